@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# adaptive_concurrency.py - Adaptive Parallelität pro Host (AIMD) für die Scraper von IRI® Legal Agent
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from politeness import host_of
+
+logger = logging.getLogger("adaptive_concurrency")
+
+# Obergrenze des Fensters gleichzeitiger Anfragen an denselben Host
+SCRAPER_MAX_PER_HOST = int(os.getenv("SCRAPER_MAX_PER_HOST", "4"))
+
+# Faktor, mit dem das Fenster gleichzeitiger Anfragen bei Drosselung verkleinert wird
+AIMD_DECREASE_FACTOR = float(os.getenv("AIMD_DECREASE_FACTOR", "0.5"))
+
+# Sperrzeit nach der ersten Drosselung ohne Retry-After (verdoppelt sich bei jeder weiteren)
+CONGESTION_BACKOFF = float(os.getenv("CONGESTION_BACKOFF", "5"))
+
+# Längste Sperrzeit in Sekunden (auch für sehr große Retry-After-Werte)
+MAX_CONGESTION_BACKOFF = float(os.getenv("MAX_CONGESTION_BACKOFF", "600"))
+
+# Statuscodes, mit denen ein Host Drosselung signalisiert
+CONGESTION_STATUS_CODES = (429, 503)
+
+# Statuscodes, bei denen der Inhalt auf eine Captcha- oder Bot-Prüfseite untersucht wird
+CHALLENGE_STATUS_CODES = (403,)
+
+# Textmerkmale von Captcha- und Bot-Prüfseiten (bewusst ohne "robot", das auch in <meta name="robots"> vorkommt)
+CONGESTION_TEXT_MARKERS = ("captcha", "are you a robot", "not a robot", "unusual traffic", "ungewöhnlichen datenverkehr")
+
+
+def is_congested(status_code, text):
+    """
+    Prüft, ob eine Antwort auf Drosselung oder Anti-Bot-Maßnahmen hinweist
+    
+    Args:
+        status_code: HTTP-Statuscode
+        text: Inhalt der Antwort
+        
+    Returns:
+        True bei 429, 503 oder einer 403-Antwort mit einem Merkmal aus CONGESTION_TEXT_MARKERS
+    """
+    if status_code in CONGESTION_STATUS_CODES:
+        return True
+    
+    # Gewöhnliche Seiten binden oft reCAPTCHA im Kontaktformular ein; nur abgewiesene Anfragen prüfen
+    if status_code not in CHALLENGE_STATUS_CODES:
+        return False
+    text_lower = (text or "").lower()
+    return any(marker in text_lower for marker in CONGESTION_TEXT_MARKERS)
+
+
+def parse_retry_after(value):
+    """
+    Liest einen Retry-After-Header (Sekunden oder HTTP-Datum)
+    
+    Args:
+        value: Wert des Headers oder None
+        
+    Returns:
+        Wartezeit in Sekunden oder None, wenn der Header fehlt oder ungültig ist
+    """
+    if not value:
+        return None
+    
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostWindow:
+    """AIMD-Zustand eines Hosts: Fenster gleichzeitiger Anfragen und Sperrzeit nach Drosselung"""
+    
+    __slots__ = ("window", "blocked_until", "consecutive_congestions", "successes", "congestions")
+    
+    def __init__(self, initial):
+        self.window = float(initial)
+        self.blocked_until = 0.0
+        self.consecutive_congestions = 0
+        self.successes = 0
+        self.congestions = 0
+
+
+class AIMDController:
+    """Passt die Parallelität pro Host nach Additive Increase / Multiplicative Decrease an
+    
+    Jede erfolgreiche Antwort vergrößert das Fenster um 1/Fenster, also um etwa eine Anfrage pro
+    Runde, bis zur Obergrenze SCRAPER_MAX_PER_HOST. Antwortet ein Host mit 429, 503 oder einer Captcha-Seite, wird das
+    Fenster mit AIMD_DECREASE_FACTOR multipliziert und der Host bis zum Ablauf von Retry-After (oder
+    einer exponentiell wachsenden Sperrzeit) nicht mehr angefragt. Weitere Drosselungen, die während
+    der Sperrzeit eintreffen (Anfragen, die schon unterwegs waren), verkleinern das Fenster nicht erneut.
+    """
+    
+    def __init__(self, initial=1, minimum=1, maximum=None, decrease_factor=None, backoff=None, max_backoff=None):
+        """
+        Initialisiert den AIMDController
+        
+        Args:
+            initial: Fenster eines neuen Hosts
+            minimum: Kleinstes Fenster
+            maximum: Optional, größtes Fenster (Standard: SCRAPER_MAX_PER_HOST)
+            decrease_factor: Optional, Faktor bei Drosselung (Standard: AIMD_DECREASE_FACTOR)
+            backoff: Optional, erste Sperrzeit ohne Retry-After in Sekunden (Standard: CONGESTION_BACKOFF)
+            max_backoff: Optional, längste Sperrzeit in Sekunden (Standard: MAX_CONGESTION_BACKOFF)
+        """
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum or SCRAPER_MAX_PER_HOST
+        self.decrease_factor = decrease_factor or AIMD_DECREASE_FACTOR
+        self.backoff = backoff or CONGESTION_BACKOFF
+        self.max_backoff = max_backoff or MAX_CONGESTION_BACKOFF
+        self._hosts = {}
+        self._lock = threading.Lock()
+    
+    def _host(self, url):
+        """AIMD-Zustand des Hosts einer URL (muss unter self._lock aufgerufen werden)"""
+        host = host_of(url)
+        if host not in self._hosts:
+            self._hosts[host] = HostWindow(self.initial)
+        return self._hosts[host]
+    
+    def limit(self, url, maximum=None):
+        """
+        Anzahl gleichzeitiger Anfragen, die aktuell an den Host einer URL gehen dürfen
+        
+        Args:
+            url: Die URL der Anfrage
+            maximum: Optional, zusätzliche Obergrenze des Aufrufers
+            
+        Returns:
+            Ganzzahliges Fenster zwischen minimum und maximum
+        """
+        maximum = min(self.maximum, maximum) if maximum else self.maximum
+        with self._lock:
+            return max(self.minimum, min(maximum, int(self._host(url).window)))
+    
+    def blocked_for(self, url):
+        """Verbleibende Sperrzeit des Hosts einer URL in Sekunden (0, wenn nicht gesperrt)"""
+        with self._lock:
+            return max(0.0, self._host(url).blocked_until - time.monotonic())
+    
+    def record_success(self, url):
+        """
+        Meldet eine erfolgreiche Antwort (vergrößert das Fenster additiv bis zur Obergrenze)
+        
+        Args:
+            url: Die URL der Anfrage
+        """
+        with self._lock:
+            state = self._host(url)
+            state.successes += 1
+            state.consecutive_congestions = 0
+            state.window = min(float(self.maximum), state.window + 1.0 / state.window)
+    
+    def record_congestion(self, url, retry_after=None):
+        """
+        Meldet Drosselung (verkleinert das Fenster multiplikativ und sperrt den Host)
+        
+        Args:
+            url: Die URL der Anfrage
+            retry_after: Optional, Wert des Retry-After-Headers
+            
+        Returns:
+            Sperrzeit des Hosts in Sekunden
+        """
+        delay = parse_retry_after(retry_after)
+        
+        with self._lock:
+            state = self._host(url)
+            now = time.monotonic()
+            state.congestions += 1
+            
+            # Nur eine Verkleinerung pro Sperrzeit, damit gleichzeitig abgewiesene Anfragen das Fenster nicht auf 1 drücken
+            if now >= state.blocked_until:
+                state.consecutive_congestions += 1
+                state.window = max(float(self.minimum), state.window * self.decrease_factor)
+            
+            if delay is None:
+                delay = self.backoff * 2 ** (state.consecutive_congestions - 1)
+            delay = min(delay, self.max_backoff)
+            state.blocked_until = max(state.blocked_until, now + delay)
+            
+            logger.info(f"Drosselung durch {host_of(url)}: Fenster {state.window:.1f}, Pause {delay:.1f}s")
+            return state.blocked_until - now
+    
+    def wait(self, url):
+        """
+        Blockiert, bis die Sperrzeit des Hosts abgelaufen ist
+        
+        Args:
+            url: Die URL der Anfrage
+            
+        Returns:
+            Gewartete Zeit in Sekunden
+        """
+        waited = 0.0
+        delay = self.blocked_for(url)
+        while delay > 0:
+            time.sleep(delay)
+            waited += delay
+            delay = self.blocked_for(url)
+        return waited
+    
+    async def wait_async(self, url):
+        """
+        Wartet in der Event-Loop, bis die Sperrzeit des Hosts abgelaufen ist
+        
+        Args:
+            url: Die URL der Anfrage
+            
+        Returns:
+            Gewartete Zeit in Sekunden
+        """
+        waited = 0.0
+        delay = self.blocked_for(url)
+        while delay > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+            delay = self.blocked_for(url)
+        return waited
+    
+    def get_statistics(self):
+        """
+        Gibt den Zustand aller bisher angefragten Hosts zurück
+        
+        Returns:
+            Dictionary Host -> Fenster, Sperrzeit, Erfolge und Drosselungen
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: {
+                    "window": round(state.window, 2),
+                    "blocked_for": round(max(0.0, state.blocked_until - now), 1),
+                    "successes": state.successes,
+                    "congestions": state.congestions
+                }
+                for host, state in self._hosts.items()
+            }
+
+
+# Ein Controller pro Prozess, damit alle Scraper dieselben Fenster und Sperrzeiten sehen
+_concurrency_controller = None
+_concurrency_controller_lock = threading.Lock()
+
+
+def get_concurrency_controller():
+    """
+    Gibt den gemeinsam genutzten AIMDController zurück
+    
+    Returns:
+        AIMDController-Objekt
+    """
+    global _concurrency_controller
+    
+    if _concurrency_controller is None:
+        with _concurrency_controller_lock:
+            if _concurrency_controller is None:
+                _concurrency_controller = AIMDController()
+    
+    return _concurrency_controller
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# analysis_cache.py - Cache für Analyseergebnisse unveränderter Profile und Posts
+
+import os
+import json
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from analysis_result import AnalysisResult
+
+logger = logging.getLogger("analysis_cache")
+
+# Maximale Anzahl von Einträgen im Arbeitsspeicher
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "50000"))
+
+# Alter in Tagen, nach dem Einträge aus der Datenbank entfernt werden (unabhängig von der Detector-Version)
+ANALYSIS_CACHE_MAX_AGE_DAYS = float(os.getenv("ANALYSIS_CACHE_MAX_AGE_DAYS", "30"))
+
+
+def make_cache_key(kind, detector_version, text):
+    """
+    Berechnet den Cache-Schlüssel für einen Text
+    
+    Args:
+        kind: Art der Analyse ('profile' oder 'post')
+        detector_version: Versionsstempel des Detectors
+        text: Der analysierte Text
+        
+    Returns:
+        SHA-256-Hexdigest aus Analyseart, Detector-Version und normalisiertem Text
+    """
+    normalized = unicodedata.normalize("NFC", text or "").strip()
+    digest = hashlib.sha256()
+    digest.update(f"{kind}\x00{detector_version}\x00".encode("utf-8"))
+    digest.update(normalized.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Zweistufiger Cache für Analyseergebnisse: LRU im Arbeitsspeicher und persistent in der Datenbank"""
+    
+    def __init__(self, db_manager=None, max_entries=None):
+        """
+        Initialisiert den AnalysisCache
+        
+        Args:
+            db_manager: Optional, ein DatabaseManager-Objekt für die persistente Stufe
+            max_entries: Optional, maximale Anzahl von Einträgen im Arbeitsspeicher
+        """
+        self.db_manager = db_manager
+        self.max_entries = max_entries or ANALYSIS_CACHE_SIZE
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # Statistiken
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get_many(self, cache_keys):
+        """
+        Sucht mehrere Schlüssel, zuerst im Arbeitsspeicher, dann in der Datenbank
+        
+        Args:
+            cache_keys: Liste von Cache-Schlüsseln
+            
+        Returns:
+            Dictionary mit Cache-Schlüssel -> AnalysisResult für alle Treffer
+        """
+        found = {}
+        missing = []
+        
+        with self._lock:
+            for cache_key in cache_keys:
+                result = self._entries.get(cache_key)
+                if result is None:
+                    missing.append(cache_key)
+                else:
+                    self._entries.move_to_end(cache_key)
+                    found[cache_key] = result
+            self.hits += len(found)
+        
+        if missing and self.db_manager:
+            stored = self.db_manager.get_cached_analyses(missing)
+            loaded = {cache_key: AnalysisResult.from_dict(json.loads(result)) for cache_key, result in stored.items()}
+            
+            with self._lock:
+                for cache_key, result in loaded.items():
+                    self._remember(cache_key, result)
+                self.db_hits += len(loaded)
+            
+            found.update(loaded)
+        
+        with self._lock:
+            self.misses += len(cache_keys) - len(found)
+        
+        return found
+    
+    def put_many(self, entries, detector_version, kind):
+        """
+        Speichert neue Analyseergebnisse in beiden Stufen
+        
+        Args:
+            entries: Dictionary mit Cache-Schlüssel -> AnalysisResult
+            detector_version: Versionsstempel des Detectors
+            kind: Art der Analyse ('profile' oder 'post')
+        """
+        if not entries:
+            return
+        
+        with self._lock:
+            for cache_key, result in entries.items():
+                self._remember(cache_key, result)
+        
+        if self.db_manager:
+            self.db_manager.store_cached_analyses([
+                {
+                    "cache_key": cache_key,
+                    "detector_version": detector_version,
+                    "kind": kind,
+                    "result": json.dumps(result.to_dict(), ensure_ascii=False)
+                }
+                for cache_key, result in entries.items()
+            ])
+    
+    def _remember(self, cache_key, result):
+        """Fügt einen Eintrag in den LRU-Speicher ein (Lock muss gehalten werden)"""
+        self._entries[cache_key] = result
+        self._entries.move_to_end(cache_key)
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self):
+        """
+        Leert den Arbeitsspeicher
+        
+        Die Datenbank bleibt unverändert: die Detector-Version ist Teil des Schlüssels, sodass
+        Einträge anderer Versionen nicht getroffen werden, aber nach einem Wechsel zurück auf
+        einen früheren Regelsatz (oder in anderen Prozessen) weiterverwendet werden können.
+        """
+        with self._lock:
+            self._entries.clear()
+    
+    def trim(self, max_age_days=None):
+        """
+        Entfernt alte Einträge aus der Datenbank
+        
+        Args:
+            max_age_days: Optional, Alter in Tagen (Standard: ANALYSIS_CACHE_MAX_AGE_DAYS)
+            
+        Returns:
+            Anzahl der gelöschten Einträge
+        """
+        if not self.db_manager:
+            return 0
+        
+        max_age_days = ANALYSIS_CACHE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        return self.db_manager.purge_analysis_cache(datetime.now() - timedelta(days=max_age_days))
+    
+    def get_statistics(self):
+        """
+        Gibt Trefferstatistiken des Caches zurück
+        
+        Returns:
+            Dictionary mit Statistiken
+        """
+        lookups = self.hits + self.db_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "memory_hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.db_hits) / lookups if lookups else 0.0
+        }
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# analysis_result.py - Kompakte Analyseergebnisse für IRI® Legal Agent
+
+from array import array
+
+# Felder der Dictionary-Darstellung (entspricht dem bisherigen Ausgabeformat)
+PROFILE_FIELDS = (
+    "contains_hyaluron_pen", "keyword_hits", "keyword_hit_count", "prices", "emails", "phones",
+    "locations", "commercial_score", "risk_score", "analysis_date"
+)
+POST_FIELDS = (
+    "contains_hyaluron_pen", "keyword_hits", "keyword_hit_count", "prices", "price_mentioned",
+    "commercial_score", "risk_score", "analysis_date"
+)
+
+
+class AnalysisResult:
+    """Analyseergebnis eines Profils oder Posts mit __slots__ statt eines Dictionaries pro Ergebnis
+    
+    Flags und Scores werden als native Werte gespeichert, Preise als Array in Cent, Keyword-Treffer,
+    Kontaktdaten und Orte als Tupel. Leere Felder teilen sich das leere Tupel. Ergebnisse werden
+    nach dem Erstellen nicht mehr verändert, damit Kopien (with_date) die Inhalte teilen können.
+    Lesender Zugriff wie auf ein Dictionary (result["risk_score"], result.get(...)) bleibt
+    möglich; to_dict() wird nur für JSON (Export, API, Datenbank-Cache) benötigt.
+    """
+    
+    __slots__ = (
+        "kind", "contains_hyaluron_pen", "_keyword_hits", "keyword_hit_count", "_price_cents",
+        "emails", "phones", "locations", "commercial_score", "risk_score", "analysis_date"
+    )
+    
+    def __init__(self, kind, contains_hyaluron_pen, keyword_hits, keyword_hit_count, price_cents,
+                 commercial_score, risk_score, analysis_date, emails=(), phones=(), locations=()):
+        """
+        Initialisiert ein AnalysisResult
+        
+        Args:
+            kind: Art der Analyse ('profile' oder 'post')
+            contains_hyaluron_pen: Ob Hyaluron-Keywords gefunden wurden
+            keyword_hits: Dictionary mit Schlüsselwort -> Liste der Startpositionen
+            keyword_hit_count: Anzahl aller Keyword-Treffer
+            price_cents: Liste der Preise in Cent
+            commercial_score: Kommerzieller Score (0-1)
+            risk_score: Risiko-Score (0-100)
+            analysis_date: Zeitstempel der Analyse (ISO-Format, pro Batch geteilt)
+            emails: Optional, gefundene E-Mail-Adressen (nur Profile)
+            phones: Optional, gefundene Telefonnummern (nur Profile)
+            locations: Optional, gefundene Orte (nur Profile)
+        """
+        self.kind = kind
+        self.contains_hyaluron_pen = bool(contains_hyaluron_pen)
+        self._keyword_hits = tuple(
+            (keyword, tuple(positions)) for keyword, positions in keyword_hits.items()
+        ) if keyword_hits else ()
+        self.keyword_hit_count = int(keyword_hit_count)
+        self._price_cents = array("l", price_cents) if price_cents else None
+        self.emails = tuple(emails) if emails else ()
+        self.phones = tuple(phones) if phones else ()
+        self.locations = tuple(locations) if locations else ()
+        self.commercial_score = float(commercial_score)
+        self.risk_score = float(risk_score)
+        self.analysis_date = analysis_date
+    
+    @property
+    def keyword_hits(self):
+        """Dictionary mit Schlüsselwort -> Liste der Startpositionen"""
+        return {keyword: list(positions) for keyword, positions in self._keyword_hits}
+    
+    @property
+    def price_cents(self):
+        """Preise in Cent"""
+        return self._price_cents if self._price_cents is not None else ()
+    
+    @property
+    def prices(self):
+        """Preise in Euro"""
+        return [price_cents / 100 for price_cents in self.price_cents]
+    
+    @property
+    def price_mentioned(self):
+        """Preise als Text für die Datenbank (z.B. '79.0€, 150.0€') oder None"""
+        prices = self.prices
+        return ", ".join([f"{price}€" for price in prices]) if prices else None
+    
+    @property
+    def fields(self):
+        """Felder der Dictionary-Darstellung"""
+        return PROFILE_FIELDS if self.kind == "profile" else POST_FIELDS
+    
+    def with_date(self, analysis_date):
+        """
+        Gibt eine Kopie mit anderem Analysedatum zurück (die Inhalte werden geteilt)
+        
+        Args:
+            analysis_date: Zeitstempel der Analyse (ISO-Format)
+            
+        Returns:
+            AnalysisResult-Objekt
+        """
+        copy = object.__new__(AnalysisResult)
+        for slot in self.__slots__:
+            setattr(copy, slot, getattr(self, slot))
+        copy.analysis_date = analysis_date
+        return copy
+    
+    def with_risk_score(self, risk_score):
+        """
+        Gibt eine Kopie mit anderem Risiko-Score zurück (z.B. aus dem gelernten Risikomodell)
+        
+        Args:
+            risk_score: Risiko-Score (0-100)
+            
+        Returns:
+            AnalysisResult-Objekt
+        """
+        copy = self.with_date(self.analysis_date)
+        copy.risk_score = float(risk_score)
+        return copy
+    
+    def to_dict(self):
+        """
+        Wandelt das Ergebnis in ein JSON-serialisierbares Dictionary um
+        
+        Returns:
+            Dictionary im bisherigen Ausgabeformat von analyze_profile bzw. analyze_post
+        """
+        result = {field: getattr(self, field) for field in self.fields}
+        for field in ("emails", "phones", "locations"):
+            if field in result:
+                result[field] = list(result[field])
+        return result
+    
+    @classmethod
+    def from_dict(cls, data, kind=None):
+        """
+        Erstellt ein Ergebnis aus seiner Dictionary-Darstellung
+        
+        Args:
+            data: Dictionary, z.B. aus dem Datenbank-Cache
+            kind: Optional, Art der Analyse (Standard: 'profile', wenn Kontaktdaten enthalten sind)
+            
+        Returns:
+            AnalysisResult-Objekt
+        """
+        if kind is None:
+            kind = "profile" if "emails" in data else "post"
+        
+        return cls(
+            kind,
+            data.get("contains_hyaluron_pen", False),
+            data.get("keyword_hits"),
+            data.get("keyword_hit_count", 0),
+            [round(price * 100) for price in data.get("prices") or []],
+            data.get("commercial_score", 0.0),
+            data.get("risk_score", 0.0),
+            data.get("analysis_date"),
+            emails=data.get("emails"),
+            phones=data.get("phones"),
+            locations=data.get("locations")
+        )
+    
+    def __getitem__(self, key):
+        if key not in self.fields:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key, default=None):
+        """Liest ein Feld wie bei einem Dictionary"""
+        return getattr(self, key) if key in self.fields else default
+    
+    def __contains__(self, key):
+        return key in self.fields
+    
+    def keys(self):
+        """Felder der Dictionary-Darstellung"""
+        return list(self.fields)
+    
+    def __eq__(self, other):
+        if isinstance(other, AnalysisResult):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return f"<AnalysisResult(kind='{self.kind}', risk_score={self.risk_score:.2f}, keyword_hits={self.keyword_hit_count})>"
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# async_scraper.py - Asynchrone Scraping-Engine (asyncio/aiohttp) für IRI® Legal Agent
+
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+from collections import Counter
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+from requests.structures import CaseInsensitiveDict
+
+from platform_scraper import search_results
+from politeness import get_politeness_scheduler, host_of
+from adaptive_concurrency import SCRAPER_MAX_PER_HOST, get_concurrency_controller, is_congested
+from http_cache import request_url
+
+logger = logging.getLogger("async_scraper")
+
+# Maximale Anzahl gleichzeitig laufender Anfragen über alle Hosts
+SCRAPER_MAX_CONCURRENCY = int(os.getenv("SCRAPER_MAX_CONCURRENCY", "16"))
+
+# Zeitlimit einer Anfrage in Sekunden (wie BaseScraper.make_request)
+REQUEST_TIMEOUT = 10
+
+
+class FetchedPage:
+    """Asynchron geladene Seite mit den Attributen, die die Scraper von einem requests.Response verwenden"""
+    
+    __slots__ = ("url", "status_code", "headers", "text")
+    
+    def __init__(self, url, status_code, headers, text):
+        """
+        Initialisiert eine FetchedPage
+        
+        Args:
+            url: Endgültige URL (nach Weiterleitungen)
+            status_code: HTTP-Statuscode
+            headers: Antwort-Header (Groß-/Kleinschreibung egal, wie bei requests)
+            text: Dekodierter Inhalt der Seite
+        """
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+    
+    @property
+    def ok(self):
+        """Ob die Anfrage erfolgreich war (wie requests.Response.ok)"""
+        return self.status_code < 400
+    
+    def __bool__(self):
+        return self.ok
+
+
+class HostLimiter:
+    """Globales Limit und adaptives Limit pro Host für gleichzeitige Anfragen (gilt für einen Durchlauf der Event-Loop)"""
+    
+    def __init__(self, max_concurrency, max_per_host, scheduler=None, controller=None):
+        """
+        Initialisiert den HostLimiter
+        
+        Args:
+            max_concurrency: Maximale Anzahl gleichzeitiger Anfragen über alle Hosts
+            max_per_host: Obergrenze gleichzeitiger Anfragen pro Host
+            scheduler: Optional, PolitenessScheduler, dessen Rate pro Host zusätzlich eingehalten wird
+            controller: Optional, AIMDController, der das Limit pro Host unterhalb von max_per_host festlegt
+                        und gedrosselte Hosts sperrt (ohne Controller gilt max_per_host fest)
+        """
+        self.max_per_host = max_per_host
+        self.scheduler = scheduler
+        self.controller = controller
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._host_conditions = {}
+        self._in_flight = Counter()
+    
+    def _limit(self, url):
+        """Aktuelles Limit gleichzeitiger Anfragen an den Host einer URL"""
+        if self.controller:
+            return self.controller.limit(url, self.max_per_host)
+        return self.max_per_host
+    
+    @asynccontextmanager
+    async def slot(self, url, platform=None):
+        """Belegt einen Platz beim Host der URL und einen globalen Platz für die Dauer einer Anfrage"""
+        host = host_of(url)
+        if host not in self._host_conditions:
+            self._host_conditions[host] = asyncio.Condition()
+        condition = self._host_conditions[host]
+        
+        # Das Limit kann sich zwischen zwei Anfragen ändern und wird bei jeder Freigabe neu geprüft
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight[host] < self._limit(url))
+            self._in_flight[host] += 1
+        
+        try:
+            # Auf Sperrzeit und Rate des Hosts wird gewartet, bevor ein globaler Platz belegt wird,
+            # damit ein gedrosselter Host keine Plätze für andere Hosts blockiert
+            if self.controller:
+                await self.controller.wait_async(url)
+            if self.scheduler:
+                await self.scheduler.wait_async(url, platform)
+            async with self._slots:
+                yield
+        finally:
+            async with condition:
+                self._in_flight[host] -= 1
+                condition.notify_all()
+
+
+class AsyncSearchEngine:
+    """Führt die Suchen eines MultiPlatformScraper gleichzeitig aus
+    
+    Alle Seiten aller Plattformen und Suchbegriffe werden mit einer gemeinsamen aiohttp-Session
+    geladen, begrenzt durch ein globales Limit, ein adaptives Limit pro Host (AIMDController) und die
+    Rate pro Host des PolitenessScheduler. Ausgewertet und gespeichert werden
+    die Seiten von den Suchmethoden der Plattform-Scraper in einem einzelnen Hintergrund-Thread,
+    damit Datenbankzugriffe wie beim sequenziellen Durchlauf nacheinander erfolgen und die
+    Event-Loop nicht blockieren.
+    """
+    
+    def __init__(self, platform_scraper, max_concurrency=None, max_per_host=None, retry_count=3, retry_delay=2,
+                 scheduler=None, controller=None):
+        """
+        Initialisiert die AsyncSearchEngine
+        
+        Args:
+            platform_scraper: MultiPlatformScraper, dessen Scraper Seiten auswerten und speichern
+            max_concurrency: Optional, maximale Anzahl gleichzeitiger Anfragen (Standard: SCRAPER_MAX_CONCURRENCY)
+            max_per_host: Optional, Obergrenze gleichzeitiger Anfragen pro Host (Standard: SCRAPER_MAX_PER_HOST)
+            retry_count: Anzahl der Versuche pro Seite
+            retry_delay: Verzögerung zwischen Wiederholungsversuchen in Sekunden
+            scheduler: Optional, PolitenessScheduler für die Rate pro Host (Standard: gemeinsamer Scheduler)
+            controller: Optional, AIMDController für das Limit pro Host (Standard: gemeinsamer Controller)
+        """
+        self.platform_scraper = platform_scraper
+        self.max_concurrency = max_concurrency or SCRAPER_MAX_CONCURRENCY
+        self.max_per_host = max_per_host or SCRAPER_MAX_PER_HOST
+        self.retry_count = retry_count
+        self.retry_delay = retry_delay
+        self.scheduler = scheduler or get_politeness_scheduler()
+        self.controller = controller or get_concurrency_controller()
+    
+    def run_search(self, search_terms=None, platforms=None):
+        """
+        Führt eine Suche auf allen oder bestimmten Plattformen gleichzeitig durch
+        
+        Args:
+            search_terms: Liste von Suchbegriffen oder None für Standardbegriffe
+            platforms: Liste von Plattformen oder None für alle Plattformen
+            
+        Returns:
+            Dictionary mit Ergebnissen pro Plattform (gleiche Reihenfolge wie MultiPlatformScraper.run_search)
+        """
+        # Verwende alle Plattformen, wenn keine angegeben sind
+        if not platforms:
+            platforms = ["Instagram", "Facebook", "TikTok", "Google", "Website"]
+        
+        plan = self.platform_scraper.plan_search(search_terms, platforms)
+        found = asyncio.run(self._run(plan))
+        
+        results = {platform: [] for platform in platforms}
+        for platform, platform_found in zip([platform for platform, searches in plan], found):
+            for search_found in platform_found:
+                results[platform].extend(search_found)
+            logger.info(f"Suche auf {platform} abgeschlossen: {len(results[platform])} Ergebnisse gefunden")
+        
+        return results
+    
+    def iter_search(self, search_terms=None, platforms=None):
+        """
+        Führt eine Suche gleichzeitig durch und liefert jedes Ergebnis, sobald seine Seite ausgewertet ist
+        
+        Args:
+            search_terms: Liste von Suchbegriffen oder None für Standardbegriffe
+            platforms: Liste von Plattformen oder None für alle Plattformen
+            
+        Yields:
+            Tupel (Plattform, Profildaten) in der Reihenfolge, in der die Seiten geladen wurden
+        """
+        plan = self.platform_scraper.plan_search(search_terms, platforms)
+        found = queue.Queue()
+        done = object()
+        
+        def run():
+            try:
+                asyncio.run(self._run(plan, found.put))
+            except Exception as e:
+                logger.error(f"Fehler in der asynchronen Suche: {e}")
+            finally:
+                found.put(done)
+        
+        # Die Event-Loop läuft in einem eigenen Thread, damit der Aufrufer die Ergebnisse verarbeiten kann
+        thread = threading.Thread(target=run, name="async-search", daemon=True)
+        thread.start()
+        
+        while True:
+            item = found.get()
+            if item is done:
+                break
+            yield item
+        
+        thread.join()
+    
+    async def _run(self, plan, on_result=None):
+        """
+        Lädt und wertet alle Seiten eines Suchplans aus
+        
+        Args:
+            plan: Suchplan aus MultiPlatformScraper.plan_search
+            on_result: Optional, Funktion, die für jedes Ergebnis mit (Plattform, Profildaten) aufgerufen wird
+            
+        Returns:
+            Pro Plattform eine Liste mit den Ergebnislisten ihrer Suchen (in der Reihenfolge des Plans)
+        """
+        limiter = HostLimiter(self.max_concurrency, self.max_per_host, self.scheduler, self.controller)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.max_per_host)
+        
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="async-search-parse") as parser:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                return await asyncio.gather(*[
+                    asyncio.gather(*[
+                        self._search(session, limiter, parser, platform, search, url, term, on_result)
+                        for search, url, term in searches
+                    ])
+                    for platform, searches in plan
+                ])
+    
+    async def _search(self, session, limiter, parser, platform, search, url, term, on_result):
+        """Lädt die Seite einer Suche und wertet sie mit der Suchmethode des Scrapers aus"""
+        scraper = search.__self__
+        start_time = time.time()
+        
+        page = await self._fetch(session, limiter, scraper, url)
+        if page is None:
+            scraper.log_search(scraper.platform_name, term, 0, time.time() - start_time,
+                               is_successful=False, error_message=f"Alle Versuche für {url} fehlgeschlagen")
+            return []
+        
+        loop = asyncio.get_running_loop()
+        try:
+            found = search_results(await loop.run_in_executor(parser, lambda: search(term, response=page)))
+        except Exception as e:
+            logger.error(f"Fehler beim Auswerten von {url}: {e}")
+            return []
+        
+        if on_result:
+            for profile_data in found:
+                on_result((platform, profile_data))
+        return found
+    
+    async def _fetch(self, session, limiter, scraper, url):
+        """
+        Lädt eine Seite mit Wiederholungsversuchen (asynchrone Entsprechung von BaseScraper.make_request)
+        
+        Args:
+            session: aiohttp.ClientSession
+            limiter: HostLimiter des Durchlaufs
+            scraper: Plattform-Scraper, dessen User-Agent und Proxy-Pool verwendet werden
+            url: Die URL der Seite
+            
+        Returns:
+            FetchedPage-Objekt oder None bei Fehler
+        """
+        # Derselbe HTTP-Cache wie bei make_request: innerhalb der TTL ohne Anfrage, danach bedingt
+        cache = scraper.http_cache
+        cache_url = cache_entry = None
+        conditional_headers = {}
+        if cache:
+            cache_url = request_url(url)
+            cache_entry = cache.lookup(cache_url)
+            if cache_entry and cache_entry.is_fresh(cache.ttl_for(scraper.platform_name)):
+                text = cache.text(cache_entry)
+                if text is not None:
+                    return FetchedPage(cache_entry.url, 200, cache_entry.headers(), text)
+            if cache_entry:
+                conditional_headers = cache_entry.conditional_headers()
+        
+        for attempt in range(self.retry_count):
+            proxy = None
+            # Pro Versuch neu aufbauen, damit rotate_user_agent() auch für Wiederholungen gilt
+            headers = {"User-Agent": scraper.session.headers.get("User-Agent"), **conditional_headers}
+            try:
+                # Plätze werden nur während der Anfrage belegt, nicht während der Wartezeit
+                async with limiter.slot(url, scraper.platform_name):
+                    proxy = scraper.proxy_pool.acquire(url)
+                    start_time = time.monotonic()
+                    try:
+                        async with session.get(url, headers=headers, proxy=proxy) as response:
+                            body = await response.read()
+                            text = await response.text(errors="replace")
+                            page = FetchedPage(str(response.url), response.status, CaseInsensitiveDict(response.headers), text)
+                    except (aiohttp.ClientError, asyncio.TimeoutError):
+                        scraper.proxy_pool.record_failure(proxy, url)
+                        raise
+                
+                    # Rückmeldung an Controller und Proxy-Pool, solange der Platz noch belegt ist
+                    congested = is_congested(page.status_code, page.text)
+                    scraper.proxy_pool.record_response(proxy, url, page.status_code, time.monotonic() - start_time, congested)
+                    if congested:
+                        self.controller.record_congestion(url, page.headers.get("Retry-After"))
+                    elif page.ok:
+                        self.controller.record_success(url)
+                        if page.status_code == 304 and cache_entry:
+                            cache.refresh(cache_entry, page.headers)
+                            text = cache.text(cache_entry, revalidated=True)
+                            if text is not None:
+                                return FetchedPage(cache_entry.url, 200, cache_entry.headers(), text)
+                            
+                            # Inhalt wurde inzwischen verdrängt: ohne Validatoren erneut anfragen
+                            conditional_headers = {}
+                            cache_entry = None
+                            continue
+                        if cache and page.status_code == 200:
+                            cache.store(cache_url, page.headers, body, response.charset)
+                        return page
+                
+                if congested:
+                    # Die nächste Anfrage wartet die Sperrzeit des Hosts ab (Retry-After)
+                    logger.warning(f"Drosselung oder Anti-Bot-Maßnahme bei {url} (HTTP {page.status_code}, Versuch {attempt+1}/{self.retry_count})")
+                    scraper.rotate_user_agent()
+                    continue
+                
+                logger.warning(f"Fehler bei Anfrage an {url}: HTTP {page.status_code} (Versuch {attempt+1}/{self.retry_count})")
+            
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Fehler bei Anfrage an {url}: {e!r} (Versuch {attempt+1}/{self.retry_count})")
+            
+                # Ein toter Proxy ist kein Grund zu warten: der nächste Versuch geht über einen anderen
+                if proxy and isinstance(e, (aiohttp.ClientProxyConnectionError, aiohttp.ClientHttpProxyError)):
+                    scraper.rotate_user_agent()
+                    continue
+            
+            scraper.rotate_user_agent()
+            await asyncio.sleep(self.retry_delay * (attempt + 1))
+        
+        logger.error(f"Alle Versuche für {url} fehlgeschlagen")
+        return None
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# bulk_writer.py - Gepuffertes Speichern analysierter Profile für IRI® Legal Agent
+
+import os
+import time
+import logging
+import threading
+from pipeline_metrics import instrumented
+
+logger = logging.getLogger("bulk_writer")
+
+# Anzahl der Profile, ab der der Puffer in die Datenbank geschrieben wird
+BULK_BATCH_SIZE = int(os.getenv("DB_BULK_BATCH_SIZE", "200"))
+
+# Maximale Zeit in Sekunden, die ein Profil im Puffer verbleibt
+BULK_FLUSH_INTERVAL = float(os.getenv("DB_BULK_FLUSH_INTERVAL", "5.0"))
+
+
+class BulkProfileWriter:
+    """Sammelt Profile und Posts und schreibt sie batchweise in je einer Transaktion"""
+    
+    def __init__(self, db_manager, batch_size=None, flush_interval=None):
+        """
+        Initialisiert den BulkProfileWriter
+        
+        Args:
+            db_manager: Ein DatabaseManager-Objekt
+            batch_size: Optional, Anzahl der Profile pro Transaktion
+            flush_interval: Optional, maximale Verweildauer im Puffer in Sekunden (0 deaktiviert den Timer)
+        """
+        self.db_manager = db_manager
+        self.batch_size = max(1, batch_size or BULK_BATCH_SIZE)
+        self.flush_interval = BULK_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        
+        # Statistiken
+        self.profiles_written = 0
+        self.posts_written = 0
+        self.failed_batches = 0
+        self.failed_profiles = 0
+        
+        # Hintergrund-Thread, der den Puffer spätestens nach flush_interval Sekunden leert
+        self._stop_event = threading.Event()
+        self._timer_thread = None
+        if self.flush_interval and self.flush_interval > 0:
+            self._timer_thread = threading.Thread(target=self._run_timer, name="bulk-writer", daemon=True)
+            self._timer_thread.start()
+    
+    def __len__(self):
+        return len(self._buffer)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def add(self, platform_name, profile_data, posts=None):
+        """
+        Puffert ein Profil mit seinen Posts
+        
+        Args:
+            platform_name: Name der Plattform (z.B. 'Instagram')
+            profile_data: Dictionary mit den Profildaten
+            posts: Optional, Liste von Dictionaries mit Postdaten
+        """
+        with self._lock:
+            self._buffer.append({
+                "platform": platform_name,
+                "profile": dict(profile_data),
+                "posts": list(posts or [])
+            })
+            full = len(self._buffer) >= self.batch_size
+        
+        if full:
+            self.flush()
+    
+    @instrumented("bulk_writer.flush")
+    def flush(self):
+        """
+        Schreibt alle gepufferten Profile in die Datenbank
+        
+        Returns:
+            Anzahl der geschriebenen Profile
+        """
+        with self._flush_lock:
+            with self._lock:
+                records, self._buffer = self._buffer, []
+                self._last_flush = time.monotonic()
+            
+            written = 0
+            for start in range(0, len(records), self.batch_size):
+                batch = records[start:start + self.batch_size]
+                result = self.db_manager.bulk_upsert_profiles(batch)
+                
+                if result is None:
+                    # Ein fehlerhafter Datensatz soll nicht den ganzen Batch kosten: einzeln wiederholen
+                    self.failed_batches += 1
+                    logger.warning(f"Batch mit {len(batch)} Profilen konnte nicht gespeichert werden, speichere einzeln")
+                    result = self._write_individually(batch)
+                
+                self.profiles_written += result[0]
+                self.posts_written += result[1]
+                written += result[0]
+            
+            return written
+    
+    def _write_individually(self, records):
+        """
+        Speichert Profile einzeln, jedes in einer eigenen Transaktion (nach einem fehlgeschlagenen Batch)
+        
+        Args:
+            records: Liste gepufferter Profile
+            
+        Returns:
+            Tupel (Anzahl geschriebener Profile, Anzahl neuer Posts)
+        """
+        profiles, posts = 0, 0
+        for record in records:
+            result = self.db_manager.bulk_upsert_profiles([record])
+            if result is None:
+                self.failed_profiles += 1
+                logger.error(f"Profil {record['profile'].get('profile_name')} ({record['platform']}) konnte nicht gespeichert werden")
+                continue
+            profiles += result[0]
+            posts += result[1]
+        return profiles, posts
+    
+    def _run_timer(self):
+        """Leert den Puffer regelmäßig, damit Profile nicht unbegrenzt warten"""
+        while not self._stop_event.wait(self.flush_interval):
+            if self._buffer and time.monotonic() - self._last_flush >= self.flush_interval:
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Fehler beim zeitgesteuerten Speichern: {e}")
+    
+    def close(self):
+        """Schreibt den restlichen Puffer und beendet den Hintergrund-Thread"""
+        self._stop_event.set()
+        if self._timer_thread:
+            self._timer_thread.join()
+            self._timer_thread = None
+        self.flush()
+    
+    def get_statistics(self):
+        """
+        Gibt Statistiken des Writers zurück
+        
+        Returns:
+            Dictionary mit Statistiken
+        """
+        return {
+            "buffered": len(self._buffer),
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "profiles_written": self.profiles_written,
+            "posts_written": self.posts_written,
+            "failed_batches": self.failed_batches,
+            "failed_profiles": self.failed_profiles
+        }
@@ -4,9 +4,9 @@
 import os
 import json
 from datetime import datetime
-from sqlalchemy import create_engine, func
+from sqlalchemy import create_engine, func, inspect, text
 from sqlalchemy.orm import sessionmaker
-from database_schema import Base, Platform, Profile, Post, Screenshot, SearchTerm, SearchLog, HealthAuthority, Report
+from database_schema import Base, Platform, Profile, Post, Screenshot, SearchTerm, SearchLog, HealthAuthority, Report, AnalysisCacheEntry, OperatorLink, OperatorIdentifier, DetectionRuleSet
 from dotenv import load_dotenv
 
 # Lade Umgebungsvariablen aus .env-Datei
@@ -35,6 +35,9 @@ class DatabaseManager:
         # Erstelle alle Tabellen, falls sie nicht existieren
         Base.metadata.create_all(self.engine)
         
+        # Ergänze Spalten, die bestehenden Tabellen seit ihrer Erstellung hinzugefügt wurden
+        self._add_missing_columns()
+        
         # Erstelle eine Session-Factory
         self.Session = sessionmaker(bind=self.engine)
     
@@ -42,6 +45,25 @@ class DatabaseManager:
         """Erstellt und gibt eine neue Datenbanksitzung zurück"""
         return self.Session()
     
+    def _add_missing_columns(self):
+        """Fügt fehlende, nachträglich eingeführte Spalten zu bestehenden Tabellen hinzu"""
+        inspector = inspect(self.engine)
+        
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            
+            for column in table.columns:
+                if column.name in existing_columns or column.primary_key or not column.nullable:
+                    continue
+                
+                column_type = column.type.compile(dialect=self.engine.dialect)
+                with self.engine.begin() as connection:
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                print(f"Spalte '{column.name}' zur Tabelle '{table.name}' hinzugefügt.")
+    
     def init_default_data(self):
         """Initialisiert die Datenbank mit Standarddaten"""
         session = self.get_session()
@@ -227,6 +249,134 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def bulk_upsert_profiles(self, records):
+        """
+        Fügt viele Profile und Posts in einer Transaktion hinzu oder aktualisiert sie
+        
+        Plattformen, bestehende Profile und bestehende Posts werden pro Batch mit je einer
+        Abfrage geladen, statt für jedes Profil eigene Abfragen und Commits auszuführen.
+        
+        Args:
+            records: Liste von Dictionaries mit den Schlüsseln 'platform', 'profile' und 'posts'
+            
+        Returns:
+            Tupel (Anzahl geschriebener Profile, Anzahl neuer Posts) oder None bei einem Fehler
+        """
+        if not records:
+            return (0, 0)
+        
+        # Mehrfach gepufferte Profile zusammenfassen, der letzte Stand gewinnt
+        merged = {}
+        for record in records:
+            key = (record["platform"], record["profile"].get('profile_name'))
+            if key in merged:
+                merged[key]["profile"] = record["profile"]
+                merged[key]["posts"].extend(record.get("posts") or [])
+            else:
+                merged[key] = {"profile": record["profile"], "posts": list(record.get("posts") or [])}
+        
+        session = self.get_session()
+        
+        try:
+            # Lade alle benötigten Plattformen mit einer Abfrage
+            platform_names = {platform_name for platform_name, _ in merged}
+            platforms = {
+                platform.name: platform
+                for platform in session.query(Platform).filter(Platform.name.in_(platform_names)).all()
+            }
+            for platform_name in platform_names - set(platforms):
+                print(f"Plattform '{platform_name}' nicht gefunden. Erstelle neu.")
+                platforms[platform_name] = Platform(name=platform_name)
+                session.add(platforms[platform_name])
+            session.flush()
+            
+            # Lade alle bestehenden Profile des Batches mit einer Abfrage
+            platform_ids = {platform.id for platform in platforms.values()}
+            profile_names = {profile_name for _, profile_name in merged}
+            existing_profiles = {
+                (profile.platform_id, profile.profile_name): profile
+                for profile in session.query(Profile).filter(
+                    Profile.platform_id.in_(platform_ids),
+                    Profile.profile_name.in_(profile_names)
+                ).all()
+            }
+            
+            now = datetime.now()
+            profiles = {}
+            for (platform_name, profile_name), record in merged.items():
+                profile_data = record["profile"]
+                platform_id = platforms[platform_name].id
+                profile = existing_profiles.get((platform_id, profile_name))
+                
+                if profile:
+                    # Aktualisiere das bestehende Profil
+                    profile.description = profile_data.get('description', profile.description)
+                    profile.email = profile_data.get('email', profile.email)
+                    profile.location = profile_data.get('location', profile.location)
+                    profile.follower_count = profile_data.get('follower_count', profile.follower_count)
+                    profile.risk_score = profile_data.get('risk_score', profile.risk_score)
+                    profile.last_checked = now
+                else:
+                    # Erstelle ein neues Profil
+                    profile = Profile(
+                        platform_id=platform_id,
+                        profile_name=profile_name,
+                        profile_link=profile_data.get('profile_link'),
+                        description=profile_data.get('description'),
+                        email=profile_data.get('email'),
+                        location=profile_data.get('location'),
+                        follower_count=profile_data.get('follower_count'),
+                        risk_score=profile_data.get('risk_score', 0.0),
+                        first_seen=now,
+                        last_checked=now
+                    )
+                    session.add(profile)
+                
+                profiles[(platform_name, profile_name)] = profile
+            session.flush()
+            
+            # Lade alle bestehenden Post-Links der betroffenen Profile mit einer Abfrage
+            profile_ids = {profile.id for profile in profiles.values()}
+            existing_posts = set(
+                session.query(Post.profile_id, Post.post_link).filter(
+                    Post.profile_id.in_(profile_ids),
+                    Post.post_link.isnot(None)
+                ).all()
+            )
+            
+            new_posts = []
+            for key, record in merged.items():
+                profile_id = profiles[key].id
+                for post_data in record["posts"]:
+                    post_link = post_data.get('post_link')
+                    if post_link:
+                        if (profile_id, post_link) in existing_posts:
+                            continue
+                        existing_posts.add((profile_id, post_link))
+                    
+                    new_posts.append(Post(
+                        profile_id=profile_id,
+                        post_link=post_link,
+                        post_text=post_data.get('post_text'),
+                        post_date=post_data.get('post_date'),
+                        contains_hyaluron_pen=post_data.get('contains_hyaluron_pen', False),
+                        contains_price=post_data.get('contains_price', False),
+                        price_mentioned=post_data.get('price_mentioned')
+                    ))
+            session.add_all(new_posts)
+            
+            # Commit der Änderungen
+            session.commit()
+            print(f"{len(profiles)} Profile und {len(new_posts)} neue Posts gespeichert.")
+            return (len(profiles), len(new_posts))
+            
+        except Exception as e:
+            session.rollback()
+            print(f"Fehler beim Speichern der Profile: {e}")
+            return None
+        finally:
+            session.close()
+    
     def add_screenshot(self, screenshot_data):
         """
         Fügt einen neuen Screenshot hinzu
@@ -247,12 +397,16 @@ class DatabaseManager:
                 file_path=screenshot_data.get('file_path'),
                 url_captured=screenshot_data.get('url_captured'),
                 is_evidence=screenshot_data.get('is_evidence', True),
-                metadata=screenshot_data.get('metadata')
+                meta_data=screenshot_data.get('metadata'),
+                perceptual_hash=screenshot_data.get('perceptual_hash')
             )
             session.add(screenshot)
             
             # Commit der Änderungen
             session.commit()
+            
+            # Lade die ID, damit sie auch nach dem Schließen der Sitzung verfügbar ist
+            session.refresh(screenshot)
             print(f"Neuer Screenshot für URL '{screenshot_data.get('url_captured')}' hinzugefügt.")
             return screenshot
             
@@ -263,6 +417,40 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def iter_screenshot_hashes(self, batch_size=1000):
+        """
+        Liefert alle Screenshots mit Wahrnehmungs-Hash in Aufnahmereihenfolge
+        
+        Args:
+            batch_size: Anzahl der Zeilen, die pro Abfrage geladen werden
+            
+        Yields:
+            Dictionaries mit id, profile_id, post_id, url_captured und perceptual_hash
+        """
+        session = self.get_session()
+        
+        try:
+            screenshots = session.query(
+                Screenshot.id, Screenshot.profile_id, Screenshot.post_id,
+                Screenshot.url_captured, Screenshot.perceptual_hash
+            ).filter(
+                Screenshot.perceptual_hash.isnot(None)
+            ).order_by(Screenshot.screenshot_date, Screenshot.id).yield_per(batch_size)
+            
+            for screenshot_id, profile_id, post_id, url_captured, perceptual_hash in screenshots:
+                yield {
+                    "id": screenshot_id,
+                    "profile_id": profile_id,
+                    "post_id": post_id,
+                    "url_captured": url_captured,
+                    "perceptual_hash": perceptual_hash
+                }
+                
+        except Exception as e:
+            print(f"Fehler beim Laden der Screenshot-Hashes: {e}")
+        finally:
+            session.close()
+    
     def log_search(self, platform_name, search_term, results_count, duration_seconds, is_successful=True, error_message=None):
         """
         Protokolliert einen Suchvorgang
@@ -324,6 +512,433 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def get_cached_analyses(self, cache_keys):
+        """
+        Gibt zwischengespeicherte Analyseergebnisse für mehrere Schlüssel zurück
+        
+        Args:
+            cache_keys: Liste von Cache-Schlüsseln
+            
+        Returns:
+            Dictionary mit Cache-Schlüssel -> JSON-Analyseergebnis
+        """
+        if not cache_keys:
+            return {}
+        
+        session = self.get_session()
+        
+        try:
+            entries = session.query(AnalysisCacheEntry.cache_key, AnalysisCacheEntry.result).filter(
+                AnalysisCacheEntry.cache_key.in_(list(cache_keys))
+            ).all()
+            return {cache_key: result for cache_key, result in entries}
+            
+        except Exception as e:
+            print(f"Fehler beim Abrufen zwischengespeicherter Analysen: {e}")
+            return {}
+        finally:
+            session.close()
+    
+    def store_cached_analyses(self, entries):
+        """
+        Speichert Analyseergebnisse im Cache (bestehende Schlüssel werden übersprungen)
+        
+        Args:
+            entries: Liste von Dictionaries mit cache_key, detector_version, kind und result (JSON)
+            
+        Returns:
+            Anzahl der neu gespeicherten Einträge
+        """
+        if not entries:
+            return 0
+        
+        session = self.get_session()
+        
+        try:
+            keys = [entry["cache_key"] for entry in entries]
+            existing = {
+                cache_key for (cache_key,) in session.query(AnalysisCacheEntry.cache_key).filter(
+                    AnalysisCacheEntry.cache_key.in_(keys)
+                )
+            }
+            
+            new_entries = []
+            for entry in entries:
+                if entry["cache_key"] in existing:
+                    continue
+                existing.add(entry["cache_key"])
+                new_entries.append(AnalysisCacheEntry(**entry))
+            
+            session.add_all(new_entries)
+            
+            # Commit der Änderungen
+            session.commit()
+            return len(new_entries)
+            
+        except Exception as e:
+            session.rollback()
+            print(f"Fehler beim Speichern zwischengespeicherter Analysen: {e}")
+            return 0
+        finally:
+            session.close()
+    
+    def purge_analysis_cache(self, older_than):
+        """
+        Entfernt Cache-Einträge, die vor einem Zeitpunkt gespeichert wurden (alle Detector-Versionen)
+        
+        Args:
+            older_than: Zeitpunkt (datetime); ältere Einträge werden gelöscht
+            
+        Returns:
+            Anzahl der gelöschten Einträge
+        """
+        session = self.get_session()
+        
+        try:
+            deleted = session.query(AnalysisCacheEntry).filter(
+                AnalysisCacheEntry.created_at < older_than
+            ).delete(synchronize_session=False)
+            session.commit()
+            if deleted:
+                print(f"{deleted} veraltete Cache-Einträge entfernt.")
+            return deleted
+            
+        except Exception as e:
+            session.rollback()
+            print(f"Fehler beim Bereinigen des Analyse-Caches: {e}")
+            return 0
+        finally:
+            session.close()
+    
+    def iter_deduplication_texts(self, batch_size=1000):
+        """
+        Liefert alle Profilbeschreibungen und Posttexte für den Duplikat-Index
+        
+        Args:
+            batch_size: Anzahl der Zeilen, die pro Abfrage geladen werden
+            
+        Yields:
+            Tupel (Schlüssel, Text), z.B. ('profile:Instagram:name', Beschreibung)
+        """
+        from near_duplicates import profile_key, post_key
+        
+        session = self.get_session()
+        
+        try:
+            profiles = session.query(Platform.name, Profile.profile_name, Profile.description).join(
+                Profile, Profile.platform_id == Platform.id
+            ).filter(Profile.description.isnot(None)).yield_per(batch_size)
+            
+            for platform_name, profile_name, description in profiles:
+                yield profile_key(platform_name, profile_name), description
+            
+            posts = session.query(Post.id, Post.post_link, Post.post_text).filter(
+                Post.post_text.isnot(None)
+            ).yield_per(batch_size)
+            
+            for post_id, post_link, post_text in posts:
+                yield post_key(post_link) if post_link else f"post:id:{post_id}", post_text
+                
+        except Exception as e:
+            print(f"Fehler beim Laden der Texte für den Duplikat-Index: {e}")
+        finally:
+            session.close()
+    
+    def iter_labeled_profiles(self, batch_size=1000, profile_ids=None):
+        """
+        Liefert Profile mit Meldestatus und Status ihrer Meldungen für das Training des Risikomodells
+        
+        Args:
+            batch_size: Anzahl der Zeilen, die pro Abfrage geladen werden
+            profile_ids: Optional, nur diese Profile (z.B. für eine einzelne Rückmeldung)
+            
+        Yields:
+            Dictionaries mit platform, profile_name, description, post_text (neuester Post),
+            is_reported und report_statuses (älteste Meldung zuerst)
+        """
+        session = self.get_session()
+        
+        try:
+            reports = session.query(Report.profile_id, Report.status).order_by(Report.report_date, Report.id)
+            posts = session.query(Post.profile_id, Post.post_text).filter(Post.post_text.isnot(None))
+            profiles = session.query(
+                Profile.id, Platform.name, Profile.profile_name, Profile.description, Profile.is_reported
+            ).join(Platform, Profile.platform_id == Platform.id)
+            
+            if profile_ids is not None:
+                reports = reports.filter(Report.profile_id.in_(profile_ids))
+                posts = posts.filter(Post.profile_id.in_(profile_ids))
+                profiles = profiles.filter(Profile.id.in_(profile_ids))
+            
+            # Status aller Meldungen und neuester Posttext je Profil (je eine Abfrage)
+            report_statuses = {}
+            for profile_id, status in reports:
+                report_statuses.setdefault(profile_id, []).append(status)
+            
+            post_texts = {}
+            posts = posts.order_by(Post.profile_id, Post.post_date.desc(), Post.id.desc()).yield_per(batch_size)
+            for profile_id, post_text in posts:
+                post_texts.setdefault(profile_id, post_text)
+            
+            profiles = profiles.yield_per(batch_size)
+            
+            for profile_id, platform_name, profile_name, description, is_reported in profiles:
+                yield {
+                    "platform": platform_name,
+                    "profile_name": profile_name,
+                    "description": description,
+                    "post_text": post_texts.get(profile_id),
+                    "is_reported": bool(is_reported),
+                    "report_statuses": report_statuses.get(profile_id, [])
+                }
+                
+        except Exception as e:
+            print(f"Fehler beim Laden der gelabelten Profile: {e}")
+        finally:
+            session.close()
+    
+    def iter_operator_links(self, batch_size=1000):
+        """
+        Liefert alle gespeicherten Elternverweise der Betreiberzuordnung
+        
+        Args:
+            batch_size: Anzahl der Zeilen, die pro Abfrage geladen werden
+            
+        Yields:
+            Tupel (Profilschlüssel, Schlüssel des übergeordneten Profils)
+        """
+        session = self.get_session()
+        
+        try:
+            links = session.query(OperatorLink.profile_key, OperatorLink.parent_key).yield_per(batch_size)
+            
+            for profile_key, parent_key in links:
+                yield profile_key, parent_key
+                
+        except Exception as e:
+            print(f"Fehler beim Laden der Betreiberzuordnung: {e}")
+        finally:
+            session.close()
+    
+    def iter_operator_identifiers(self, batch_size=1000):
+        """
+        Liefert alle gespeicherten Kontaktmerkmale der Betreiberzuordnung
+        
+        Args:
+            batch_size: Anzahl der Zeilen, die pro Abfrage geladen werden
+            
+        Yields:
+            Tupel (Art, Wert, Profilschlüssel), z.B. ('phone', '+491711234567', 'profile:Instagram:name')
+        """
+        session = self.get_session()
+        
+        try:
+            identifiers = session.query(
+                OperatorIdentifier.kind, OperatorIdentifier.value, OperatorIdentifier.profile_key
+            ).yield_per(batch_size)
+            
+            for kind, value, profile_key in identifiers:
+                yield kind, value, profile_key
+                
+        except Exception as e:
+            print(f"Fehler beim Laden der Kontaktmerkmale: {e}")
+        finally:
+            session.close()
+    
+    def store_operator_links(self, links, identifiers):
+        """
+        Speichert Änderungen der Betreiberzuordnung in einer Transaktion
+        
+        Args:
+            links: Dictionary Profilschlüssel -> Schlüssel des übergeordneten Profils (neu oder geändert)
+            identifiers: Dictionary (Art, Wert) -> Profilschlüssel (neue Kontaktmerkmale)
+            
+        Returns:
+            True bei Erfolg, sonst False
+        """
+        session = self.get_session()
+        
+        try:
+            # Lade bestehende Knoten mit einer Abfrage
+            existing_links = {
+                link.profile_key: link
+                for link in session.query(OperatorLink).filter(OperatorLink.profile_key.in_(list(links))).all()
+            } if links else {}
+            
+            for profile_key, parent_key in links.items():
+                link = existing_links.get(profile_key)
+                if link:
+                    link.parent_key = parent_key
+                else:
+                    session.add(OperatorLink(profile_key=profile_key, parent_key=parent_key))
+            
+            # Bereits bekannte Kontaktmerkmale behalten ihr erstes Profil
+            values = {value for _, value in identifiers}
+            existing_identifiers = set(
+                session.query(OperatorIdentifier.kind, OperatorIdentifier.value).filter(
+                    OperatorIdentifier.value.in_(values)
+                ).all()
+            ) if values else set()
+            
+            session.add_all([
+                OperatorIdentifier(kind=kind, value=value, profile_key=profile_key)
+                for (kind, value), profile_key in identifiers.items()
+                if (kind, value) not in existing_identifiers
+            ])
+            
+            # Commit der Änderungen
+            session.commit()
+            return True
+            
+        except Exception as e:
+            session.rollback()
+            print(f"Fehler beim Speichern der Betreiberzuordnung: {e}")
+            return False
+        finally:
+            session.close()
+    
+    def get_active_rule_set_version(self):
+        """
+        Gibt die Version des aktiven Regelsatzes zurück (eine Abfrage, für die regelmäßige Prüfung)
+        
+        Returns:
+            Versionsnummer, 0 wenn kein Regelsatz aktiv ist, None bei einem Fehler
+        """
+        session = self.get_session()
+        
+        try:
+            version = session.query(func.max(DetectionRuleSet.version)).filter_by(is_active=True).scalar()
+            return version or 0
+            
+        except Exception as e:
+            print(f"Fehler beim Abrufen der aktiven Regelversion: {e}")
+            return None
+        finally:
+            session.close()
+    
+    def get_active_rule_set(self):
+        """
+        Gibt den aktiven Regelsatz zurück
+        
+        Returns:
+            Dictionary mit version, rules, description und created_at oder None
+        """
+        session = self.get_session()
+        
+        try:
+            rule_set = session.query(DetectionRuleSet).filter_by(is_active=True).order_by(
+                DetectionRuleSet.version.desc()
+            ).first()
+            
+            if not rule_set:
+                return None
+            
+            return {
+                "version": rule_set.version,
+                "rules": json.loads(rule_set.rules),
+                "description": rule_set.description,
+                "created_at": rule_set.created_at.isoformat() if rule_set.created_at else None
+            }
+            
+        except Exception as e:
+            print(f"Fehler beim Abrufen des aktiven Regelsatzes: {e}")
+            return None
+        finally:
+            session.close()
+    
+    def get_rule_sets(self, limit=20):
+        """
+        Gibt die zuletzt gespeicherten Regelsätze ohne Regelinhalt zurück
+        
+        Args:
+            limit: Optional, maximale Anzahl der Regelsätze
+            
+        Returns:
+            Liste von Dictionaries mit version, description, is_active und created_at
+        """
+        session = self.get_session()
+        
+        try:
+            rule_sets = session.query(DetectionRuleSet).order_by(DetectionRuleSet.version.desc()).limit(limit).all()
+            return [
+                {
+                    "version": rule_set.version,
+                    "description": rule_set.description,
+                    "is_active": rule_set.is_active,
+                    "created_at": rule_set.created_at.isoformat() if rule_set.created_at else None
+                }
+                for rule_set in rule_sets
+            ]
+            
+        except Exception as e:
+            print(f"Fehler beim Abrufen der Regelsätze: {e}")
+            return []
+        finally:
+            session.close()
+    
+    def store_rule_set(self, rules, description=None):
+        """
+        Speichert einen Regelsatz als neue, aktive Version
+        
+        Args:
+            rules: Geprüfter Regelsatz (Dictionary)
+            description: Optional, Beschreibung der Änderung
+            
+        Returns:
+            Neue Versionsnummer oder None bei einem Fehler
+        """
+        session = self.get_session()
+        
+        try:
+            version = (session.query(func.max(DetectionRuleSet.version)).scalar() or 0) + 1
+            session.add(DetectionRuleSet(
+                version=version,
+                rules=json.dumps(rules, ensure_ascii=False),
+                description=description,
+                is_active=True
+            ))
+            
+            # Commit der Änderungen (gleichzeitiges Speichern scheitert an der eindeutigen Version)
+            session.commit()
+            print(f"Regelsatz Version {version} gespeichert.")
+            return version
+            
+        except Exception as e:
+            session.rollback()
+            print(f"Fehler beim Speichern des Regelsatzes: {e}")
+            return None
+        finally:
+            session.close()
+    
+    def set_rule_set_active(self, version, is_active=True):
+        """
+        Aktiviert oder deaktiviert einen Regelsatz (Deaktivieren der neuesten Version stellt die vorherige wieder her)
+        
+        Args:
+            version: Versionsnummer
+            is_active: Optional, ob der Regelsatz aktiv sein soll
+            
+        Returns:
+            True bei Erfolg, False wenn die Version nicht existiert oder ein Fehler auftritt
+        """
+        session = self.get_session()
+        
+        try:
+            rule_set = session.query(DetectionRuleSet).filter_by(version=version).first()
+            if not rule_set:
+                return False
+            
+            rule_set.is_active = is_active
+            session.commit()
+            return True
+            
+        except Exception as e:
+            session.rollback()
+            print(f"Fehler beim Ändern des Regelsatzes: {e}")
+            return False
+        finally:
+            session.close()
+    
     def get_active_search_terms(self, category=None, limit=None):
         """
         Gibt aktive Suchbegriffe zurück
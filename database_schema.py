@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # database_schema.py - Datenbankschema für IRI® Legal Agent
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 from datetime import datetime
@@ -89,6 +89,7 @@ class Screenshot(Base):
     url_captured = Column(String(512), nullable=False)
     is_evidence = Column(Boolean, default=True)
     meta_data = Column(Text)  # JSON-Metadaten
+    perceptual_hash = Column(String(16))  # dHash (64 Bit, hexadezimal) für Ähnlichkeitssuche
     
     # Beziehungen
     profile = relationship("Profile", back_populates="screenshots")
@@ -172,7 +173,67 @@ class Report(Base):
     health_authority = relationship("HealthAuthority")
     
     def __repr__(self):
-        return f"<Report(id='{self.id}', profile='{self.profile.profile_name}', authority='{self.health_authority.name}')>"
+        # Prüfungsmeldungen (report_type 'review') haben keine Behörde
+        authority = self.health_authority.name if self.health_authority else None
+        return f"<Report(id='{self.id}', profile='{self.profile.profile_name}', authority='{authority}')>"
+
+
+class AnalysisCacheEntry(Base):
+    """Tabelle für zwischengespeicherte Analyseergebnisse (Schlüssel: Hash aus Text und Detector-Version)"""
+    __tablename__ = 'analysis_cache'
+    
+    id = Column(Integer, primary_key=True)
+    cache_key = Column(String(64), nullable=False, unique=True, index=True)
+    detector_version = Column(String(32), nullable=False, index=True)
+    kind = Column(String(20))  # z.B. 'profile', 'post'
+    result = Column(Text, nullable=False)  # JSON-Analyseergebnis
+    created_at = Column(DateTime, default=datetime.now)
+    
+    def __repr__(self):
+        return f"<AnalysisCacheEntry(key='{self.cache_key}', kind='{self.kind}')>"
+
+
+class OperatorLink(Base):
+    """Tabelle für die Betreiberzuordnung als Union-Find-Wald (Profil -> übergeordnetes Profil)"""
+    __tablename__ = 'operator_links'
+    
+    id = Column(Integer, primary_key=True)
+    profile_key = Column(String(600), nullable=False, unique=True, index=True)  # z.B. 'profile:Instagram:name'
+    parent_key = Column(String(600), nullable=False)  # Gleich profile_key für Repräsentanten
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    
+    def __repr__(self):
+        return f"<OperatorLink(profile='{self.profile_key}', parent='{self.parent_key}')>"
+
+
+class OperatorIdentifier(Base):
+    """Tabelle für normalisierte Kontaktmerkmale (E-Mail, Telefon E.164, Domain) und das erste Profil, das sie nennt"""
+    __tablename__ = 'operator_identifiers'
+    __table_args__ = (UniqueConstraint('kind', 'value'),)
+    
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(10), nullable=False)  # 'email', 'phone' oder 'domain'
+    value = Column(String(255), nullable=False)
+    profile_key = Column(String(600), nullable=False)
+    created_at = Column(DateTime, default=datetime.now)
+    
+    def __repr__(self):
+        return f"<OperatorIdentifier(kind='{self.kind}', value='{self.value}')>"
+
+
+class DetectionRuleSet(Base):
+    """Tabelle für versionierte Erkennungsregeln (aktiv ist die höchste Version mit is_active=True)"""
+    __tablename__ = 'detection_rule_sets'
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, unique=True, index=True)
+    rules = Column(Text, nullable=False)  # JSON: Keywords, Indikatoren, Preismuster, Gewichte, Schwellenwert
+    description = Column(String(255))
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.now)
+    
+    def __repr__(self):
+        return f"<DetectionRuleSet(version={self.version}, active={self.is_active})>"
 
 
 def init_db(db_url="sqlite:///iri_legal_agent.db"):
@@ -1,14 +1,36 @@
 #!/usr/bin/env python3
 # detection_algorithms.py - Verbesserte Erkennungsalgorithmen für IRI® Legal Agent
 
+import os
 import re
 import json
+import hashlib
 import logging
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from math import log10
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 import nltk
 
+from gazetteer import get_gazetteer
+from fuzzy_keywords import FuzzyKeywordMatcher
+from analysis_cache import AnalysisCache, make_cache_key
+from analysis_result import AnalysisResult
+from bulk_writer import BulkProfileWriter
+from near_duplicates import NearDuplicateIndex, profile_key, post_key
+from image_hashing import hash_image_file
+from operator_resolution import OperatorIndex, collect_identifiers
+from pipeline_metrics import instrumented
+from risk_model import OnlineRiskTrainer, label_for, load_risk_model
+from language_id import DEFAULT_LANGUAGE, STOPWORD_LANGUAGES, SUPPORTED_LANGUAGES, get_language_identifier
+from detection_rules import DEFAULT_RULES, DEFAULT_RULES_VERSION, RuleSetProvider, rules_fingerprint
+
 # Konfiguriere Logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,36 +50,610 @@ except LookupError:
     nltk.download('punkt')
     nltk.download('stopwords')
 
+# Ab dieser Anzahl von Profilen verteilt analyze_profiles_batch die Analyse auf mehrere Prozesse
+PARALLEL_THRESHOLD = int(os.getenv("DETECTION_PARALLEL_THRESHOLD", "2000"))
+
+# Anzahl der Profile, die ein Worker-Prozess pro Auftrag analysiert
+BATCH_CHUNK_SIZE = int(os.getenv("DETECTION_CHUNK_SIZE", "500"))
+
+# Anzahl der Profile, die analyze_scraping_results_stream gemeinsam analysiert (1 = jedes Profil sofort)
+STREAM_CHUNK_SIZE = int(os.getenv("DETECTION_STREAM_CHUNK_SIZE", "1"))
+
+# Längste Zeit in Sekunden, die ein Profil im Streaming-Modus auf einen vollen Abschnitt wartet
+STREAM_MAX_WAIT = float(os.getenv("DETECTION_STREAM_MAX_WAIT", "2.0"))
+
+# Textfelder, die für die Profilanalyse an die Worker-Prozesse übertragen werden
+ANALYSIS_FIELDS = ("description", "post_text")
+
+# Version der Analyse-Logik; bei Änderungen an den Algorithmen erhöhen, damit zwischengespeicherte Ergebnisse verfallen
+DETECTOR_VERSION = "2"
+
+# Wortfrequenzliste für die Zerlegung von Hashtags (eine Zeile pro Wort: "wort anzahl", z.B. de_50k.txt)
+HASHTAG_WORDS_FILE = os.getenv("HASHTAG_WORDS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "wortfrequenzen.txt"))
+
+# Maximale Anzahl zwischengespeicherter Hashtag-Zerlegungen
+HASHTAG_CACHE_SIZE = int(os.getenv("HASHTAG_CACHE_SIZE", "50000"))
+
+# Buchstabenfolgen in Hashtags werden erst ab dieser Länge zerlegt
+MIN_HASHTAG_LENGTH = 6
+
+# Zusätzliche Kosten je Zeichen eines unbekannten Wortteils (log10-Skala), damit bekannte Wörter bevorzugt werden
+UNKNOWN_CHAR_COST = 1.0
+
+# Fallback, falls keine Wortfrequenzliste vorhanden ist: häufige Wörter aus Anzeigen und Beauty-Hashtags
+DEFAULT_WORD_FREQUENCIES = {
+    "und": 50000, "die": 48000, "der": 45000, "mit": 30000, "für": 28000, "ohne": 12000, "bei": 15000,
+    "in": 40000, "im": 20000, "am": 15000, "an": 18000, "auf": 20000, "von": 22000, "zu": 25000,
+    "ab": 9000, "nur": 11000, "jetzt": 8000, "neu": 7000, "heute": 6000, "hier": 7000, "dein": 5000,
+    "deine": 5000, "mein": 5000, "meine": 5000, "dich": 4000, "mich": 4000, "wir": 9000, "ich": 15000,
+    "lippen": 3000, "lippe": 1500, "lip": 1500, "lips": 2000, "falten": 2000, "falte": 800, "haut": 2500,
+    "gesicht": 2500, "nase": 1000, "kinn": 600, "wangen": 700, "stirn": 600, "augen": 2000, "nägel": 900,
+    "wimpern": 1200, "augenbrauen": 800, "hyaluron": 2500, "hyaluronsäure": 1200, "pen": 2000, "stift": 800,
+    "pistole": 400, "filler": 1500, "fillers": 400, "botox": 1500, "needle": 500, "free": 1200, "nadel": 900,
+    "nadelfrei": 400, "aufspritzen": 700, "aufspritzung": 500, "unterspritzung": 600, "unterspritzen": 400,
+    "vergrößerung": 500, "vergrößern": 400, "aufbau": 700, "korrektur": 600, "behandlung": 2500,
+    "behandlungen": 1200, "schulung": 900, "schulungen": 400, "kurs": 900, "kurse": 500, "seminar": 500,
+    "ausbildung": 800, "zertifikat": 400, "termin": 1800, "termine": 1200, "angebot": 2000, "preis": 1800,
+    "preise": 900, "aktion": 1200, "rabatt": 700, "gutschein": 600, "beauty": 3000, "salon": 1500,
+    "studio": 1800, "kosmetik": 1800, "kosmetikstudio": 600, "beautysalon": 500, "schönheit": 1000,
+    "pflege": 1200, "vorher": 1000, "nachher": 1000, "ergebnis": 900, "ergebnisse": 500, "natürlich": 900,
+    "natürliche": 500, "schön": 1500, "schöne": 900, "volle": 400, "voll": 800, "glatt": 300, "jung": 500,
+    "anti": 600, "aging": 600, "make": 800, "up": 2000, "art": 900, "style": 600, "look": 900,
+    "verlängerung": 500, "lifting": 500, "microneedling": 300, "permanent": 400, "shop": 900,
+    "berlin": 2000, "hamburg": 1500, "münchen": 1500, "köln": 1300, "frankfurt": 1200, "stuttgart": 900,
+    "düsseldorf": 900, "leipzig": 700, "dresden": 700, "hannover": 700, "nürnberg": 600, "dortmund": 600,
+    "essen": 1200, "bremen": 600, "bonn": 500, "germany": 1200, "deutschland": 1500
+}
+
+class KeywordAutomaton:
+    """Aho-Corasick-Automat zur gleichzeitigen Suche vieler Schlüsselwörter in einem Durchlauf"""
+    
+    def __init__(self, keywords):
+        """
+        Baut den Automaten einmalig aus einer Liste von Schlüsselwörtern auf
+        
+        Args:
+            keywords: Liste von Schlüsselwörtern (werden in Kleinbuchstaben gesucht)
+        """
+        self.keywords = []
+        
+        # Zustandsübergänge, Fehlerlinks und Ausgaben je Zustand (Zustand 0 = Wurzel)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        
+        for keyword in keywords:
+            self._add_keyword(keyword.lower())
+        
+        self._build_failure_links()
+    
+    def _add_keyword(self, keyword):
+        """Fügt ein Schlüsselwort in den Trie ein"""
+        if not keyword or keyword in self.keywords:
+            return
+        
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._goto[state][char] = next_state
+            state = next_state
+        
+        self._output[state] = self._output[state] + (len(self.keywords),)
+        self.keywords.append(keyword)
+    
+    def _build_failure_links(self):
+        """Berechnet die Fehlerlinks per Breitensuche und vererbt die Ausgaben"""
+        queue = deque(self._goto[0].values())
+        
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fail_state = self._goto[fallback].get(char, 0)
+                if fail_state == next_state:
+                    fail_state = 0
+                
+                self._fail[next_state] = fail_state
+                self._output[next_state] = self._output[next_state] + self._output[fail_state]
+    
+    def iter_matches(self, text_lower):
+        """
+        Durchläuft einen (bereits kleingeschriebenen) Text genau einmal
+        
+        Args:
+            text_lower: Der zu durchsuchende Text in Kleinbuchstaben
+            
+        Yields:
+            Tupel (Startposition, Schlüsselwort) für jeden Treffer
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        keywords = self.keywords
+        state = 0
+        
+        for position, char in enumerate(text_lower):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            
+            for keyword_index in output[state]:
+                keyword = keywords[keyword_index]
+                yield position - len(keyword) + 1, keyword
+    
+    def find_all(self, text):
+        """
+        Findet alle Schlüsselwort-Treffer in einem Text
+        
+        Args:
+            text: Der zu durchsuchende Text
+            
+        Returns:
+            Dictionary mit Schlüsselwort -> Liste der Startpositionen
+        """
+        matches = {}
+        
+        if not text:
+            return matches
+        
+        return self.find_all_lower(text.lower())
+    
+    def find_all_lower(self, text_lower):
+        """
+        Wie find_all, aber für einen bereits kleingeschriebenen Text
+        
+        Args:
+            text_lower: Der zu durchsuchende Text in Kleinbuchstaben
+            
+        Returns:
+            Dictionary mit Schlüsselwort -> Liste der Startpositionen
+        """
+        matches = {}
+        
+        for position, keyword in self.iter_matches(text_lower):
+            matches.setdefault(keyword, []).append(position)
+        
+        return matches
+
+
+# Hashtag-Körper und Buchstabenfolgen darin (Ziffern und Unterstriche werden nicht zerlegt)
+_HASHTAG_PATTERN = re.compile(r'#(\w+)')
+_LETTER_RUN_PATTERN = re.compile(r'[^\W\d_]+')
+
+
+class HashtagSegmenter:
+    """Zerlegt zusammengeschriebene Hashtags in bekannte Wörter (#lippenaufspritzungohnenadel -> lippen aufspritzung ohne nadel)
+    
+    Dynamische Programmierung über die Wortkosten -log10(Häufigkeit / Summe) aus einer Wortfrequenzliste;
+    unbekannte Wortteile kosten zusätzlich UNKNOWN_CHAR_COST je Zeichen. Zerlegungen werden je
+    Hashtag zwischengespeichert, da wenige tausend Hashtags den Großteil der Texte ausmachen.
+    Zerlegt wird nur durch Einfügen von Leerzeichen, damit Trefferpositionen zurückgerechnet werden können.
+    """
+    
+    def __init__(self, frequencies, extra_words=()):
+        """
+        Berechnet die Wortkosten einmalig
+        
+        Args:
+            frequencies: Dictionary Wort -> Häufigkeit
+            extra_words: Optional, Wörter, die immer als häufigste Wörter gelten (z.B. Schlüsselwörter)
+        """
+        counts = {word.lower(): count for word, count in frequencies.items() if count > 0}
+        top_count = max(counts.values(), default=1)
+        for word in extra_words:
+            counts[word.lower()] = top_count
+        
+        total = sum(counts.values()) or 1
+        self._costs = {word: log10(total / count) for word, count in counts.items()}
+        self._unknown_cost = log10(total)
+        self.max_word_length = min(max((len(word) for word in counts), default=1), 30)
+        self._cache = {}
+    
+    def __len__(self):
+        return len(self._costs)
+    
+    def word_cost(self, word):
+        """Kosten eines Wortteils (bekannte Wörter nach Häufigkeit, unbekannte nach Länge)"""
+        cost = self._costs.get(word)
+        if cost is None:
+            return self._unknown_cost + UNKNOWN_CHAR_COST * len(word)
+        return cost
+    
+    def segment(self, word):
+        """
+        Zerlegt eine kleingeschriebene Buchstabenfolge in Wörter mit minimalen Gesamtkosten
+        
+        Args:
+            word: Buchstabenfolge in Kleinbuchstaben
+            
+        Returns:
+            Tupel der Wortteile
+        """
+        length = len(word)
+        best = [0.0] + [float("inf")] * length
+        starts = [0] * (length + 1)
+        
+        for end in range(1, length + 1):
+            for start in range(max(0, end - self.max_word_length), end):
+                cost = best[start] + self.word_cost(word[start:end])
+                if cost < best[end]:
+                    best[end] = cost
+                    starts[end] = start
+        
+        segments = []
+        end = length
+        while end > 0:
+            segments.append(word[starts[end]:end])
+            end = starts[end]
+        return tuple(reversed(segments))
+    
+    def split_points(self, hashtag):
+        """
+        Positionen innerhalb eines Hashtags, an denen Leerzeichen eingefügt werden (zwischengespeichert)
+        
+        Args:
+            hashtag: Hashtag ohne '#'
+            
+        Returns:
+            Tupel der Positionen (leer, wenn der Hashtag nicht zerlegt wird)
+        """
+        cached = self._cache.get(hashtag)
+        if cached is not None:
+            return cached
+        
+        points = []
+        for run in _LETTER_RUN_PATTERN.finditer(hashtag):
+            letters = run.group(0)
+            lower = letters.lower()
+            if len(letters) < MIN_HASHTAG_LENGTH or len(lower) != len(letters):
+                continue
+            
+            position = run.start()
+            for segment in self.segment(lower)[:-1]:
+                position += len(segment)
+                points.append(position)
+        
+        points = tuple(points)
+        if len(self._cache) >= HASHTAG_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[hashtag] = points
+        return points
+    
+    def segment_text(self, text):
+        """
+        Fügt in allen Hashtags eines Textes Leerzeichen zwischen den erkannten Wörtern ein
+        
+        Args:
+            text: Der zu analysierende Text
+            
+        Returns:
+            Tupel (Text mit zerlegten Hashtags, sortierte Positionen der eingefügten Leerzeichen im neuen Text)
+        """
+        if not text or "#" not in text:
+            return text, ()
+        
+        parts = []
+        insertions = []
+        last = 0
+        
+        for hashtag in _HASHTAG_PATTERN.finditer(text):
+            offset = hashtag.start(1)
+            for point in self.split_points(hashtag.group(1)):
+                parts.append(text[last:offset + point])
+                insertions.append(offset + point + len(insertions))
+                last = offset + point
+        
+        if not insertions:
+            return text, ()
+        
+        parts.append(text[last:])
+        return " ".join(parts), tuple(insertions)
+
+
+def restore_positions(hits, insertions):
+    """
+    Rechnet Trefferpositionen im Text mit zerlegten Hashtags auf den Originaltext zurück
+    
+    Args:
+        hits: Dictionary mit Schlüsselwort -> Liste der Startpositionen im zerlegten Text
+        insertions: Positionen der eingefügten Leerzeichen (siehe HashtagSegmenter.segment_text)
+        
+    Returns:
+        Dictionary mit Schlüsselwort -> Liste der Startpositionen im Originaltext
+    """
+    if not insertions:
+        return hits
+    return {
+        keyword: [position - bisect_left(insertions, position) for position in positions]
+        for keyword, positions in hits.items()
+    }
+
+
+def segmented_position(position, insertions):
+    """Rechnet eine Position im Originaltext auf den Text mit zerlegten Hashtags um"""
+    if not insertions:
+        return position
+    original_insertions = [insertion - index for index, insertion in enumerate(insertions)]
+    return position + bisect_right(original_insertions, position)
+
+
+# Prozessweit geteilte Wortfrequenzliste
+_word_frequencies = None
+_word_frequencies_lock = threading.Lock()
+
+
+def get_word_frequencies():
+    """
+    Gibt die prozessweit geteilte Wortfrequenzliste zurück (wird beim ersten Aufruf geladen)
+    
+    Returns:
+        Dictionary Wort -> Häufigkeit
+    """
+    global _word_frequencies
+    
+    if _word_frequencies is None:
+        with _word_frequencies_lock:
+            if _word_frequencies is None:
+                if os.path.exists(HASHTAG_WORDS_FILE):
+                    frequencies = dict(DEFAULT_WORD_FREQUENCIES)
+                    with open(HASHTAG_WORDS_FILE, "r", encoding="utf-8") as f:
+                        for line in f:
+                            fields = line.replace(";", " ").replace(",", " ").split()
+                            if len(fields) >= 2 and fields[1].isdigit():
+                                word = fields[0].lower()
+                                frequencies[word] = max(frequencies.get(word, 0), int(fields[1]))
+                    _word_frequencies = frequencies
+                    logger.info(f"Wortfrequenzliste mit {len(frequencies)} Wörtern aus {HASHTAG_WORDS_FILE} geladen")
+                else:
+                    _word_frequencies = DEFAULT_WORD_FREQUENCIES
+                    logger.warning(f"Wortfrequenzliste {HASHTAG_WORDS_FILE} nicht gefunden, verwende {len(DEFAULT_WORD_FREQUENCIES)} Standardwörter")
+    
+    return _word_frequencies
+
+
+class AnalysisContext:
+    """Gemeinsamer Analysezustand eines Textes: einmal normalisiert, kleingeschrieben und tokenisiert"""
+    
+    def __init__(self, text, stopwords=None, segmenter=None, language=DEFAULT_LANGUAGE):
+        """
+        Bereitet einen Text für alle Extraktoren und Scorer vor
+        
+        Args:
+            text: Der zu analysierende Text
+            stopwords: Optional, Menge von Stopwörtern für content_tokens
+            segmenter: Optional, HashtagSegmenter zum Zerlegen zusammengeschriebener Hashtags
+            language: Optional, erkannte Sprache des Textes (bestimmt Keyword-Automat und Stopwörter)
+        """
+        # Unicode-Normalisierung, damit z.B. "München" in NFC und NFD gleich behandelt wird
+        self.text = unicodedata.normalize("NFC", text) if text else ""
+        self.language = language
+        
+        # Hashtags in Wörter zerlegt; Keywords, Orte und Indikatoren werden in diesem Text gesucht
+        self.segmented_text, self.insertions = segmenter.segment_text(self.text) if segmenter else (self.text, ())
+        self.text_lower = self.segmented_text.lower()
+        
+        # Tokenisierung genau einmal pro Text
+        self.tokens = word_tokenize(self.segmented_text) if self.text else []
+        self.tokens_lower = [token.lower() for token in self.tokens]
+        
+        self._stopwords = stopwords or set()
+        self._content_tokens = None
+    
+    @property
+    def content_tokens(self):
+        """Kleingeschriebene Tokens ohne Stopwörter (wird bei Bedarf einmal berechnet)"""
+        if self._content_tokens is None:
+            self._content_tokens = [token for token in self.tokens_lower if token not in self._stopwords]
+        return self._content_tokens
+    
+    def __bool__(self):
+        return bool(self.text)
+
+
+class TextScanner:
+    """Vorkompilierter Scanner, der Preise, Telefonnummern und E-Mail-Adressen in einem Durchlauf extrahiert"""
+    
+    # Betrag mit optionalen Tausenderpunkten und Cent-Anteil (79, 79,00, 1.299,90)
+    AMOUNT = r'(?P<{name}_euros>\d{{1,3}}(?:\.\d{{3}})+|\d+)(?:[.,](?P<{name}_cents>\d{{2}}))?(?![\d])'
+    
+    def __init__(self):
+        """Kompiliert das kombinierte Muster einmalig"""
+        patterns = [
+            # E-Mail-Adressen (nur am Wortanfang, damit lange Tokens nicht quadratisch geprüft werden)
+            r'(?P<email>(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+            # Preise mit nachgestellter Währung: 79€, ab 79 Euro, nur 79,00 EUR
+            r'(?P<price_suffix>(?<![\d.,])' + self.AMOUNT.format(name="suffix") + r'\s*(?:€|Euro|EUR))',
+            # Preise mit vorangestellter Währung: € 79, Euro 79,00
+            r'(?P<price_prefix>(?:€|Euro|EUR)\s*' + self.AMOUNT.format(name="prefix") + r')',
+            # Telefonnummern: +49 123 45678, 0123 45678, +49 12 34 56 78 90
+            r'(?P<phone>(?<![\d+])(?:\+49|0)[- ]?(?:\d{3,5}[- ]?\d{5,8}|\d{2}(?:[- ]?\d{2}){4}))',
+        ]
+        self.pattern = re.compile("|".join(patterns))
+    
+    def scan(self, text):
+        """
+        Durchläuft einen Text genau einmal und sammelt alle Treffer
+        
+        Args:
+            text: Der zu analysierende Text
+            
+        Returns:
+            Dictionary mit Preisen in Cent (dedupliziert), Telefonnummern und E-Mail-Adressen
+        """
+        result = {
+            "price_cents": [],
+            "phones": [],
+            "emails": []
+        }
+        
+        if not text:
+            return result
+        
+        seen_prices = set()
+        seen_phones = set()
+        seen_emails = set()
+        
+        for match in self.pattern.finditer(text):
+            kind = match.lastgroup
+            
+            if kind == "email":
+                email = match.group("email")
+                if email not in seen_emails:
+                    seen_emails.add(email)
+                    result["emails"].append(email)
+            
+            elif kind == "phone":
+                phone = match.group("phone")
+                if phone not in seen_phones:
+                    seen_phones.add(phone)
+                    result["phones"].append(phone)
+            
+            else:
+                name = "suffix" if kind == "price_suffix" else "prefix"
+                euros = match.group(f"{name}_euros").replace(".", "")
+                cents = match.group(f"{name}_cents") or "00"
+                price_cents = int(euros) * 100 + int(cents)
+                if price_cents not in seen_prices:
+                    seen_prices.add(price_cents)
+                    result["price_cents"].append(price_cents)
+        
+        return result
+
+
+class CompiledRuleSet:
+    """Einmalig kompilierter Regelsatz: Keyword-Automat, Löschverzeichnis, Indikatoren, Preismuster und Gewichte
+    
+    Wird nach dem Erstellen nicht verändert; ein Regelwechsel ersetzt das ganze Objekt.
+    """
+    
+    def __init__(self, rules, version=DEFAULT_RULES_VERSION):
+        """
+        Kompiliert einen Regelsatz
+        
+        Args:
+            rules: Geprüfter Regelsatz (siehe detection_rules.validate_rules)
+            version: Optional, Versionsnummer des Regelsatzes
+        """
+        self.version = version
+        self.rules = rules
+        self.fingerprint = rules_fingerprint(rules)
+        
+        self.hyaluron_keywords = list(rules["keywords"])
+        self.keyword_automaton = KeywordAutomaton(self.hyaluron_keywords)
+        self.fuzzy_matcher = FuzzyKeywordMatcher(self.hyaluron_keywords)
+        
+        # Je Sprache ein Automat und ein Löschverzeichnis aus allgemeinen und sprachspezifischen Keywords
+        self.language_keywords = {language: list(terms) for language, terms in rules["language_keywords"].items()}
+        self._keyword_automata = {DEFAULT_LANGUAGE: self.keyword_automaton}
+        self._fuzzy_matchers = {DEFAULT_LANGUAGE: self.fuzzy_matcher}
+        for language, terms in self.language_keywords.items():
+            keywords = self.hyaluron_keywords + [term for term in terms if term not in self.hyaluron_keywords]
+            if len(keywords) > len(self.hyaluron_keywords):
+                self._keyword_automata[language] = KeywordAutomaton(keywords)
+                self._fuzzy_matchers[language] = FuzzyKeywordMatcher(keywords)
+        
+        # Schlüsselwörter und ihre Bestandteile gelten beim Zerlegen von Hashtags als häufigste Wörter
+        segment_words = set(rules["commercial_indicators"])
+        for keyword in self.hyaluron_keywords:
+            parts = _LETTER_RUN_PATTERN.findall(keyword)
+            segment_words.update(parts)
+            segment_words.add("".join(parts))
+        self.hashtag_segmenter = HashtagSegmenter(get_word_frequencies(), segment_words)
+        
+        self.commercial_indicators = frozenset(rules["commercial_indicators"])
+        self.price_patterns = [re.compile(pattern) for pattern in rules["price_patterns"]]
+        
+        self.profile_weights = dict(rules["profile_weights"])
+        self.post_weights = dict(rules["post_weights"])
+        self.suspicious_threshold = rules["suspicious_threshold"]
+    
+    def keyword_automaton_for(self, language):
+        """Keyword-Automat für eine Sprache (ohne eigene Keywords: der allgemeine Automat)"""
+        return self._keyword_automata.get(language, self.keyword_automaton)
+    
+    def fuzzy_matcher_for(self, language):
+        """Löschverzeichnis für eine Sprache (ohne eigene Keywords: das allgemeine Verzeichnis)"""
+        return self._fuzzy_matchers.get(language, self.fuzzy_matcher)
+    
+    def __repr__(self):
+        return f"<CompiledRuleSet(version={self.version}, fingerprint='{self.fingerprint}')>"
+
+
+# Standardregeln werden pro Prozess nur einmal kompiliert
+_default_rule_set = None
+_default_rule_set_lock = threading.Lock()
+
+
+def compile_rule_set(rules, version):
+    """
+    Kompiliert einen Regelsatz (die Standardregeln werden im Prozess geteilt)
+    
+    Args:
+        rules: Geprüfter Regelsatz
+        version: Versionsnummer des Regelsatzes
+        
+    Returns:
+        CompiledRuleSet-Objekt
+    """
+    global _default_rule_set
+    
+    if version != DEFAULT_RULES_VERSION:
+        return CompiledRuleSet(rules, version)
+    
+    if _default_rule_set is None:
+        with _default_rule_set_lock:
+            if _default_rule_set is None:
+                _default_rule_set = CompiledRuleSet(DEFAULT_RULES, DEFAULT_RULES_VERSION)
+    
+    return _default_rule_set
+
+
+def load_stopwords(language):
+    """
+    Lädt die NLTK-Stopwörter einer Sprache
+    
+    Args:
+        language: Sprachcode aus SUPPORTED_LANGUAGES
+        
+    Returns:
+        Menge von Stopwörtern (leer, wenn die Liste nicht installiert ist)
+    """
+    try:
+        return set(stopwords.words(STOPWORD_LANGUAGES[language]))
+    except (OSError, LookupError):
+        logger.warning(f"Stopwörter für {language} nicht gefunden, Texte dieser Sprache werden ohne Stopwörter bewertet")
+        return set()
+
+
 class HyaluronPenDetector:
     """Klasse zur Erkennung von Hyaluron Pen Angeboten in Texten und Profilen"""
     
-    def __init__(self):
-        """Initialisiert den HyaluronPenDetector"""
+    def __init__(self, rule_set=None, rule_provider=None):
+        """
+        Initialisiert den HyaluronPenDetector
+        
+        Args:
+            rule_set: Optional, fester CompiledRuleSet (Standard: eingebaute Standardregeln)
+            rule_provider: Optional, RuleSetProvider, der neue Regelversionen aus der Datenbank übernimmt
+        """
         # Lade deutsche Stopwörter
         self.stopwords = set(stopwords.words('german'))
         
-        # Schlüsselwörter für Hyaluron Pen Angebote
-        self.hyaluron_keywords = [
-            "hyaluron pen", "hyaluronpen", "hyaluron-pen", "hyaluronstift", "hyaluron stift",
-            "hyaluronpistole", "hyaluron pistole", "needlefreefiller", "needle free filler",
-            "lippenaufspritzen", "lippen aufspritzen", "lippenunterspritzung", "lippen unterspritzung",
-            "faltenaufspritzen", "falten aufspritzen", "lippenvergrößerung", "lippen vergrößerung",
-            "lippenaufbau", "lippen aufbau", "lippenkorrektur", "lippen korrektur",
-            "hyaluronsäurepen", "hyaluronsäure pen", "hyaluronsäure-pen"
-        ]
-        
-        # Preismuster für Preiserkennung
-        self.price_patterns = [
-            r'(\d+)[.,]?(\d{2})?\s*€',  # 79€, 79.00€, 79,00€
-            r'(\d+)[.,]?(\d{2})?\s*Euro',  # 79 Euro, 79.00 Euro
-            r'€\s*(\d+)[.,]?(\d{2})?',  # € 79, € 79.00
-            r'Euro\s*(\d+)[.,]?(\d{2})?',  # Euro 79
-            r'ab\s*(\d+)[.,]?(\d{2})?\s*€',  # ab 79€
-            r'ab\s*(\d+)[.,]?(\d{2})?\s*Euro',  # ab 79 Euro
-            r'nur\s*(\d+)[.,]?(\d{2})?\s*€',  # nur 79€
-            r'nur\s*(\d+)[.,]?(\d{2})?\s*Euro',  # nur 79 Euro
-            r'(\d+)[.,]?(\d{2})?\s*EUR',  # 79 EUR
-        ]
+        # Spracherkennung und Stopwörter je Sprache für mehrsprachige Texte
+        self.language_identifier = get_language_identifier()
+        self.language_stopwords = {
+            language: self.stopwords if language == DEFAULT_LANGUAGE else load_stopwords(language)
+            for language in SUPPORTED_LANGUAGES
+        }
         
         # Muster für E-Mail-Adressen
         self.email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
@@ -69,32 +665,147 @@ class HyaluronPenDetector:
             r'(\+49|0)[- ]?(\d{4})[- ]?(\d{6})',  # +49 1234 567890
         ]
         
-        # Muster für Orte in Deutschland
-        self.location_keywords = [
-            "Berlin", "Hamburg", "München", "Köln", "Frankfurt", "Stuttgart", "Düsseldorf",
-            "Leipzig", "Dresden", "Hannover", "Nürnberg", "Dortmund", "Essen", "Bremen",
-            "Duisburg", "Bochum", "Wuppertal", "Bielefeld", "Bonn", "Münster", "Karlsruhe",
-            "Mannheim", "Augsburg", "Wiesbaden", "Gelsenkirchen", "Mönchengladbach", "Braunschweig",
-            "Kiel", "Chemnitz", "Aachen", "Halle", "Magdeburg", "Freiburg", "Krefeld", "Lübeck",
-            "Oberhausen", "Erfurt", "Mainz", "Rostock", "Kassel", "Hagen", "Hamm", "Saarbrücken",
-            "Mülheim", "Potsdam", "Ludwigshafen", "Oldenburg", "Leverkusen", "Osnabrück", "Solingen"
-        ]
+        # Kombinierter Scanner für Preise, Telefonnummern und E-Mail-Adressen
+        self.text_scanner = TextScanner()
         
-        # Wörter, die auf kommerzielle Angebote hindeuten
-        self.commercial_indicators = [
-            "angebot", "preis", "kosten", "termin", "vereinbaren", "buchen", "buchung",
-            "behandlung", "behandlungen", "studio", "salon", "kosmetik", "kosmetikstudio",
-            "beauty", "beautysalon", "schönheit", "schönheitssalon", "rabatt", "sparen",
-            "aktion", "sonderangebot", "gutschein", "geschenkgutschein", "jetzt", "neu",
-            "vorher", "nachher", "ergebnis", "ergebnisse", "vorher-nachher", "beratung"
-        ]
+        # Geteiltes Ortsverzeichnis (Gemeinden, mehrteilige Namen und Postleitzahlen); Gemeinden, deren Name
+        # ein Stopwort oder ein Eintrag der Wortfrequenzliste ist, gelten nur mit Präposition oder PLZ als Ort
+        self.gazetteer = get_gazetteer(self.stopwords | set(get_word_frequencies()))
+        
+        # Kompilierte Erkennungsregeln (fest vorgegeben oder über einen RuleSetProvider austauschbar)
+        self._rule_set = rule_set
+        self._rule_provider = rule_provider
+        
+        # (Regelsatz, Versionsstempel); wird nur bei einem Regelwechsel neu berechnet
+        self._version_cache = (None, None)
+    
+    @property
+    def rules(self):
+        """Aktueller kompilierter Regelsatz (bei einem RuleSetProvider höchstens alle paar Sekunden geprüft)"""
+        if self._rule_provider is not None:
+            return self._rule_provider.get()
+        if self._rule_set is None:
+            self._rule_set = compile_rule_set(DEFAULT_RULES, DEFAULT_RULES_VERSION)
+        return self._rule_set
+    
+    @property
+    def hyaluron_keywords(self):
+        """Schlüsselwörter für Hyaluron Pen Angebote"""
+        return self.rules.hyaluron_keywords
+    
+    @property
+    def keyword_automaton(self):
+        """Kompilierter Automat für alle Hyaluron-Keywords"""
+        return self.rules.keyword_automaton
+    
+    @property
+    def fuzzy_matcher(self):
+        """Löschverzeichnis für verschleierte Schreibweisen (hyalur0n, hy4luron-p3n, h.y.a.l.u.r.o.n)"""
+        return self.rules.fuzzy_matcher
+    
+    @property
+    def commercial_indicators(self):
+        """Wörter, die auf kommerzielle Angebote hindeuten"""
+        return self.rules.commercial_indicators
+    
+    @property
+    def price_patterns(self):
+        """Kompilierte Preismuster für extract_prices"""
+        return self.rules.price_patterns
+    
+    @property
+    def profile_weights(self):
+        """Gewichte für den Risiko-Score von Profilen"""
+        return self.rules.profile_weights
+    
+    @property
+    def post_weights(self):
+        """Gewichte für den Risiko-Score von Posts"""
+        return self.rules.post_weights
+    
+    @property
+    def suspicious_threshold(self):
+        """Risiko-Score, ab dem ein Profil als verdächtig gilt"""
+        return self.rules.suspicious_threshold
+    
+    @property
+    def version(self):
+        """
+        Versionsstempel über Analyse-Logik, Regelsatz, Stopwörter und Muster
+        
+        Ändert sich, sobald sich eine Eingabe des Detectors ändert, und dient als Teil
+        des Cache-Schlüssels für zwischengespeicherte Analyseergebnisse. Wird nur bei
+        einem Regelwechsel neu berechnet.
+        """
+        rules = self.rules
+        cached_rules, cached_version = self._version_cache
+        if rules is cached_rules:
+            return cached_version
+        
+        fingerprint = json.dumps([
+            DETECTOR_VERSION,
+            rules.version,
+            rules.fingerprint,
+            rules.fuzzy_matcher.max_distance,
+            len(rules.hashtag_segmenter),
+            sorted(self.stopwords),
+            {language: sorted(words) for language, words in self.language_stopwords.items()},
+            self.language_identifier.fingerprint,
+            self.text_scanner.pattern.pattern,
+            len(self.gazetteer)
+        ], sort_keys=True, ensure_ascii=False)
+        
+        version = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:16]
+        self._version_cache = (rules, version)
+        return version
+    
+    def build_context(self, text, rules=None):
+        """
+        Erstellt einen AnalysisContext, der von allen Extraktoren gemeinsam genutzt wird
+        
+        Args:
+            text: Der zu analysierende Text oder ein bestehender AnalysisContext
+            rules: Optional, CompiledRuleSet, dessen HashtagSegmenter verwendet wird (Standard: aktueller Regelsatz)
+            
+        Returns:
+            AnalysisContext-Objekt
+        """
+        if isinstance(text, AnalysisContext):
+            return text
+        return self._tokenize(text, rules or self.rules)
+    
+    @instrumented("detector.tokenize")
+    def _tokenize(self, text, rules):
+        """Erkennt die Sprache, normalisiert, zerlegt Hashtags und tokenisiert einen Text (einmal pro Analyse)"""
+        language = self.language_identifier.identify(text)
+        return AnalysisContext(text, self.language_stopwords[language], rules.hashtag_segmenter, language)
+    
+    def detect_language(self, text):
+        """
+        Bestimmt die Sprache eines Textes
+        
+        Args:
+            text: Der zu analysierende Text oder ein AnalysisContext
+            
+        Returns:
+            Sprachcode aus SUPPORTED_LANGUAGES
+        """
+        if isinstance(text, AnalysisContext):
+            return text.language
+        return self.language_identifier.identify(text)
+    
+    def _segmented_text(self, text, rules):
+        """Text mit zerlegten Hashtags und Positionen der eingefügten Leerzeichen"""
+        if isinstance(text, AnalysisContext):
+            return text.segmented_text, text.insertions
+        return rules.hashtag_segmenter.segment_text(text)
     
     def detect_hyaluron_pen_content(self, text):
         """
         Erkennt, ob ein Text Hinweise auf Hyaluron Pen Angebote enthält
         
         Args:
-            text: Der zu analysierende Text
+            text: Der zu analysierende Text oder ein AnalysisContext
             
         Returns:
             Boolean: True, wenn Hyaluron Pen Angebote erkannt wurden, sonst False
@@ -102,15 +813,74 @@ class HyaluronPenDetector:
         if not text:
             return False
         
-        # Konvertiere Text zu Kleinbuchstaben
-        text_lower = text.lower()
+        rules = self.rules
+        text_lower = text.text_lower if isinstance(text, AnalysisContext) else self._segmented_text(text, rules)[0].lower()
         
-        # Prüfe auf Hyaluron-Keywords
-        for keyword in self.hyaluron_keywords:
-            if keyword in text_lower:
-                return True
+        # Ein Durchlauf über den Text, Abbruch beim ersten Treffer
+        for _ in rules.keyword_automaton_for(self.detect_language(text)).iter_matches(text_lower):
+            return True
+        
+        # Ohne exakten Treffer nach verschleierten Schreibweisen suchen
+        return bool(self.find_obfuscated_keywords(text, rules=rules))
+    
+    @instrumented("detector.keywords")
+    def find_hyaluron_keywords(self, text, include_obfuscated=False, rules=None):
+        """
+        Findet alle Hyaluron-Keywords mit ihren Positionen in einem Text
         
-        return False
+        Args:
+            text: Der zu analysierende Text oder ein AnalysisContext
+            include_obfuscated: Optional, ob auch verschleierte Schreibweisen gezählt werden
+            rules: Optional, zu verwendender CompiledRuleSet (Standard: aktueller Regelsatz)
+            
+        Returns:
+            Dictionary mit Schlüsselwort -> Liste der Startpositionen
+        """
+        rules = rules or self.rules
+        automaton = rules.keyword_automaton_for(self.detect_language(text))
+        
+        # Gesucht wird im Text mit zerlegten Hashtags, Positionen beziehen sich auf den Originaltext
+        if isinstance(text, AnalysisContext):
+            keyword_hits = automaton.find_all_lower(text.text_lower)
+            insertions = text.insertions
+        else:
+            segmented_text, insertions = self._segmented_text(text, rules)
+            keyword_hits = automaton.find_all(segmented_text)
+        keyword_hits = restore_positions(keyword_hits, insertions)
+        
+        if include_obfuscated:
+            for keyword, positions in self.find_obfuscated_keywords(text, keyword_hits, rules).items():
+                keyword_hits.setdefault(keyword, []).extend(positions)
+        
+        return keyword_hits
+    
+    @instrumented("detector.fuzzy_keywords")
+    def find_obfuscated_keywords(self, text, exact_hits=None, rules=None):
+        """
+        Findet verschleierte Schreibweisen der Hyaluron-Keywords (Editierdistanz bis 2)
+        
+        Args:
+            text: Der zu analysierende Text oder ein AnalysisContext
+            exact_hits: Optional, Ergebnis von find_hyaluron_keywords; bereits exakt gefundene
+                        Stellen werden nicht doppelt gezählt
+            rules: Optional, zu verwendender CompiledRuleSet (Standard: aktueller Regelsatz)
+            
+        Returns:
+            Dictionary mit Schlüsselwort -> Liste der Startpositionen
+        """
+        rules = rules or self.rules
+        segmented_text, insertions = self._segmented_text(text, rules)
+        if not segmented_text:
+            return {}
+        
+        exclude_spans = []
+        for keyword, positions in (exact_hits or {}).items():
+            for position in positions:
+                start = segmented_position(position, insertions)
+                exclude_spans.append((start, start + len(keyword)))
+        
+        fuzzy_matcher = rules.fuzzy_matcher_for(self.detect_language(text))
+        return restore_positions(fuzzy_matcher.find_all(segmented_text, exclude_spans), insertions)
     
     def extract_prices(self, text):
         """
@@ -128,7 +898,7 @@ class HyaluronPenDetector:
         prices = []
         
         for pattern in self.price_patterns:
-            matches = re.finditer(pattern, text)
+            matches = pattern.finditer(text)
             for match in matches:
                 # Extrahiere den Preis aus dem Match
                 price_str = match.group(0)
@@ -181,12 +951,31 @@ class HyaluronPenDetector:
         
         return phones
     
+    @instrumented("detector.scan")
+    def scan_text(self, text):
+        """
+        Extrahiert Preise, Telefonnummern und E-Mail-Adressen in einem einzigen Durchlauf
+        
+        Args:
+            text: Der zu analysierende Text oder ein AnalysisContext
+            
+        Returns:
+            Dictionary mit "prices" (Euro, dedupliziert), "price_cents", "phones" und "emails"
+        """
+        if isinstance(text, AnalysisContext):
+            text = text.text
+        
+        result = self.text_scanner.scan(text)
+        result["prices"] = [price_cents / 100 for price_cents in result["price_cents"]]
+        return result
+    
+    @instrumented("detector.locations")
     def extract_locations(self, text):
         """
         Extrahiert Orte aus einem Text
         
         Args:
-            text: Der zu analysierende Text
+            text: Der zu analysierende Text oder ein AnalysisContext
             
         Returns:
             Liste von gefundenen Orten
@@ -194,25 +983,19 @@ class HyaluronPenDetector:
         if not text:
             return []
         
-        locations = []
+        context = self.build_context(text)
         
-        # Tokenisiere den Text
-        words = word_tokenize(text)
-        
-        # Suche nach Orten
-        for word in words:
-            for location in self.location_keywords:
-                if location.lower() == word.lower():
-                    locations.append(location)
-        
-        return locations
+        # Ein Durchlauf über die Tokens: Hash-Lookup, Trie für mehrteilige Namen, PLZ-Index
+        return self.gazetteer.match_tokens(context.tokens_lower)
     
-    def calculate_commercial_score(self, text):
+    @instrumented("detector.commercial_score")
+    def calculate_commercial_score(self, text, rules=None):
         """
         Berechnet einen Score für die Wahrscheinlichkeit, dass es sich um ein kommerzielles Angebot handelt
         
         Args:
-            text: Der zu analysierende Text
+            text: Der zu analysierende Text oder ein AnalysisContext
+            rules: Optional, zu verwendender CompiledRuleSet (Standard: aktueller Regelsatz)
             
         Returns:
             Float: Score zwischen 0 und 1
@@ -220,21 +1003,12 @@ class HyaluronPenDetector:
         if not text:
             return 0.0
         
-        # Konvertiere Text zu Kleinbuchstaben
-        text_lower = text.lower()
-        
-        # Tokenisiere den Text
-        words = word_tokenize(text_lower)
+        # Kleingeschriebene Tokens ohne Stopwörter aus dem gemeinsamen Kontext
+        words = self.build_context(text).content_tokens
         
-        # Entferne Stopwörter
-        words = [word for word in words if word not in self.stopwords]
-        
-        # Zähle kommerzielle Indikatoren
-        commercial_count = 0
-        for word in words:
-            for indicator in self.commercial_indicators:
-                if indicator == word:
-                    commercial_count += 1
+        # Zähle kommerzielle Indikatoren (Mengen-Lookup je Wort)
+        indicators = (rules or self.rules).commercial_indicators
+        commercial_count = sum(1 for word in words if word in indicators)
         
         # Berechne Score
         if len(words) > 0:
@@ -245,109 +1019,151 @@ class HyaluronPenDetector:
         
         return 0.0
     
-    def analyze_profile(self, profile_data):
+    def combine_profile_text(self, profile_data):
         """
-        Analysiert ein Profil auf Hinweise auf Hyaluron Pen Angebote
+        Kombiniert die für die Profilanalyse relevanten Textfelder
         
         Args:
             profile_data: Dictionary mit Profildaten
             
         Returns:
-            Dictionary mit Analyseergebnissen
+            Kombinierter Text
         """
-        # Kombiniere relevante Textfelder
         text_fields = []
         if "description" in profile_data and profile_data["description"]:
             text_fields.append(profile_data["description"])
         if "post_text" in profile_data and profile_data["post_text"]:
             text_fields.append(profile_data["post_text"])
         
-        combined_text = " ".join(text_fields)
+        return " ".join(text_fields)
+    
+    @instrumented("detector.analyze_profile", profile=True)
+    def analyze_profile(self, profile_data, analysis_date=None):
+        """
+        Analysiert ein Profil auf Hinweise auf Hyaluron Pen Angebote
+        
+        Args:
+            profile_data: Dictionary mit Profildaten
+            analysis_date: Optional, Zeitstempel der Analyse (wird pro Batch einmal erzeugt)
+            
+        Returns:
+            AnalysisResult-Objekt
+        """
+        # Kombiniere relevante Textfelder
+        combined_text = self.combine_profile_text(profile_data)
+        
+        # Ein Regelsatz für die gesamte Analyse, auch wenn währenddessen eine neue Version aktiv wird
+        rules = self.rules
+        
+        # Normalisiere, zerlege Hashtags und tokenisiere den Text einmal für alle Analyseschritte
+        context = self.build_context(combined_text, rules)
         
         # Analysiere den Text
-        contains_hyaluron = self.detect_hyaluron_pen_content(combined_text)
-        prices = self.extract_prices(combined_text)
-        emails = self.extract_emails(combined_text)
-        phones = self.extract_phones(combined_text)
-        locations = self.extract_locations(combined_text)
-        commercial_score = self.calculate_commercial_score(combined_text)
+        keyword_hits = self.find_hyaluron_keywords(context, include_obfuscated=True, rules=rules)
+        keyword_hit_count = sum(len(positions) for positions in keyword_hits.values())
+        contains_hyaluron = keyword_hit_count > 0
+        scan = self.scan_text(context)
+        price_cents = scan["price_cents"]
+        emails = scan["emails"]
+        phones = scan["phones"]
+        locations = self.extract_locations(context)
+        commercial_score = self.calculate_commercial_score(context, rules)
         
         # Berechne Risiko-Score
         risk_score = 0.0
         
+        weights = rules.profile_weights
+        
         if contains_hyaluron:
-            risk_score += 0.5  # Grundwert für Hyaluron Pen Erwähnung
+            risk_score += weights["hyaluron"]  # Grundwert für Hyaluron Pen Erwähnung
+            # Wiederholte Erwähnungen erhöhen das Risiko leicht
+            risk_score += min((keyword_hit_count - 1) * weights["repeat_hit"], weights["repeat_hit_max"])
         
-        if prices:
-            risk_score += 0.2  # Preisangaben erhöhen das Risiko
+        if price_cents:
+            risk_score += weights["price"]  # Preisangaben erhöhen das Risiko
         
         if emails or phones:
-            risk_score += 0.1  # Kontaktdaten erhöhen das Risiko
+            risk_score += weights["contact"]  # Kontaktdaten erhöhen das Risiko
         
         # Kommerzieller Score fließt direkt ein
-        risk_score += commercial_score * 0.2
+        risk_score += commercial_score * weights["commercial"]
         
         # Normalisiere auf 0-100
         risk_score = min(risk_score * 100, 100.0)
         
         # Erstelle Analyseergebnis
-        result = {
-            "contains_hyaluron_pen": contains_hyaluron,
-            "prices": prices,
-            "emails": emails,
-            "phones": phones,
-            "locations": locations,
-            "commercial_score": commercial_score,
-            "risk_score": risk_score,
-            "analysis_date": datetime.now().isoformat()
-        }
-        
-        return result
+        return AnalysisResult(
+            "profile",
+            contains_hyaluron,
+            keyword_hits,
+            keyword_hit_count,
+            price_cents,
+            commercial_score,
+            risk_score,
+            analysis_date or datetime.now().isoformat(),
+            emails=emails,
+            phones=phones,
+            locations=locations
+        )
     
-    def analyze_post(self, post_data):
+    @instrumented("detector.analyze_post", profile=True)
+    def analyze_post(self, post_data, analysis_date=None):
         """
         Analysiert einen Post auf Hinweise auf Hyaluron Pen Angebote
         
         Args:
             post_data: Dictionary mit Postdaten
+            analysis_date: Optional, Zeitstempel der Analyse (wird pro Batch einmal erzeugt)
             
         Returns:
-            Dictionary mit Analyseergebnissen
+            AnalysisResult-Objekt
         """
         # Extrahiere Text
         text = post_data.get("post_text", "")
         
+        # Ein Regelsatz für die gesamte Analyse, auch wenn währenddessen eine neue Version aktiv wird
+        rules = self.rules
+        
+        # Normalisiere, zerlege Hashtags und tokenisiere den Text einmal für alle Analyseschritte
+        context = self.build_context(text, rules)
+        
         # Analysiere den Text
-        contains_hyaluron = self.detect_hyaluron_pen_content(text)
-        prices = self.extract_prices(text)
-        commercial_score = self.calculate_commercial_score(text)
+        keyword_hits = self.find_hyaluron_keywords(context, include_obfuscated=True, rules=rules)
+        keyword_hit_count = sum(len(positions) for positions in keyword_hits.values())
+        contains_hyaluron = keyword_hit_count > 0
+        price_cents = self.scan_text(context)["price_cents"]
+        commercial_score = self.calculate_commercial_score(context, rules)
         
         # Berechne Risiko-Score
         risk_score = 0.0
         
+        weights = rules.post_weights
+        
         if contains_hyaluron:
-            risk_score += 0.6  # Grundwert für Hyaluron Pen Erwähnung
+            risk_score += weights["hyaluron"]  # Grundwert für Hyaluron Pen Erwähnung
+            # Wiederholte Erwähnungen erhöhen das Risiko leicht
+            risk_score += min((keyword_hit_count - 1) * weights["repeat_hit"], weights["repeat_hit_max"])
         
-        if prices:
-            risk_score += 0.2  # Preisangaben erhöhen das Risiko
+        if price_cents:
+            risk_score += weights["price"]  # Preisangaben erhöhen das Risiko
         
         # Kommerzieller Score fließt direkt ein
-        risk_score += commercial_score * 0.2
+        risk_score += commercial_score * weights["commercial"]
         
         # Normalisiere auf 0-100
         risk_score = min(risk_score * 100, 100.0)
         
         # Erstelle Analyseergebnis
-        result = {
-            "contains_hyaluron_pen": contains_hyaluron,
-            "prices": prices,
-            "price_mentioned": ", ".join([f"{price}€" for price in prices]) if prices else None,
-            "commercial_score": commercial_score,
-            "risk_score": risk_score,
-            "analysis_date": datetime.now().isoformat()
-        }
-        
-        return result
+        return AnalysisResult(
+            "post",
+            contains_hyaluron,
+            keyword_hits,
+            keyword_hit_count,
+            price_cents,
+            commercial_score,
+            risk_score,
+            analysis_date or datetime.now().isoformat()
+        )
 
 
 class ImageAnalyzer:
@@ -392,6 +1208,7 @@ class ImageAnalyzer:
         result = {
             "contains_hyaluron_pen": contains_hyaluron,
             "contains_before_after": contains_before_after,
+            "perceptual_hash": hash_image_file(image_path),
             "risk_score": risk_score,
             "analysis_date": datetime.now().isoformat()
         }
@@ -399,19 +1216,362 @@ class ImageAnalyzer:
         return result
 
 
+# Detector je Worker-Prozess (Stopwörter, Automaten und Ortsverzeichnis werden nur einmal geladen)
+_worker_detector = None
+
+
+def _init_batch_worker(rules=None, rules_version=DEFAULT_RULES_VERSION):
+    """Initialisiert den HyaluronPenDetector eines Worker-Prozesses mit dem Regelsatz des Hauptprozesses"""
+    global _worker_detector
+    rule_set = compile_rule_set(rules, rules_version) if rules is not None else None
+    _worker_detector = HyaluronPenDetector(rule_set=rule_set)
+
+
+def _analyze_profile_chunk(profiles):
+    """Analysiert einen Block von Profilen im Worker-Prozess"""
+    analysis_date = datetime.now().isoformat()
+    return [_worker_detector.analyze_profile(profile_data, analysis_date) for profile_data in profiles]
+
+
 class DetectionManager:
     """Klasse zur Koordination der Erkennungsalgorithmen"""
     
-    def __init__(self, db_manager=None):
+    def __init__(self, db_manager=None, use_cache=True, bulk_writes=True, risk_model=None):
         """
         Initialisiert den DetectionManager
         
         Args:
             db_manager: Optional, ein DatabaseManager-Objekt für die Datenbankintegration
+            use_cache: Optional, ob Analyseergebnisse unveränderter Texte zwischengespeichert werden
+            bulk_writes: Optional, ob verdächtige Profile gepuffert und batchweise gespeichert werden
+            risk_model: Optional, LogisticRiskModel für den Risiko-Score von Profilen
+                        (Standard: RISK_MODEL_FILE, falls vorhanden; False deaktiviert das Modell)
         """
         self.db_manager = db_manager
-        self.hyaluron_detector = HyaluronPenDetector()
+        
+        # Erkennungsregeln aus der Datenbank; neue Versionen werden ohne Neustart übernommen
+        self.rule_provider = RuleSetProvider(compile_rule_set, db_manager)
+        self.hyaluron_detector = HyaluronPenDetector(rule_provider=self.rule_provider)
         self.image_analyzer = ImageAnalyzer()
+        
+        # Gelerntes Risikomodell ersetzt den regelbasierten Risiko-Score von Profilen und lernt aus Rückmeldungen
+        self.risk_model = load_risk_model() if risk_model is None else risk_model or None
+        self.risk_trainer = OnlineRiskTrainer(self.risk_model) if self.risk_model is not None else None
+        
+        # Cache für unveränderte Profile und Posts (LRU im Speicher, persistent in der Datenbank)
+        self.analysis_cache = AnalysisCache(db_manager) if use_cache else None
+        self._cache_version = None
+        
+        # Gepuffertes Speichern verdächtiger Profile (eine Transaktion pro Batch)
+        self.profile_writer = BulkProfileWriter(db_manager) if db_manager and bulk_writes else None
+        
+        # Index kopierter Anzeigentexte (wird beim ersten Zugriff aus der Datenbank aufgebaut)
+        self._duplicate_index = None
+        self._duplicate_index_lock = threading.Lock()
+        
+        # Zuordnung von Profilen zu Betreibern über gemeinsame Kontaktdaten (wird beim ersten Zugriff geladen)
+        self._operator_index = None
+        self._operator_index_lock = threading.Lock()
+    
+    def is_suspicious(self, analysis):
+        """
+        Prüft, ob ein Analyseergebnis den Schwellenwert des aktiven Regelsatzes erreicht
+        
+        Args:
+            analysis: Analyseergebnis eines Profils
+            
+        Returns:
+            True, wenn das Profil verdächtig ist, sonst False
+        """
+        return analysis.risk_score >= self.hyaluron_detector.suspicious_threshold
+    
+    @property
+    def duplicate_index(self):
+        """Index der Profilbeschreibungen und Posttexte zur Erkennung kopierter Anzeigen"""
+        if self._duplicate_index is None:
+            with self._duplicate_index_lock:
+                if self._duplicate_index is None:
+                    if self.db_manager:
+                        self._duplicate_index = NearDuplicateIndex.from_database(self.db_manager)
+                    else:
+                        self._duplicate_index = NearDuplicateIndex()
+        
+        return self._duplicate_index
+    
+    @property
+    def operator_index(self):
+        """Index, der Profile mit gemeinsamen E-Mail-Adressen, Telefonnummern oder Domains einem Betreiber zuordnet"""
+        if self._operator_index is None:
+            with self._operator_index_lock:
+                if self._operator_index is None:
+                    if self.db_manager:
+                        self._operator_index = OperatorIndex.from_database(self.db_manager)
+                    else:
+                        self._operator_index = OperatorIndex()
+        
+        return self._operator_index
+    
+    @instrumented("manager.operators", payload_arg=1)
+    def register_operator(self, platform, profile_data):
+        """
+        Ordnet ein analysiertes Profil über seine Kontaktdaten einem Betreiber zu
+        
+        Ergänzt das Profil um 'operator_cluster' (Repräsentant des Betreibers) und
+        'operator_profiles' (alle bekannten Profile des Betreibers), damit nachgelagerte
+        Schritte Arbeit pro Betreiber statt pro Profil erledigen können.
+        
+        Args:
+            platform: Name der Plattform
+            profile_data: Dictionary mit Profildaten und Analyseergebnis
+            
+        Returns:
+            Schlüssel des Betreiber-Repräsentanten
+        """
+        index = self.operator_index
+        key = profile_key(platform, profile_data.get("profile_name"))
+        
+        profile_data["operator_cluster"] = index.add(key, collect_identifiers(platform, profile_data))
+        profile_data["operator_profiles"] = index.members_of(key)
+        
+        return profile_data["operator_cluster"]
+    
+    def flush_pending_writes(self):
+        """Speichert gepufferte Profile und Änderungen der Betreiberzuordnung"""
+        if self.profile_writer is not None:
+            self.profile_writer.flush()
+        
+        if self._operator_index is not None:
+            self._operator_index.flush()
+    
+    @instrumented("manager.near_duplicates", payload_arg=1)
+    def register_near_duplicates(self, platform, profile_data):
+        """
+        Trägt Beschreibung und Post eines Profils in den Duplikat-Index ein
+        
+        Ergänzt das Profil um 'duplicate_cluster' (Repräsentant der Gruppe kopierter Texte)
+        und 'near_duplicates' (bereits bekannte Kopien), damit Screenshots und Meldungen
+        gruppiert werden können.
+        
+        Args:
+            platform: Name der Plattform
+            profile_data: Dictionary mit Profildaten
+            
+        Returns:
+            Liste der Schlüssel bereits bekannter Kopien
+        """
+        index = self.duplicate_index
+        key = profile_key(platform, profile_data.get("profile_name"))
+        near_duplicates = [other_key for other_key, _ in index.add(key, profile_data.get("description"))]
+        
+        if profile_data.get("post_text") and profile_data.get("post_link"):
+            near_duplicates.extend(
+                other_key for other_key, _ in index.add(post_key(profile_data["post_link"]), profile_data["post_text"])
+            )
+        
+        profile_data["duplicate_cluster"] = index.cluster_of(key)
+        profile_data["near_duplicates"] = near_duplicates
+        
+        return near_duplicates
+    
+    def _get_cache_version(self):
+        """
+        Gibt die aktuelle Detector-Version zurück und leert den Arbeitsspeicher-Cache, wenn sie sich geändert hat
+        
+        Returns:
+            Versionsstempel des Detectors
+        """
+        version = self.hyaluron_detector.version
+        
+        if version != self._cache_version:
+            logger.info(f"Detector-Version {version} aktiv, leere den Analyse-Cache im Arbeitsspeicher")
+            self.analysis_cache.invalidate()
+            
+            # Datenbankeinträge anderer Versionen bleiben für einen Wechsel zurück erhalten, nur alte werden entfernt
+            self.analysis_cache.trim()
+            self._cache_version = version
+        
+        return version
+    
+    def _analyze_cached(self, kind, texts, analyze_func):
+        """
+        Liefert Analyseergebnisse aus dem Cache und analysiert nur neue oder geänderte Texte
+        
+        Args:
+            kind: Art der Analyse ('profile' oder 'post')
+            texts: Liste der zu analysierenden Texte (bestimmen den Cache-Schlüssel)
+            analyze_func: Funktion, die eine Liste von Indizes analysiert und die Ergebnisse zurückgibt
+            
+        Returns:
+            Liste von Analyseergebnissen in der Reihenfolge der Texte
+        """
+        if self.analysis_cache is None:
+            return analyze_func(list(range(len(texts))))
+        
+        version = self._get_cache_version()
+        keys = [make_cache_key(kind, version, text) for text in texts]
+        cached = self.analysis_cache.get_many(list(set(keys)))
+        
+        # Identische Texte innerhalb eines Batches werden nur einmal analysiert
+        pending = {}
+        for index, cache_key in enumerate(keys):
+            if cache_key not in cached and cache_key not in pending:
+                pending[cache_key] = index
+        
+        if pending:
+            fresh = dict(zip(pending.keys(), analyze_func(list(pending.values()))))
+            self.analysis_cache.put_many(fresh, version, kind)
+            cached.update(fresh)
+        
+        # Eine Kopie pro Text mit dem Analysedatum des Batches; identische Texte teilen sich das Ergebnis
+        analysis_date = datetime.now().isoformat()
+        dated = {cache_key: result.with_date(analysis_date) for cache_key, result in cached.items()}
+        
+        return [dated[cache_key] for cache_key in keys]
+    
+    def analyze_profile(self, profile_data):
+        """
+        Analysiert ein einzelnes Profil (mit Cache)
+        
+        Args:
+            profile_data: Dictionary mit Profildaten
+            
+        Returns:
+            AnalysisResult-Objekt (mit to_dict() in ein Dictionary umwandelbar)
+        """
+        return self.analyze_profiles_batch([profile_data])[0]
+    
+    def analyze_post(self, post_data):
+        """
+        Analysiert einen einzelnen Post (mit Cache)
+        
+        Args:
+            post_data: Dictionary mit Postdaten
+            
+        Returns:
+            AnalysisResult-Objekt (mit to_dict() in ein Dictionary umwandelbar)
+        """
+        return self._analyze_cached(
+            "post",
+            [post_data.get("post_text") or ""],
+            lambda indexes: [self.hyaluron_detector.analyze_post(post_data) for _ in indexes]
+        )[0]
+    
+    @instrumented("manager.analyze_batch")
+    def analyze_profiles_batch(self, profiles, workers=None, chunk_size=None):
+        """
+        Analysiert viele Profile, bei großen Mengen parallel auf mehreren Prozessen
+        
+        Profile, deren Texte seit der letzten Analyse unverändert sind, werden aus dem
+        Analyse-Cache beantwortet; nur neue oder geänderte Texte werden analysiert.
+        
+        Args:
+            profiles: Liste von Profildaten (Dictionaries)
+            workers: Optional, Anzahl der Worker-Prozesse (Standard: Anzahl der CPU-Kerne).
+                     Mit workers=1 wird immer im aktuellen Prozess analysiert.
+            chunk_size: Optional, Anzahl der Profile pro Worker-Auftrag
+            
+        Returns:
+            Liste von Analyseergebnissen in der Reihenfolge der Eingabe
+        """
+        profiles = list(profiles)
+        texts = [self.hyaluron_detector.combine_profile_text(profile_data) for profile_data in profiles]
+        
+        analyses = self._analyze_cached(
+            "profile",
+            texts,
+            lambda indexes: self._analyze_profiles_uncached([profiles[i] for i in indexes], workers, chunk_size)
+        )
+        
+        # Das Risikomodell bewertet nach dem Cache, damit Aktualisierungen keine Analyseergebnisse verwerfen
+        return self._apply_risk_model(texts, analyses)
+    
+    @instrumented("manager.analyze_uncached")
+    def _analyze_profiles_uncached(self, profiles, workers=None, chunk_size=None):
+        """
+        Analysiert Profile ohne Cache, ab PARALLEL_THRESHOLD Profilen auf mehreren Prozessen
+        
+        Args:
+            profiles: Liste von Profildaten (Dictionaries)
+            workers: Optional, Anzahl der Worker-Prozesse
+            chunk_size: Optional, Anzahl der Profile pro Worker-Auftrag
+            
+        Returns:
+            Liste von Analyseergebnissen in der Reihenfolge der Eingabe
+        """
+        workers = workers or os.cpu_count() or 1
+        chunk_size = chunk_size or BATCH_CHUNK_SIZE
+        
+        # Kleine Mengen lohnen den Prozessstart nicht
+        if workers <= 1 or len(profiles) < PARALLEL_THRESHOLD:
+            analysis_date = datetime.now().isoformat()
+            return [self.hyaluron_detector.analyze_profile(profile_data, analysis_date) for profile_data in profiles]
+        
+        # Übertrage nur die für die Analyse benötigten Textfelder an die Worker
+        slim_profiles = [
+            {field: profile_data.get(field) for field in ANALYSIS_FIELDS}
+            for profile_data in profiles
+        ]
+        chunks = [slim_profiles[i:i + chunk_size] for i in range(0, len(slim_profiles), chunk_size)]
+        
+        logger.info(f"Analysiere {len(profiles)} Profile in {len(chunks)} Blöcken mit {workers} Prozessen")
+        
+        # Alle Worker analysieren mit dem Regelsatz, der beim Start des Batches aktiv ist
+        rules = self.hyaluron_detector.rules
+        
+        analyses = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_batch_worker,
+                                 initargs=(rules.rules, rules.version)) as executor:
+            # map liefert die Ergebnisse in der Reihenfolge der Blöcke
+            for chunk_analyses in executor.map(_analyze_profile_chunk, chunks):
+                analyses.extend(chunk_analyses)
+        
+        return analyses
+    
+    @instrumented("manager.risk_model")
+    def _apply_risk_model(self, texts, analyses):
+        """
+        Ersetzt die Risiko-Scores eines Batches durch die des gelernten Risikomodells
+        
+        Args:
+            texts: Liste der kombinierten Profiltexte
+            analyses: Liste der regelbasierten Analyseergebnisse
+            
+        Returns:
+            Liste von Analyseergebnissen (unverändert, wenn kein Modell geladen ist)
+        """
+        if self.risk_model is None or not analyses:
+            return analyses
+        
+        # Checkpoints anderer Prozesse (Rückmeldungen, neues Training) werden ohne Neustart übernommen
+        self.risk_trainer.sync()
+        scores = self.risk_model.risk_scores(texts, analyses)
+        
+        return [analysis.with_risk_score(score) for analysis, score in zip(analyses, scores)]
+    
+    def record_feedback(self, profile_data, label=None):
+        """
+        Übernimmt die Entscheidung eines Ermittlers als Trainingsbeispiel für das Risikomodell
+        
+        Args:
+            profile_data: Dictionary mit Profildaten (description, post_text, ...)
+            label: Optional, 1 (Angebot bestätigt) oder 0 (Verdacht zurückgewiesen); Standard: aus
+                   is_reported und report_statuses der Profildaten wie beim Training bestimmt
+            
+        Returns:
+            True, wenn die Rückmeldung übernommen wurde
+        """
+        if self.risk_trainer is None:
+            return False
+        
+        if label is None:
+            label = label_for(profile_data.get("is_reported"), profile_data.get("report_statuses") or [])
+            if label is None:
+                return False
+        
+        # Merkmale aus dem regelbasierten Ergebnis, wie beim Training
+        analysis = self.hyaluron_detector.analyze_profile(profile_data)
+        self.risk_trainer.add_feedback(self.hyaluron_detector.combine_profile_text(profile_data), label, analysis)
+        return True
     
     def analyze_scraping_results(self, results):
         """
@@ -425,53 +1585,167 @@ class DetectionManager:
         """
         suspicious_profiles = []
         
-        # Analysiere Ergebnisse für jede Plattform
+        # Analysiere alle Profile gemeinsam, damit große Ergebnismengen parallel verarbeitet werden
+        all_profiles = [profile_data for platform_results in results.values() for profile_data in platform_results]
+        analyses = iter(self.analyze_profiles_batch(all_profiles))
+        
+        # Werte die Ergebnisse für jede Plattform aus
         for platform, platform_results in results.items():
             logger.info(f"Analysiere {len(platform_results)} Ergebnisse für {platform}")
             
             for profile_data in platform_results:
-                # Analysiere das Profil
-                analysis = self.hyaluron_detector.analyze_profile(profile_data)
-                
-                # Füge Analyseergebnisse zum Profil hinzu
-                profile_data["analysis"] = analysis
-                
-                # Prüfe, ob das Profil verdächtig ist
-                if analysis["risk_score"] >= 50.0:  # Schwellenwert für verdächtige Profile
+                if self._process_profile_analysis(platform, profile_data, next(analyses)):
                     suspicious_profiles.append(profile_data)
-                    logger.info(f"Verdächtiges Profil gefunden: {profile_data.get('profile_name')} auf {platform} (Risiko-Score: {analysis['risk_score']:.2f})")
-                    
-                    # Speichere das Profil in der Datenbank mit aktualisiertem Risiko-Score
-                    if self.db_manager:
-                        # Aktualisiere das Profil mit dem Risiko-Score
-                        profile_data["risk_score"] = analysis["risk_score"]
-                        
-                        # Speichere das Profil in der Datenbank
-                        profile = self.db_manager.add_profile(platform, profile_data)
-                        
-                        # Wenn ein Post vorhanden ist, analysiere und speichere ihn
-                        if profile and "post_text" in profile_data:
-                            post_data = {
-                                "post_link": profile_data.get("post_link"),
-                                "post_text": profile_data.get("post_text")
-                            }
-                            
-                            # Analysiere den Post
-                            post_analysis = self.hyaluron_detector.analyze_post(post_data)
-                            
-                            # Aktualisiere Post-Daten mit Analyseergebnissen
-                            post_data.update({
-                                "contains_hyaluron_pen": post_analysis["contains_hyaluron_pen"],
-                                "contains_price": len(post_analysis["prices"]) > 0,
-                                "price_mentioned": post_analysis["price_mentioned"]
-                            })
-                            
-                            # Speichere den Post in der Datenbank
-                            self.db_manager.add_post(profile.id, post_data)
+        
+        self.flush_pending_writes()
         
         logger.info(f"Analyse abgeschlossen: {len(suspicious_profiles)} verdächtige Profile gefunden")
         return suspicious_profiles
     
+    def analyze_scraping_results_stream(self, items, chunk_size=None, max_wait=None):
+        """
+        Analysiert Scraping-Ergebnisse fortlaufend und liefert verdächtige Profile, sobald sie erkannt wurden
+        
+        Im Gegensatz zu analyze_scraping_results müssen nicht alle Ergebnisse im Speicher
+        liegen; nachgelagerte Schritte (Screenshots, Datenbank) können mit dem ersten
+        Treffer beginnen, während die Suche noch läuft.
+        
+        Args:
+            items: Iterator von Tupeln (Plattform, Profildaten), z.B. MultiPlatformScraper.iter_search()
+            chunk_size: Optional, Anzahl der Profile, die gemeinsam analysiert werden
+            max_wait: Optional, Sekunden, nach denen ein unvollständiger Abschnitt analysiert wird
+            
+        Yields:
+            Verdächtige Profile mit Analyseergebnissen
+        """
+        chunk_size = max(1, chunk_size or STREAM_CHUNK_SIZE)
+        max_wait = STREAM_MAX_WAIT if max_wait is None else max_wait
+        
+        analyzed_count = 0
+        suspicious_count = 0
+        chunk = []
+        chunk_started = None
+        
+        # Bricht der Aufrufer vorzeitig ab, werden bereits erkannte Profile trotzdem gespeichert
+        try:
+            for item in items:
+                if not chunk:
+                    chunk_started = time.monotonic()
+                chunk.append(item)
+                if len(chunk) < chunk_size and time.monotonic() - chunk_started < max_wait:
+                    continue
+                
+                for profile_data in self._process_stream_chunk(chunk):
+                    suspicious_count += 1
+                    yield profile_data
+                analyzed_count += len(chunk)
+                chunk = []
+            
+            if chunk:
+                for profile_data in self._process_stream_chunk(chunk):
+                    suspicious_count += 1
+                    yield profile_data
+                analyzed_count += len(chunk)
+        finally:
+            self.flush_pending_writes()
+        
+        logger.info(f"Analyse abgeschlossen: {suspicious_count} von {analyzed_count} Profilen verdächtig")
+    
+    def _process_stream_chunk(self, chunk):
+        """
+        Analysiert einen Abschnitt des Ergebnisstroms
+        
+        Args:
+            chunk: Liste von Tupeln (Plattform, Profildaten)
+            
+        Yields:
+            Verdächtige Profile mit Analyseergebnissen
+        """
+        analyses = self.analyze_profiles_batch([profile_data for _, profile_data in chunk])
+        
+        for (platform, profile_data), analysis in zip(chunk, analyses):
+            if self._process_profile_analysis(platform, profile_data, analysis):
+                yield profile_data
+    
+    @instrumented("manager.process_analysis", payload_arg=1)
+    def _process_profile_analysis(self, platform, profile_data, analysis):
+        """
+        Übernimmt das Analyseergebnis in das Profil und speichert verdächtige Profile
+        
+        Args:
+            platform: Name der Plattform
+            profile_data: Dictionary mit Profildaten (wird um die Analyse ergänzt)
+            analysis: Analyseergebnis des Profils
+            
+        Returns:
+            True, wenn das Profil verdächtig ist, sonst False
+        """
+        # Füge Analyseergebnisse zum Profil hinzu
+        profile_data["analysis"] = analysis
+        
+        # Prüfe, ob das Profil verdächtig ist
+        if not self.is_suspicious(analysis):
+            return False
+        
+        logger.info(f"Verdächtiges Profil gefunden: {profile_data.get('profile_name')} auf {platform} (Risiko-Score: {analysis.risk_score:.2f})")
+        
+        # Gruppiere kopierte Anzeigentexte
+        if self.register_near_duplicates(platform, profile_data):
+            logger.info(f"Profil {profile_data.get('profile_name')} enthält kopierte Texte (Cluster: {profile_data['duplicate_cluster']})")
+        
+        # Fasse Profile desselben Betreibers plattformübergreifend zusammen
+        self.register_operator(platform, profile_data)
+        if len(profile_data["operator_profiles"]) > 1:
+            logger.info(f"Profil {profile_data.get('profile_name')} gehört zu Betreiber {profile_data['operator_cluster']} mit {len(profile_data['operator_profiles'])} Profilen")
+        
+        # Speichere das Profil in der Datenbank mit aktualisiertem Risiko-Score
+        if self.db_manager:
+            # Aktualisiere das Profil mit dem Risiko-Score
+            profile_data["risk_score"] = analysis.risk_score
+            
+            # Gepuffert: Profil und Post werden gemeinsam im nächsten Batch gespeichert
+            if self.profile_writer is not None:
+                posts = [self._build_post_data(profile_data)] if "post_text" in profile_data else []
+                self.profile_writer.add(platform, profile_data, posts)
+                return True
+            
+            # Speichere das Profil in der Datenbank
+            profile = self.db_manager.add_profile(platform, profile_data)
+            
+            # Wenn ein Post vorhanden ist, analysiere und speichere ihn
+            if profile and "post_text" in profile_data:
+                # Speichere den Post in der Datenbank
+                self.db_manager.add_post(profile.id, self._build_post_data(profile_data))
+        
+        return True
+    
+    def _build_post_data(self, profile_data):
+        """
+        Erstellt die Postdaten eines Profils inklusive Analyseergebnissen
+        
+        Args:
+            profile_data: Dictionary mit Profildaten
+            
+        Returns:
+            Dictionary mit Postdaten
+        """
+        post_data = {
+            "post_link": profile_data.get("post_link"),
+            "post_text": profile_data.get("post_text")
+        }
+        
+        # Analysiere den Post
+        post_analysis = self.analyze_post(post_data)
+        
+        # Aktualisiere Post-Daten mit Analyseergebnissen
+        post_data.update({
+            "contains_hyaluron_pen": post_analysis.contains_hyaluron_pen,
+            "contains_price": len(post_analysis.price_cents) > 0,
+            "price_mentioned": post_analysis.price_mentioned
+        })
+        
+        return post_data
+    
     def analyze_image_file(self, image_path, profile_id=None, post_id=None):
         """
         Analysiert ein Bild und speichert die Ergebnisse
@@ -531,7 +1805,7 @@ if __name__ == "__main__":
     
     print("\nPreiserkennung:")
     for text in price_texts:
-        prices = detector.extract_prices(text)
+        prices = detector.scan_text(text)["prices"]
         print(f"- '{text}': {prices}")
     
     # Teste die Profilanalyse
@@ -546,4 +1820,4 @@ if __name__ == "__main__":
     
     print("\nProfilanalyse:")
     analysis = detector.analyze_profile(test_profile)
-    print(json.dumps(analysis, indent=2))
+    print(json.dumps(analysis.to_dict(), indent=2, ensure_ascii=False))
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+# detection_benchmark.py - Benchmarks für die Erkennungsalgorithmen des IRI® Legal Agent
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tracemalloc
+from array import array
+from datetime import datetime
+
+from detection_algorithms import HyaluronPenDetector, DetectionManager
+from gazetteer import DEFAULT_MUNICIPALITIES
+
+logger = logging.getLogger("detection_benchmark")
+
+# Textbausteine für synthetische Website-Texte
+WEBSITE_SNIPPETS = [
+    "Willkommen in unserem Kosmetikstudio! Wir bieten professionelle Behandlungen für Gesicht und Körper.",
+    "Hyaluron Pen Behandlung ab {price}€ – Lippen aufspritzen ohne Nadel.",
+    "Jetzt Termin vereinbaren unter {phone} oder per E-Mail an {email}.",
+    "Unsere Preise: Lippenaufbau {price},00 Euro, Faltenbehandlung € {price}.",
+    "Vorher-Nachher-Bilder unserer Kundinnen finden Sie in der Galerie.",
+    "Impressum: Beauty Lounge GmbH, Hauptstraße 12, 10115 Berlin. Telefon: {phone}",
+    "Gutschein-Aktion: nur {price} EUR für eine Lippenkorrektur mit dem Hyaluron Pen!",
+    "Datenschutzerklärung: Wir verarbeiten Ihre personenbezogenen Daten gemäß DSGVO.",
+    "Öffnungszeiten: Montag bis Freitag 9:00 - 18:00 Uhr, Samstag nach Vereinbarung.",
+]
+
+
+# Textbausteine für synthetische Profilbeschreibungen
+PROFILE_SNIPPETS = [
+    "Beauty Studio in {city} ✨",
+    "Kosmetikstudio {city} | Lippen | Augenbrauen | Wimpern",
+    "Hyaluron Pen Behandlungen ohne Nadel 💋",
+    "Termine nur per DM oder WhatsApp {phone}",
+    "Buchung: {email}",
+    "Zertifizierte Kosmetikerin seit {year}",
+    "Lip Filler & Faltenunterspritzung ab {price}€",
+    "📍 {plz} {city}",
+    "Nageldesign und Pediküre",
+    "Gutscheine erhältlich!"
+]
+
+# Textbausteine für synthetische Posts
+POST_SNIPPETS = [
+    "Hyaluron Pen ab {price}€, jetzt Termin buchen!",
+    "Volle Lippen ohne OP und ohne Nadel 😍 Nur diese Woche {price} Euro statt {old_price} Euro.",
+    "Vorher/Nachher: Lippenaufbau mit dem Hyaluron Pen bei unserer Kundin aus {city}.",
+    "Neue Termine frei! Meldet euch unter {phone}.",
+    "Schulung Hyaluron Pen für Anfänger, Zertifikat inklusive – {price},00 €",
+    "Danke für euer Vertrauen ❤️ Wir freuen uns auf euch in {city}.",
+    "Heute entspannte Gesichtsbehandlung mit Fruchtsäurepeeling.",
+    "Angebot: Lippen aufspritzen € {price}, Info per Mail an {email}"
+]
+
+# Hashtags für Profile und Posts
+HASHTAGS = [
+    "#hyaluronpen", "#hyaluron", "#lippenaufspritzen", "#lippen", "#lipfiller", "#beauty",
+    "#kosmetik", "#ohnenadel", "#lippenvergrößerung", "#beautysalon", "#faltenbehandlung",
+    "#nägel", "#wimpernverlängerung", "#kosmetikstudio"
+]
+
+
+def _fill_snippet(snippet, rng):
+    """Setzt zufällige Werte in einen Textbaustein ein"""
+    city = rng.choice(DEFAULT_MUNICIPALITIES)
+    price = rng.randint(49, 399)
+    return snippet.format(
+        city=city,
+        price=price,
+        old_price=price + rng.randint(20, 100),
+        phone=f"0{rng.randint(151, 179)} {rng.randint(1000000, 9999999)}",
+        email=f"info@{city.split()[0].lower()}-beauty{rng.randint(1, 999)}.de",
+        plz=f"{rng.randint(1067, 99998):05d}",
+        year=rng.randint(2005, 2023)
+    )
+
+
+def generate_profile(index, rng):
+    """
+    Erzeugt ein synthetisches Profil mit Beschreibung und Post
+    
+    Args:
+        index: Laufende Nummer (für eindeutige Profilnamen)
+        rng: random.Random-Instanz für reproduzierbare Profile
+        
+    Returns:
+        Dictionary mit Profildaten im Format der Plattform-Scraper
+    """
+    description = " ".join(_fill_snippet(snippet, rng) for snippet in rng.sample(PROFILE_SNIPPETS, rng.randint(2, 5)))
+    post_text = " ".join(_fill_snippet(snippet, rng) for snippet in rng.sample(POST_SNIPPETS, rng.randint(1, 3)))
+    hashtags = " ".join(rng.sample(HASHTAGS, rng.randint(0, 6)))
+    
+    return {
+        "profile_name": f"beauty_studio_{index}",
+        "profile_link": f"https://www.instagram.com/beauty_studio_{index}/",
+        "description": description,
+        "post_text": f"{post_text} {hashtags}".strip(),
+        "post_link": f"https://www.instagram.com/p/{index:x}/"
+    }
+
+
+def generate_corpus(count, seed=42):
+    """
+    Erzeugt einen reproduzierbaren Korpus synthetischer Profile
+    
+    Args:
+        count: Anzahl der Profile
+        seed: Seed für den Zufallsgenerator
+        
+    Yields:
+        Dictionaries mit Profildaten
+    """
+    rng = random.Random(seed)
+    for index in range(count):
+        yield generate_profile(index, rng)
+
+
+def generate_website_text(size_bytes, rng):
+    """
+    Erzeugt einen synthetischen Website-Text mit Preisen, Telefonnummern und E-Mail-Adressen
+    
+    Args:
+        size_bytes: Ungefähre Zielgröße des Textes in Bytes
+        rng: random.Random-Instanz für reproduzierbare Texte
+    
+    Returns:
+        Der erzeugte Text
+    """
+    parts = []
+    length = 0
+    
+    while length < size_bytes:
+        snippet = rng.choice(WEBSITE_SNIPPETS).format(
+            price=rng.randint(49, 399),
+            phone=f"0{rng.randint(151, 179)} {rng.randint(1000000, 9999999)}",
+            email=f"info@studio{rng.randint(1, 999)}.de"
+        )
+        parts.append(snippet)
+        length += len(snippet.encode("utf-8")) + 1
+    
+    return "\n".join(parts)
+
+
+def load_website_texts(input_dir):
+    """
+    Lädt gespeicherte Website-Texte (z.B. aus WebsiteScraper.scrape_website) aus einem Verzeichnis
+    
+    Args:
+        input_dir: Verzeichnis mit .txt- oder .html-Dateien
+    
+    Returns:
+        Liste von Texten
+    """
+    from bs4 import BeautifulSoup
+    
+    texts = []
+    
+    for filename in sorted(os.listdir(input_dir)):
+        filepath = os.path.join(input_dir, filename)
+        if not os.path.isfile(filepath):
+            continue
+        
+        with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
+            content = f.read()
+        
+        if filename.endswith((".html", ".htm")):
+            content = BeautifulSoup(content, "html.parser").get_text("\n")
+        
+        texts.append(content)
+    
+    return texts
+
+
+def fetch_website_texts(urls):
+    """
+    Lädt Website-Texte über den WebsiteScraper herunter
+    
+    Args:
+        urls: Liste von URLs
+    
+    Returns:
+        Liste von Texten
+    """
+    from bs4 import BeautifulSoup
+    from platform_scraper import WebsiteScraper
+    
+    scraper = WebsiteScraper()
+    texts = []
+    
+    for url in urls:
+        response = scraper.make_request(url)
+        if response:
+            texts.append(BeautifulSoup(response.text, "html.parser").get_text("\n"))
+    
+    return texts
+
+
+def _time_call(func, text, repeat):
+    """Misst die beste Laufzeit eines Aufrufs über mehrere Wiederholungen"""
+    best = None
+    
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        duration = time.perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+    
+    return best
+
+
+def benchmark_text_scanner(detector, texts, repeat=3):
+    """
+    Vergleicht extract_prices/extract_phones/extract_emails mit dem kombinierten TextScanner
+    
+    Args:
+        detector: HyaluronPenDetector-Instanz
+        texts: Liste von Texten
+        repeat: Anzahl der Wiederholungen pro Text (bester Wert zählt)
+    
+    Returns:
+        Liste von Dictionaries mit Messergebnissen pro Text
+    """
+    def legacy(text):
+        detector.extract_prices(text)
+        detector.extract_phones(text)
+        detector.extract_emails(text)
+    
+    results = []
+    
+    for text in texts:
+        size_kb = len(text.encode("utf-8")) / 1024
+        legacy_seconds = _time_call(legacy, text, repeat)
+        scanner_seconds = _time_call(detector.text_scanner.scan, text, repeat)
+        
+        results.append({
+            "size_kb": round(size_kb, 1),
+            "legacy_ms": round(legacy_seconds * 1000, 2),
+            "scanner_ms": round(scanner_seconds * 1000, 2),
+            "speedup": round(legacy_seconds / scanner_seconds, 2) if scanner_seconds else None,
+            "legacy_prices": len(detector.extract_prices(text)),
+            "scanner_prices": len(detector.text_scanner.scan(text)["price_cents"])
+        })
+    
+    return results
+
+
+def _percentile(sorted_values, fraction):
+    """Gibt das Perzentil einer sortierten Werteliste zurück (nächster Rang)"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def measure(func, inputs, input_bytes=None, memory_sample=1000):
+    """
+    Misst Durchsatz, Latenz pro Datensatz und Spitzenspeicher einer Funktion
+    
+    Die Laufzeit wird ohne Speicherverfolgung gemessen; der Spitzenspeicher wird in einem
+    zweiten Durchlauf über die ersten memory_sample Eingaben mit tracemalloc bestimmt.
+    
+    Args:
+        func: Funktion, die mit jeder Eingabe aufgerufen wird
+        inputs: Liste von Eingaben
+        input_bytes: Optional, Gesamtgröße der Eingaben in Bytes (für MB/s)
+        memory_sample: Anzahl der Eingaben für die Speichermessung (0 deaktiviert sie)
+        
+    Returns:
+        Dictionary mit Messergebnissen
+    """
+    latencies = array("d")
+    
+    start = time.perf_counter()
+    for item in inputs:
+        item_start = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - item_start)
+    total_seconds = time.perf_counter() - start
+    
+    sorted_latencies = sorted(latencies)
+    result = {
+        "records": len(inputs),
+        "total_seconds": round(total_seconds, 4),
+        "records_per_second": round(len(inputs) / total_seconds, 1) if total_seconds else None,
+        "p50_ms": round(_percentile(sorted_latencies, 0.50) * 1000, 4),
+        "p99_ms": round(_percentile(sorted_latencies, 0.99) * 1000, 4),
+        "max_ms": round(sorted_latencies[-1] * 1000, 4) if sorted_latencies else 0.0
+    }
+    
+    if input_bytes is not None and total_seconds:
+        result["mb_per_second"] = round(input_bytes / total_seconds / (1024 * 1024), 3)
+    
+    if memory_sample:
+        tracemalloc.start()
+        try:
+            for item in inputs[:memory_sample]:
+                func(item)
+            result["peak_memory_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+    
+    return result
+
+
+# Einzelne Methoden des HyaluronPenDetector, die auf Texten arbeiten
+TEXT_METHODS = [
+    "detect_hyaluron_pen_content", "find_hyaluron_keywords", "scan_text", "extract_prices",
+    "extract_phones", "extract_emails", "extract_locations", "calculate_commercial_score"
+]
+
+
+def run_benchmark_suite(record_counts, website_sizes_kb, seed=42, memory_sample=1000, workers=None):
+    """
+    Führt alle Benchmarks auf einem synthetischen Korpus aus
+    
+    Args:
+        record_counts: Liste von Korpusgrößen (Anzahl der Profile)
+        website_sizes_kb: Liste von Größen für Website-Texte in KB
+        seed: Seed für den Korpus
+        memory_sample: Anzahl der Datensätze für die Speichermessung
+        workers: Optional, Anzahl der Worker-Prozesse für analyze_profiles_batch
+        
+    Returns:
+        Dictionary mit Metadaten und Messergebnissen (JSON-serialisierbar)
+    """
+    detector = HyaluronPenDetector()
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "seed": seed,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "detector_version": detector.version
+        },
+        "corpus": {},
+        "websites": {}
+    }
+    
+    for count in record_counts:
+        logger.info(f"Erzeuge Korpus mit {count} Profilen")
+        profiles = list(generate_corpus(count, seed))
+        texts = [detector.combine_profile_text(profile_data) for profile_data in profiles]
+        posts = [{"post_text": profile_data["post_text"]} for profile_data in profiles]
+        text_bytes = sum(len(text.encode("utf-8")) for text in texts)
+        
+        results = {}
+        for method in TEXT_METHODS:
+            logger.info(f"Messe {method} ({count} Profile)")
+            results[method] = measure(getattr(detector, method), texts, text_bytes, memory_sample)
+        
+        logger.info(f"Messe analyze_post ({count} Profile)")
+        results["analyze_post"] = measure(detector.analyze_post, posts, memory_sample=memory_sample)
+        
+        logger.info(f"Messe analyze_profile ({count} Profile)")
+        results["analyze_profile"] = measure(detector.analyze_profile, profiles, text_bytes, memory_sample)
+        
+        # Ende-zu-Ende über den DetectionManager (ohne Cache, damit jede Analyse gemessen wird)
+        logger.info(f"Messe DetectionManager.analyze_profiles_batch ({count} Profile)")
+        manager = DetectionManager(use_cache=False)
+        batch = measure(
+            lambda batch_profiles: manager.analyze_profiles_batch(batch_profiles, workers=workers),
+            [profiles],
+            text_bytes,
+            memory_sample=0
+        )
+        batch["records"] = count
+        batch["records_per_second"] = round(count / batch["total_seconds"], 1) if batch["total_seconds"] else None
+        for key in ("p50_ms", "p99_ms", "max_ms"):
+            batch.pop(key)
+        results["DetectionManager.analyze_profiles_batch"] = batch
+        
+        report["corpus"][str(count)] = {"text_bytes": text_bytes, "results": results}
+    
+    rng = random.Random(seed)
+    for size_kb in website_sizes_kb:
+        logger.info(f"Messe Website-Text mit {size_kb} KB")
+        text = generate_website_text(size_kb * 1024, rng)
+        text_bytes = len(text.encode("utf-8"))
+        repeat = max(1, min(20, 2048 // max(size_kb, 1)))
+        
+        results = {}
+        for method in TEXT_METHODS:
+            results[method] = measure(getattr(detector, method), [text] * repeat, text_bytes * repeat, memory_sample=1)
+        results["analyze_profile"] = measure(
+            detector.analyze_profile, [{"description": text}] * repeat, text_bytes * repeat, memory_sample=1
+        )
+        
+        report["websites"][f"{size_kb}KB"] = {"text_bytes": text_bytes, "repeat": repeat, "results": results}
+    
+    return report
+
+
+def print_report(report):
+    """Gibt die Ergebnisse der Benchmark-Suite als Tabelle aus"""
+    header = f"{'Methode':<42} {'Datensätze/s':>14} {'p50 (ms)':>10} {'p99 (ms)':>10} {'MB/s':>8} {'Speicher (KB)':>14}"
+    
+    for section in ("corpus", "websites"):
+        for size, entry in report[section].items():
+            label = f"{size} Profile" if section == "corpus" else f"Website-Text {size}"
+            print(f"\n=== {label} ({entry['text_bytes'] / 1024:.0f} KB Text) ===")
+            print(header)
+            for method, row in entry["results"].items():
+                print(f"{method:<42} {row.get('records_per_second') or '-':>14} {row.get('p50_ms', '-'):>10} "
+                      f"{row.get('p99_ms', '-'):>10} {row.get('mb_per_second', '-'):>8} {row.get('peak_memory_kb', '-'):>14}")
+
+
+def main():
+    """Hauptfunktion für die Kommandozeilenausführung"""
+    parser = argparse.ArgumentParser(description="IRI® Legal Agent - Benchmark der Erkennungsalgorithmen")
+    
+    parser.add_argument("--mode", choices=["scanner", "suite"], default="scanner",
+                        help="scanner: bisherige Methoden vs. TextScanner, suite: alle Methoden auf einem synthetischen Korpus")
+    parser.add_argument("--records", nargs="+", type=int, default=[1000],
+                        help="Korpusgrößen (Anzahl der Profile) für die Benchmark-Suite, z.B. 1000 100000 1000000")
+    parser.add_argument("--website-sizes", nargs="+", type=int, default=[1, 10, 100, 1024],
+                        help="Größen der Website-Texte in KB für die Benchmark-Suite")
+    parser.add_argument("--memory-sample", type=int, default=1000,
+                        help="Anzahl der Datensätze für die Speichermessung (0 deaktiviert sie)")
+    parser.add_argument("--workers", type=int,
+                        help="Worker-Prozesse für analyze_profiles_batch (Standard: Anzahl der CPU-Kerne)")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="JSON-Datei für die Ergebnisse der Benchmark-Suite")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[50, 100, 250, 500],
+                        help="Größen der synthetischen Website-Texte in KB")
+    parser.add_argument("--input-dir",
+                        help="Verzeichnis mit gespeicherten Website-Texten statt synthetischer Texte")
+    parser.add_argument("--urls", nargs="+",
+                        help="URLs, die über den WebsiteScraper geladen und gemessen werden")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Wiederholungen pro Messung")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="Seed für die synthetischen Texte")
+    
+    args = parser.parse_args()
+    
+    if args.mode == "suite":
+        report = run_benchmark_suite(args.records, args.website_sizes, seed=args.seed,
+                                     memory_sample=args.memory_sample, workers=args.workers)
+        
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        
+        print_report(report)
+        print(f"\nErgebnisse gespeichert: {os.path.abspath(args.output)}")
+        return
+    
+    if args.input_dir:
+        texts = load_website_texts(args.input_dir)
+    elif args.urls:
+        texts = fetch_website_texts(args.urls)
+    else:
+        rng = random.Random(args.seed)
+        texts = [generate_website_text(size * 1024, rng) for size in args.sizes]
+    
+    detector = HyaluronPenDetector()
+    
+    print("Preise/Telefon/E-Mail: bisherige Methoden vs. TextScanner")
+    print(f"{'Größe (KB)':>12} {'bisher (ms)':>12} {'Scanner (ms)':>13} {'Faktor':>8} {'Preise':>14}")
+    for row in benchmark_text_scanner(detector, texts, repeat=args.repeat):
+        print(f"{row['size_kb']:>12} {row['legacy_ms']:>12} {row['scanner_ms']:>13} {row['speedup']:>8} "
+              f"{row['legacy_prices']:>6} -> {row['scanner_prices']:<6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# detection_rules.py - Versionierte Erkennungsregeln für IRI® Legal Agent
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+
+from language_id import DEFAULT_LANGUAGE, SUPPORTED_LANGUAGES
+
+logger = logging.getLogger("detection_rules")
+
+# Mindestabstand in Sekunden zwischen zwei Prüfungen der aktiven Regelversion in der Datenbank
+RULES_REFRESH_INTERVAL = float(os.getenv("DETECTION_RULES_REFRESH_INTERVAL", "30"))
+
+# Versionsnummer der eingebauten Standardregeln (gespeicherte Regelsätze beginnen bei 1)
+DEFAULT_RULES_VERSION = 0
+
+# Eingebaute Standardregeln, solange kein Regelsatz in der Datenbank aktiv ist
+DEFAULT_RULES = {
+    # Schlüsselwörter für Hyaluron Pen Angebote
+    "keywords": [
+        "hyaluron pen", "hyaluronpen", "hyaluron-pen", "hyaluronstift", "hyaluron stift",
+        "hyaluronpistole", "hyaluron pistole", "needlefreefiller", "needle free filler",
+        "lippenaufspritzen", "lippen aufspritzen", "lippenunterspritzung", "lippen unterspritzung",
+        "faltenaufspritzen", "falten aufspritzen", "lippenvergrößerung", "lippen vergrößerung",
+        "lippenaufbau", "lippen aufbau", "lippenkorrektur", "lippen korrektur",
+        "hyaluronsäurepen", "hyaluronsäure pen", "hyaluronsäure-pen"
+    ],
+    
+    # Zusätzliche Schlüsselwörter je erkannter Sprache (die allgemeinen Schlüsselwörter gelten immer)
+    "language_keywords": {
+        "en": [
+            "hyaluronic pen", "hyaluronic acid pen", "hyaluron pen treatment", "needle free lip filler",
+            "needle-free filler", "needleless filler", "lip filler", "lip fillers", "lip injections",
+            "lip augmentation", "lip plumping"
+        ],
+        "tr": [
+            "hyaluron kalem", "hyalüron kalem", "hyaluronik asit kalemi", "iğnesiz dolgu",
+            "iğnesiz dudak dolgusu", "dudak dolgusu", "dudak büyütme"
+        ],
+        "ru": [
+            "гиалуроновая ручка", "гиалурон пен", "гиалуроновый пен", "безыгольный филлер",
+            "безыгольное увеличение губ", "увеличение губ", "филлер для губ", "контурная пластика губ"
+        ],
+        "ar": [
+            "قلم الهيالورونيك", "قلم هيالورونيك", "قلم الهيالورون", "فيلر بدون إبر", "فيلر الشفايف",
+            "فيلر الشفاه", "تكبير الشفايف", "تكبير الشفاه", "حقن الشفاه"
+        ]
+    },
+    
+    # Wörter, die auf kommerzielle Angebote hindeuten
+    "commercial_indicators": [
+        "angebot", "preis", "kosten", "termin", "vereinbaren", "buchen", "buchung",
+        "behandlung", "behandlungen", "studio", "salon", "kosmetik", "kosmetikstudio",
+        "beauty", "beautysalon", "schönheit", "schönheitssalon", "rabatt", "sparen",
+        "aktion", "sonderangebot", "gutschein", "geschenkgutschein", "jetzt", "neu",
+        "vorher", "nachher", "ergebnis", "ergebnisse", "vorher-nachher", "beratung"
+    ],
+    
+    # Preismuster für extract_prices
+    "price_patterns": [
+        r'(\d+)[.,]?(\d{2})?\s*€',  # 79€, 79.00€, 79,00€
+        r'(\d+)[.,]?(\d{2})?\s*Euro',  # 79 Euro, 79.00 Euro
+        r'€\s*(\d+)[.,]?(\d{2})?',  # € 79, € 79.00
+        r'Euro\s*(\d+)[.,]?(\d{2})?',  # Euro 79
+        r'ab\s*(\d+)[.,]?(\d{2})?\s*€',  # ab 79€
+        r'ab\s*(\d+)[.,]?(\d{2})?\s*Euro',  # ab 79 Euro
+        r'nur\s*(\d+)[.,]?(\d{2})?\s*€',  # nur 79€
+        r'nur\s*(\d+)[.,]?(\d{2})?\s*Euro',  # nur 79 Euro
+        r'(\d+)[.,]?(\d{2})?\s*EUR',  # 79 EUR
+    ],
+    
+    # Gewichte für den Risiko-Score von Profilen
+    "profile_weights": {
+        "hyaluron": 0.5,  # Grundwert für Hyaluron Pen Erwähnung
+        "repeat_hit": 0.05,  # Zuschlag je weiterer Keyword-Erwähnung
+        "repeat_hit_max": 0.1,  # Maximaler Zuschlag für wiederholte Erwähnungen
+        "price": 0.2,  # Preisangaben erhöhen das Risiko
+        "contact": 0.1,  # Kontaktdaten erhöhen das Risiko
+        "commercial": 0.2  # Gewichtung des kommerziellen Scores
+    },
+    
+    # Gewichte für den Risiko-Score von Posts
+    "post_weights": {
+        "hyaluron": 0.6,
+        "repeat_hit": 0.05,
+        "repeat_hit_max": 0.1,
+        "price": 0.2,
+        "commercial": 0.2
+    },
+    
+    # Ab diesem Risiko-Score (0-100) gilt ein Profil als verdächtig
+    "suspicious_threshold": 50.0
+}
+
+
+def _validate_terms(rules, name):
+    """Prüft eine Wortliste und entfernt leere Einträge und Duplikate (Reihenfolge bleibt erhalten)"""
+    terms = rules[name]
+    if isinstance(terms, str) or not isinstance(terms, (list, tuple)):
+        raise ValueError(f"'{name}' muss eine Liste von Zeichenketten sein")
+    
+    cleaned = []
+    for term in terms:
+        if not isinstance(term, str):
+            raise ValueError(f"'{name}' enthält keinen Text: {term!r}")
+        term = term.strip().lower()
+        if term and term not in cleaned:
+            cleaned.append(term)
+    
+    if not cleaned:
+        raise ValueError(f"'{name}' darf nicht leer sein")
+    return cleaned
+
+
+def _validate_language_keywords(rules):
+    """Prüft die sprachspezifischen Schlüsselwörter (Sprachcode -> Liste, leere Listen sind erlaubt)"""
+    language_keywords = rules["language_keywords"]
+    if not isinstance(language_keywords, dict):
+        raise ValueError("'language_keywords' muss ein Dictionary Sprachcode -> Liste sein")
+    
+    validated = {}
+    for language, terms in language_keywords.items():
+        if language not in SUPPORTED_LANGUAGES or language == DEFAULT_LANGUAGE:
+            supported = ", ".join(code for code in SUPPORTED_LANGUAGES if code != DEFAULT_LANGUAGE)
+            raise ValueError(f"Sprache {language!r} in 'language_keywords' nicht unterstützt (möglich: {supported})")
+        validated[language] = _validate_terms({language: terms}, language) if terms else []
+    return validated
+
+
+def _validate_weights(rules, name):
+    """Prüft Gewichte; fehlende Gewichte werden aus den Standardregeln übernommen"""
+    weights = rules[name]
+    if not isinstance(weights, dict):
+        raise ValueError(f"'{name}' muss ein Dictionary sein")
+    
+    unknown = set(weights) - set(DEFAULT_RULES[name])
+    if unknown:
+        raise ValueError(f"Unbekannte Gewichte in '{name}': {', '.join(sorted(unknown))}")
+    
+    merged = dict(DEFAULT_RULES[name])
+    for key, value in weights.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise ValueError(f"Gewicht '{name}.{key}' muss eine nicht-negative Zahl sein")
+        merged[key] = float(value)
+    return merged
+
+
+def validate_rules(rules):
+    """
+    Prüft einen Regelsatz und ergänzt fehlende Einträge aus den Standardregeln
+    
+    Args:
+        rules: Dictionary mit keywords, language_keywords, commercial_indicators, price_patterns, profile_weights,
+               post_weights und suspicious_threshold (einzelne Einträge dürfen fehlen)
+               
+    Returns:
+        Vollständiger, normalisierter Regelsatz (neues Dictionary)
+        
+    Raises:
+        ValueError: Wenn ein Eintrag unbekannt oder ungültig ist
+    """
+    if not isinstance(rules, dict):
+        raise ValueError("Regelsatz muss ein Dictionary sein")
+    
+    unknown = set(rules) - set(DEFAULT_RULES)
+    if unknown:
+        raise ValueError(f"Unbekannte Regeln: {', '.join(sorted(unknown))}")
+    
+    rules = {**DEFAULT_RULES, **rules}
+    
+    patterns = rules["price_patterns"]
+    if isinstance(patterns, str) or not isinstance(patterns, (list, tuple)) or not patterns:
+        raise ValueError("'price_patterns' muss eine nicht-leere Liste regulärer Ausdrücke sein")
+    for pattern in patterns:
+        try:
+            re.compile(pattern)
+        except (re.error, TypeError) as e:
+            raise ValueError(f"Ungültiges Preismuster {pattern!r}: {e}")
+    
+    threshold = rules["suspicious_threshold"]
+    if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or not 0 <= threshold <= 100:
+        raise ValueError("'suspicious_threshold' muss eine Zahl zwischen 0 und 100 sein")
+    
+    return {
+        "keywords": _validate_terms(rules, "keywords"),
+        "language_keywords": _validate_language_keywords(rules),
+        "commercial_indicators": _validate_terms(rules, "commercial_indicators"),
+        "price_patterns": list(patterns),
+        "profile_weights": _validate_weights(rules, "profile_weights"),
+        "post_weights": _validate_weights(rules, "post_weights"),
+        "suspicious_threshold": float(threshold)
+    }
+
+
+def rules_fingerprint(rules):
+    """
+    Berechnet einen Hash über den Inhalt eines Regelsatzes
+    
+    Args:
+        rules: Normalisierter Regelsatz (siehe validate_rules)
+        
+    Returns:
+        Hex-String (16 Zeichen)
+    """
+    serialized = json.dumps(rules, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(serialized.encode("utf-8")).hexdigest()[:16]
+
+
+class RuleSetProvider:
+    """Hält den kompilierten Regelsatz eines Prozesses und tauscht ihn bei einer neuen aktiven Version aus
+    
+    Die aktive Version wird höchstens alle refresh_interval Sekunden mit einer einzelnen Abfrage
+    geprüft. Nur wenn sie sich geändert hat, wird der Regelsatz geladen und einmalig kompiliert;
+    der Austausch ist eine einzelne Referenzzuweisung, laufende Analysen behalten ihren Regelsatz.
+    Schlägt das Laden fehl, bleibt der bisherige Regelsatz aktiv.
+    """
+    
+    def __init__(self, compiler, db_manager=None, refresh_interval=None):
+        """
+        Initialisiert den RuleSetProvider
+        
+        Args:
+            compiler: Funktion (Regelsatz, Version) -> kompilierter Regelsatz mit Attribut 'version'
+            db_manager: Optional, ein DatabaseManager-Objekt (ohne Datenbank gelten die Standardregeln)
+            refresh_interval: Optional, Sekunden zwischen zwei Versionsprüfungen (Standard: RULES_REFRESH_INTERVAL)
+        """
+        self._compiler = compiler
+        self.db_manager = db_manager
+        self.refresh_interval = RULES_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        
+        self._current = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+    
+    def get(self):
+        """
+        Gibt den aktuellen kompilierten Regelsatz zurück
+        
+        Returns:
+            Kompilierter Regelsatz
+        """
+        current = self._current
+        if current is None or time.monotonic() >= self._next_check:
+            return self.refresh()
+        return current
+    
+    def refresh(self, force=False):
+        """
+        Prüft die aktive Version in der Datenbank und kompiliert den Regelsatz bei einer Änderung neu
+        
+        Args:
+            force: Optional, ob unabhängig vom Prüfintervall geprüft wird
+            
+        Returns:
+            Kompilierter Regelsatz
+        """
+        # Prüft bereits ein anderer Thread, wird der bisherige Regelsatz weiterverwendet
+        if not self._lock.acquire(blocking=self._current is None or force):
+            return self._current
+        
+        try:
+            if not force and self._current is not None and time.monotonic() < self._next_check:
+                return self._current
+            self._next_check = time.monotonic() + self.refresh_interval
+            
+            version = self.db_manager.get_active_rule_set_version() if self.db_manager else DEFAULT_RULES_VERSION
+            if version is None:
+                # Datenbank nicht erreichbar: bisherige Regeln behalten
+                return self._current or self._install(DEFAULT_RULES, DEFAULT_RULES_VERSION)
+            
+            if self._current is not None and self._current.version == version:
+                return self._current
+            
+            if version == DEFAULT_RULES_VERSION:
+                return self._install(DEFAULT_RULES, DEFAULT_RULES_VERSION)
+            
+            stored = self.db_manager.get_active_rule_set()
+            if stored is None:
+                return self._current or self._install(DEFAULT_RULES, DEFAULT_RULES_VERSION)
+            
+            try:
+                return self._install(validate_rules(stored["rules"]), stored["version"])
+            except ValueError as e:
+                logger.error(f"Regelsatz Version {stored['version']} ist ungültig und wird ignoriert: {e}")
+                return self._current or self._install(DEFAULT_RULES, DEFAULT_RULES_VERSION)
+        finally:
+            self._lock.release()
+    
+    def _install(self, rules, version):
+        """Kompiliert einen Regelsatz und macht ihn mit einer Zuweisung zum aktuellen Regelsatz"""
+        compiled = self._compiler(rules, version)
+        self._current = compiled
+        logger.info(f"Erkennungsregeln Version {version} aktiv")
+        return compiled
+    
+    def publish(self, rules, description=None):
+        """
+        Prüft, speichert und aktiviert einen neuen Regelsatz
+        
+        Andere Prozesse übernehmen ihn spätestens nach refresh_interval Sekunden.
+        
+        Args:
+            rules: Regelsatz (fehlende Einträge werden aus den Standardregeln übernommen)
+            description: Optional, Beschreibung der Änderung
+            
+        Returns:
+            Kompilierter Regelsatz der neuen Version
+            
+        Raises:
+            ValueError: Wenn der Regelsatz ungültig ist
+            RuntimeError: Wenn keine Datenbank verfügbar ist oder das Speichern fehlschlägt
+        """
+        # Vor dem Speichern prüfen, damit kein Regelsatz aktiv wird, den andere Prozesse nicht laden können
+        rules = validate_rules(rules)
+        
+        if not self.db_manager:
+            raise RuntimeError("Regelsätze können nur mit einer Datenbank gespeichert werden")
+        
+        version = self.db_manager.store_rule_set(rules, description)
+        if version is None:
+            raise RuntimeError("Regelsatz konnte nicht gespeichert werden")
+        
+        with self._lock:
+            self._next_check = time.monotonic() + self.refresh_interval
+            return self._install(rules, version)
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# fuzzy_keywords.py - Fehlertolerante Erkennung verschleierter Schlüsselwörter für IRI® Legal Agent
+
+import os
+import re
+import unicodedata
+
+# Maximale Editierdistanz für verschleierte Schlüsselwörter
+FUZZY_MAX_DISTANCE = int(os.getenv("FUZZY_MAX_DISTANCE", "2"))
+
+# Teile mehrteiliger Schlüsselwörter bis zu dieser Länge ("pen", "gel", "stift") müssen exakt übereinstimmen
+EXACT_PART_LENGTH = 5
+
+# Länge des Präfixes, für das Löschvarianten berechnet werden (SymSpell)
+PREFIX_LENGTH = 7
+
+# Maximale Anzahl zwischengespeicherter Suchbegriffe
+LOOKUP_CACHE_SIZE = 100000
+
+# Unsichtbare Zeichen, die zum Verschleiern in Wörter eingefügt werden
+ZERO_WIDTH_CHARACTERS = "\u00ad\u180e\u200b\u200c\u200d\u2060\ufeff"
+
+# Kyrillische und griechische Zeichen, die wie lateinische Buchstaben aussehen
+HOMOGLYPHS = {
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h", "о": "o", "р": "p",
+    "с": "c", "т": "t", "у": "y", "х": "x", "і": "i", "ј": "j", "ѕ": "s", "ԁ": "d", "ɩ": "l",
+    "α": "a", "β": "b", "ε": "e", "η": "n", "ι": "i", "κ": "k", "ν": "v", "ο": "o", "ρ": "p",
+    "τ": "t", "υ": "u", "χ": "x", "ү": "y", "ı": "i"
+}
+
+# Ziffern und Symbole, die Buchstaben ersetzen (nur in Tokens, die auch Buchstaben enthalten)
+LEET_CHARACTERS = {
+    "0": "o", "1": "l", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b", "@": "a", "$": "s", "|": "l"
+}
+
+# Satzzeichen am Rand eines Tokens (werden vor dem Lesen von Ziffern als Buchstaben entfernt)
+EDGE_PUNCTUATION = ".,;:!?()[]{}\"'«»„“”‚‘’…#*"
+
+# Umlaute werden umschrieben, damit "lippenvergroesserung" und "lippenvergrößerung" gleich sind
+TRANSLITERATIONS = {"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"}
+
+_HOMOGLYPH_TABLE = str.maketrans({**HOMOGLYPHS, **TRANSLITERATIONS, **{char: None for char in ZERO_WIDTH_CHARACTERS}})
+_LEET_TABLE = str.maketrans(LEET_CHARACTERS)
+_TOKEN_PATTERN = re.compile(r'\S+')
+_NON_LETTER_PATTERN = re.compile(r'[^a-z]+')
+_LETTER_PATTERN = re.compile(r'[^\W\d_]')
+
+
+def normalize_token(token):
+    """
+    Normalisiert ein Token für den fehlertoleranten Vergleich
+    
+    NFKC (Vollbreite, Ligaturen), Kleinschreibung, unsichtbare Zeichen entfernen,
+    Homoglyphen und Umlaute umschreiben, Ziffern/Symbole in gemischten Tokens als
+    Buchstaben lesen und alle übrigen Zeichen (Punkte, Bindestriche, Emojis) entfernen.
+    
+    Args:
+        token: Das Token
+        
+    Returns:
+        Normalisiertes Token (nur a-z), leer für reine Zahlen oder Satzzeichen
+    """
+    token = unicodedata.normalize("NFKC", token).lower().translate(_HOMOGLYPH_TABLE).strip(EDGE_PUNCTUATION)
+    if _LETTER_PATTERN.search(token):
+        token = token.translate(_LEET_TABLE)
+    return _NON_LETTER_PATTERN.sub("", unicodedata.normalize("NFKD", token))
+
+
+def edit_distance(first, second, max_distance):
+    """
+    Berechnet die Damerau-Levenshtein-Distanz (optimal string alignment) mit Abbruchschranke
+    
+    Args:
+        first: Erste Zeichenkette
+        second: Zweite Zeichenkette
+        max_distance: Maximale relevante Distanz
+        
+    Returns:
+        Distanz oder max_distance + 1, wenn sie größer als max_distance ist
+    """
+    if abs(len(first) - len(second)) > max_distance:
+        return max_distance + 1
+    
+    previous_previous = None
+    previous = list(range(len(second) + 1))
+    
+    for i in range(1, len(first) + 1):
+        current = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = 0 if first[i - 1] == second[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
+
+
+class FuzzyKeywordMatcher:
+    """Findet verschleierte Schlüsselwörter über ein vorberechnetes Löschverzeichnis (SymSpell)
+    
+    Für jedes Schlüsselwort (ohne Leer- und Trennzeichen) werden alle Varianten seines Präfixes
+    mit bis zu max_distance gelöschten Zeichen indiziert. Ein Suchbegriff erzeugt höchstens
+    sum(C(PREFIX_LENGTH, k)) Löschvarianten (29 bei Distanz 2), unabhängig von der Anzahl der
+    Schlüsselwörter; nur die so gefundenen Kandidaten werden mit der Editierdistanz geprüft.
+    """
+    
+    def __init__(self, keywords, max_distance=None, prefix_length=PREFIX_LENGTH):
+        """
+        Baut das Löschverzeichnis einmalig auf
+        
+        Args:
+            keywords: Liste von Schlüsselwörtern (mehrteilige Schlüsselwörter werden zusammengeschrieben verglichen)
+            max_distance: Optional, maximale Editierdistanz (Standard: FUZZY_MAX_DISTANCE)
+            prefix_length: Länge des indizierten Präfixes
+        """
+        self.max_distance = FUZZY_MAX_DISTANCE if max_distance is None else max_distance
+        self.prefix_length = prefix_length
+        
+        # Zusammengeschriebene Form -> erstes Schlüsselwort dieser Form (z.B. 'hyaluronpen' -> 'hyaluron pen')
+        self._keywords = {}
+        self._parts = {}
+        self._deletes = {}
+        self.max_words = 1
+        
+        for keyword in keywords:
+            parts = tuple(part for part in (normalize_token(word) for word in keyword.split()) if part)
+            collapsed = "".join(parts)
+            if not collapsed:
+                continue
+            
+            # Schreibweisen derselben Form ("hyaluronstift", "hyaluron stift") teilen sich die feinste Zerlegung
+            if collapsed in self._keywords:
+                if len(parts) > len(self._parts[collapsed]):
+                    self._parts[collapsed] = parts
+                continue
+            
+            self._keywords[collapsed] = keyword.lower()
+            self._parts[collapsed] = parts
+            self.max_words = max(self.max_words, len(keyword.split()))
+            for delete in self._prefix_deletes(collapsed, self.distance_for(collapsed)):
+                self._deletes.setdefault(delete, []).append(collapsed)
+        
+        self.min_length = min((len(collapsed) for collapsed in self._keywords), default=0)
+        self.max_length = max((len(collapsed) for collapsed in self._keywords), default=0)
+        self._cache = {}
+        self._token_cache = {}
+    
+    def distance_for(self, collapsed):
+        """Erlaubte Distanz je nach Länge (kurze Wörter nur exakt, damit keine Alltagswörter treffen)"""
+        if len(collapsed) < 5:
+            return 0
+        if len(collapsed) < 10:
+            return min(1, self.max_distance)
+        return self.max_distance
+    
+    def part_distance_for(self, part):
+        """Erlaubte Distanz für einen Teil eines mehrteiligen Schlüsselworts (kurze Teile nur exakt)"""
+        if len(part) <= EXACT_PART_LENGTH:
+            return 0
+        return self.distance_for(part)
+    
+    def _split_distance(self, term, parts):
+        """
+        Verteilt einen Suchbegriff auf die Teile eines mehrteiligen Schlüsselworts
+        
+        Jeder Teil hat sein eigenes Budget, damit z.B. "hyaluron gel" nicht als
+        "hyaluron pen" gilt, nur weil die Distanz über das ganze Wort gering ist.
+        
+        Args:
+            term: Normalisierter Suchbegriff (oder sein noch nicht zugeordneter Rest)
+            parts: Normalisierte Teile des Schlüsselworts
+            
+        Returns:
+            Kleinste Summe der Distanzen oder None, wenn ein Teil sein Budget überschreitet
+        """
+        part = parts[0]
+        allowed = self.part_distance_for(part)
+        
+        if len(parts) == 1:
+            distance = edit_distance(term, part, allowed)
+            return distance if distance <= allowed else None
+        
+        best = None
+        for split in range(max(0, len(part) - allowed), min(len(term), len(part) + allowed) + 1):
+            distance = edit_distance(term[:split], part, allowed)
+            if distance > allowed:
+                continue
+            rest = self._split_distance(term[split:], parts[1:])
+            if rest is not None and (best is None or distance + rest < best):
+                best = distance + rest
+        
+        return best
+    
+    def _prefix_deletes(self, word, distance):
+        """Alle Varianten des Präfixes mit bis zu distance gelöschten Zeichen"""
+        deletes = {word[:self.prefix_length]}
+        frontier = deletes
+        for _ in range(distance):
+            frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+            deletes |= frontier
+        return deletes
+    
+    def lookup(self, term):
+        """
+        Sucht das nächstgelegene Schlüsselwort zu einem normalisierten Suchbegriff
+        
+        Args:
+            term: Normalisierter Suchbegriff (siehe normalize_token)
+            
+        Returns:
+            Tupel (Schlüsselwort, Distanz) oder None
+        """
+        if not self.min_length - self.max_distance <= len(term) <= self.max_length + self.max_distance:
+            return None
+        
+        cached = self._cache.get(term, False)
+        if cached is not False:
+            return cached
+        
+        best = None
+        if term in self._keywords:
+            best = (self._keywords[term], 0)
+        else:
+            candidates = set()
+            for delete in self._prefix_deletes(term, self.max_distance):
+                candidates.update(self._deletes.get(delete, ()))
+            
+            for collapsed in candidates:
+                allowed = self.distance_for(collapsed)
+                distance = edit_distance(term, collapsed, allowed)
+                if distance > allowed or (best is not None and distance >= best[1]):
+                    continue
+                
+                # Mehrteilige Schlüsselwörter: Budget pro Teil statt über das ganze Wort
+                if len(self._parts[collapsed]) > 1:
+                    split_distance = self._split_distance(term, self._parts[collapsed])
+                    if split_distance is None or split_distance > allowed:
+                        continue
+                best = (self._keywords[collapsed], distance)
+        
+        if len(self._cache) >= LOOKUP_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[term] = best
+        return best
+    
+    def _normalized_tokens(self, text):
+        """Normalisierte Tokens mit Start- und Endposition; einzeln geschriebene Buchstaben werden zusammengefasst"""
+        token_cache = self._token_cache
+        if len(token_cache) >= LOOKUP_CACHE_SIZE:
+            token_cache.clear()
+        
+        tokens = []
+        for match in _TOKEN_PATTERN.finditer(text):
+            token = match.group(0)
+            normalized = token_cache.get(token)
+            if normalized is None:
+                normalized = token_cache[token] = normalize_token(token)
+            if not normalized:
+                continue
+            
+            # "h y a l u r o n" -> "hyaluron"
+            if len(normalized) == 1 and tokens and tokens[-1][3]:
+                start, _, previous, _ = tokens[-1]
+                tokens[-1] = (start, match.end(), previous + normalized, True)
+            else:
+                tokens.append((match.start(), match.end(), normalized, len(normalized) == 1))
+        
+        return [(start, end, normalized) for start, end, normalized, _ in tokens]
+    
+    def find_all(self, text, exclude_spans=()):
+        """
+        Findet verschleierte Schlüsselwörter in einem Text
+        
+        Args:
+            text: Der zu durchsuchende Text
+            exclude_spans: Optional, Liste von (Start, Ende) bereits exakt gefundener Treffer;
+                           Fundstellen, die diese überlappen, werden nicht gemeldet
+                           
+        Returns:
+            Dictionary mit Schlüsselwort -> Liste der Startpositionen
+        """
+        matches = {}
+        if not text or not self._keywords:
+            return matches
+        
+        tokens = self._normalized_tokens(text)
+        min_length = self.min_length - self.max_distance
+        max_length = self.max_length + self.max_distance
+        
+        for index, (start, _, _) in enumerate(tokens):
+            term = ""
+            for window_end in range(index, min(index + self.max_words, len(tokens))):
+                term += tokens[window_end][2]
+                if len(term) > max_length:
+                    break
+                if len(term) < min_length:
+                    continue
+                
+                found = self.lookup(term)
+                if found is None:
+                    continue
+                
+                end = tokens[window_end][1]
+                if any(start < span_end and span_start < end for span_start, span_end in exclude_spans):
+                    continue
+                
+                positions = matches.setdefault(found[0], [])
+                if start not in positions:
+                    positions.append(start)
+        
+        return matches
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# gazetteer.py - Ortsverzeichnis (Gemeinden und Postleitzahlen) für IRI® Legal Agent
+
+import os
+import re
+import csv
+import logging
+import threading
+import unicodedata
+
+logger = logging.getLogger("gazetteer")
+
+# Pfad zum vollständigen Gemeindeverzeichnis (GeoNames-Postleitzahlen DE.txt oder CSV mit name;plz)
+GAZETTEER_FILE = os.getenv("GAZETTEER_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gemeinden.csv"))
+
+# Fallback, falls kein Gemeindeverzeichnis vorhanden ist: die größten Städte inkl. amtlicher Langnamen
+DEFAULT_MUNICIPALITIES = [
+    "Berlin", "Hamburg", "München", "Köln", "Frankfurt", "Stuttgart", "Düsseldorf",
+    "Leipzig", "Dresden", "Hannover", "Nürnberg", "Dortmund", "Essen", "Bremen",
+    "Duisburg", "Bochum", "Wuppertal", "Bielefeld", "Bonn", "Münster", "Karlsruhe",
+    "Mannheim", "Augsburg", "Wiesbaden", "Gelsenkirchen", "Mönchengladbach", "Braunschweig",
+    "Kiel", "Chemnitz", "Aachen", "Halle", "Magdeburg", "Freiburg", "Krefeld", "Lübeck",
+    "Oberhausen", "Erfurt", "Mainz", "Rostock", "Kassel", "Hagen", "Hamm", "Saarbrücken",
+    "Mülheim", "Potsdam", "Ludwigshafen", "Oldenburg", "Leverkusen", "Osnabrück", "Solingen",
+    "Frankfurt am Main", "Frankfurt (Oder)", "Halle (Saale)", "Mülheim an der Ruhr",
+    "Freiburg im Breisgau", "Ludwigshafen am Rhein", "Offenbach am Main", "Brandenburg an der Havel"
+]
+
+# Postleitzahl: genau fünf Ziffern
+PLZ_PATTERN = re.compile(r'^\d{5}$')
+
+# Zerlegt Ortsnamen so, wie word_tokenize es mit Fließtext tut (Bindestrich-Namen bleiben zusammen)
+NAME_TOKEN_PATTERN = re.compile(r"\w+(?:[-'.]\w+)*|[^\w\s]")
+
+# Mehrdeutige Gemeindenamen ("ohne Nadel", "Wangen", "Hof") werden beim Laden abgeleitet: einteilige Namen,
+# die zugleich gebräuchliche Wörter sind (Stopwörter, Wortfrequenzliste) oder weniger Buchstaben als
+# AMBIGUOUS_NAME_LENGTH haben. Sie zählen nur nach einer Präposition ("in Hof") oder neben einer Postleitzahl.
+AMBIGUOUS_NAME_LENGTH = 5
+
+# Großstädte aus DEFAULT_MUNICIPALITIES gelten als eindeutig, auch wenn sie in der Wortfrequenzliste stehen,
+# außer diese, deren Name zugleich ein gebräuchliches Wort ist ("Essen und Trinken")
+COMMON_WORD_CITIES = {"essen", "halle"}
+
+# Präpositionen, nach denen ein mehrdeutiger Name als Ort gilt
+LOCATION_PREPOSITIONS = {"in", "aus", "bei", "nach", "nahe", "von", "um", "im", "raum"}
+
+# Markierung für Endzustände im Trie
+_TERMINAL = ""
+
+
+def normalize_token(token):
+    """
+    Normalisiert ein Token für den Vergleich mit dem Ortsverzeichnis
+    
+    Args:
+        token: Das Token (z.B. aus word_tokenize)
+        
+    Returns:
+        Normalisiertes Token in Kleinbuchstaben, "" für Punkte; andere Satzzeichen bleiben erhalten,
+        damit mehrteilige Namen nicht über Kommas oder Klammern hinweg erkannt werden
+    """
+    token = unicodedata.normalize("NFC", token).lower().strip()
+    if any(char.isalnum() for char in token):
+        return token.strip(".")
+    return "" if token in ("", ".") else token
+
+
+class Gazetteer:
+    """Ortsverzeichnis mit Hash-Lookup für einteilige Namen, Trie für mehrteilige Namen und PLZ-Index"""
+    
+    def __init__(self, municipalities=None, postal_codes=None, common_words=None):
+        """
+        Initialisiert das Ortsverzeichnis
+        
+        Args:
+            municipalities: Optional, Liste von Gemeindenamen
+            postal_codes: Optional, Dictionary PLZ -> Gemeindename
+            common_words: Optional, gebräuchliche Wörter (z.B. Stopwörter und Wortfrequenzliste),
+                          aus denen mehrdeutige Gemeindenamen abgeleitet werden
+        """
+        self._single = {}
+        self._trie = {}
+        self._plz = {}
+        self._ambiguous = set()
+        
+        self.common_words = {normalize_token(word) for word in common_words or ()}
+        self._major_cities = {normalize_token(name) for name in DEFAULT_MUNICIPALITIES}
+        
+        for name in municipalities or []:
+            self.add_municipality(name)
+        
+        for plz, name in (postal_codes or {}).items():
+            self.add_postal_code(plz, name)
+    
+    def __len__(self):
+        return len(self._single) + self._count_trie_entries(self._trie)
+    
+    def _count_trie_entries(self, node):
+        """Zählt die Endzustände im Trie"""
+        count = 1 if _TERMINAL in node else 0
+        for key, child in node.items():
+            if key != _TERMINAL:
+                count += self._count_trie_entries(child)
+        return count
+    
+    def add_municipality(self, name):
+        """
+        Fügt einen Gemeindenamen hinzu
+        
+        Args:
+            name: Amtlicher Name der Gemeinde (z.B. "Frankfurt am Main")
+        """
+        name = name.strip()
+        tokens = [token for token in (normalize_token(t) for t in NAME_TOKEN_PATTERN.findall(name)) if token]
+        
+        if not tokens:
+            return
+        
+        if len(tokens) == 1:
+            self._single.setdefault(tokens[0], name)
+            if self.is_ambiguous(tokens[0]):
+                self._ambiguous.add(tokens[0])
+            return
+        
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(_TERMINAL, name)
+    
+    def is_ambiguous(self, word):
+        """
+        Prüft, ob ein einteiliger Gemeindename auch ein gebräuchliches Wort sein kann
+        
+        Args:
+            word: Normalisierter Name
+            
+        Returns:
+            True, wenn der Name nur mit Präposition oder Postleitzahl als Ort gilt
+        """
+        if word in self._major_cities:
+            return word in COMMON_WORD_CITIES
+        return word in self.common_words or len(word) < AMBIGUOUS_NAME_LENGTH
+    
+    def add_postal_code(self, plz, name):
+        """
+        Ordnet einer Postleitzahl eine Gemeinde zu
+        
+        Args:
+            plz: Fünfstellige Postleitzahl
+            name: Name der Gemeinde
+        """
+        plz = plz.strip()
+        if PLZ_PATTERN.match(plz):
+            self._plz.setdefault(plz, name.strip())
+    
+    def lookup(self, name):
+        """
+        Sucht einen einzelnen Orts- oder PLZ-Eintrag
+        
+        Args:
+            name: Ortsname oder Postleitzahl
+            
+        Returns:
+            Amtlicher Name der Gemeinde oder None
+        """
+        matches = self.match_tokens(NAME_TOKEN_PATTERN.findall(name), require_context=False)
+        return matches[0] if matches else None
+    
+    def match_tokens(self, tokens, require_context=True):
+        """
+        Findet Orte in einer Tokenfolge in einem Durchlauf (längster Treffer gewinnt)
+        
+        Klammern gehören zum Namen ("Frankfurt (Oder)" wird nur mit Klammern erkannt), Kommas und
+        andere Satzzeichen beenden einen mehrteiligen Namen.
+        
+        Args:
+            tokens: Liste von Tokens (z.B. AnalysisContext.tokens_lower)
+            require_context: Optional, ob mehrdeutige Namen (siehe is_ambiguous) eine Präposition oder
+                             Postleitzahl als Nachbarn brauchen
+            
+        Returns:
+            Liste von gefundenen Gemeindenamen in Textreihenfolge
+        """
+        words = [token for token in (normalize_token(t) for t in tokens) if token]
+        locations = []
+        
+        position = 0
+        count = len(words)
+        
+        while position < count:
+            word = words[position]
+            
+            # Mehrteilige Namen über den Trie, längster Treffer gewinnt
+            match = None
+            match_end = position
+            node = self._trie.get(word)
+            end = position + 1
+            while node is not None:
+                if _TERMINAL in node:
+                    match = node[_TERMINAL]
+                    match_end = end
+                if end >= count:
+                    break
+                node = node.get(words[end])
+                end += 1
+            
+            if match is not None:
+                locations.append(match)
+                position = match_end
+                continue
+            
+            # Einteilige Namen und Postleitzahlen per Hash-Lookup
+            if word in self._single:
+                if not require_context or word not in self._ambiguous or self._has_location_context(words, position):
+                    locations.append(self._single[word])
+            elif PLZ_PATTERN.match(word) and word in self._plz:
+                locations.append(self._plz[word])
+            
+            position += 1
+        
+        return locations
+    
+    def _has_location_context(self, words, position):
+        """Ob vor dem Wort eine Präposition oder daneben eine Postleitzahl steht"""
+        previous = words[position - 1] if position > 0 else ""
+        following = words[position + 1] if position + 1 < len(words) else ""
+        return previous in LOCATION_PREPOSITIONS or bool(PLZ_PATTERN.match(previous)) or bool(PLZ_PATTERN.match(following))
+    
+    @classmethod
+    def from_file(cls, filepath, common_words=None):
+        """
+        Lädt ein Ortsverzeichnis aus einer Datei
+        
+        Unterstützt den GeoNames-Postleitzahlen-Export (DE.txt, tabulatorgetrennt) sowie
+        CSV-Dateien mit den Spalten "name" und "plz" (Trennzeichen ";" oder ",").
+        
+        Args:
+            filepath: Pfad zur Datei
+            common_words: Optional, gebräuchliche Wörter für die Ableitung mehrdeutiger Namen
+            
+        Returns:
+            Gazetteer-Objekt
+        """
+        gazetteer = cls(common_words=common_words)
+        
+        with open(filepath, "r", encoding="utf-8") as f:
+            first_line = f.readline()
+            f.seek(0)
+            
+            if "\t" in first_line:
+                # GeoNames: Ländercode, PLZ, Ortsname, ...
+                for row in csv.reader(f, delimiter="\t"):
+                    if len(row) < 3:
+                        continue
+                    gazetteer.add_municipality(row[2])
+                    gazetteer.add_postal_code(row[1], row[2])
+            else:
+                delimiter = ";" if ";" in first_line else ","
+                for row in csv.DictReader(f, delimiter=delimiter):
+                    name = (row.get("name") or "").strip()
+                    if not name:
+                        continue
+                    gazetteer.add_municipality(name)
+                    for plz in (row.get("plz") or "").replace(",", " ").split():
+                        gazetteer.add_postal_code(plz, name)
+        
+        # Die Kurznamen der Großstädte sollen auch mit vollständigem Verzeichnis erkannt werden
+        for name in DEFAULT_MUNICIPALITIES:
+            gazetteer.add_municipality(name)
+        
+        return gazetteer
+
+
+_shared_gazetteer = None
+_shared_lock = threading.Lock()
+
+
+def get_gazetteer(common_words=None):
+    """
+    Gibt das prozessweit geteilte Ortsverzeichnis zurück (wird beim ersten Aufruf geladen)
+    
+    Args:
+        common_words: Optional, gebräuchliche Wörter für die Ableitung mehrdeutiger Namen (nur beim ersten Aufruf)
+    
+    Returns:
+        Gazetteer-Objekt
+    """
+    global _shared_gazetteer
+    
+    if _shared_gazetteer is None:
+        with _shared_lock:
+            if _shared_gazetteer is None:
+                if os.path.exists(GAZETTEER_FILE):
+                    _shared_gazetteer = Gazetteer.from_file(GAZETTEER_FILE, common_words)
+                    logger.info(f"Ortsverzeichnis mit {len(_shared_gazetteer)} Orten aus {GAZETTEER_FILE} geladen")
+                else:
+                    _shared_gazetteer = Gazetteer(DEFAULT_MUNICIPALITIES, common_words=common_words)
+                    logger.warning(f"Ortsverzeichnis {GAZETTEER_FILE} nicht gefunden, verwende {len(DEFAULT_MUNICIPALITIES)} Standardorte")
+    
+    return _shared_gazetteer
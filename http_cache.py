@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+# http_cache.py - Inhaltsadressierter HTTP-Cache mit bedingten Anfragen für die Scraper von IRI® Legal Agent
+
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+import requests
+from requests.models import PreparedRequest
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger("http_cache")
+
+# Cache ein- oder ausschalten
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Verzeichnis für Index und komprimierte Inhalte
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.abspath("http_cache"))
+
+# Obergrenze für die komprimierten Inhalte in Bytes (älteste Einträge werden zuerst verdrängt)
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Sekunden, die eine gespeicherte Seite ohne Rückfrage beim Server verwendet wird; danach wird sie
+# mit If-None-Match/If-Modified-Since nachgeprüft. Profile ändern sich oft, Studio-Websites selten.
+DEFAULT_PLATFORM_TTLS = {
+    "Instagram": 6 * 3600,
+    "Facebook": 6 * 3600,
+    "TikTok": 6 * 3600,
+    "Google": 24 * 3600,
+    "Website": 7 * 24 * 3600
+}
+
+# TTL für Plattformen, die nicht konfiguriert sind
+DEFAULT_TTL = 24 * 3600
+
+# Abweichende TTLs in Sekunden, z.B. "Instagram=3600,Website=0" (0 = immer nachprüfen)
+HTTP_CACHE_TTLS = os.getenv("HTTP_CACHE_TTLS", "")
+
+# Nach einer Verdrängung ist der Cache höchstens zu diesem Anteil gefüllt, damit nicht jede Speicherung verdrängt
+EVICTION_TARGET = 0.9
+
+
+def parse_ttls(value):
+    """
+    Liest TTLs im Format "Plattform=Sekunden", durch Kommas getrennt
+    
+    Args:
+        value: Zeichenkette, z.B. aus HTTP_CACHE_TTLS
+        
+    Returns:
+        Dictionary Plattform -> TTL in Sekunden
+        
+    Raises:
+        ValueError: Wenn ein Eintrag nicht dem Format entspricht oder die TTL negativ ist
+    """
+    ttls = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        
+        platform, separator, ttl = entry.partition("=")
+        if not separator or not platform.strip():
+            raise ValueError(f"Ungültige TTL {entry.strip()!r}, erwartet Plattform=Sekunden")
+        
+        ttl = float(ttl)
+        if ttl < 0:
+            raise ValueError(f"TTL für {platform.strip()} darf nicht negativ sein")
+        ttls[platform.strip()] = ttl
+    
+    return ttls
+
+
+def request_url(url, params=None):
+    """Vollständige URL einer Anfrage einschließlich Parametern (so, wie requests sie sendet)"""
+    prepared = PreparedRequest()
+    prepared.prepare_url(url, params)
+    return prepared.url
+
+
+class CacheEntry:
+    """Index-Eintrag einer URL: Verweis auf den Inhalt und die Validatoren des Servers"""
+    
+    __slots__ = ("key", "url", "body_hash", "content_type", "encoding", "etag", "last_modified", "stored_at")
+    
+    def __init__(self, key, url, body_hash, content_type, encoding, etag, last_modified, stored_at):
+        self.key = key
+        self.url = url
+        self.body_hash = body_hash
+        self.content_type = content_type
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+    
+    def is_fresh(self, ttl):
+        """True, wenn der Eintrag jünger als ttl Sekunden ist (oder zuletzt vor weniger als ttl nachgeprüft wurde)"""
+        return time.time() - self.stored_at < ttl
+    
+    def conditional_headers(self):
+        """If-None-Match/If-Modified-Since für die Nachprüfung beim Server"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+    
+    def headers(self):
+        """Gespeicherte Antwort-Header"""
+        headers = CaseInsensitiveDict()
+        if self.content_type:
+            headers["Content-Type"] = self.content_type
+        if self.etag:
+            headers["ETag"] = self.etag
+        if self.last_modified:
+            headers["Last-Modified"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """Persistenter HTTP-Cache für GET-Anfragen
+    
+    Inhalte werden zlib-komprimiert unter ihrem SHA-256 abgelegt (objects/ab/abcdef…), sodass identische
+    Seiten unter verschiedenen URLs nur einmal gespeichert werden. Ein SQLite-Index ordnet jeder URL
+    ihren Inhalt sowie ETag und Last-Modified zu. Innerhalb der TTL ihrer Plattform wird eine Seite
+    ohne Anfrage geliefert; danach fragt der Scraper bedingt an und verwendet bei 304 die lokale Kopie.
+    Überschreiten die Inhalte max_bytes, werden die am längsten nicht verwendeten Einträge verdrängt.
+    """
+    
+    def __init__(self, directory=None, max_bytes=None, platform_ttls=None):
+        """
+        Initialisiert den HttpCache und legt das Verzeichnis bei Bedarf an
+        
+        Args:
+            directory: Optional, Cache-Verzeichnis (Standard: HTTP_CACHE_DIR)
+            max_bytes: Optional, Obergrenze der komprimierten Inhalte (Standard: HTTP_CACHE_MAX_BYTES)
+            platform_ttls: Optional, Dictionary Plattform -> TTL in Sekunden; nicht angegebene Plattformen
+                           verwenden DEFAULT_PLATFORM_TTLS
+        """
+        self.directory = directory or HTTP_CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else HTTP_CACHE_MAX_BYTES
+        self.platform_ttls = dict(DEFAULT_PLATFORM_TTLS)
+        self.platform_ttls.update(platform_ttls or {})
+        self._lock = threading.Lock()
+        
+        # Statistiken
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        os.makedirs(os.path.join(self.directory, "objects"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), timeout=30, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, url TEXT, body_hash TEXT, content_type TEXT, encoding TEXT, "
+                "etag TEXT, last_modified TEXT, stored_at REAL, last_used REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_body_hash ON entries (body_hash)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS objects (hash TEXT PRIMARY KEY, size INTEGER)")
+    
+    def ttl_for(self, platform):
+        """TTL in Sekunden für eine Plattform"""
+        return self.platform_ttls.get(platform, DEFAULT_TTL)
+    
+    def _key(self, url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+    
+    def _object_path(self, body_hash):
+        return os.path.join(self.directory, "objects", body_hash[:2], body_hash)
+    
+    def lookup(self, url):
+        """
+        Sucht den Eintrag einer URL
+        
+        Args:
+            url: Vollständige URL (siehe request_url)
+            
+        Returns:
+            CacheEntry-Objekt oder None, wenn die URL nicht (mehr) im Cache ist
+        """
+        key = self._key(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT key, url, body_hash, content_type, encoding, etag, last_modified, stored_at "
+                "FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        
+        if row is None or not os.path.exists(self._object_path(row[2])):
+            self.misses += 1
+            return None
+        return CacheEntry(*row)
+    
+    def read_body(self, entry):
+        """
+        Liest den unkomprimierten Inhalt eines Eintrags und vermerkt die Verwendung
+        
+        Args:
+            entry: CacheEntry-Objekt
+            
+        Returns:
+            Inhalt als Bytes oder None, wenn die Datei inzwischen verdrängt wurde
+        """
+        try:
+            with open(self._object_path(entry.body_hash), "rb") as f:
+                body = zlib.decompress(f.read())
+        except (OSError, zlib.error) as e:
+            logger.warning(f"Cache-Inhalt für {entry.url} nicht lesbar: {e}")
+            return None
+        
+        with self._lock, self._db:
+            self._db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), entry.key))
+        return body
+    
+    def response(self, entry, revalidated=False):
+        """
+        Baut aus einem Eintrag ein requests.Response-Objekt, wie es make_request zurückgibt
+        
+        Args:
+            entry: CacheEntry-Objekt
+            revalidated: True, wenn der Server den Eintrag gerade mit 304 bestätigt hat
+            
+        Returns:
+            Response-Objekt mit Status 200 oder None, wenn der Inhalt nicht mehr verfügbar ist
+        """
+        body = self.read_body(entry)
+        if body is None:
+            return None
+        
+        if revalidated:
+            self.revalidations += 1
+        else:
+            self.hits += 1
+        
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry.url
+        response.headers = entry.headers()
+        response.encoding = entry.encoding
+        response._content = body
+        response.from_cache = True
+        return response
+    
+    def text(self, entry, revalidated=False):
+        """
+        Liest den Inhalt eines Eintrags als Text (für die asynchrone Engine)
+        
+        Args:
+            entry: CacheEntry-Objekt
+            revalidated: True, wenn der Server den Eintrag gerade mit 304 bestätigt hat
+            
+        Returns:
+            Dekodierter Inhalt oder None, wenn der Inhalt nicht mehr verfügbar ist
+        """
+        response = self.response(entry, revalidated)
+        return response.text if response is not None else None
+    
+    def store(self, url, headers, body, encoding=None):
+        """
+        Speichert eine erfolgreiche Antwort (nur, wenn der Server das Speichern nicht untersagt)
+        
+        Args:
+            url: Vollständige URL der Anfrage (siehe request_url)
+            headers: Antwort-Header
+            body: Unkomprimierter Inhalt als Bytes
+            encoding: Optional, Zeichenkodierung der Antwort
+            
+        Returns:
+            CacheEntry-Objekt oder None, wenn die Antwort nicht gespeichert wurde
+        """
+        if "no-store" in (headers.get("Cache-Control") or "").lower():
+            return None
+        
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._object_path(body_hash)
+        
+        # Gleiche Inhalte liegen schon unter ihrem Hash, es muss nur der Index aktualisiert werden
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressed = zlib.compress(body, 6)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(temp_path, path)
+        else:
+            compressed = None
+        
+        now = time.time()
+        entry = CacheEntry(
+            self._key(url), url, body_hash, headers.get("Content-Type"), encoding,
+            headers.get("ETag"), headers.get("Last-Modified"), now
+        )
+        
+        with self._lock:
+            with self._db:
+                previous = self._db.execute("SELECT body_hash FROM entries WHERE key = ?", (entry.key,)).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (entry.key, url, body_hash, entry.content_type, encoding, entry.etag, entry.last_modified, now, now)
+                )
+                if compressed is not None:
+                    self._db.execute("INSERT OR REPLACE INTO objects VALUES (?, ?)", (body_hash, len(compressed)))
+                if previous and previous[0] != body_hash:
+                    self._release(previous[0])
+            self._evict()
+        
+        return entry
+    
+    def refresh(self, entry, headers):
+        """
+        Vermerkt eine Bestätigung des Servers (304): die TTL beginnt neu, neue Validatoren werden übernommen
+        
+        Args:
+            entry: CacheEntry-Objekt
+            headers: Header der 304-Antwort
+        """
+        entry.stored_at = time.time()
+        entry.etag = headers.get("ETag") or entry.etag
+        entry.last_modified = headers.get("Last-Modified") or entry.last_modified
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE entries SET stored_at = ?, etag = ?, last_modified = ? WHERE key = ?",
+                (entry.stored_at, entry.etag, entry.last_modified, entry.key)
+            )
+    
+    def _release(self, body_hash):
+        """
+        Löscht einen Inhalt, auf den kein Eintrag mehr verweist (muss unter self._lock aufgerufen werden)
+        
+        Returns:
+            Freigegebene Bytes (0, wenn der Inhalt noch verwendet wird)
+        """
+        if self._db.execute("SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone():
+            return 0
+        row = self._db.execute("SELECT size FROM objects WHERE hash = ?", (body_hash,)).fetchone()
+        self._db.execute("DELETE FROM objects WHERE hash = ?", (body_hash,))
+        try:
+            os.remove(self._object_path(body_hash))
+        except FileNotFoundError:
+            pass
+        return row[0] if row else 0
+    
+    def size(self):
+        """Größe der komprimierten Inhalte in Bytes"""
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+    
+    def _evict(self):
+        """Verdrängt die am längsten nicht verwendeten Einträge, bis der Cache unter max_bytes liegt"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        target = self.max_bytes * EVICTION_TARGET
+        with self._db:
+            rows = self._db.execute("SELECT key, body_hash FROM entries ORDER BY last_used").fetchall()
+            for key, body_hash in rows:
+                if total <= target:
+                    break
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= self._release(body_hash)
+                self.evictions += 1
+        
+        logger.info(f"HTTP-Cache verkleinert auf {total / 1024 / 1024:.1f} MB")
+    
+    def clear(self):
+        """Löscht alle Einträge und Inhalte"""
+        with self._lock:
+            with self._db:
+                hashes = [row[0] for row in self._db.execute("SELECT hash FROM objects")]
+                self._db.execute("DELETE FROM entries")
+                self._db.execute("DELETE FROM objects")
+            for body_hash in hashes:
+                try:
+                    os.remove(self._object_path(body_hash))
+                except FileNotFoundError:
+                    pass
+    
+    def get_statistics(self):
+        """
+        Gibt Kennzahlen des Caches zurück
+        
+        Returns:
+            Dictionary mit Einträgen, Größe, Treffern, Nachprüfungen, Fehlschlägen und Verdrängungen
+        """
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
+# Ein Cache pro Prozess, damit nicht jeder Scraper eine eigene Datenbankverbindung öffnet
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """
+    Gibt den gemeinsam genutzten HttpCache zurück (TTLs aus HTTP_CACHE_TTLS)
+    
+    Returns:
+        HttpCache-Objekt oder None, wenn der Cache mit HTTP_CACHE_ENABLED abgeschaltet ist
+    """
+    global _http_cache
+    
+    if not HTTP_CACHE_ENABLED:
+        return None
+    
+    if _http_cache is None:
+        with _http_cache_lock:
+            if _http_cache is None:
+                _http_cache = HttpCache(platform_ttls=parse_ttls(HTTP_CACHE_TTLS))
+    
+    return _http_cache
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# image_hashing.py - Wahrnehmungsbasierte Hashes (dHash) und Hamming-Index für Screenshots des IRI® Legal Agent
+
+import os
+import logging
+import threading
+import numpy as np
+from itertools import combinations
+from PIL import Image, UnidentifiedImageError
+
+logger = logging.getLogger("image_hashing")
+
+# Maximale Hamming-Distanz (von 64 Bit), bis zu der zwei Screenshots als visuell gleich gelten
+PHASH_MAX_DISTANCE = int(os.getenv("PHASH_MAX_DISTANCE", "6"))
+
+# Kantenlänge des dHash (hash_size * hash_size Bit)
+HASH_SIZE = 8
+
+
+def dhash(image, hash_size=HASH_SIZE):
+    """
+    Berechnet den Differenz-Hash (dHash) eines Bildes
+    
+    Das Bild wird in Graustufen auf (hash_size + 1) x hash_size Pixel verkleinert; jedes Bit
+    gibt an, ob ein Pixel heller ist als sein rechter Nachbar. Skalierung, Kompression und
+    leichte Farbänderungen verändern den Hash kaum.
+    
+    Args:
+        image: PIL-Bild
+        hash_size: Kantenlänge des Hashes
+        
+    Returns:
+        Hash als Integer mit hash_size * hash_size Bit
+    """
+    pixels = np.asarray(
+        image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS),
+        dtype=np.int16
+    )
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hash_image_file(image_path, hash_size=HASH_SIZE):
+    """
+    Berechnet den dHash einer Bilddatei
+    
+    Args:
+        image_path: Pfad zum Bild
+        hash_size: Kantenlänge des Hashes
+        
+    Returns:
+        Hash als Hex-String oder None, wenn die Datei kein lesbares Bild ist
+    """
+    try:
+        with Image.open(image_path) as image:
+            return format(dhash(image, hash_size), f"0{hash_size * hash_size // 4}x")
+    except (OSError, UnidentifiedImageError) as e:
+        logger.debug(f"Kein Hash für {image_path}: {e}")
+        return None
+
+
+def hamming_distance(hash_a, hash_b):
+    """
+    Berechnet die Anzahl unterschiedlicher Bits zweier Hashes
+    
+    Args:
+        hash_a: Hash als Integer
+        hash_b: Hash als Integer
+        
+    Returns:
+        Hamming-Distanz
+    """
+    return bin(hash_a ^ hash_b).count("1")
+
+
+class MultiIndexHashTable:
+    """Multi-Index-Hashing für Ähnlichkeitssuche über Hamming-Distanzen
+    
+    Der 64-Bit-Hash wird in vier 16-Bit-Abschnitte zerlegt. Unterscheiden sich zwei Hashes
+    in höchstens r Bits, stimmt nach dem Schubfachprinzip mindestens ein Abschnitt bis auf
+    r // 4 Bits überein; nur diese Kandidaten werden vollständig verglichen.
+    """
+    
+    def __init__(self, hash_bits=HASH_SIZE * HASH_SIZE, chunks=4):
+        """
+        Initialisiert eine leere Tabelle
+        
+        Args:
+            hash_bits: Länge der Hashes in Bit
+            chunks: Anzahl der Abschnitte (hash_bits muss durch chunks teilbar sein)
+        """
+        self.chunks = chunks
+        self.chunk_bits = hash_bits // chunks
+        self._mask = (1 << self.chunk_bits) - 1
+        self._tables = [{} for _ in range(chunks)]
+        self._values = {}
+        self._size = 0
+    
+    def __len__(self):
+        return self._size
+    
+    def _split(self, hash_value):
+        """Zerlegt einen Hash in seine Abschnitte"""
+        return [(hash_value >> (index * self.chunk_bits)) & self._mask for index in range(self.chunks)]
+    
+    def _neighbors(self, chunk, radius):
+        """Alle Abschnittswerte mit höchstens radius abweichenden Bits"""
+        neighbors = [chunk]
+        for distance in range(1, radius + 1):
+            for bits in combinations(range(self.chunk_bits), distance):
+                flipped = chunk
+                for bit in bits:
+                    flipped ^= 1 << bit
+                neighbors.append(flipped)
+        return neighbors
+    
+    def add(self, hash_value, value):
+        """
+        Fügt einen Hash mit zugehörigem Wert hinzu
+        
+        Args:
+            hash_value: Hash als Integer
+            value: Beliebiger Wert (z.B. Screenshot-Informationen)
+        """
+        self._size += 1
+        
+        if hash_value in self._values:
+            self._values[hash_value].append(value)
+            return
+        
+        self._values[hash_value] = [value]
+        for table, chunk in zip(self._tables, self._split(hash_value)):
+            table.setdefault(chunk, []).append(hash_value)
+    
+    def search(self, hash_value, max_distance):
+        """
+        Findet alle Werte, deren Hash höchstens max_distance Bits abweicht
+        
+        Args:
+            hash_value: Hash als Integer
+            max_distance: Maximale Hamming-Distanz
+            
+        Returns:
+            Liste von Tupeln (Distanz, Wert), nach Distanz sortiert
+        """
+        radius = max_distance // self.chunks
+        candidates = set()
+        
+        for table, chunk in zip(self._tables, self._split(hash_value)):
+            for neighbor in self._neighbors(chunk, radius):
+                candidates.update(table.get(neighbor, ()))
+        
+        matches = []
+        for candidate in candidates:
+            distance = hamming_distance(hash_value, candidate)
+            if distance <= max_distance:
+                matches.extend((distance, value) for value in self._values[candidate])
+        
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+
+class ScreenshotHashIndex:
+    """Index aller Screenshot-Hashes für Ähnlichkeitssuche und Vergleich mit der letzten Aufnahme einer URL"""
+    
+    def __init__(self, max_distance=None):
+        """
+        Initialisiert den ScreenshotHashIndex
+        
+        Args:
+            max_distance: Optional, maximale Hamming-Distanz für visuell gleiche Screenshots
+        """
+        self.max_distance = PHASH_MAX_DISTANCE if max_distance is None else max_distance
+        self._table = MultiIndexHashTable()
+        self._last_by_url = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._table)
+    
+    def add(self, perceptual_hash, screenshot_info):
+        """
+        Fügt einen Screenshot hinzu
+        
+        Args:
+            perceptual_hash: Hash als Hex-String
+            screenshot_info: Dictionary mit mindestens 'url_captured' (sowie z.B. 'id', 'profile_id')
+        """
+        with self._lock:
+            self._table.add(int(perceptual_hash, 16), screenshot_info)
+            if screenshot_info.get("url_captured"):
+                self._last_by_url[screenshot_info["url_captured"]] = perceptual_hash
+    
+    def find_similar(self, perceptual_hash, max_distance=None):
+        """
+        Sucht visuell gleiche Screenshots
+        
+        Args:
+            perceptual_hash: Hash als Hex-String
+            max_distance: Optional, maximale Hamming-Distanz
+            
+        Returns:
+            Liste von Tupeln (Distanz, Screenshot-Informationen), nach Distanz sortiert
+        """
+        max_distance = self.max_distance if max_distance is None else max_distance
+        with self._lock:
+            return self._table.search(int(perceptual_hash, 16), max_distance)
+    
+    def is_unchanged(self, url, perceptual_hash):
+        """
+        Prüft, ob eine URL seit der letzten Aufnahme visuell unverändert ist
+        
+        Args:
+            url: Die aufgenommene URL
+            perceptual_hash: Hash der neuen Aufnahme als Hex-String
+            
+        Returns:
+            True, wenn die letzte Aufnahme der URL höchstens max_distance Bits abweicht
+        """
+        with self._lock:
+            last_hash = self._last_by_url.get(url)
+        if last_hash is None:
+            return False
+        return hamming_distance(int(last_hash, 16), int(perceptual_hash, 16)) <= self.max_distance
+    
+    @classmethod
+    def from_database(cls, db_manager, **kwargs):
+        """
+        Baut den Index aus den gespeicherten Screenshot-Hashes auf
+        
+        Args:
+            db_manager: Ein DatabaseManager-Objekt
+            **kwargs: Parameter für den Konstruktor
+            
+        Returns:
+            ScreenshotHashIndex-Objekt
+        """
+        index = cls(**kwargs)
+        
+        for screenshot_info in db_manager.iter_screenshot_hashes():
+            index.add(screenshot_info.pop("perceptual_hash"), screenshot_info)
+        
+        logger.info(f"Screenshot-Index mit {len(index)} Hashes aus der Datenbank aufgebaut")
+        return index
+
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+
+def get_screenshot_index(db_manager=None):
+    """
+    Gibt den prozessweit geteilten Screenshot-Index zurück (wird beim ersten Aufruf geladen)
+    
+    Args:
+        db_manager: Optional, ein DatabaseManager-Objekt, aus dem der Index aufgebaut wird
+        
+    Returns:
+        ScreenshotHashIndex-Objekt
+    """
+    global _shared_index
+    
+    if _shared_index is None:
+        with _shared_lock:
+            if _shared_index is None:
+                if db_manager:
+                    _shared_index = ScreenshotHashIndex.from_database(db_manager)
+                else:
+                    _shared_index = ScreenshotHashIndex()
+    
+    return _shared_index
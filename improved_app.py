@@ -17,6 +17,8 @@ from integrated_scraper import IntegratedScraper
 from detection_algorithms import DetectionManager
 from screenshot_service import AdvancedScreenshotService
 from expanded_search_terms import get_all_search_terms, get_search_terms_by_category
+from pipeline_metrics import get_registry
+from risk_model import CONFIRMED_REPORT_STATUS, label_for
 
 # Konfiguriere Logging
 logging.basicConfig(
@@ -310,6 +312,130 @@ def api_profiles():
             'message': "Platform parameter is required"
         })
 
+@app.route('/api/duplicate_clusters')
+def api_duplicate_clusters():
+    """API-Endpunkt zum Abrufen von Gruppen kopierter Anzeigentexte"""
+    min_size = int(request.args.get('min_size', 2))
+    limit = int(request.args.get('limit', 100))
+    
+    duplicate_index = integrated_scraper.detection_manager.duplicate_index
+    clusters = duplicate_index.get_clusters(min_size=min_size)
+    
+    return jsonify({
+        'success': True,
+        'statistics': duplicate_index.get_statistics(),
+        'clusters': clusters[:limit]
+    })
+
+@app.route('/api/operators')
+def api_operators():
+    """API-Endpunkt zum Abrufen von Betreibern mit mehreren Profilen (gemeinsame E-Mail, Telefonnummer oder Domain)"""
+    min_size = int(request.args.get('min_size', 2))
+    limit = int(request.args.get('limit', 100))
+    profile_key = request.args.get('profile_key')
+    
+    operator_index = integrated_scraper.detection_manager.operator_index
+    
+    if profile_key:
+        return jsonify({
+            'success': True,
+            'operator': operator_index.operator_of(profile_key),
+            'profiles': operator_index.members_of(profile_key)
+        })
+    
+    return jsonify({
+        'success': True,
+        'statistics': operator_index.get_statistics(),
+        'operators': operator_index.get_clusters(min_size=min_size)[:limit]
+    })
+
+@app.route('/api/metrics', methods=['GET', 'POST'])
+def api_metrics():
+    """API-Endpunkt zum Abrufen und Steuern der Laufzeitmessung der Erkennungs-Pipeline"""
+    registry = get_registry()
+    
+    if request.method == 'POST':
+        data = request.json or {}
+        
+        if data.get('reset'):
+            registry.reset()
+        if 'enabled' in data:
+            if data['enabled']:
+                registry.enable(profile_every=data.get('profile_every'))
+            else:
+                registry.disable()
+    
+    return jsonify({
+        'success': True,
+        'metrics': registry.snapshot()
+    })
+
+@app.route('/api/rules', methods=['GET', 'POST'])
+def api_rules():
+    """API-Endpunkt zum Abrufen und Veröffentlichen der Erkennungsregeln (Keywords, Indikatoren, Preismuster, Gewichte)"""
+    rule_provider = integrated_scraper.detection_manager.rule_provider
+    
+    if request.method == 'POST':
+        data = request.json or {}
+        
+        try:
+            rule_provider.publish(data.get('rules') or {}, data.get('description'))
+        except (ValueError, RuntimeError) as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            })
+    
+    rules = rule_provider.get()
+    
+    return jsonify({
+        'success': True,
+        'version': rules.version,
+        'fingerprint': rules.fingerprint,
+        'rules': rules.rules,
+        'history': db_manager.get_rule_sets()
+    })
+
+@app.route('/api/rules/<int:version>', methods=['POST'])
+def api_rule_set_active(version):
+    """API-Endpunkt zum Aktivieren oder Deaktivieren einer Regelversion (Rollback)"""
+    data = request.json or {}
+    
+    if not db_manager.set_rule_set_active(version, bool(data.get('active', True))):
+        return jsonify({
+            'success': False,
+            'message': f"Regelsatz Version {version} nicht gefunden"
+        })
+    
+    rules = integrated_scraper.detection_manager.rule_provider.refresh(force=True)
+    
+    return jsonify({
+        'success': True,
+        'version': rules.version,
+        'fingerprint': rules.fingerprint
+    })
+
+@app.route('/api/risk_model', methods=['GET', 'POST'])
+def api_risk_model():
+    """API-Endpunkt zum Abrufen des Risikomodells und Übernehmen gesammelter Rückmeldungen ("flush": true)"""
+    detection = integrated_scraper.detection_manager
+    
+    if detection.risk_model is None:
+        return jsonify({
+            'success': False,
+            'message': "Kein Risikomodell geladen"
+        })
+    
+    if request.method == 'POST' and (request.json or {}).get('flush'):
+        detection.risk_trainer.flush()
+    
+    return jsonify({
+        'success': True,
+        'fingerprint': detection.risk_model.fingerprint,
+        'metadata': detection.risk_model.metadata,
+        'pending_feedback': detection.risk_trainer.pending_count
+    })
+
 @app.route('/api/analyze_url', methods=['POST'])
 def api_analyze_url():
     """API-Endpunkt zum Analysieren einer URL"""
@@ -339,9 +465,10 @@ def api_analyze_url():
 
 @app.route('/api/report_profile', methods=['POST'])
 def api_report_profile():
-    """API-Endpunkt zum Melden eines Profils"""
+    """API-Endpunkt zum Melden eines Profils oder Zurückweisen eines Verdachts ("dismissed": true)"""
     data = request.json
     profile_id = data.get('profile_id')
+    dismissed = bool(data.get('dismissed'))
     
     if not profile_id:
         return jsonify({
@@ -353,7 +480,7 @@ def api_report_profile():
     session = db_manager.get_session()
     
     try:
-        from database_schema import Profile
+        from database_schema import Profile, Report
         
         profile = session.query(Profile).filter_by(id=profile_id).first()
         
@@ -363,15 +490,31 @@ def api_report_profile():
                 'message': f"Profile with ID {profile_id} not found"
             })
         
-        # Markiere das Profil als gemeldet
-        profile.is_reported = True
+        # Bisherige Entscheidung (die jüngste Prüfung zählt)
+        statuses = [status for status, in session.query(Report.status).filter_by(profile_id=profile.id).order_by(Report.report_date, Report.id)]
+        previous_label = label_for(profile.is_reported, statuses)
+        label = 0 if dismissed else 1
+        
+        if dismissed:
+            # Zurückgewiesener Verdacht wird als Prüfung mit Status 'dismissed' festgehalten
+            session.add(Report(profile_id=profile.id, report_type='review', status='dismissed'))
+        else:
+            # Markiere das Profil als gemeldet; die Prüfung hält fest, dass die Bestätigung jünger ist als eine frühere Zurückweisung
+            profile.is_reported = True
+            session.add(Report(profile_id=profile.id, report_type='review', status=CONFIRMED_REPORT_STATUS))
         
         # Speichere die Änderungen
         session.commit()
+        profile_name = profile.profile_name
+        
+        # Die Entscheidung fließt als Trainingsbeispiel in das Risikomodell ein, aber nur, wenn sie sich geändert hat
+        if label != previous_label:
+            for profile_data in db_manager.iter_labeled_profiles(profile_ids=[profile.id]):
+                integrated_scraper.detection_manager.record_feedback(profile_data, label=label)
         
         return jsonify({
             'success': True,
-            'message': f"Profile {profile.profile_name} marked as reported"
+            'message': f"Profile {profile_name} marked as {'dismissed' if dismissed else 'reported'}"
         })
         
     except Exception as e:
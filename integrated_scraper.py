@@ -15,6 +15,8 @@ from platform_scraper import MultiPlatformScraper
 from detection_algorithms import DetectionManager
 from screenshot_service import AdvancedScreenshotService
 from expanded_search_terms import get_all_search_terms
+from pipeline_metrics import get_registry
+from analysis_result import AnalysisResult
 
 # Konfiguriere Logging
 logging.basicConfig(
@@ -67,14 +69,78 @@ class IntegratedScraper:
         # Initialisiere MultiPlatformScraper
         logger.info("Initialisiere MultiPlatformScraper")
         self.platform_scraper = MultiPlatformScraper(self.db_manager)
+        self._async_engine = None
     
-    def run_full_scraping(self, platforms=None, max_terms_per_platform=10):
+    @property
+    def async_engine(self):
+        """Asynchrone Scraping-Engine für den MultiPlatformScraper (wird bei Bedarf angelegt, benötigt aiohttp)"""
+        if self._async_engine is None:
+            from async_scraper import AsyncSearchEngine
+            self._async_engine = AsyncSearchEngine(self.platform_scraper)
+        return self._async_engine
+    
+    def _scrape_and_analyze(self, search_terms, platforms, streaming=False, use_async=False):
+        """
+        Führt die Suche durch, analysiert die Ergebnisse und erstellt Screenshots verdächtiger Profile
+        
+        Args:
+            search_terms: Liste von Suchbegriffen oder None für Standardbegriffe
+            platforms: Liste von Plattformen
+            streaming: Optional, ob Ergebnisse bereits während der Suche analysiert werden
+            use_async: Optional, ob alle Suchen gleichzeitig mit der asynchronen Engine ausgeführt werden
+            
+        Returns:
+            Tupel (Ergebnisse pro Plattform, verdächtige Profile, Screenshots)
+        """
+        search_engine = self.async_engine if use_async else self.platform_scraper
+        
+        if not streaming:
+            results = search_engine.run_search(search_terms=search_terms, platforms=platforms)
+            
+            # Analysiere die Ergebnisse
+            logger.info("Analysiere Scraping-Ergebnisse")
+            suspicious_profiles = self.detection_manager.analyze_scraping_results(results)
+            
+            # Erstelle Screenshots für verdächtige Profile
+            if suspicious_profiles:
+                logger.info(f"Erstelle Screenshots für {len(suspicious_profiles)} verdächtige Profile")
+                screenshots = self.screenshot_service.capture_screenshots_for_suspicious_profiles(suspicious_profiles)
+            else:
+                logger.info("Keine verdächtigen Profile gefunden")
+                screenshots = {}
+            
+            return results, suspicious_profiles, screenshots
+        
+        # Streaming: Analyse und Screenshots beginnen, während die Suche noch läuft
+        results = {platform: [] for platform in platforms}
+        
+        def collect(items):
+            for platform, profile_data in items:
+                results.setdefault(platform, []).append(profile_data)
+                yield platform, profile_data
+        
+        suspicious_profiles = []
+        screenshots = {}
+        
+        items = collect(search_engine.iter_search(search_terms=search_terms, platforms=platforms))
+        for profile_data in self.detection_manager.analyze_scraping_results_stream(items):
+            suspicious_profiles.append(profile_data)
+            screenshots.update(self.screenshot_service.capture_screenshots_for_suspicious_profiles([profile_data]))
+        
+        if not suspicious_profiles:
+            logger.info("Keine verdächtigen Profile gefunden")
+        
+        return results, suspicious_profiles, screenshots
+    
+    def run_full_scraping(self, platforms=None, max_terms_per_platform=10, streaming=False, use_async=False):
         """
         Führt einen vollständigen Scraping-Durchlauf durch
         
         Args:
             platforms: Optional, Liste von Plattformen, die gescrapt werden sollen
             max_terms_per_platform: Optional, maximale Anzahl von Suchbegriffen pro Plattform
+            streaming: Optional, ob Ergebnisse bereits während der Suche analysiert werden
+            use_async: Optional, ob alle Suchen gleichzeitig mit der asynchronen Engine ausgeführt werden
             
         Returns:
             Dictionary mit Ergebnissen
@@ -91,19 +157,7 @@ class IntegratedScraper:
         
         # Führe Scraping durch
         logger.info(f"Starte Scraping auf Plattformen: {', '.join(platforms)}")
-        results = self.platform_scraper.run_search(platforms=platforms)
-        
-        # Analysiere die Ergebnisse
-        logger.info("Analysiere Scraping-Ergebnisse")
-        suspicious_profiles = self.detection_manager.analyze_scraping_results(results)
-        
-        # Erstelle Screenshots für verdächtige Profile
-        if suspicious_profiles:
-            logger.info(f"Erstelle Screenshots für {len(suspicious_profiles)} verdächtige Profile")
-            screenshots = self.screenshot_service.capture_screenshots_for_suspicious_profiles(suspicious_profiles)
-        else:
-            logger.info("Keine verdächtigen Profile gefunden")
-            screenshots = {}
+        results, suspicious_profiles, screenshots = self._scrape_and_analyze(None, platforms, streaming, use_async)
         
         # Berechne Statistiken
         duration = time.time() - start_time
@@ -120,6 +174,8 @@ class IntegratedScraper:
             "screenshots_created": sum(1 for profile_screenshots in screenshots.values() 
                                      for screenshot_type, screenshot in profile_screenshots.items() 
                                      if screenshot is not None),
+            "duplicate_statistics": self.detection_manager.duplicate_index.get_statistics(),
+            "operator_statistics": self.detection_manager.operator_index.get_statistics(),
             "database_statistics": stats
         }
         
@@ -134,13 +190,15 @@ class IntegratedScraper:
             "report": report
         }
     
-    def run_targeted_scraping(self, search_terms, platforms=None):
+    def run_targeted_scraping(self, search_terms, platforms=None, streaming=False, use_async=False):
         """
         Führt gezieltes Scraping mit bestimmten Suchbegriffen durch
         
         Args:
             search_terms: Liste von Suchbegriffen
             platforms: Optional, Liste von Plattformen, die gescrapt werden sollen
+            streaming: Optional, ob Ergebnisse bereits während der Suche analysiert werden
+            use_async: Optional, ob alle Suchen gleichzeitig mit der asynchronen Engine ausgeführt werden
             
         Returns:
             Dictionary mit Ergebnissen
@@ -154,19 +212,7 @@ class IntegratedScraper:
         
         # Führe Scraping durch
         logger.info(f"Starte Scraping auf Plattformen: {', '.join(platforms)}")
-        results = self.platform_scraper.run_search(search_terms=search_terms, platforms=platforms)
-        
-        # Analysiere die Ergebnisse
-        logger.info("Analysiere Scraping-Ergebnisse")
-        suspicious_profiles = self.detection_manager.analyze_scraping_results(results)
-        
-        # Erstelle Screenshots für verdächtige Profile
-        if suspicious_profiles:
-            logger.info(f"Erstelle Screenshots für {len(suspicious_profiles)} verdächtige Profile")
-            screenshots = self.screenshot_service.capture_screenshots_for_suspicious_profiles(suspicious_profiles)
-        else:
-            logger.info("Keine verdächtigen Profile gefunden")
-            screenshots = {}
+        results, suspicious_profiles, screenshots = self._scrape_and_analyze(search_terms, platforms, streaming, use_async)
         
         # Berechne Statistiken
         duration = time.time() - start_time
@@ -184,6 +230,8 @@ class IntegratedScraper:
             "screenshots_created": sum(1 for profile_screenshots in screenshots.values() 
                                      for screenshot_type, screenshot in profile_screenshots.items() 
                                      if screenshot is not None),
+            "duplicate_statistics": self.detection_manager.duplicate_index.get_statistics(),
+            "operator_statistics": self.detection_manager.operator_index.get_statistics(),
             "database_statistics": stats
         }
         
@@ -258,11 +306,11 @@ class IntegratedScraper:
                 results[platform].append(profile_data)
                 
                 # Analysiere das Profil
-                analysis = self.detection_manager.hyaluron_detector.analyze_profile(profile_data)
+                analysis = self.detection_manager.analyze_profile(profile_data)
                 profile_data["analysis"] = analysis
                 
                 # Prüfe, ob das Profil verdächtig ist
-                if analysis["risk_score"] >= 50.0:
+                if self.detection_manager.is_suspicious(analysis):
                     suspicious_profiles.append(profile_data)
                     
                     # Erstelle Screenshots
@@ -285,6 +333,8 @@ class IntegratedScraper:
             "screenshots_created": sum(1 for profile_screenshots in screenshots.values() 
                                      for screenshot_type, screenshot in profile_screenshots.items() 
                                      if screenshot is not None),
+            "duplicate_statistics": self.detection_manager.duplicate_index.get_statistics(),
+            "operator_statistics": self.detection_manager.operator_index.get_statistics(),
             "database_statistics": stats
         }
         
@@ -327,11 +377,9 @@ class IntegratedScraper:
             for profile in results["suspicious_profiles"]:
                 profile_copy = profile.copy()
                 
-                # Entferne nicht serialisierbare Objekte
-                if "analysis" in profile_copy and isinstance(profile_copy["analysis"], dict):
-                    # Konvertiere datetime-Objekte zu Strings
-                    if "analysis_date" in profile_copy["analysis"] and not isinstance(profile_copy["analysis"]["analysis_date"], str):
-                        profile_copy["analysis"]["analysis_date"] = profile_copy["analysis"]["analysis_date"].isoformat()
+                # Wandle Analyseergebnisse erst hier in JSON-serialisierbare Dictionaries um
+                if isinstance(profile_copy.get("analysis"), AnalysisResult):
+                    profile_copy["analysis"] = profile_copy["analysis"].to_dict()
                 
                 serializable_results["suspicious_profile_details"].append(profile_copy)
             
@@ -381,6 +429,21 @@ class IntegratedScraper:
                 f.write(f"Erfolgreiche Suchen: {stats.get('successful_searches', 0)}\n")
                 f.write(f"Gemeldete Profile: {stats.get('reported_profiles', 0)}\n\n")
                 
+                if 'duplicate_statistics' in report:
+                    duplicate_stats = report['duplicate_statistics']
+                    f.write("=== Kopierte Anzeigentexte ===\n\n")
+                    f.write(f"Indizierte Texte: {duplicate_stats.get('texts', 0)}\n")
+                    f.write(f"Gruppen kopierter Texte: {duplicate_stats.get('duplicate_clusters', 0)}\n")
+                    f.write(f"Texte in Gruppen: {duplicate_stats.get('duplicated_texts', 0)}\n\n")
+                
+                if 'operator_statistics' in report:
+                    operator_stats = report['operator_statistics']
+                    f.write("=== Betreiber ===\n\n")
+                    f.write(f"Zugeordnete Profile: {operator_stats.get('profiles', 0)}\n")
+                    f.write(f"Betreiber: {operator_stats.get('operators', 0)}\n")
+                    f.write(f"Betreiber mit mehreren Profilen: {operator_stats.get('multi_profile_operators', 0)}\n")
+                    f.write(f"Profile dieser Betreiber: {operator_stats.get('profiles_in_multi_profile_operators', 0)}\n\n")
+                
                 f.write("=== Profile pro Plattform ===\n\n")
                 for platform, count in stats.get('platforms', {}).items():
                     f.write(f"{platform}: {count}\n")
@@ -400,6 +463,12 @@ class IntegratedScraper:
                     if "post_text" in profile and profile["post_text"]:
                         f.write(f"  Post-Text: {profile['post_text'][:100]}...\n")
                     
+                    if profile.get("near_duplicates"):
+                        f.write(f"  Kopierter Text (Cluster: {profile.get('duplicate_cluster')}): {len(profile['near_duplicates'])} ähnliche Texte\n")
+                    
+                    if len(profile.get("operator_profiles", [])) > 1:
+                        f.write(f"  Betreiber ({profile.get('operator_cluster')}): {', '.join(profile['operator_profiles'])}\n")
+                    
                     f.write("\n")
             
             logger.info(f"Bericht generiert: {filename}")
@@ -425,22 +494,34 @@ def main():
                         help="Profil-Links für Profil-Scraping")
     parser.add_argument("--db-url", 
                         help="URL für die Datenbankverbindung")
+    parser.add_argument("--stream", action="store_true",
+                        help="Ergebnisse bereits während der Suche analysieren und Screenshots erstellen")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Alle Suchen gleichzeitig mit der asynchronen Engine (aiohttp) ausführen")
     parser.add_argument("--output", default="scraping_results",
                         help="Präfix für Ausgabedateien")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Laufzeiten der Erkennungs-Pipeline messen und ausgeben")
+    parser.add_argument("--profile-every", type=int, default=None,
+                        help="Jeden N-ten Analyseaufruf mit cProfile aufzeichnen (impliziert --metrics)")
     
     args = parser.parse_args()
     
+    metrics = get_registry()
+    if args.metrics or args.profile_every:
+        metrics.enable(profile_every=args.profile_every)
+    
     # Initialisiere IntegratedScraper
     scraper = IntegratedScraper(db_url=args.db_url)
     
     # Führe Scraping entsprechend dem gewählten Modus durch
     if args.mode == "full":
-        results = scraper.run_full_scraping(platforms=args.platforms)
+        results = scraper.run_full_scraping(platforms=args.platforms, streaming=args.stream, use_async=args.use_async)
     elif args.mode == "targeted":
         if not args.terms:
             logger.error("Für gezieltes Scraping müssen Suchbegriffe angegeben werden")
             return
-        results = scraper.run_targeted_scraping(args.terms, platforms=args.platforms)
+        results = scraper.run_targeted_scraping(args.terms, platforms=args.platforms, streaming=args.stream, use_async=args.use_async)
     elif args.mode == "profile":
         if not args.profiles:
             logger.error("Für Profil-Scraping müssen Profil-Links angegeben werden")
@@ -454,6 +535,14 @@ def main():
     logger.info("Scraping abgeschlossen")
     logger.info(f"JSON-Ergebnisse: {json_file}")
     logger.info(f"Bericht: {report_file}")
+    
+    if metrics.enabled:
+        metrics_file = f"{args.output}_metrics.json"
+        with open(metrics_file, 'w', encoding='utf-8') as f:
+            json.dump(metrics.snapshot(), f, ensure_ascii=False, indent=2)
+        
+        print(metrics.format_table())
+        logger.info(f"Laufzeitmessung: {metrics_file}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# language_id.py - Spracherkennung über Zeichen-Trigramme (Naive Bayes) für IRI® Legal Agent
+
+import os
+import hashlib
+import logging
+import threading
+
+import numpy as np
+
+logger = logging.getLogger("language_id")
+
+# Unterstützte Sprachen (ISO 639-1); für jede gibt es eigene Keywords und Stopwörter
+SUPPORTED_LANGUAGES = ("de", "en", "tr", "ru", "ar")
+
+# Sprache für kurze oder nicht eindeutige Texte
+DEFAULT_LANGUAGE = "de"
+
+# Namen der NLTK-Stopwortlisten je Sprache
+STOPWORD_LANGUAGES = {"de": "german", "en": "english", "tr": "turkish", "ru": "russian", "ar": "arabic"}
+
+# Nur die ersten Wörter eines Textes werden ausgewertet (für die Sprache reichen wenige Sätze)
+LANGUAGE_ID_MAX_WORDS = int(os.getenv("LANGUAGE_ID_MAX_WORDS", "60"))
+
+# Maximale Anzahl zwischengespeicherter Wort-Scores
+WORD_CACHE_SIZE = 100000
+
+# Mindestanzahl bekannter Trigramme, ab der von DEFAULT_LANGUAGE abgewichen wird
+MIN_KNOWN_TRIGRAMS = 5
+
+# Mindestvorsprung (mittlere Log-Wahrscheinlichkeit je Trigramm) einer anderen Sprache vor DEFAULT_LANGUAGE
+MIN_MARGIN = 0.15
+
+# Eingebettete Trainingstexte: Alltagssprache und typische Anzeigentexte je Sprache
+TRAINING_SAMPLES = {
+    "de": [
+        "Ich habe heute noch einen freien Termin, meldet euch gerne per Nachricht oder ruft an.",
+        "Die Behandlung dauert ungefähr eine Stunde und das Ergebnis hält mehrere Monate.",
+        "Jetzt neu in unserem Studio: Lippen aufspritzen ohne Nadel zum Einführungspreis.",
+        "Wir freuen uns auf deinen Besuch, die Beratung ist kostenlos und unverbindlich.",
+        "Vorher und nachher Bilder findet ihr in meinem Profil, schaut gerne vorbei.",
+        "Das Angebot gilt nur diese Woche, also schnell sein und einen Termin buchen.",
+        "Meine Kundinnen sind begeistert, weil die Haut danach so schön glatt aussieht.",
+        "Öffnungszeiten sind Montag bis Freitag von neun bis achtzehn Uhr und samstags nach Vereinbarung.",
+        "Gutscheine gibt es auch für Freunde und Familie, perfekt als Geschenk zum Geburtstag.",
+        "Bitte kommt ungeschminkt zur Behandlung und trinkt vorher ausreichend Wasser.",
+        "Wir sind ein kleines Kosmetikstudio mitten in der Stadt mit viel Erfahrung.",
+        "Schreib mir einfach, wenn du Fragen hast, ich antworte dir so schnell wie möglich.",
+        "Die Schwellung geht nach wenigen Tagen zurück, danach sieht man das volle Ergebnis.",
+        "Schönheit, Pflege und Wohlbefinden stehen bei uns an erster Stelle.",
+        "Hier bekommst du deine Wimpern, Augenbrauen und Nägel aus einer Hand.",
+    ],
+    "en": [
+        "I still have a free appointment today, feel free to send me a message or give me a call.",
+        "The treatment takes about one hour and the results last for several months.",
+        "New in our studio: lip filler without needles at a special introductory price.",
+        "We look forward to your visit, the consultation is free and without obligation.",
+        "You can find before and after pictures on my profile, come and have a look.",
+        "This offer is only valid this week, so be quick and book your appointment now.",
+        "My clients love it because their skin looks so smooth and fresh afterwards.",
+        "Opening hours are Monday to Friday from nine to six and Saturdays by appointment.",
+        "Gift vouchers are also available for friends and family, perfect for birthdays.",
+        "Please come without makeup and drink enough water before your treatment.",
+        "We are a small beauty salon in the city centre with many years of experience.",
+        "Just write to me if you have any questions and I will answer as soon as possible.",
+        "The swelling goes down after a few days and then you can see the full result.",
+        "Beauty, care and wellbeing are our highest priority for every customer.",
+        "Get your lashes, brows and nails done in one place with the best prices in town.",
+    ],
+    "tr": [
+        "Bugün hâlâ boş bir randevum var, mesaj atabilir ya da beni arayabilirsiniz.",
+        "Uygulama yaklaşık bir saat sürüyor ve sonuçlar birkaç ay kalıcı oluyor.",
+        "Stüdyomuzda yeni: iğnesiz dudak dolgusu özel açılış fiyatıyla sizlerle.",
+        "Ziyaretinizi bekliyoruz, danışmanlık ücretsiz ve hiçbir yükümlülük yok.",
+        "Öncesi ve sonrası fotoğrafları profilimde bulabilirsiniz, bakmayı unutmayın.",
+        "Bu kampanya sadece bu hafta geçerli, hemen randevunuzu oluşturun.",
+        "Müşterilerim çok memnun çünkü cilt uygulamadan sonra pürüzsüz ve canlı görünüyor.",
+        "Çalışma saatlerimiz pazartesiden cumaya dokuzdan altıya, cumartesi randevu ile.",
+        "Arkadaşlarınız ve aileniz için hediye çekleri de mevcut, doğum günü için ideal.",
+        "Lütfen uygulamaya makyajsız gelin ve öncesinde bol su için.",
+        "Şehir merkezinde yılların deneyimine sahip küçük bir güzellik salonuyuz.",
+        "Sorularınız varsa bana yazın, en kısa sürede cevap vereceğim.",
+        "Şişlik birkaç gün içinde iner ve ardından sonucun tamamını görürsünüz.",
+        "Güzellik, bakım ve iyi hissetmek bizim için her zaman önce gelir.",
+        "Kirpik, kaş ve tırnak işlemleriniz tek bir yerde uygun fiyatlarla.",
+    ],
+    "ru": [
+        "У меня сегодня ещё есть свободное время, пишите в личные сообщения или звоните.",
+        "Процедура длится около часа, а результат сохраняется несколько месяцев.",
+        "Новинка в нашей студии: безыгольное увеличение губ по специальной цене.",
+        "Ждём вас в гости, консультация бесплатная и ни к чему не обязывает.",
+        "Фотографии до и после смотрите в моём профиле, заходите посмотреть.",
+        "Предложение действует только на этой неделе, успейте записаться.",
+        "Мои клиентки в восторге, потому что кожа после процедуры гладкая и свежая.",
+        "Мы работаем с понедельника по пятницу с девяти до шести, в субботу по записи.",
+        "Подарочные сертификаты для друзей и семьи, отличный подарок на день рождения.",
+        "Пожалуйста, приходите без макияжа и пейте достаточно воды перед процедурой.",
+        "Мы небольшой салон красоты в центре города с многолетним опытом.",
+        "Напишите мне, если у вас есть вопросы, я отвечу как можно скорее.",
+        "Отёк проходит через несколько дней, после этого виден полный результат.",
+        "Красота, уход и хорошее самочувствие для нас на первом месте.",
+        "Ресницы, брови и ногти в одном месте по лучшим ценам в городе.",
+    ],
+    "ar": [
+        "لدي موعد متاح اليوم، تواصلوا معي برسالة خاصة أو اتصلوا بي.",
+        "تستغرق الجلسة حوالي ساعة واحدة وتدوم النتيجة عدة أشهر.",
+        "جديد في مركزنا: تكبير الشفاه بدون إبر بسعر خاص للافتتاح.",
+        "نتطلع لزيارتكم، الاستشارة مجانية وبدون أي التزام.",
+        "صور قبل وبعد موجودة في حسابي، تفضلوا بالاطلاع عليها.",
+        "العرض ساري هذا الأسبوع فقط، سارعوا بحجز موعدكم الآن.",
+        "زبوناتي سعيدات جدا لأن البشرة تصبح ناعمة ونضرة بعد الجلسة.",
+        "أوقات العمل من الاثنين إلى الجمعة من التاسعة حتى السادسة والسبت بموعد مسبق.",
+        "تتوفر قسائم هدايا للأصدقاء والعائلة، هدية مثالية لأعياد الميلاد.",
+        "يرجى الحضور بدون مكياج وشرب كمية كافية من الماء قبل الجلسة.",
+        "نحن صالون تجميل صغير في وسط المدينة مع خبرة سنوات طويلة.",
+        "راسلوني إذا كان لديكم أي سؤال وسأرد عليكم في أقرب وقت.",
+        "يزول التورم خلال أيام قليلة وبعدها تظهر النتيجة الكاملة.",
+        "الجمال والعناية والراحة هي أولويتنا دائما.",
+        "رموش وحواجب وأظافر في مكان واحد بأفضل الأسعار في المدينة.",
+    ],
+}
+
+# Anzahl der Hash-Bits für Trigramme (Tabelle: 2^16 Buckets x Sprachen, float32)
+TRIGRAM_BITS = 16
+TRIGRAM_BUCKETS = 1 << TRIGRAM_BITS
+
+# Symbole für Nicht-Buchstaben und Buchstaben, die in keinem Trainingstext vorkommen
+_SPACE = 0
+_OTHER_LETTER = 1
+
+# Multiplikator für das Hashing der Trigramme (Knuth), um 8 Bit verschoben: das vierte Byte
+# eines 32-Bit-Fensters fällt beim Überlauf heraus, übrig bleibt das Trigramm
+_HASH_MULTIPLIER = np.uint32((2654435761 << 8) & 0xFFFFFFFF)
+_HASH_SHIFT = np.uint32(32 - TRIGRAM_BITS)
+
+
+class LanguageIdentifier:
+    """Erkennt die Sprache eines Textes mit einem Naive-Bayes-Modell über Zeichen-Trigramme
+    
+    Jeder Buchstabe wird über eine Tabelle (UTF-16-Codeeinheit -> Byte) auf ein kleines Alphabet
+    abgebildet, Groß- und Kleinbuchstaben auf dasselbe Symbol, alle anderen Zeichen auf ein
+    Leerzeichen. Ein 32-Bit-Fenster mit Schrittweite 1 über diese Bytes liefert alle Trigramme
+    ohne Python-Schleife; sie werden auf TRIGRAM_BUCKETS Zeilen einer Tabelle gehasht, die je
+    Sprache die Log-Wahrscheinlichkeit und in der letzten Spalte 1 für bekannte Buckets enthält.
+    
+    Die Summe über die Trigramme eines Wortes wird einmal berechnet und pro Wort zwischengespeichert;
+    ein Text kostet danach nur Dictionary-Zugriffe und eine Summe über seine ersten Wörter.
+    """
+    
+    def __init__(self, samples=None, alpha=0.5, max_words=None):
+        """
+        Trainiert das Modell aus Beispieltexten
+        
+        Args:
+            samples: Optional, Dictionary Sprache -> Liste von Texten (Standard: TRAINING_SAMPLES)
+            alpha: Optional, additive Glättung für ungesehene Trigramme
+            max_words: Optional, Anzahl der ausgewerteten Wörter je Text (Standard: LANGUAGE_ID_MAX_WORDS)
+            
+        Raises:
+            ValueError: Wenn die Trainingstexte mehr als 254 verschiedene Buchstaben enthalten
+        """
+        samples = samples or TRAINING_SAMPLES
+        self.languages = tuple(samples)
+        self.max_words = max_words or LANGUAGE_ID_MAX_WORDS
+        self._word_cache = {}
+        
+        alphabet = sorted({char for texts in samples.values() for text in texts for char in text.lower() if char.isalpha()})
+        if len(alphabet) > 254:
+            raise ValueError(f"Trainingstexte enthalten {len(alphabet)} Buchstaben, höchstens 254 sind möglich")
+        
+        # UTF-16-Codeeinheit -> Symbol (Emojis bestehen aus Surrogaten und gelten wie Satzzeichen als Leerzeichen)
+        self._symbols = np.zeros(0x10000, dtype=np.uint8)
+        for code_unit in range(0x10000):
+            if chr(code_unit).isalpha():
+                self._symbols[code_unit] = _OTHER_LETTER
+        for symbol, char in enumerate(alphabet, start=2):
+            for variant in {char, char.upper()}:
+                if len(variant) == 1 and ord(variant) < 0x10000:
+                    self._symbols[ord(variant)] = symbol
+        
+        counts = np.zeros((len(self.languages), TRIGRAM_BUCKETS))
+        for row, language in enumerate(self.languages):
+            for text in samples[language]:
+                np.add.at(counts[row], self._buckets(text), 1)
+        
+        # Trigramme aus drei Leerzeichen (Satzzeichen, Zahlen) landen in Bucket 0 und zählen nicht
+        counts[:, 0] = 0
+        
+        # Log-Wahrscheinlichkeiten mit additiver Glättung; ungesehene Buckets tragen nichts bei
+        known = counts.sum(axis=0) > 0
+        log_probs = np.log((counts + alpha) / (counts.sum(axis=1, keepdims=True) + alpha * known.sum()))
+        log_probs[:, ~known] = 0.0
+        
+        # Eine Zeile je Bucket: Log-Wahrscheinlichkeiten aller Sprachen und 1, wenn der Bucket bekannt ist
+        self._table = np.ascontiguousarray(np.vstack([log_probs, known]).T, dtype=np.float32)
+        
+        self._default_column = self.languages.index(DEFAULT_LANGUAGE) if DEFAULT_LANGUAGE in self.languages else 0
+        self.fingerprint = hashlib.sha1(self._table.tobytes()).hexdigest()[:8]
+    
+    def __len__(self):
+        return int(self._table[:, -1].sum())
+    
+    def _buckets(self, text):
+        """Hash-Buckets aller Trigramme eines Textes (Wortränder zählen als Leerzeichen)"""
+        code_units = np.frombuffer((" " + text + "  ").encode("utf-16-le"), dtype=np.uint16)
+        symbols = self._symbols.take(code_units)
+        
+        # Fenster i enthält die Symbole i, i+1, i+2 (und i+3, das beim Hashing herausfällt)
+        windows = np.ndarray((len(symbols) - 3,), dtype="<u4", buffer=symbols, strides=(1,))
+        return (windows * _HASH_MULTIPLIER) >> _HASH_SHIFT
+    
+    def _word_scores(self, word):
+        """Log-Wahrscheinlichkeiten je Sprache und Anzahl bekannter Trigramme eines Wortes (zwischengespeichert)"""
+        scores = self._word_cache.get(word)
+        if scores is None:
+            if len(self._word_cache) >= WORD_CACHE_SIZE:
+                self._word_cache.clear()
+            scores = self._word_cache[word] = tuple(self._table.take(self._buckets(word), axis=0).sum(axis=0).tolist())
+        return scores
+    
+    def _totals(self, words):
+        """Summe der Wort-Scores über die ersten max_words Wörter (leere Liste ohne Wörter)"""
+        cache = self._word_cache
+        word_scores = [cache.get(word) or self._word_scores(word) for word in words[:self.max_words]]
+        return [sum(column) for column in zip(*word_scores)]
+    
+    def scores(self, text):
+        """
+        Berechnet die mittlere Log-Wahrscheinlichkeit je bekanntem Trigramm für jede Sprache
+        
+        Args:
+            text: Der zu analysierende Text
+            
+        Returns:
+            Dictionary Sprache -> Score (leer, wenn der Text keine bekannten Trigramme enthält)
+        """
+        totals = self._totals((text or "").lower().split())
+        if not totals or not totals[-1]:
+            return {}
+        return {language: total / totals[-1] for language, total in zip(self.languages, totals)}
+    
+    def identify(self, text):
+        """
+        Bestimmt die Sprache eines Textes
+        
+        Args:
+            text: Der zu analysierende Text
+            
+        Returns:
+            Sprachcode aus SUPPORTED_LANGUAGES; DEFAULT_LANGUAGE bei kurzen oder nicht eindeutigen Texten
+        """
+        if not text:
+            return DEFAULT_LANGUAGE
+        return self.identify_words(text.lower().split())
+    
+    def identify_words(self, words):
+        """
+        Bestimmt die Sprache aus bereits zerlegten, kleingeschriebenen Wörtern (z.B. AnalysisContext.tokens_lower)
+        
+        Args:
+            words: Liste von Wörtern
+            
+        Returns:
+            Sprachcode aus SUPPORTED_LANGUAGES; DEFAULT_LANGUAGE bei kurzen oder nicht eindeutigen Texten
+        """
+        totals = self._totals(words)
+        if not totals or totals[-1] < MIN_KNOWN_TRIGRAMS:
+            return DEFAULT_LANGUAGE
+        
+        known = totals[-1]
+        totals = totals[:-1]
+        best = max(range(len(totals)), key=totals.__getitem__)
+        
+        # Deutsch bleibt, solange eine andere Sprache nicht deutlich besser passt (Markennamen, Mischtexte)
+        if best != self._default_column and totals[best] - totals[self._default_column] < MIN_MARGIN * known:
+            return DEFAULT_LANGUAGE
+        return self.languages[best]
+
+
+# Das Modell wird pro Prozess nur einmal trainiert
+_language_identifier = None
+_language_identifier_lock = threading.Lock()
+
+
+def get_language_identifier():
+    """
+    Gibt die gemeinsam genutzte Spracherkennung zurück (wird beim ersten Aufruf trainiert)
+    
+    Returns:
+        LanguageIdentifier-Objekt
+    """
+    global _language_identifier
+    
+    if _language_identifier is None:
+        with _language_identifier_lock:
+            if _language_identifier is None:
+                _language_identifier = LanguageIdentifier()
+                logger.info(f"Spracherkennung mit {len(_language_identifier)} Trigrammen für {', '.join(_language_identifier.languages)} trainiert")
+    
+    return _language_identifier
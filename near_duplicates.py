@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# near_duplicates.py - Erkennung kopierter Anzeigentexte (MinHash/LSH) für IRI® Legal Agent
+
+import os
+import re
+import zlib
+import logging
+import threading
+import unicodedata
+import numpy as np
+
+logger = logging.getLogger("near_duplicates")
+
+# Ab dieser geschätzten Jaccard-Ähnlichkeit gelten zwei Texte als Kopie
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+
+# Länge der Zeichen-Shingles
+SHINGLE_SIZE = 5
+
+# Anzahl der Hashfunktionen pro Signatur und Anzahl der LSH-Bänder
+NUM_PERMUTATIONS = 128
+NUM_BANDS = 16
+
+# Primzahl < 2^32, damit a * x + b in uint64 nicht überläuft
+_PRIME = np.uint64(4294967291)
+
+# Anzahl der Shingles, die pro Schritt gegen alle Hashfunktionen gerechnet werden
+_BLOCK_SIZE = 4096
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """
+    Normalisiert einen Text für den Vergleich (Unicode, Kleinschreibung, Leerzeichen)
+    
+    Args:
+        text: Der Text
+        
+    Returns:
+        Normalisierter Text
+    """
+    text = unicodedata.normalize("NFC", text or "").lower()
+    return _WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    """
+    Zerlegt einen Text in Zeichen-Shingles und hasht sie auf 32 Bit
+    
+    Args:
+        text: Der (normalisierte) Text
+        size: Länge der Shingles
+        
+    Returns:
+        NumPy-Array mit den eindeutigen Shingle-Hashes
+    """
+    if len(text) <= size:
+        shingles = {text} if text else set()
+    else:
+        shingles = {text[i:i + size] for i in range(len(text) - size + 1)}
+    
+    return np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+
+
+class MinHasher:
+    """Berechnet MinHash-Signaturen mit universellen Hashfunktionen (a * x + b) mod p"""
+    
+    def __init__(self, num_perm=NUM_PERMUTATIONS, seed=1):
+        """
+        Initialisiert den MinHasher
+        
+        Args:
+            num_perm: Anzahl der Hashfunktionen
+            seed: Seed für die Hashparameter (Signaturen sind nur bei gleichem Seed vergleichbar)
+        """
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, int(_PRIME), size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.randint(0, int(_PRIME), size=num_perm, dtype=np.uint64)[:, None]
+    
+    def signature(self, hashes):
+        """
+        Berechnet die MinHash-Signatur einer Shingle-Menge
+        
+        Args:
+            hashes: NumPy-Array mit Shingle-Hashes
+            
+        Returns:
+            NumPy-Array (uint32) mit num_perm Einträgen
+        """
+        signature = np.full(self.num_perm, int(_PRIME), dtype=np.uint64)
+        hashes = hashes % _PRIME
+        
+        for start in range(0, len(hashes), _BLOCK_SIZE):
+            block = hashes[start:start + _BLOCK_SIZE][None, :]
+            np.minimum(signature, ((self._a * block + self._b) % _PRIME).min(axis=1), out=signature)
+        
+        return signature.astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    """Inkrementeller LSH-Index für Texte mit Gruppierung ähnlicher Texte zu Clustern"""
+    
+    def __init__(self, threshold=None, num_perm=NUM_PERMUTATIONS, bands=NUM_BANDS, shingle_size=SHINGLE_SIZE):
+        """
+        Initialisiert den NearDuplicateIndex
+        
+        Args:
+            threshold: Optional, Mindestähnlichkeit für Kopien (Standard: NEAR_DUPLICATE_THRESHOLD)
+            num_perm: Anzahl der Hashfunktionen pro Signatur
+            bands: Anzahl der LSH-Bänder (num_perm muss durch bands teilbar sein)
+            shingle_size: Länge der Zeichen-Shingles
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm muss durch bands teilbar sein")
+        
+        self.threshold = NEAR_DUPLICATE_THRESHOLD if threshold is None else threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm)
+        
+        self._signatures = {}
+        self._buckets = [{} for _ in range(bands)]
+        self._parents = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._signatures)
+    
+    def __contains__(self, key):
+        return key in self._signatures
+    
+    def signature(self, text):
+        """
+        Berechnet die Signatur eines Textes
+        
+        Args:
+            text: Der Text
+            
+        Returns:
+            MinHash-Signatur oder None für leere Texte
+        """
+        text = normalize_text(text)
+        if not text:
+            return None
+        return self.hasher.signature(shingle_hashes(text, self.shingle_size))
+    
+    def _band_keys(self, signature):
+        """Zerlegt eine Signatur in die Schlüssel der LSH-Bänder"""
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+    
+    def query(self, text=None, signature=None):
+        """
+        Sucht bereits indizierte Texte, die dem Text mindestens zu threshold ähneln
+        
+        Args:
+            text: Der Text (oder alternativ signature)
+            signature: Optional, bereits berechnete Signatur
+            
+        Returns:
+            Liste von Tupeln (Schlüssel, geschätzte Ähnlichkeit), absteigend sortiert
+        """
+        if signature is None:
+            signature = self.signature(text)
+        if signature is None:
+            return []
+        
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        
+        matches = []
+        for key in candidates:
+            similarity = float(np.count_nonzero(self._signatures[key] == signature)) / len(signature)
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+    
+    def add(self, key, text):
+        """
+        Fügt einen Text hinzu und ordnet ihn dem Cluster seiner Kopien zu
+        
+        Args:
+            key: Eindeutiger Schlüssel (z.B. 'post:<Link>' oder 'profile:<Plattform>:<Name>')
+            text: Der Text
+            
+        Returns:
+            Liste von Tupeln (Schlüssel, Ähnlichkeit) der bereits bekannten Kopien
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return []
+        
+        with self._lock:
+            matches = [match for match in self.query(signature=signature) if match[0] != key]
+            
+            if key not in self._signatures:
+                for band, band_key in enumerate(self._band_keys(signature)):
+                    self._buckets[band].setdefault(band_key, []).append(key)
+                self._signatures[key] = signature
+                self._parents[key] = key
+            
+            for other_key, _ in matches:
+                self._union(key, other_key)
+        
+        return matches
+    
+    def _find(self, key):
+        """Sucht den Repräsentanten eines Clusters (mit Pfadkompression)"""
+        root = key
+        while self._parents[root] != root:
+            root = self._parents[root]
+        while self._parents[key] != root:
+            self._parents[key], key = root, self._parents[key]
+        return root
+    
+    def _union(self, key, other_key):
+        """Vereinigt die Cluster zweier Schlüssel"""
+        root, other_root = self._find(key), self._find(other_key)
+        if root != other_root:
+            self._parents[max(root, other_root)] = min(root, other_root)
+    
+    def cluster_of(self, key):
+        """
+        Gibt den Cluster-Schlüssel eines Textes zurück
+        
+        Args:
+            key: Schlüssel des Textes
+            
+        Returns:
+            Schlüssel des Cluster-Repräsentanten oder None, wenn der Text unbekannt ist
+        """
+        with self._lock:
+            return self._find(key) if key in self._parents else None
+    
+    def get_clusters(self, min_size=2):
+        """
+        Gibt alle Gruppen kopierter Texte zurück
+        
+        Args:
+            min_size: Mindestanzahl von Texten pro Cluster
+            
+        Returns:
+            Liste von Schlüssellisten, größte Cluster zuerst
+        """
+        clusters = {}
+        with self._lock:
+            for key in self._parents:
+                clusters.setdefault(self._find(key), []).append(key)
+        
+        return sorted(
+            (sorted(keys) for keys in clusters.values() if len(keys) >= min_size),
+            key=len,
+            reverse=True
+        )
+    
+    def get_statistics(self):
+        """
+        Gibt Statistiken des Index zurück
+        
+        Returns:
+            Dictionary mit Statistiken
+        """
+        clusters = self.get_clusters()
+        return {
+            "texts": len(self._signatures),
+            "threshold": self.threshold,
+            "duplicate_clusters": len(clusters),
+            "duplicated_texts": sum(len(keys) for keys in clusters)
+        }
+    
+    @classmethod
+    def from_database(cls, db_manager, **kwargs):
+        """
+        Baut den Index aus den gespeicherten Profilbeschreibungen und Posts auf
+        
+        Args:
+            db_manager: Ein DatabaseManager-Objekt
+            **kwargs: Parameter für den Konstruktor
+            
+        Returns:
+            NearDuplicateIndex-Objekt
+        """
+        index = cls(**kwargs)
+        
+        for key, text in db_manager.iter_deduplication_texts():
+            index.add(key, text)
+        
+        logger.info(f"Duplikat-Index mit {len(index)} Texten aus der Datenbank aufgebaut")
+        return index
+
+
+def profile_key(platform_name, profile_name):
+    """Schlüssel einer Profilbeschreibung im Duplikat-Index"""
+    return f"profile:{platform_name}:{profile_name}"
+
+
+def post_key(post_link):
+    """Schlüssel eines Posts im Duplikat-Index"""
+    return f"post:{post_link}"
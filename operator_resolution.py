@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# operator_resolution.py - Zuordnung von Profilen zu Betreibern über gemeinsame Kontaktdaten für IRI® Legal Agent
+
+import os
+import re
+import logging
+import threading
+from urllib.parse import urlparse
+
+logger = logging.getLogger("operator_resolution")
+
+# Ländervorwahl für nationale Telefonnummern (0171 ... -> +49171 ...)
+DEFAULT_COUNTRY_CODE = os.getenv("OPERATOR_DEFAULT_COUNTRY_CODE", "49")
+
+# Domains von Plattformen und Link-Diensten, die keinem einzelnen Betreiber gehören
+SHARED_DOMAINS = {
+    "instagram.com", "facebook.com", "fb.com", "fb.me", "tiktok.com", "google.com", "google.de",
+    "youtube.com", "youtu.be", "wa.me", "whatsapp.com", "t.me", "linktr.ee", "linkin.bio",
+    "bit.ly", "goo.gl", "maps.app.goo.gl", "treatwell.de", "booksy.com", "planity.com"
+}
+
+# Freemail-Anbieter: die Domain einer E-Mail-Adresse verweist hier nicht auf eine Website des Betreibers
+FREEMAIL_DOMAINS = {
+    "gmail.com", "googlemail.com", "web.de", "gmx.de", "gmx.net", "gmx.at", "gmx.ch", "t-online.de",
+    "yahoo.com", "yahoo.de", "hotmail.com", "hotmail.de", "outlook.com", "outlook.de", "live.de",
+    "live.com", "icloud.com", "me.com", "aol.com", "freenet.de", "mail.de", "posteo.de", "arcor.de"
+}
+
+# Plattformen, deren Profil-Link die Website des Betreibers ist
+WEBSITE_PLATFORMS = {"Website", "Google"}
+
+_URL_PATTERN = re.compile(
+    r'(?:https?://|www\.)[^\s<>"\'()]+|(?<![@\w.-])\b[a-z0-9][a-z0-9-]*(?:\.[a-z0-9-]+)*\.(?:de|at|ch|com|net|eu|info|shop|beauty)\b(?![@\w.-])',
+    re.IGNORECASE
+)
+
+
+def normalize_email(email):
+    """
+    Normalisiert eine E-Mail-Adresse (Kleinschreibung, ohne umgebende Satzzeichen)
+    
+    Args:
+        email: Die E-Mail-Adresse
+        
+    Returns:
+        Normalisierte Adresse oder None, wenn sie ungültig ist
+    """
+    email = (email or "").strip().strip(".,;:<>()[]").lower()
+    if email.count("@") != 1:
+        return None
+    
+    local, domain = email.split("@")
+    if not local or "." not in domain:
+        return None
+    return f"{local}@{domain}"
+
+
+def normalize_phone(phone, country_code=None):
+    """
+    Normalisiert eine Telefonnummer in das E.164-Format
+    
+    Args:
+        phone: Die Telefonnummer (z.B. '0171 1234567', '+49 (0)171-1234567', '0049 171 1234567')
+        country_code: Optional, Ländervorwahl für nationale Nummern (Standard: DEFAULT_COUNTRY_CODE)
+        
+    Returns:
+        Nummer im Format '+49171234567' oder None, wenn sie ungültig ist
+    """
+    country_code = country_code or DEFAULT_COUNTRY_CODE
+    phone = (phone or "").strip().replace("(0)", "")
+    
+    digits = re.sub(r'\D', '', phone)
+    if phone.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith("0"):
+        digits = country_code + digits[1:]
+    else:
+        return None
+    
+    # E.164: höchstens 15 Ziffern, kürzere Nummern sind keine vollständigen Anschlüsse
+    if not 8 <= len(digits) <= 15:
+        return None
+    return f"+{digits}"
+
+
+def normalize_domain(url):
+    """
+    Normalisiert eine URL oder einen Hostnamen zur Domain (ohne 'www.')
+    
+    Args:
+        url: URL oder Hostname
+        
+    Returns:
+        Domain in Kleinbuchstaben oder None, wenn sie keinem einzelnen Betreiber zuzuordnen ist
+    """
+    url = (url or "").strip().rstrip(".,;:!?")
+    if not url:
+        return None
+    if "://" not in url:
+        url = f"http://{url}"
+    
+    try:
+        host = (urlparse(url).hostname or "").lower()
+    except ValueError:
+        return None
+    
+    if host.startswith("www."):
+        host = host[4:]
+    if "." not in host or host in SHARED_DOMAINS or any(host.endswith(f".{domain}") for domain in SHARED_DOMAINS):
+        return None
+    return host
+
+
+def extract_domains(text):
+    """
+    Extrahiert Website-Domains aus einem Text
+    
+    Args:
+        text: Der zu analysierende Text
+        
+    Returns:
+        Liste normalisierter Domains (ohne Duplikate)
+    """
+    domains = []
+    for match in _URL_PATTERN.finditer(text or ""):
+        domain = normalize_domain(match.group(0))
+        if domain and domain not in domains:
+            domains.append(domain)
+    return domains
+
+
+def collect_identifiers(platform_name, profile_data):
+    """
+    Sammelt die normalisierten Kontaktmerkmale eines Profils
+    
+    Berücksichtigt die Analyseergebnisse des Detectors ('emails', 'phones'), die E-Mail-Adresse
+    des Profils, in Texten genannte Websites, die Domains geschäftlicher E-Mail-Adressen und
+    bei Websites den Profil-Link selbst.
+    
+    Args:
+        platform_name: Name der Plattform
+        profile_data: Dictionary mit Profildaten (optional mit 'analysis')
+        
+    Returns:
+        Menge von Tupeln (Art, Wert), z.B. ('phone', '+491711234567')
+    """
+    analysis = profile_data.get("analysis") or {}
+    identifiers = set()
+    
+    emails = list(analysis.get("emails") or [])
+    if profile_data.get("email"):
+        emails.append(profile_data["email"])
+    
+    for email in emails:
+        email = normalize_email(email)
+        if email:
+            identifiers.add(("email", email))
+            domain = email.split("@")[1]
+            if domain not in FREEMAIL_DOMAINS:
+                identifiers.add(("domain", domain))
+    
+    for phone in analysis.get("phones") or []:
+        phone = normalize_phone(phone)
+        if phone:
+            identifiers.add(("phone", phone))
+    
+    # Auch in Texten genannte Freemail-Domains (z.B. aus "gmail.com") verbinden keine Betreiber
+    for field in ("description", "post_text"):
+        for domain in extract_domains(profile_data.get(field)):
+            if domain not in FREEMAIL_DOMAINS:
+                identifiers.add(("domain", domain))
+    
+    if platform_name in WEBSITE_PLATFORMS:
+        domain = normalize_domain(profile_data.get("profile_link"))
+        if domain:
+            identifiers.add(("domain", domain))
+    
+    return identifiers
+
+
+class OperatorIndex:
+    """Inkrementelle Union-Find-Struktur, die Profile mit gemeinsamen Kontaktdaten zu Betreibern zusammenfasst
+    
+    Union nach Größe und Pfadkompression ergeben amortisiert O(α(n)) pro Abfrage. Neue Knoten,
+    geänderte Elternverweise und neue Kontaktmerkmale werden gesammelt und mit flush()
+    in einer Transaktion gespeichert.
+    """
+    
+    def __init__(self, db_manager=None):
+        """
+        Initialisiert den OperatorIndex
+        
+        Args:
+            db_manager: Optional, ein DatabaseManager-Objekt zum Speichern der Zuordnungen
+        """
+        self.db_manager = db_manager
+        
+        self._parents = {}
+        self._members = {}
+        self._identifiers = {}
+        self._lock = threading.Lock()
+        
+        # Noch nicht gespeicherte Änderungen
+        self._dirty_links = set()
+        self._new_identifiers = {}
+    
+    def __len__(self):
+        return len(self._parents)
+    
+    def __contains__(self, key):
+        return key in self._parents
+    
+    def _add_node(self, key):
+        """Legt einen Knoten als eigenen Betreiber an"""
+        if key not in self._parents:
+            self._parents[key] = key
+            self._members[key] = [key]
+    
+    def _find(self, key):
+        """Sucht den Repräsentanten eines Betreibers (mit Pfadkompression)"""
+        root = key
+        while self._parents[root] != root:
+            root = self._parents[root]
+        while self._parents[key] != root:
+            self._parents[key], key = root, self._parents[key]
+        return root
+    
+    def _union(self, key, other_key):
+        """Vereinigt die Betreiber zweier Profile (die kleinere Gruppe wird angehängt)"""
+        root, other_root = self._find(key), self._find(other_key)
+        if root == other_root:
+            return root
+        
+        if len(self._members[root]) < len(self._members[other_root]):
+            root, other_root = other_root, root
+        
+        self._parents[other_root] = root
+        self._members[root].extend(self._members.pop(other_root))
+        self._dirty_links.add(other_root)
+        return root
+    
+    def add(self, key, identifiers):
+        """
+        Fügt ein Profil mit seinen Kontaktmerkmalen hinzu
+        
+        Args:
+            key: Schlüssel des Profils (z.B. 'profile:Instagram:name')
+            identifiers: Menge von Tupeln (Art, Wert), siehe collect_identifiers()
+            
+        Returns:
+            Schlüssel des Betreiber-Repräsentanten
+        """
+        with self._lock:
+            if key not in self._parents:
+                self._add_node(key)
+                self._dirty_links.add(key)
+            
+            for identifier in identifiers:
+                owner = self._identifiers.get(identifier)
+                if owner is None:
+                    self._identifiers[identifier] = key
+                    self._new_identifiers[identifier] = key
+                elif owner != key:
+                    self._union(owner, key)
+            
+            return self._find(key)
+    
+    def operator_of(self, key):
+        """
+        Gibt den Betreiber-Repräsentanten eines Profils zurück
+        
+        Args:
+            key: Schlüssel des Profils
+            
+        Returns:
+            Schlüssel des Repräsentanten oder None, wenn das Profil unbekannt ist
+        """
+        with self._lock:
+            return self._find(key) if key in self._parents else None
+    
+    def members_of(self, key):
+        """
+        Gibt alle Profile desselben Betreibers zurück
+        
+        Args:
+            key: Schlüssel des Profils
+            
+        Returns:
+            Sortierte Liste der Profilschlüssel (leer, wenn das Profil unbekannt ist)
+        """
+        with self._lock:
+            if key not in self._parents:
+                return []
+            return sorted(self._members[self._find(key)])
+    
+    def get_clusters(self, min_size=2):
+        """
+        Gibt alle Betreiber mit mehreren Profilen zurück
+        
+        Args:
+            min_size: Mindestanzahl von Profilen pro Betreiber
+            
+        Returns:
+            Liste von Schlüssellisten, größte Betreiber zuerst
+        """
+        with self._lock:
+            clusters = [sorted(keys) for keys in self._members.values() if len(keys) >= min_size]
+        return sorted(clusters, key=len, reverse=True)
+    
+    def flush(self):
+        """
+        Speichert neue Knoten, geänderte Elternverweise und neue Kontaktmerkmale
+        
+        Returns:
+            True, wenn die Änderungen gespeichert wurden (oder keine vorlagen), sonst False
+        """
+        if not self.db_manager:
+            return True
+        
+        with self._lock:
+            links = {key: self._parents[key] for key in self._dirty_links}
+            identifiers = dict(self._new_identifiers)
+            self._dirty_links = set()
+            self._new_identifiers = {}
+        
+        if not links and not identifiers:
+            return True
+        
+        if self.db_manager.store_operator_links(links, identifiers):
+            return True
+        
+        # Beim nächsten flush() erneut versuchen
+        with self._lock:
+            self._dirty_links.update(links)
+            for identifier, key in identifiers.items():
+                self._new_identifiers.setdefault(identifier, key)
+        return False
+    
+    def get_statistics(self):
+        """
+        Gibt Statistiken des Index zurück
+        
+        Returns:
+            Dictionary mit Statistiken
+        """
+        clusters = self.get_clusters()
+        return {
+            "profiles": len(self._parents),
+            "operators": len(self._members),
+            "identifiers": len(self._identifiers),
+            "multi_profile_operators": len(clusters),
+            "profiles_in_multi_profile_operators": sum(len(keys) for keys in clusters)
+        }
+    
+    @classmethod
+    def from_database(cls, db_manager):
+        """
+        Lädt die gespeicherten Zuordnungen aus der Datenbank
+        
+        Args:
+            db_manager: Ein DatabaseManager-Objekt
+            
+        Returns:
+            OperatorIndex-Objekt
+        """
+        index = cls(db_manager)
+        
+        for key, parent_key in db_manager.iter_operator_links():
+            index._parents[key] = parent_key
+        
+        # Elternverweise können auf noch unbekannte Knoten zeigen, daher Gruppen erst danach bilden
+        for parent_key in set(index._parents.values()) - set(index._parents):
+            index._parents[parent_key] = parent_key
+        for key in list(index._parents):
+            index._members.setdefault(index._find(key), []).append(key)
+        
+        for kind, value, key in db_manager.iter_operator_identifiers():
+            index._identifiers[(kind, value)] = key
+            if key not in index._parents:
+                index._add_node(key)
+                index._dirty_links.add(key)
+        
+        logger.info(f"Betreiber-Index mit {len(index)} Profilen aus der Datenbank geladen")
+        return index
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# pipeline_metrics.py - Laufzeitmessung der Erkennungs-Pipeline für IRI® Legal Agent
+
+import os
+import time
+import pstats
+import cProfile
+import logging
+import threading
+from functools import wraps
+
+logger = logging.getLogger("pipeline_metrics")
+
+# Messung aktivieren (1/true) oder deaktivieren (Standard)
+DETECTION_METRICS = os.getenv("DETECTION_METRICS", "false").lower() in ("1", "true", "yes")
+
+# Jeder N-te Aufruf einer Profiling-Stufe wird mit cProfile aufgezeichnet (0 deaktiviert das Profiling)
+DETECTION_PROFILE_EVERY = int(os.getenv("DETECTION_PROFILE_EVERY", "0"))
+
+# Verzeichnis für die cProfile-Ausgaben
+DETECTION_PROFILE_DIR = os.getenv("DETECTION_PROFILE_DIR", os.path.abspath("profiles"))
+
+
+class MetricsRegistry:
+    """Prozessweite Sammlung von Aufrufzahlen, Laufzeiten und verarbeiteten Bytes pro Pipeline-Stufe"""
+    
+    def __init__(self, enabled=False, profile_every=0, profile_dir=None):
+        """
+        Initialisiert die MetricsRegistry
+        
+        Args:
+            enabled: Ob Messungen aufgezeichnet werden
+            profile_every: Jeder N-te Aufruf einer Profiling-Stufe wird mit cProfile aufgezeichnet (0 = aus)
+            profile_dir: Optional, Verzeichnis für die cProfile-Ausgaben
+        """
+        self.enabled = enabled
+        self.profile_every = profile_every
+        self.profile_dir = profile_dir or DETECTION_PROFILE_DIR
+        
+        # Stufe -> [Aufrufe, Gesamtzeit (ns), maximale Zeit (ns), Bytes]
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profile_files = []
+        self._started_at = time.time()
+    
+    def enable(self, profile_every=None, profile_dir=None):
+        """
+        Aktiviert die Messung
+        
+        Args:
+            profile_every: Optional, jeder N-te Aufruf wird mit cProfile aufgezeichnet
+            profile_dir: Optional, Verzeichnis für die cProfile-Ausgaben
+        """
+        if profile_every is not None:
+            self.profile_every = profile_every
+        if profile_dir:
+            self.profile_dir = profile_dir
+        self.enabled = True
+    
+    def disable(self):
+        """Deaktiviert die Messung (bisherige Werte bleiben erhalten)"""
+        self.enabled = False
+    
+    def reset(self):
+        """Verwirft alle bisherigen Messwerte"""
+        with self._lock:
+            self._stages.clear()
+            self._profile_files = []
+            self._started_at = time.time()
+    
+    def record(self, stage, elapsed_ns, nbytes=0):
+        """
+        Zeichnet einen Aufruf einer Stufe auf
+        
+        Args:
+            stage: Name der Stufe (z.B. 'detector.scan_text')
+            elapsed_ns: Laufzeit in Nanosekunden
+            nbytes: Verarbeitete Bytes
+        """
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                self._stages[stage] = [1, elapsed_ns, elapsed_ns, nbytes]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed_ns
+                if elapsed_ns > entry[2]:
+                    entry[2] = elapsed_ns
+                entry[3] += nbytes
+    
+    def call_count(self, stage):
+        """Gibt die Anzahl der bisherigen Aufrufe einer Stufe zurück"""
+        entry = self._stages.get(stage)
+        return entry[0] if entry else 0
+    
+    def _should_profile(self, stage):
+        """Prüft, ob der nächste Aufruf einer Stufe mit cProfile aufgezeichnet wird"""
+        if not self.profile_every or getattr(self._local, "profiling", False):
+            return False
+        return (self.call_count(stage) + 1) % self.profile_every == 0
+    
+    def _run_profiled(self, stage, func, args, kwargs):
+        """Führt einen Aufruf unter cProfile aus und speichert die Statistik"""
+        profiler = cProfile.Profile()
+        self._local.profiling = True
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            self._local.profiling = False
+            self._dump_profile(stage, profiler)
+    
+    def _dump_profile(self, stage, profiler):
+        """Schreibt eine cProfile-Statistik in das Profiling-Verzeichnis"""
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            filename = f"{stage}_{os.getpid()}_{self.call_count(stage) + 1}.prof"
+            filepath = os.path.join(self.profile_dir, filename)
+            pstats.Stats(profiler).dump_stats(filepath)
+            
+            with self._lock:
+                self._profile_files.append(filepath)
+            logger.debug(f"cProfile-Ausgabe gespeichert: {filepath}")
+        except OSError as e:
+            logger.error(f"Fehler beim Speichern der cProfile-Ausgabe: {e}")
+    
+    def snapshot(self):
+        """
+        Gibt alle Messwerte zurück
+        
+        Returns:
+            Dictionary mit Metadaten und Messwerten pro Stufe (JSON-serialisierbar)
+        """
+        with self._lock:
+            stages = {stage: list(entry) for stage, entry in self._stages.items()}
+            profile_files = list(self._profile_files)
+        
+        return {
+            "enabled": self.enabled,
+            "profile_every": self.profile_every,
+            "since": self._started_at,
+            "pid": os.getpid(),
+            "stages": {
+                stage: {
+                    "calls": calls,
+                    "total_ms": round(total_ns / 1e6, 3),
+                    "mean_ms": round(total_ns / calls / 1e6, 4),
+                    "max_ms": round(max_ns / 1e6, 4),
+                    "bytes": nbytes,
+                    "mb_per_second": round(nbytes / (total_ns / 1e9) / (1024 * 1024), 3) if total_ns and nbytes else None
+                }
+                for stage, (calls, total_ns, max_ns, nbytes) in sorted(stages.items())
+            },
+            "profile_files": profile_files[-50:]
+        }
+    
+    def format_table(self):
+        """
+        Formatiert die Messwerte als Tabelle für die Kommandozeile
+        
+        Returns:
+            Tabelle als String
+        """
+        snapshot = self.snapshot()
+        lines = [f"{'Stufe':<46} {'Aufrufe':>9} {'gesamt (ms)':>12} {'Mittel (ms)':>12} {'max (ms)':>10} {'MB/s':>8}"]
+        for stage, values in snapshot["stages"].items():
+            lines.append(
+                f"{stage:<46} {values['calls']:>9} {values['total_ms']:>12} {values['mean_ms']:>12} "
+                f"{values['max_ms']:>10} {values['mb_per_second'] or '-':>8}"
+            )
+        return "\n".join(lines)
+
+
+def _payload_bytes(value):
+    """Bestimmt die Größe eines Texts, eines AnalysisContext oder eines Profils in Bytes"""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, dict):
+        return sum(len(value[field].encode("utf-8")) for field in ("description", "post_text")
+                   if isinstance(value.get(field), str))
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_bytes(item) for item in value)
+    text = getattr(value, "text", None)
+    if isinstance(text, str):
+        return len(text.encode("utf-8"))
+    return 0
+
+
+_registry = MetricsRegistry(enabled=DETECTION_METRICS, profile_every=DETECTION_PROFILE_EVERY)
+
+
+def get_registry():
+    """
+    Gibt die prozessweite MetricsRegistry zurück
+    
+    Returns:
+        MetricsRegistry-Objekt
+    """
+    return _registry
+
+
+def instrumented(stage, profile=False, payload_arg=0):
+    """
+    Dekorator, der Laufzeit, Aufrufe und Bytes einer Methode in der Registry erfasst
+    
+    Bei deaktivierter Messung kostet der Aufruf nur eine Attributabfrage. Worker-Prozesse
+    von analyze_profiles_batch führen eigene Registries, deren Werte hier nicht erscheinen.
+    
+    Args:
+        stage: Name der Stufe
+        profile: Ob Aufrufe dieser Stufe für das cProfile-Sampling in Frage kommen
+        payload_arg: Position des Arguments (ohne self), dessen Größe als verarbeitete Bytes zählt
+        
+    Returns:
+        Dekorator
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            registry = _registry
+            if not registry.enabled:
+                return func(self, *args, **kwargs)
+            
+            nbytes = _payload_bytes(args[payload_arg]) if len(args) > payload_arg else 0
+            
+            start = time.perf_counter_ns()
+            if profile and registry._should_profile(stage):
+                result = registry._run_profiled(stage, func, (self,) + args, kwargs)
+            else:
+                result = func(self, *args, **kwargs)
+            registry.record(stage, time.perf_counter_ns() - start, nbytes)
+            
+            return result
+        return wrapper
+    return decorator
@@ -12,6 +12,11 @@ from dotenv import load_dotenv
 import logging
 from urllib.parse import quote_plus
 
+from politeness import get_politeness_scheduler
+from adaptive_concurrency import get_concurrency_controller, is_congested
+from http_cache import get_http_cache, request_url
+from proxy_pool import get_proxy_pool
+
 # Konfiguriere Logging
 logging.basicConfig(
     level=logging.INFO,
@@ -47,22 +52,15 @@ class BaseScraper:
         self.session = requests.Session()
         self.rotate_user_agent()
         
-        # Proxy-Konfiguration (falls benötigt)
-        self.proxies = self._load_proxies()
-        if self.proxies:
-            self.rotate_proxy()
-    
-    def _load_proxies(self):
-        """Lädt Proxies aus einer Datei oder Umgebungsvariable"""
-        proxy_list = os.getenv("PROXY_LIST")
-        if proxy_list:
-            return proxy_list.split(",")
+        # Anfrageraten und Sperrzeiten pro Host, gemeinsam für alle Scraper des Prozesses
+        self.scheduler = get_politeness_scheduler()
+        self.concurrency = get_concurrency_controller()
         
-        if os.path.exists("proxies.txt"):
-            with open("proxies.txt", "r") as f:
-                return [line.strip() for line in f if line.strip()]
+        # Persistenter HTTP-Cache (None, wenn abgeschaltet)
+        self.http_cache = get_http_cache()
         
-        return []
+        # Proxies (PROXY_LIST oder proxies.txt) mit Gesundheitsbewertung, gemeinsam für alle Scraper des Prozesses
+        self.proxy_pool = get_proxy_pool()
     
     def rotate_user_agent(self):
         """Wechselt den User-Agent zufällig"""
@@ -70,18 +68,6 @@ class BaseScraper:
         self.session.headers.update({"User-Agent": user_agent})
         logger.debug(f"User-Agent gewechselt zu: {user_agent}")
     
-    def rotate_proxy(self):
-        """Wechselt den Proxy zufällig"""
-        if not self.proxies:
-            return
-        
-        proxy = random.choice(self.proxies)
-        self.session.proxies.update({
-            "http": proxy,
-            "https": proxy
-        })
-        logger.debug(f"Proxy gewechselt zu: {proxy}")
-    
     def make_request(self, url, method="GET", params=None, data=None, headers=None, retry_count=3, retry_delay=2):
         """
         Führt eine HTTP-Anfrage mit Wiederholungsversuchen und Fehlerbehandlung durch
@@ -96,40 +82,86 @@ class BaseScraper:
             retry_delay: Verzögerung zwischen Wiederholungsversuchen in Sekunden
             
         Returns:
-            Response-Objekt oder None bei Fehler
+            Response-Objekt oder None bei Fehler (bei GET-Anfragen ggf. aus dem HTTP-Cache)
         """
+        platform = getattr(self, "platform_name", None)
+        
+        # GET-Anfragen gehen über den HTTP-Cache: innerhalb der TTL ohne Anfrage, danach bedingt
+        cache_url = cache_entry = None
+        if self.http_cache and method == "GET" and data is None:
+            cache_url = request_url(url, params)
+            cache_entry = self.http_cache.lookup(cache_url)
+            if cache_entry and cache_entry.is_fresh(self.http_cache.ttl_for(platform)):
+                cached = self.http_cache.response(cache_entry)
+                if cached is not None:
+                    return cached
+            if cache_entry:
+                headers = {**(headers or {}), **cache_entry.conditional_headers()}
+        
         for attempt in range(retry_count):
+            proxy = None
             try:
-                # Füge zufällige Verzögerung hinzu, um Anti-Scraping-Maßnahmen zu umgehen
-                time.sleep(random.uniform(1.0, 3.0))
+                # Warte, solange der Host nach Drosselung gesperrt ist (Retry-After)
+                self.concurrency.wait(url)
+                
+                # Warte nur, wenn der Host sein Limit erreicht hat (andere Hosts sind nicht betroffen)
+                self.scheduler.wait(url, platform)
                 
-                # Führe die Anfrage durch
+                # Führe die Anfrage über den gesündesten verfügbaren Proxy durch
+                proxy = self.proxy_pool.acquire(url)
+                start_time = time.monotonic()
                 response = self.session.request(
                     method=method,
                     url=url,
                     params=params,
                     data=data,
                     headers=headers,
+                    proxies={"http": proxy, "https": proxy} if proxy else None,
                     timeout=10
                 )
                 
-                # Prüfe auf Erfolg
-                response.raise_for_status()
-                
-                # Prüfe auf Anti-Bot-Maßnahmen
-                if "captcha" in response.text.lower() or "robot" in response.text.lower():
-                    logger.warning(f"Mögliche Anti-Bot-Maßnahme erkannt bei {url}")
+                # Prüfe auf Drosselung (429, 503) und Anti-Bot-Maßnahmen; die nächste Anfrage an den Host
+                # wartet die Sperrzeit ab, statt linear zu warten
+                congested = is_congested(response.status_code, response.text)
+                self.proxy_pool.record_response(proxy, url, response.status_code, time.monotonic() - start_time, congested)
+                if congested:
+                    logger.warning(f"Drosselung oder Anti-Bot-Maßnahme bei {url} (HTTP {response.status_code}, Versuch {attempt+1}/{retry_count})")
+                    self.concurrency.record_congestion(url, response.headers.get("Retry-After"))
                     self.rotate_user_agent()
-                    self.rotate_proxy()
-                    time.sleep(retry_delay * (attempt + 1))
                     continue
                 
+                # Der Server bestätigt die lokale Kopie (304 Not Modified)
+                if response.status_code == 304 and cache_entry:
+                    self.concurrency.record_success(url)
+                    self.http_cache.refresh(cache_entry, response.headers)
+                    cached = self.http_cache.response(cache_entry, revalidated=True)
+                    if cached is not None:
+                        return cached
+                    
+                    # Inhalt wurde inzwischen verdrängt: ohne Validatoren erneut anfragen
+                    headers = {name: value for name, value in headers.items() if name not in cache_entry.conditional_headers()}
+                    cache_entry = None
+                    continue
+                
+                # Prüfe auf Erfolg
+                response.raise_for_status()
+                
+                self.concurrency.record_success(url)
+                if cache_url and response.status_code == 200:
+                    self.http_cache.store(cache_url, response.headers, response.content, response.encoding)
                 return response
                 
             except requests.exceptions.RequestException as e:
                 logger.warning(f"Fehler bei Anfrage an {url}: {e} (Versuch {attempt+1}/{retry_count})")
                 self.rotate_user_agent()
-                self.rotate_proxy()
+                
+                # Ohne Antwort liegt der Fehler beim Proxy oder der Verbindung (HTTP-Fehler sind schon gemeldet)
+                if e.response is None:
+                    self.proxy_pool.record_failure(proxy, url)
+                
+                # Ein toter Proxy ist kein Grund zu warten: der nächste Versuch geht über einen anderen
+                if proxy and isinstance(e, (requests.exceptions.ProxyError, requests.exceptions.ConnectTimeout)):
+                    continue
                 time.sleep(retry_delay * (attempt + 1))
         
         logger.error(f"Alle Versuche für {url} fehlgeschlagen")
@@ -166,12 +198,25 @@ class InstagramScraper(BaseScraper):
         super().__init__(db_manager)
         self.platform_name = "Instagram"
     
-    def search_hashtag(self, hashtag):
+    def hashtag_url(self, hashtag):
+        """URL der Hashtag-Seite (Hashtag mit oder ohne #)"""
+        if hashtag.startswith("#"):
+            hashtag = hashtag[1:]
+        return f"https://www.instagram.com/explore/tags/{hashtag}/"
+    
+    def profile_url(self, profile_name):
+        """URL eines Profils (Profilname mit oder ohne @)"""
+        if profile_name.startswith("@"):
+            profile_name = profile_name[1:]
+        return f"https://www.instagram.com/{profile_name}/"
+    
+    def search_hashtag(self, hashtag, response=None):
         """
         Sucht nach einem Hashtag auf Instagram
         
         Args:
             hashtag: Der Hashtag (mit oder ohne #)
+            response: Optional, bereits geladene Antwort (z.B. von der asynchronen Engine); sonst wird die Seite geladen
             
         Returns:
             Liste von gefundenen Profilen/Posts
@@ -183,8 +228,8 @@ class InstagramScraper(BaseScraper):
         logger.info(f"Suche nach Hashtag #{hashtag} auf Instagram")
         start_time = time.time()
         
-        url = f"https://www.instagram.com/explore/tags/{hashtag}/"
-        response = self.make_request(url)
+        if response is None:
+            response = self.make_request(self.hashtag_url(hashtag))
         
         results = []
         
@@ -220,12 +265,13 @@ class InstagramScraper(BaseScraper):
         
         return results
     
-    def search_profile(self, profile_name):
+    def search_profile(self, profile_name, response=None):
         """
         Sucht nach einem Profil auf Instagram
         
         Args:
             profile_name: Der Profilname (ohne @)
+            response: Optional, bereits geladene Antwort (z.B. von der asynchronen Engine); sonst wird die Seite geladen
             
         Returns:
             Profildaten oder None
@@ -237,8 +283,8 @@ class InstagramScraper(BaseScraper):
         logger.info(f"Suche nach Profil @{profile_name} auf Instagram")
         start_time = time.time()
         
-        url = f"https://www.instagram.com/{profile_name}/"
-        response = self.make_request(url)
+        if response is None:
+            response = self.make_request(self.profile_url(profile_name))
         
         result = None
         
@@ -321,12 +367,21 @@ class FacebookScraper(BaseScraper):
         super().__init__(db_manager)
         self.platform_name = "Facebook"
     
-    def search_page(self, page_name):
+    def page_url(self, page_name):
+        """URL einer Seite"""
+        return f"https://www.facebook.com/{page_name}/"
+    
+    def keyword_url(self, keyword):
+        """URL der Suchergebnisse für ein Keyword"""
+        return f"https://www.facebook.com/search/top/?q={quote_plus(keyword)}"
+    
+    def search_page(self, page_name, response=None):
         """
         Sucht nach einer Seite auf Facebook
         
         Args:
             page_name: Der Name der Seite
+            response: Optional, bereits geladene Antwort (z.B. von der asynchronen Engine); sonst wird die Seite geladen
             
         Returns:
             Seitendaten oder None
@@ -334,8 +389,8 @@ class FacebookScraper(BaseScraper):
         logger.info(f"Suche nach Seite {page_name} auf Facebook")
         start_time = time.time()
         
-        url = f"https://www.facebook.com/{page_name}/"
-        response = self.make_request(url)
+        if response is None:
+            response = self.make_request(self.page_url(page_name))
         
         result = None
         
@@ -364,12 +419,13 @@ class FacebookScraper(BaseScraper):
         
         return result
     
-    def search_keyword(self, keyword):
+    def search_keyword(self, keyword, response=None):
         """
         Sucht nach einem Keyword auf Facebook
         
         Args:
             keyword: Das Suchbegriff
+            response: Optional, bereits geladene Antwort (z.B. von der asynchronen Engine); sonst wird die Seite geladen
             
         Returns:
             Liste von gefundenen Seiten/Posts
@@ -377,8 +433,8 @@ class FacebookScraper(BaseScraper):
         logger.info(f"Suche nach Keyword '{keyword}' auf Facebook")
         start_time = time.time()
         
-        url = f"https://www.facebook.com/search/top/?q={quote_plus(keyword)}"
-        response = self.make_request(url)
+        if response is None:
+            response = self.make_request(self.keyword_url(keyword))
         
         results = []
         
@@ -468,12 +524,25 @@ class TikTokScraper(BaseScraper):
         super().__init__(db_manager)
         self.platform_name = "TikTok"
     
-    def search_hashtag(self, hashtag):
+    def hashtag_url(self, hashtag):
+        """URL der Hashtag-Seite (Hashtag mit oder ohne #)"""
+        if hashtag.startswith("#"):
+            hashtag = hashtag[1:]
+        return f"https://www.tiktok.com/tag/{hashtag}"
+    
+    def profile_url(self, profile_name):
+        """URL eines Profils (Profilname mit oder ohne @)"""
+        if profile_name.startswith("@"):
+            profile_name = profile_name[1:]
+        return f"https://www.tiktok.com/@{profile_name}"
+    
+    def search_hashtag(self, hashtag, response=None):
         """
         Sucht nach einem Hashtag auf TikTok
         
         Args:
             hashtag: Der Hashtag (mit oder ohne #)
+            response: Optional, bereits geladene Antwort (z.B. von der asynchronen Engine); sonst wird die Seite geladen
             
         Returns:
             Liste von gefundenen Profilen/Posts
@@ -485,8 +554,8 @@ class TikTokScraper(BaseScraper):
         logger.info(f"Suche nach Hashtag #{hashtag} auf TikTok")
         start_time = time.time()
         
-        url = f"https://www.tiktok.com/tag/{hashtag}"
-        response = self.make_request(url)
+        if response is None:
+            response = self.make_request(self.hashtag_url(hashtag))
         
         results = []
         
@@ -522,12 +591,13 @@ class TikTokScraper(BaseScraper):
         
         return results
     
-    def search_profile(self, profile_name):
+    def search_profile(self, profile_name, response=None):
         """
         Sucht nach einem Profil auf TikTok
         
         Args:
             profile_name: Der Profilname (mit oder ohne @)
+            response: Optional, bereits geladene Antwort (z.B. von der asynchronen Engine); sonst wird die Seite geladen
             
         Returns:
             Profildaten oder None
@@ -539,8 +609,8 @@ class TikTokScraper(BaseScraper):
         logger.info(f"Suche nach Profil @{profile_name} auf TikTok")
         start_time = time.time()
         
-        url = f"https://www.tiktok.com/@{profile_name}"
-        response = self.make_request(url)
+        if response is None:
+            response = self.make_request(self.profile_url(profile_name))
         
         result = None
         
@@ -623,12 +693,17 @@ class GoogleScraper(BaseScraper):
         super().__init__(db_manager)
         self.platform_name = "Google"
     
-    def search_keyword(self, keyword):
+    def keyword_url(self, keyword):
+        """URL der Suchergebnisse für ein Keyword"""
+        return f"https://www.google.com/search?q={quote_plus(keyword)}"
+    
+    def search_keyword(self, keyword, response=None):
         """
         Sucht nach einem Keyword auf Google
         
         Args:
             keyword: Das Suchbegriff
+            response: Optional, bereits geladene Antwort (z.B. von der asynchronen Engine); sonst wird die Seite geladen
             
         Returns:
             Liste von gefundenen Websites
@@ -636,8 +711,8 @@ class GoogleScraper(BaseScraper):
         logger.info(f"Suche nach Keyword '{keyword}' auf Google")
         start_time = time.time()
         
-        url = f"https://www.google.com/search?q={quote_plus(keyword)}"
-        response = self.make_request(url)
+        if response is None:
+            response = self.make_request(self.keyword_url(keyword))
         
         results = []
         
@@ -706,12 +781,13 @@ class WebsiteScraper(BaseScraper):
         super().__init__(db_manager)
         self.platform_name = "Website"
     
-    def scrape_website(self, url):
+    def scrape_website(self, url, response=None):
         """
         Scrapt eine Website nach Informationen zu Hyaluron Pen Behandlungen
         
         Args:
             url: Die URL der Website
+            response: Optional, bereits geladene Antwort (z.B. von der asynchronen Engine); sonst wird die Seite geladen
             
         Returns:
             Extrahierte Informationen oder None
@@ -719,7 +795,8 @@ class WebsiteScraper(BaseScraper):
         logger.info(f"Scrape Website {url}")
         start_time = time.time()
         
-        response = self.make_request(url)
+        if response is None:
+            response = self.make_request(url)
         
         result = None
         
@@ -815,6 +892,50 @@ class MultiPlatformScraper:
         Returns:
             Dictionary mit Ergebnissen pro Plattform
         """
+        # Verwende alle Plattformen, wenn keine angegeben sind
+        if not platforms:
+            platforms = ["Instagram", "Facebook", "TikTok", "Google", "Website"]
+        
+        results = {platform: [] for platform in platforms}
+        
+        for platform, profile_data in self.iter_search(search_terms, platforms):
+            results[platform].append(profile_data)
+        
+        return results
+    
+    def iter_search(self, search_terms=None, platforms=None):
+        """
+        Führt eine Suche durch und liefert jedes Ergebnis, sobald es gefunden wurde
+        
+        Args:
+            search_terms: Liste von Suchbegriffen oder None für Standardbegriffe
+            platforms: Liste von Plattformen oder None für alle Plattformen
+            
+        Yields:
+            Tupel (Plattform, Profildaten)
+        """
+        # Führe Suche auf jeder Plattform durch
+        for platform, searches in self.plan_search(search_terms, platforms):
+            result_count = 0
+            for search, url, term in searches:
+                for profile_data in search_results(search(term)):
+                    result_count += 1
+                    yield platform, profile_data
+            
+            logger.info(f"Suche auf {platform} abgeschlossen: {result_count} Ergebnisse gefunden")
+    
+    def plan_search(self, search_terms=None, platforms=None):
+        """
+        Legt fest, welche Seiten für eine Suche geladen werden (ohne sie zu laden)
+        
+        Args:
+            search_terms: Liste von Suchbegriffen oder None für Standardbegriffe
+            platforms: Liste von Plattformen oder None für alle Plattformen
+            
+        Returns:
+            Liste von Tupeln (Plattform, Suchen); jede Suche ist ein Tupel (Suchmethode, URL, Suchbegriff).
+            Die Suchmethode liefert eine Liste, ein Ergebnis oder None (siehe search_results).
+        """
         from expanded_search_terms import get_all_search_terms, get_search_terms_for_platform
         
         # Verwende Standardsuchbegriffe, wenn keine angegeben sind
@@ -828,12 +949,8 @@ class MultiPlatformScraper:
         if not platforms:
             platforms = ["Instagram", "Facebook", "TikTok", "Google", "Website"]
         
-        results = {}
-        
-        # Führe Suche auf jeder Plattform durch
+        plan = []
         for platform in platforms:
-            platform_results = []
-            
             # Wähle plattformspezifische Suchbegriffe
             platform_terms = get_search_terms_for_platform(platform.lower())
             if not platform_terms:
@@ -844,70 +961,94 @@ class MultiPlatformScraper:
             platform_terms = platform_terms[:5]
             
             logger.info(f"Starte Suche auf {platform} mit {len(platform_terms)} Suchbegriffen")
+            plan.append((platform, self._plan_platform(platform, platform_terms)))
+            
+        return plan
             
-            if platform == "Instagram":
-                # Suche nach Hashtags
-                for term in [t for t in platform_terms if t.startswith("#")]:
-                    results_for_term = self.instagram_scraper.search_hashtag(term)
-                    platform_results.extend(results_for_term)
-                
-                # Suche nach Profilen
-                for term in [t for t in platform_terms if not t.startswith("#")]:
-                    result = self.instagram_scraper.search_profile(term)
-                    if result:
-                        platform_results.append(result)
-            
-            elif platform == "Facebook":
-                # Suche nach Seiten
-                for term in platform_terms:
-                    if " " not in term and not term.startswith("#"):
-                        result = self.facebook_scraper.search_page(term)
-                        if result:
-                            platform_results.append(result)
-                
-                # Suche nach Keywords
-                for term in [t for t in platform_terms if " " in t]:
-                    results_for_term = self.facebook_scraper.search_keyword(term)
-                    platform_results.extend(results_for_term)
-            
-            elif platform == "TikTok":
-                # Suche nach Hashtags
-                for term in [t for t in platform_terms if t.startswith("#")]:
-                    results_for_term = self.tiktok_scraper.search_hashtag(term)
-                    platform_results.extend(results_for_term)
-                
-                # Suche nach Profilen
-                for term in [t for t in platform_terms if t.startswith("@")]:
-                    result = self.tiktok_scraper.search_profile(term)
-                    if result:
-                        platform_results.append(result)
-            
-            elif platform == "Google":
-                # Suche nach Keywords
-                for term in platform_terms:
-                    if not term.startswith("#") and not term.startswith("@"):
-                        results_for_term = self.google_scraper.search_keyword(term)
-                        platform_results.extend(results_for_term)
-            
-            elif platform == "Website":
-                # Scrape Websites
-                # In einer realen Implementierung würden wir hier URLs aus den Google-Ergebnissen verwenden
-                # Für Entwicklungszwecke verwenden wir einige Beispiel-URLs
-                example_urls = [
-                    "https://kosmetik-berlin.de",
-                    "https://beauty-salon-hamburg.de",
-                    "https://hyaluron-pen-muenchen.de"
-                ]
-                
-                for url in example_urls:
-                    result = self.website_scraper.scrape_website(url)
-                    if result:
-                        platform_results.append(result)
-            
-            results[platform] = platform_results
-            logger.info(f"Suche auf {platform} abgeschlossen: {len(platform_results)} Ergebnisse gefunden")
+    def _plan_platform(self, platform, platform_terms):
+        """
+        Bestimmt die Suchen auf einer Plattform für die angegebenen Suchbegriffe
         
-        return results
+        Args:
+            platform: Name der Plattform
+            platform_terms: Liste von Suchbegriffen für diese Plattform
+            
+        Returns:
+            Liste von Tupeln (Suchmethode, URL, Suchbegriff)
+        """
+        searches = []
+        
+        if platform == "Instagram":
+            scraper = self.instagram_scraper
+            
+            # Suche nach Hashtags
+            for term in [t for t in platform_terms if t.startswith("#")]:
+                searches.append((scraper.search_hashtag, scraper.hashtag_url(term), term))
+            
+            # Suche nach Profilen
+            for term in [t for t in platform_terms if not t.startswith("#")]:
+                searches.append((scraper.search_profile, scraper.profile_url(term), term))
+        
+        elif platform == "Facebook":
+            scraper = self.facebook_scraper
+            
+            # Suche nach Seiten
+            for term in platform_terms:
+                if " " not in term and not term.startswith("#"):
+                    searches.append((scraper.search_page, scraper.page_url(term), term))
+            
+            # Suche nach Keywords
+            for term in [t for t in platform_terms if " " in t]:
+                searches.append((scraper.search_keyword, scraper.keyword_url(term), term))
+        
+        elif platform == "TikTok":
+            scraper = self.tiktok_scraper
+            
+            # Suche nach Hashtags
+            for term in [t for t in platform_terms if t.startswith("#")]:
+                searches.append((scraper.search_hashtag, scraper.hashtag_url(term), term))
+            
+            # Suche nach Profilen
+            for term in [t for t in platform_terms if t.startswith("@")]:
+                searches.append((scraper.search_profile, scraper.profile_url(term), term))
+        
+        elif platform == "Google":
+            scraper = self.google_scraper
+            
+            # Suche nach Keywords
+            for term in platform_terms:
+                if not term.startswith("#") and not term.startswith("@"):
+                    searches.append((scraper.search_keyword, scraper.keyword_url(term), term))
+        
+        elif platform == "Website":
+            # Scrape Websites
+            # In einer realen Implementierung würden wir hier URLs aus den Google-Ergebnissen verwenden
+            # Für Entwicklungszwecke verwenden wir einige Beispiel-URLs
+            example_urls = [
+                "https://kosmetik-berlin.de",
+                "https://beauty-salon-hamburg.de",
+                "https://hyaluron-pen-muenchen.de"
+            ]
+            
+            for url in example_urls:
+                searches.append((self.website_scraper.scrape_website, url, url))
+        
+        return searches
+
+
+def search_results(result):
+    """
+    Vereinheitlicht das Ergebnis einer Suchmethode
+    
+    Args:
+        result: Liste von Ergebnissen (Hashtag- und Keyword-Suchen), ein Ergebnis oder None
+        
+    Returns:
+        Liste von Profildaten
+    """
+    if isinstance(result, list):
+        return result
+    return [result] if result else []
 
 
 if __name__ == "__main__":
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# politeness.py - Anfrageraten pro Host (Token-Buckets) für die Scraper von IRI® Legal Agent
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from urllib.parse import urlparse
+
+logger = logging.getLogger("politeness")
+
+# Anfragen pro Sekunde und Burst je Plattform: streng für die großen Plattformen, großzügig für
+# unabhängige Studio-Websites (jede Domain hat ihren eigenen Bucket)
+DEFAULT_PLATFORM_RATES = {
+    "Instagram": (0.25, 1),
+    "Facebook": (0.5, 1),
+    "TikTok": (0.5, 1),
+    "Google": (0.5, 2),
+    "Website": (1.0, 3)
+}
+
+# Rate für Hosts, deren Plattform nicht konfiguriert ist
+DEFAULT_RATE = (0.5, 1)
+
+# Abweichende Raten, z.B. "Instagram=0.2:1,Website=2:4" (Anfragen pro Sekunde, optional :Burst)
+SCRAPER_RATE_LIMITS = os.getenv("SCRAPER_RATE_LIMITS", "")
+
+
+def parse_rate_limits(value):
+    """
+    Liest Raten im Format "Plattform=Anfragen pro Sekunde[:Burst]", durch Kommas getrennt
+    
+    Args:
+        value: Zeichenkette, z.B. aus SCRAPER_RATE_LIMITS
+        
+    Returns:
+        Dictionary Plattform -> (Rate, Burst)
+        
+    Raises:
+        ValueError: Wenn ein Eintrag nicht dem Format entspricht oder die Rate nicht positiv ist
+    """
+    rates = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        
+        platform, separator, rate = entry.partition("=")
+        if not separator or not platform.strip():
+            raise ValueError(f"Ungültige Rate {entry.strip()!r}, erwartet Plattform=Anfragen pro Sekunde[:Burst]")
+        
+        rate, _, burst = rate.partition(":")
+        rate, burst = float(rate), int(burst or 1)
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"Rate und Burst für {platform.strip()} müssen positiv sein")
+        rates[platform.strip()] = (rate, burst)
+    
+    return rates
+
+
+def host_of(url):
+    """Host einer URL ohne 'www.' (instagram.com und www.instagram.com teilen sich einen Bucket)"""
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class TokenBucket:
+    """Token-Bucket für einen Host: im Mittel höchstens `rate` Anfragen pro Sekunde, bis zu `burst` am Stück
+    
+    Wer eine Anfrage stellen will, reserviert ein Token und erfährt, wie lange er bis dahin warten muss.
+    Der Bestand darf negativ werden, sodass sich Wartende in der Reihenfolge ihrer Reservierung
+    einreihen, ohne dass jemand pollen muss.
+    """
+    
+    def __init__(self, rate, burst=1):
+        """
+        Initialisiert einen vollen TokenBucket
+        
+        Args:
+            rate: Anfragen pro Sekunde
+            burst: Maximale Anzahl von Anfragen ohne Wartezeit
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self):
+        """
+        Reserviert ein Token
+        
+        Returns:
+            Wartezeit in Sekunden, bis die Anfrage gestellt werden darf (0, wenn sofort)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class PolitenessScheduler:
+    """Verteilt Anfragen auf einen TokenBucket pro Host
+    
+    Anfragen an verschiedene Hosts warten nicht aufeinander; jeder Host bleibt innerhalb der Rate
+    der Plattform, über die er zuerst angefragt wurde. Alle Scraper eines Prozesses teilen sich
+    einen Scheduler (siehe get_politeness_scheduler), damit parallele Scraper ein Limit nicht
+    mehrfach ausschöpfen.
+    """
+    
+    def __init__(self, platform_rates=None):
+        """
+        Initialisiert den PolitenessScheduler
+        
+        Args:
+            platform_rates: Optional, Dictionary Plattform -> (Rate, Burst); nicht angegebene Plattformen
+                            verwenden DEFAULT_PLATFORM_RATES
+        """
+        self.platform_rates = dict(DEFAULT_PLATFORM_RATES)
+        self.platform_rates.update(platform_rates or {})
+        self._buckets = {}
+        self._lock = threading.Lock()
+    
+    def rate_for(self, platform):
+        """(Rate, Burst) für eine Plattform"""
+        return self.platform_rates.get(platform, DEFAULT_RATE)
+    
+    def bucket(self, url, platform=None):
+        """
+        Gibt den TokenBucket des Hosts einer URL zurück (wird beim ersten Zugriff angelegt)
+        
+        Args:
+            url: Die URL der Anfrage
+            platform: Optional, Plattform, deren Rate für einen neuen Host gilt
+            
+        Returns:
+            TokenBucket-Objekt
+        """
+        host = host_of(url)
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    bucket = self._buckets[host] = TokenBucket(*self.rate_for(platform))
+        return bucket
+    
+    def wait(self, url, platform=None):
+        """
+        Blockiert, bis eine Anfrage an den Host der URL gestellt werden darf
+        
+        Args:
+            url: Die URL der Anfrage
+            platform: Optional, Plattform des Scrapers (bestimmt die Rate)
+            
+        Returns:
+            Gewartete Zeit in Sekunden
+        """
+        delay = self.bucket(url, platform).reserve()
+        if delay > 0:
+            logger.debug(f"Warte {delay:.2f}s vor Anfrage an {host_of(url)}")
+            time.sleep(delay)
+        return delay
+    
+    async def wait_async(self, url, platform=None):
+        """
+        Wartet in der Event-Loop, bis eine Anfrage an den Host der URL gestellt werden darf
+        
+        Args:
+            url: Die URL der Anfrage
+            platform: Optional, Plattform des Scrapers (bestimmt die Rate)
+            
+        Returns:
+            Gewartete Zeit in Sekunden
+        """
+        delay = self.bucket(url, platform).reserve()
+        if delay > 0:
+            logger.debug(f"Warte {delay:.2f}s vor Anfrage an {host_of(url)}")
+            await asyncio.sleep(delay)
+        return delay
+
+
+# Ein Scheduler pro Prozess, damit alle Scraper dieselben Buckets verwenden
+_politeness_scheduler = None
+_politeness_scheduler_lock = threading.Lock()
+
+
+def get_politeness_scheduler():
+    """
+    Gibt den gemeinsam genutzten PolitenessScheduler zurück (Raten aus SCRAPER_RATE_LIMITS)
+    
+    Returns:
+        PolitenessScheduler-Objekt
+    """
+    global _politeness_scheduler
+    
+    if _politeness_scheduler is None:
+        with _politeness_scheduler_lock:
+            if _politeness_scheduler is None:
+                _politeness_scheduler = PolitenessScheduler(parse_rate_limits(SCRAPER_RATE_LIMITS))
+    
+    return _politeness_scheduler
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# proxy_pool.py - Proxy-Pool mit Gesundheitsbewertung und Circuit-Breakern für die Scraper von IRI® Legal Agent
+
+import os
+import time
+import random
+import logging
+import threading
+from urllib.parse import urlparse
+
+from politeness import host_of
+
+logger = logging.getLogger("proxy_pool")
+
+# Aufeinanderfolgende Fehlschläge, nach denen ein Proxy (oder ein Proxy für einen Host) gesperrt wird
+PROXY_FAILURE_THRESHOLD = int(os.getenv("PROXY_FAILURE_THRESHOLD", "3"))
+
+# Sperrzeit in Sekunden, bevor ein gesperrter Proxy mit einer einzelnen Probeanfrage getestet wird
+# (verdoppelt sich bei jeder fehlgeschlagenen Probe)
+PROXY_OPEN_TIMEOUT = float(os.getenv("PROXY_OPEN_TIMEOUT", "60"))
+
+# Längste Sperrzeit eines Proxys in Sekunden
+PROXY_MAX_OPEN_TIMEOUT = float(os.getenv("PROXY_MAX_OPEN_TIMEOUT", "1800"))
+
+# Gewicht der jüngsten Anfrage in den gleitenden Mittelwerten von Erfolgsquote und Latenz
+HEALTH_DECAY = 0.2
+
+# Eine Probeanfrage, die nach dieser Zeit nicht gemeldet wurde, gilt als verloren
+PROBE_TIMEOUT = 60.0
+
+# Statuscodes, mit denen ein Zielhost einen Proxy abweist
+PROXY_BAN_STATUS_CODES = (403,)
+
+# Statuscodes, die auf einen Fehler des Proxys selbst hinweisen
+PROXY_FAILURE_STATUS_CODES = (407, 502, 504)
+
+# Zustände eines Circuit-Breakers
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def load_proxies():
+    """
+    Lädt Proxies aus der Umgebungsvariable PROXY_LIST (durch Kommas getrennt) oder aus proxies.txt
+    
+    Returns:
+        Liste von Proxy-URLs (leer, wenn keine Proxies konfiguriert sind)
+    """
+    proxy_list = os.getenv("PROXY_LIST")
+    if proxy_list:
+        return [proxy.strip() for proxy in proxy_list.split(",") if proxy.strip()]
+    
+    if os.path.exists("proxies.txt"):
+        with open("proxies.txt", "r") as f:
+            return [line.strip() for line in f if line.strip()]
+    
+    return []
+
+
+def proxy_label(proxy):
+    """Proxy ohne Zugangsdaten für Logs und Statistiken"""
+    parsed = urlparse(proxy)
+    if not parsed.hostname:
+        return proxy
+    return f"{parsed.hostname}:{parsed.port}" if parsed.port else parsed.hostname
+
+
+class ProxyHealth:
+    """Gesundheit eines Proxys (insgesamt oder für einen Zielhost) mit Circuit-Breaker
+    
+    Nach failure_threshold Fehlschlägen in Folge öffnet der Breaker: der Proxy wird bis open_until nicht
+    verwendet. Danach ist er halb offen und bekommt genau eine Probeanfrage. Gelingt sie, schließt der
+    Breaker; schlägt sie fehl, öffnet er erneut mit doppelter Sperrzeit.
+    """
+    
+    __slots__ = ("success_rate", "latency", "requests", "failures", "bans", "consecutive_failures",
+                 "state", "open_until", "open_count", "probe_started")
+    
+    def __init__(self):
+        self.success_rate = 1.0
+        self.latency = None
+        self.requests = 0
+        self.failures = 0
+        self.bans = 0
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.open_until = 0.0
+        self.open_count = 0
+        self.probe_started = None
+    
+    def available(self, now):
+        """
+        Prüft, ob der Proxy verwendet werden darf
+        
+        Args:
+            now: Aktuelle Zeit (time.monotonic)
+            
+        Returns:
+            CLOSED für normale Anfragen, HALF_OPEN, wenn eine Probeanfrage fällig ist, sonst None
+        """
+        if self.state == CLOSED:
+            return CLOSED
+        if now < self.open_until:
+            return None
+        if self.probe_started is not None and now - self.probe_started < PROBE_TIMEOUT:
+            return None
+        return HALF_OPEN
+    
+    def record_success(self, latency=None):
+        """Meldet eine erfolgreiche Anfrage (schließt den Breaker)"""
+        self.requests += 1
+        self.success_rate += HEALTH_DECAY * (1.0 - self.success_rate)
+        if latency is not None:
+            self.latency = latency if self.latency is None else self.latency + HEALTH_DECAY * (latency - self.latency)
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.open_count = 0
+        self.probe_started = None
+    
+    def record_failure(self, now, threshold, open_timeout, max_open_timeout):
+        """
+        Meldet einen Fehlschlag (öffnet den Breaker ab threshold Fehlschlägen in Folge oder nach einer fehlgeschlagenen Probe)
+        
+        Returns:
+            True, wenn der Breaker dadurch geöffnet wurde
+        """
+        self.requests += 1
+        self.success_rate -= HEALTH_DECAY * self.success_rate
+        self.consecutive_failures += 1
+        self.probe_started = None
+        
+        if self.state == CLOSED and self.consecutive_failures < threshold:
+            return False
+        
+        # Anfragen, die beim Öffnen schon unterwegs waren, verlängern die Sperrzeit nicht
+        if self.state == OPEN and now < self.open_until:
+            return False
+        
+        self.state = OPEN
+        self.open_until = now + min(open_timeout * 2 ** self.open_count, max_open_timeout)
+        self.open_count += 1
+        return True
+
+
+class ProxyPool:
+    """Wählt für jede Anfrage einen gesunden Proxy aus
+    
+    Erfolgsquote und Latenz werden pro Proxy und zusätzlich pro Proxy und Zielhost geführt: Verbindungsfehler
+    betreffen den Proxy insgesamt, Sperren (403, 429, Captcha) nur den Host, der ihn abgewiesen hat. Aus den
+    verfügbaren Proxies werden zwei zufällig gezogen und der gesündere verwendet; so meiden Anfragen schwache
+    Proxies, ohne dass alle auf denselben Proxy gehen. Fällige Probeanfragen gesperrter Proxies haben Vorrang.
+    Alle Scraper eines Prozesses teilen sich einen Pool (siehe get_proxy_pool).
+    """
+    
+    def __init__(self, proxies=None, failure_threshold=None, open_timeout=None, max_open_timeout=None):
+        """
+        Initialisiert den ProxyPool
+        
+        Args:
+            proxies: Optional, Liste von Proxy-URLs (Standard: keine, Anfragen gehen direkt)
+            failure_threshold: Optional, Fehlschläge in Folge bis zur Sperre (Standard: PROXY_FAILURE_THRESHOLD)
+            open_timeout: Optional, erste Sperrzeit in Sekunden (Standard: PROXY_OPEN_TIMEOUT)
+            max_open_timeout: Optional, längste Sperrzeit in Sekunden (Standard: PROXY_MAX_OPEN_TIMEOUT)
+        """
+        self.proxies = list(proxies or [])
+        self.failure_threshold = failure_threshold or PROXY_FAILURE_THRESHOLD
+        self.open_timeout = open_timeout or PROXY_OPEN_TIMEOUT
+        self.max_open_timeout = max_open_timeout or PROXY_MAX_OPEN_TIMEOUT
+        self._health = {proxy: ProxyHealth() for proxy in self.proxies}
+        self._host_health = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.proxies)
+    
+    def _for_host(self, proxy, host):
+        """Gesundheit eines Proxys für einen Zielhost (muss unter self._lock aufgerufen werden)"""
+        key = (proxy, host)
+        if key not in self._host_health:
+            self._host_health[key] = ProxyHealth()
+        return self._host_health[key]
+    
+    def _score(self, proxy, host):
+        """Bewertung eines Proxys für einen Host: Erfolgsquote geteilt durch Latenz (muss unter self._lock aufgerufen werden)"""
+        health = self._health[proxy]
+        host_health = self._for_host(proxy, host)
+        latency = host_health.latency if host_health.latency is not None else health.latency
+        return health.success_rate * host_health.success_rate / (1.0 + (latency or 0.0))
+    
+    def acquire(self, url):
+        """
+        Wählt einen Proxy für eine Anfrage (das Ergebnis muss mit record_response oder record_failure gemeldet werden)
+        
+        Args:
+            url: Die URL der Anfrage
+            
+        Returns:
+            Proxy-URL oder None, wenn keine Proxies konfiguriert sind
+        """
+        if not self.proxies:
+            return None
+        
+        host = host_of(url)
+        now = time.monotonic()
+        with self._lock:
+            candidates = []
+            for proxy in self.proxies:
+                states = (self._health[proxy].available(now), self._for_host(proxy, host).available(now))
+                if None in states:
+                    continue
+                
+                # Fällige Probe: genau eine Anfrage testet, ob der Proxy wieder funktioniert
+                if HALF_OPEN in states:
+                    for health, state in zip((self._health[proxy], self._for_host(proxy, host)), states):
+                        if state == HALF_OPEN:
+                            health.state = HALF_OPEN
+                            health.probe_started = now
+                    logger.debug(f"Probeanfrage über {proxy_label(proxy)} an {host}")
+                    return proxy
+                
+                candidates.append(proxy)
+            
+            # Alle Proxies gesperrt: der am besten bewertete wird trotzdem verwendet, statt ohne Proxy anzufragen
+            if not candidates:
+                return max(self.proxies, key=lambda proxy: self._score(proxy, host))
+            
+            sample = random.sample(candidates, min(2, len(candidates)))
+            return max(sample, key=lambda proxy: self._score(proxy, host))
+    
+    def record_response(self, proxy, url, status_code, latency=None, congested=False):
+        """
+        Meldet eine Antwort, die über einen Proxy empfangen wurde
+        
+        Args:
+            proxy: Proxy-URL aus acquire (None wird ignoriert)
+            url: Die URL der Anfrage
+            status_code: HTTP-Statuscode
+            latency: Optional, Dauer der Anfrage in Sekunden
+            congested: True, wenn die Antwort auf Drosselung oder Anti-Bot-Maßnahmen hinweist
+        """
+        if proxy is None:
+            return
+        
+        if congested or status_code in PROXY_BAN_STATUS_CODES:
+            self.record_ban(proxy, url)
+        elif status_code in PROXY_FAILURE_STATUS_CODES:
+            self.record_failure(proxy, url)
+        else:
+            self.record_success(proxy, url, latency)
+    
+    def record_success(self, proxy, url, latency=None):
+        """
+        Meldet eine erfolgreiche Anfrage über einen Proxy
+        
+        Args:
+            proxy: Proxy-URL aus acquire (None wird ignoriert)
+            url: Die URL der Anfrage
+            latency: Optional, Dauer der Anfrage in Sekunden
+        """
+        if proxy is None:
+            return
+        
+        with self._lock:
+            health = self._health[proxy]
+            if health.state != CLOSED:
+                logger.info(f"Proxy {proxy_label(proxy)} wieder verfügbar")
+            health.record_success(latency)
+            self._for_host(proxy, host_of(url)).record_success(latency)
+    
+    def record_ban(self, proxy, url):
+        """
+        Meldet, dass der Zielhost einen Proxy abgewiesen hat (403, 429, Captcha); der Proxy bleibt für andere Hosts verfügbar
+        
+        Args:
+            proxy: Proxy-URL aus acquire (None wird ignoriert)
+            url: Die URL der Anfrage
+        """
+        if proxy is None:
+            return
+        
+        host = host_of(url)
+        with self._lock:
+            # Der Proxy selbst hat geantwortet; eine fällige Probe für den Proxy ist damit bestanden
+            health = self._health[proxy]
+            if health.state == HALF_OPEN:
+                health.record_success()
+            
+            host_health = self._for_host(proxy, host)
+            host_health.bans += 1
+            if host_health.record_failure(time.monotonic(), self.failure_threshold, self.open_timeout, self.max_open_timeout):
+                logger.info(f"Proxy {proxy_label(proxy)} für {host} gesperrt ({host_health.consecutive_failures} Sperren in Folge)")
+    
+    def record_failure(self, proxy, url):
+        """
+        Meldet einen Fehler des Proxys selbst (Verbindungsfehler, Zeitüberschreitung, 407, 502, 504)
+        
+        Args:
+            proxy: Proxy-URL aus acquire (None wird ignoriert)
+            url: Die URL der Anfrage
+        """
+        if proxy is None:
+            return
+        
+        now = time.monotonic()
+        with self._lock:
+            health = self._health[proxy]
+            health.failures += 1
+            host_health = self._for_host(proxy, host_of(url))
+            host_health.failures += 1
+            
+            # Eine fehlgeschlagene Probe für den Host öffnet auch dessen Breaker wieder
+            if host_health.state == HALF_OPEN:
+                host_health.record_failure(now, self.failure_threshold, self.open_timeout, self.max_open_timeout)
+            
+            if health.record_failure(now, self.failure_threshold, self.open_timeout, self.max_open_timeout):
+                logger.warning(f"Proxy {proxy_label(proxy)} gesperrt für {health.open_until - now:.0f}s ({health.consecutive_failures} Fehler in Folge)")
+    
+    def get_statistics(self):
+        """
+        Gibt den Zustand aller Proxies zurück
+        
+        Returns:
+            Dictionary Proxy (ohne Zugangsdaten) -> Zustand, Erfolgsquote, Latenz, Fehler, Sperren und gesperrte Hosts
+        """
+        now = time.monotonic()
+        with self._lock:
+            statistics = {}
+            for proxy, health in self._health.items():
+                statistics[proxy_label(proxy)] = {
+                    "state": health.state,
+                    "success_rate": round(health.success_rate, 3),
+                    "latency": round(health.latency, 3) if health.latency is not None else None,
+                    "requests": health.requests,
+                    "failures": health.failures,
+                    "bans": sum(host_health.bans for (other, host), host_health in self._host_health.items() if other == proxy),
+                    "blocked_hosts": sorted(
+                        host for (other, host), host_health in self._host_health.items()
+                        if other == proxy and host_health.available(now) is None
+                    )
+                }
+            return statistics
+
+
+# Ein Pool pro Prozess, damit alle Scraper die Gesundheit der Proxies teilen
+_proxy_pool = None
+_proxy_pool_lock = threading.Lock()
+
+
+def get_proxy_pool():
+    """
+    Gibt den gemeinsam genutzten ProxyPool zurück (Proxies aus PROXY_LIST oder proxies.txt)
+    
+    Returns:
+        ProxyPool-Objekt
+    """
+    global _proxy_pool
+    
+    if _proxy_pool is None:
+        with _proxy_pool_lock:
+            if _proxy_pool is None:
+                _proxy_pool = ProxyPool(load_proxies())
+                if _proxy_pool.proxies:
+                    logger.info(f"{len(_proxy_pool)} Proxies geladen")
+    
+    return _proxy_pool
@@ -0,0 +1,746 @@
+#!/usr/bin/env python3
+# risk_model.py - Gelerntes Risikomodell (logistische Regression über gehashte Merkmale) für IRI® Legal Agent
+
+import os
+import re
+import json
+import zlib
+import time
+import random
+import hashlib
+import logging
+import atexit
+import argparse
+import threading
+import weakref
+from datetime import datetime
+
+import numpy as np
+
+logger = logging.getLogger("risk_model")
+
+# Gespeichertes Modell; existiert die Datei, ersetzt das Modell den regelbasierten Risiko-Score von Profilen
+RISK_MODEL_FILE = os.getenv("RISK_MODEL_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "risk_model.npz"))
+
+# Anzahl der Hash-Bits (2^20 Gewichte = 4 MB, unabhängig von der Größe des Vokabulars)
+HASH_BITS = int(os.getenv("RISK_MODEL_HASH_BITS", "20"))
+
+# Anzahl der Rückmeldungen, die in einem SGD-Schritt übernommen werden
+ONLINE_BATCH_SIZE = int(os.getenv("RISK_MODEL_ONLINE_BATCH_SIZE", "8"))
+
+# Lernrate der Aktualisierungen aus Rückmeldungen
+ONLINE_LEARNING_RATE = float(os.getenv("RISK_MODEL_ONLINE_LEARNING_RATE", "0.1"))
+
+# Abstand in Sekunden, in dem geprüft wird, ob ein anderer Prozess einen neueren Checkpoint geschrieben hat
+ONLINE_SYNC_INTERVAL = float(os.getenv("RISK_MODEL_SYNC_INTERVAL", "30"))
+
+# Maximale Anzahl zwischengespeicherter Merkmal-Hashes (häufige Tokens werden nur einmal gehasht)
+FEATURE_CACHE_SIZE = 200000
+
+# Meldungsstatus, mit denen eine Behörde einen Verdacht zurückgewiesen hat (negatives Trainingsbeispiel)
+REJECTED_REPORT_STATUSES = {"rejected", "dismissed", "unfounded", "abgelehnt", "unbegründet", "eingestellt"}
+
+# Meldungsstatus, mit dem ein Ermittler einen Verdacht bestätigt hat (positives Trainingsbeispiel)
+CONFIRMED_REPORT_STATUS = "confirmed"
+
+# Tokens und Hashtags (Kleinschreibung; Hashtags werden zusätzlich als eigenes Merkmal gezählt)
+_TOKEN_PATTERN = re.compile(r'[^\W\d_]{2,}')
+_HASHTAG_PATTERN = re.compile(r'#\w+')
+
+# Lebende OnlineRiskTrainer; ihre unvollständigen Mini-Batches werden beim Beenden des Prozesses übernommen
+_active_trainers = weakref.WeakSet()
+
+
+def label_for(is_reported, report_statuses):
+    """
+    Bestimmt das Trainingslabel eines Profils aus Meldestatus und Status der Meldungen
+    
+    Maßgeblich ist die jüngste Meldung: eine spätere Bestätigung überstimmt eine frühere
+    Zurückweisung und umgekehrt.
+    
+    Args:
+        is_reported: Ob das Profil gemeldet wurde
+        report_statuses: Liste der Status aller Meldungen zum Profil, älteste zuerst
+        
+    Returns:
+        1 (Angebot bestätigt), 0 (Verdacht zurückgewiesen) oder None (unbekannt)
+    """
+    if report_statuses:
+        return 0 if (report_statuses[-1] or "").strip().lower() in REJECTED_REPORT_STATUSES else 1
+    if is_reported:
+        return 1
+    return None
+
+
+class FeatureHasher:
+    """Bildet Tokens, Hashtags, Preisangaben, Orte und Treffer auf einen festen Merkmalsraum ab (Hashing-Trick)
+    
+    Der Index eines Merkmals sind die unteren Bits seines CRC32, ein weiteres Bit bestimmt das
+    Vorzeichen, damit sich Kollisionen im Mittel aufheben. CRC32 ist im Gegensatz zu hash()
+    prozessübergreifend stabil, ein gespeichertes Modell passt daher zu jedem Worker.
+    """
+    
+    def __init__(self, n_bits=HASH_BITS):
+        """
+        Initialisiert den FeatureHasher
+        
+        Args:
+            n_bits: Anzahl der Hash-Bits (höchstens 30)
+        """
+        if not 1 <= n_bits <= 30:
+            raise ValueError("n_bits muss zwischen 1 und 30 liegen")
+        
+        self.n_bits = n_bits
+        self.n_features = 1 << n_bits
+        self._mask = self.n_features - 1
+        self._cache = {}
+    
+    def _encode(self, feature):
+        """Kodiert Index und Vorzeichen eines Merkmals in einer Zahl (Index * 2 + Vorzeichenbit)"""
+        value = zlib.crc32(feature.encode("utf-8"))
+        return ((value & self._mask) << 1) | (value >> 31)
+    
+    def _cached_code(self, key, feature):
+        """Kodiert ein Merkmal und legt es im Cache ab"""
+        code = self._encode(feature)
+        if len(self._cache) >= FEATURE_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[key] = code
+        return code
+    
+    def hash_feature(self, feature):
+        """
+        Berechnet Index und Vorzeichen eines Merkmals
+        
+        Args:
+            feature: Merkmal als Text, z.B. 't:lippen' oder 'h:hyaluronpen'
+            
+        Returns:
+            Tupel (Index, Vorzeichen)
+        """
+        code = self._encode(feature)
+        return code >> 1, 1.0 if code & 1 else -1.0
+    
+    def text_codes(self, text):
+        """
+        Kodiert Tokens ('t:...') und Hashtags ('h:...') eines Textes
+        
+        Args:
+            text: Kombinierter Profiltext (Beschreibung und Post)
+            
+        Returns:
+            Liste kodierter Merkmale
+        """
+        text = (text or "").lower()
+        cache = self._cache
+        
+        # Cache-Schlüssel ohne Präfix: Tokens bestehen nur aus Buchstaben, Hashtags beginnen mit '#'
+        codes = [
+            cache[token] if token in cache else self._cached_code(token, "t:" + token)
+            for token in _TOKEN_PATTERN.findall(text)
+        ]
+        codes.extend(
+            cache[hashtag] if hashtag in cache else self._cached_code(hashtag, "h:" + hashtag[1:])
+            for hashtag in _HASHTAG_PATTERN.findall(text)
+        )
+        return codes
+    
+    def analysis_features(self, analysis):
+        """
+        Bildet Preisangabe, Orte, Kontaktdaten und Keyword-Treffer eines Analyseergebnisses auf Merkmale ab
+        
+        Args:
+            analysis: AnalysisResult bzw. Dictionary mit prices, locations, emails, phones und keyword_hit_count
+            
+        Returns:
+            Liste von Merkmalen, z.B. ['p:price', 'l:berlin', 'c:contact', 'k:1']
+        """
+        features = []
+        if analysis.get("prices"):
+            features.append("p:price")
+        
+        locations = analysis.get("locations")
+        if locations:
+            features.extend("l:" + location.lower() for location in locations)
+        else:
+            features.append("l:none")
+        
+        if analysis.get("emails") or analysis.get("phones"):
+            features.append("c:contact")
+        
+        keyword_hit_count = analysis.get("keyword_hit_count")
+        if keyword_hit_count:
+            features.append("k:" + str(min(keyword_hit_count, 3)))
+        
+        return features
+    
+    def transform(self, texts, analyses=None):
+        """
+        Erstellt die dünn besetzte Merkmalsmatrix eines Batches im Koordinatenformat
+        
+        Tokens und Hashtags werden mit 1/sqrt(Anzahl) gewichtet, damit lange Texte nicht allein durch
+        ihre Länge ein höheres Risiko erhalten; Merkmale aus dem Analyseergebnis mit 1.
+        
+        Args:
+            texts: Liste von Profiltexten
+            analyses: Optional, Liste der zugehörigen Analyseergebnisse
+            
+        Returns:
+            Tupel (Zeilen, Spalten, Werte) als NumPy-Arrays
+        """
+        cache = self._cache
+        codes = []
+        segment_lengths = []
+        segment_scales = []
+        
+        for row, text in enumerate(texts):
+            text_codes = self.text_codes(text)
+            analysis_codes = [
+                cache[feature] if feature in cache else self._cached_code(feature, feature)
+                for feature in self.analysis_features(analyses[row])
+            ] if analyses is not None else []
+            
+            codes.extend(text_codes)
+            codes.extend(analysis_codes)
+            segment_lengths.extend((len(text_codes), len(analysis_codes)))
+            segment_scales.extend((1.0 / max(len(text_codes), 1) ** 0.5, 1.0))
+        
+        codes = np.array(codes, dtype=np.int64)
+        row_lengths = np.array(segment_lengths, dtype=np.int64).reshape(-1, 2).sum(axis=1)
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), row_lengths)
+        values = np.repeat(np.array(segment_scales), segment_lengths) * np.where(codes & 1, 1.0, -1.0)
+        
+        return rows, codes >> 1, values
+
+
+class LogisticRiskModel:
+    """Logistische Regression über gehashte Merkmale mit Batch-Inferenz über NumPy
+    
+    Ein Batch wird als dünn besetzte Matrix im Koordinatenformat aufgebaut und mit einem
+    einzigen Produkt (Gewichte[Spalten] * Werte, per bincount zeilenweise summiert) bewertet.
+    Der Speicherbedarf ist unabhängig vom Vokabular fest (2^n_bits Gewichte).
+    """
+    
+    def __init__(self, n_bits=HASH_BITS, weights=None, bias=0.0, metadata=None):
+        """
+        Initialisiert das Modell
+        
+        Args:
+            n_bits: Anzahl der Hash-Bits
+            weights: Optional, Gewichtsvektor der Länge 2^n_bits (Standard: Nullen)
+            bias: Optional, Achsenabschnitt
+            metadata: Optional, Dictionary mit Angaben zum Training
+        """
+        self.hasher = FeatureHasher(n_bits)
+        self.weights = np.zeros(self.hasher.n_features, dtype=np.float32) if weights is None else np.asarray(weights, dtype=np.float32)
+        self.bias = float(bias)
+        self.metadata = metadata or {}
+        
+        if len(self.weights) != self.hasher.n_features:
+            raise ValueError(f"Gewichtsvektor hat {len(self.weights)} statt {self.hasher.n_features} Einträge")
+        
+        self.fingerprint = self._compute_fingerprint()
+    
+    def _compute_fingerprint(self):
+        """Hash über Gewichte und Achsenabschnitt (Teil des Cache-Schlüssels)"""
+        digest = hashlib.sha1(self.weights.tobytes())
+        digest.update(repr(self.bias).encode("utf-8"))
+        return digest.hexdigest()[:8]
+    
+    def decision_function(self, texts, analyses=None):
+        """
+        Berechnet die Logits eines Batches
+        
+        Args:
+            texts: Liste von Profiltexten
+            analyses: Optional, Liste der zugehörigen Analyseergebnisse
+            
+        Returns:
+            NumPy-Array der Logits
+        """
+        rows, columns, values = self.hasher.transform(texts, analyses)
+        return self._logits(rows, columns, values, len(texts), self.weights, self.bias)
+    
+    @staticmethod
+    def _logits(rows, columns, values, count, weights, bias):
+        """Produkt aus dünn besetzter Merkmalsmatrix und Gewichtsvektor plus Achsenabschnitt"""
+        return np.bincount(rows, weights=weights[columns] * values, minlength=count) + bias
+    
+    def predict_proba(self, texts, analyses=None):
+        """
+        Berechnet die Wahrscheinlichkeit eines Angebots für einen Batch
+        
+        Args:
+            texts: Liste von Profiltexten
+            analyses: Optional, Liste der zugehörigen Analyseergebnisse
+            
+        Returns:
+            NumPy-Array mit Wahrscheinlichkeiten zwischen 0 und 1
+        """
+        return _sigmoid(self.decision_function(texts, analyses))
+    
+    def risk_scores(self, texts, analyses=None):
+        """
+        Berechnet Risiko-Scores (0-100) für einen Batch
+        
+        Args:
+            texts: Liste von Profiltexten
+            analyses: Optional, Liste der zugehörigen Analyseergebnisse
+            
+        Returns:
+            Liste von Risiko-Scores
+        """
+        if not texts:
+            return []
+        return (self.predict_proba(texts, analyses) * 100.0).tolist()
+    
+    def fit(self, texts, labels, analyses=None, epochs=200, learning_rate=0.5, l2=1e-4, balanced=True):
+        """
+        Trainiert das Modell mit AdaGrad über den gesamten Batch
+        
+        Jede Epoche besteht aus einem Produkt für die Vorhersagen und einem bincount für den
+        Gradienten; seltene Merkmale erhalten durch AdaGrad größere Schritte.
+        
+        Args:
+            texts: Liste von Profiltexten
+            labels: Liste von Labels (1 = Angebot, 0 = kein Angebot)
+            analyses: Optional, Liste der zugehörigen Analyseergebnisse
+            epochs: Anzahl der Epochen
+            learning_rate: Lernrate
+            l2: L2-Regularisierung
+            balanced: Ob beide Klassen unabhängig von ihrer Häufigkeit gleich gewichtet werden
+            
+        Returns:
+            Das Modell selbst
+        """
+        labels = np.asarray(labels, dtype=np.float64)
+        if len(labels) != len(texts):
+            raise ValueError("Anzahl der Texte und Labels unterscheidet sich")
+        if len(set(labels.tolist())) < 2:
+            raise ValueError("Trainingsdaten müssen beide Klassen enthalten")
+        
+        rows, columns, values = self.hasher.transform(texts, analyses)
+        count = len(labels)
+        
+        sample_weights = np.ones(count)
+        if balanced:
+            positives = labels.sum()
+            sample_weights = np.where(labels == 1, count / (2 * positives), count / (2 * (count - positives)))
+        
+        # Nur Spalten mit Merkmalen werden aktualisiert; der Rest des Vektors bleibt unverändert
+        active, inverse = np.unique(columns, return_inverse=True)
+        weights = self.weights[active].astype(np.float64)
+        bias = self.bias
+        squared_gradients = np.full(len(active), 1e-8)
+        squared_bias_gradient = 1e-8
+        
+        for _ in range(epochs):
+            errors = (_sigmoid(self._logits(rows, inverse, values, count, weights, bias)) - labels) * sample_weights
+            gradient = np.bincount(inverse, weights=errors[rows] * values, minlength=len(active)) / count + l2 * weights
+            bias_gradient = errors.mean()
+            
+            squared_gradients += gradient ** 2
+            squared_bias_gradient += bias_gradient ** 2
+            weights -= learning_rate * gradient / np.sqrt(squared_gradients)
+            bias -= learning_rate * bias_gradient / squared_bias_gradient ** 0.5
+        
+        self.weights[active] = weights
+        self.bias = float(bias)
+        self.metadata = {
+            "trained_at": datetime.now().isoformat(),
+            "samples": count,
+            "positives": int(labels.sum()),
+            "active_features": int(len(active)),
+            "epochs": epochs
+        }
+        self.fingerprint = self._compute_fingerprint()
+        return self
+    
+    def partial_fit(self, texts, labels, analyses=None, learning_rate=ONLINE_LEARNING_RATE, l2=1e-4):
+        """
+        Aktualisiert das Modell mit einem Mini-Batch neuer Labels (ein SGD-Schritt)
+        
+        Nur die Gewichte der im Batch vorkommenden Merkmale ändern sich; der Aufwand hängt allein
+        von der Größe des Batches ab, nicht von der Anzahl bisheriger Labels. Der Gewichtsvektor
+        wird als Kopie aktualisiert und dann ausgetauscht, damit gleichzeitige Bewertungen keinen
+        halb aktualisierten Zustand sehen.
+        
+        Args:
+            texts: Liste von Profiltexten
+            labels: Liste von Labels (1 = Angebot, 0 = kein Angebot)
+            analyses: Optional, Liste der zugehörigen Analyseergebnisse
+            learning_rate: Optional, Lernrate
+            l2: Optional, L2-Regularisierung
+            
+        Returns:
+            Mittlerer Log-Loss des Batches vor der Aktualisierung
+        """
+        labels = np.asarray(labels, dtype=np.float64)
+        if len(labels) != len(texts):
+            raise ValueError("Anzahl der Texte und Labels unterscheidet sich")
+        if not len(labels):
+            return 0.0
+        
+        rows, columns, values = self.hasher.transform(texts, analyses)
+        count = len(labels)
+        
+        active, inverse = np.unique(columns, return_inverse=True)
+        weights = self.weights[active].astype(np.float64)
+        probabilities = _sigmoid(self._logits(rows, inverse, values, count, weights, self.bias))
+        errors = probabilities - labels
+        gradient = np.bincount(inverse, weights=errors[rows] * values, minlength=len(active)) / count + l2 * weights
+        
+        updated = self.weights.copy()
+        updated[active] = weights - learning_rate * gradient
+        self.weights = updated
+        self.bias = self.bias - learning_rate * float(errors.mean())
+        
+        self.metadata["online_updates"] = self.metadata.get("online_updates", 0) + 1
+        self.metadata["online_samples"] = self.metadata.get("online_samples", 0) + count
+        self.metadata["updated_at"] = datetime.now().isoformat()
+        self.fingerprint = self._compute_fingerprint()
+        
+        clipped = np.clip(probabilities, 1e-7, 1 - 1e-7)
+        return float(-np.mean(labels * np.log(clipped) + (1 - labels) * np.log(1 - clipped)))
+    
+    def assign(self, other):
+        """
+        Übernimmt Gewichte, Achsenabschnitt und Metadaten eines anderen Modells (z.B. eines neueren Checkpoints)
+        
+        Args:
+            other: LogisticRiskModel mit gleicher Anzahl Hash-Bits
+        """
+        if other.hasher.n_bits != self.hasher.n_bits:
+            raise ValueError(f"Modell hat {other.hasher.n_bits} statt {self.hasher.n_bits} Hash-Bits")
+        
+        self.weights = other.weights
+        self.bias = other.bias
+        self.metadata = other.metadata
+        self.fingerprint = other.fingerprint
+    
+    def evaluate(self, texts, labels, analyses=None, threshold=0.5):
+        """
+        Bewertet das Modell auf gelabelten Profilen
+        
+        Args:
+            texts: Liste von Profiltexten
+            labels: Liste von Labels
+            analyses: Optional, Liste der zugehörigen Analyseergebnisse
+            threshold: Optional, Wahrscheinlichkeit, ab der ein Profil als Angebot gilt
+            
+        Returns:
+            Dictionary mit accuracy, precision, recall und log_loss
+        """
+        labels = np.asarray(labels, dtype=np.float64)
+        probabilities = self.predict_proba(texts, analyses)
+        predictions = probabilities >= threshold
+        
+        true_positives = float(np.sum(predictions & (labels == 1)))
+        clipped = np.clip(probabilities, 1e-7, 1 - 1e-7)
+        
+        return {
+            "samples": int(len(labels)),
+            "accuracy": float(np.mean(predictions == (labels == 1))) if len(labels) else 0.0,
+            "precision": true_positives / max(float(predictions.sum()), 1.0),
+            "recall": true_positives / max(float(labels.sum()), 1.0),
+            "log_loss": float(-np.mean(labels * np.log(clipped) + (1 - labels) * np.log(1 - clipped))) if len(labels) else 0.0
+        }
+    
+    def save(self, filepath=None):
+        """
+        Speichert das Modell als komprimierte NumPy-Datei
+        
+        Args:
+            filepath: Optional, Zielpfad (Standard: RISK_MODEL_FILE)
+            
+        Returns:
+            Pfad der gespeicherten Datei
+        """
+        filepath = filepath or RISK_MODEL_FILE
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # Erst vollständig schreiben, dann austauschen: lesende Prozesse sehen nie eine halbe Datei
+        temp_path = f"{filepath}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                weights=self.weights,
+                bias=np.array(self.bias),
+                n_bits=np.array(self.hasher.n_bits),
+                metadata=np.array(json.dumps(self.metadata, ensure_ascii=False))
+            )
+        os.replace(temp_path, filepath)
+        
+        logger.info(f"Risikomodell {self.fingerprint} gespeichert: {filepath}")
+        return filepath
+    
+    @classmethod
+    def load(cls, filepath=None):
+        """
+        Lädt ein gespeichertes Modell
+        
+        Args:
+            filepath: Optional, Pfad der Datei (Standard: RISK_MODEL_FILE)
+            
+        Returns:
+            LogisticRiskModel-Objekt
+        """
+        with np.load(filepath or RISK_MODEL_FILE) as data:
+            return cls(
+                n_bits=int(data["n_bits"]),
+                weights=data["weights"],
+                bias=float(data["bias"]),
+                metadata=json.loads(str(data["metadata"]))
+            )
+
+
+def _flush_active_trainers():
+    """Übernimmt die Rückmeldungen aller noch lebenden Trainer (atexit)"""
+    for trainer in list(_active_trainers):
+        trainer.flush()
+
+
+atexit.register(_flush_active_trainers)
+
+
+class OnlineRiskTrainer:
+    """Aktualisiert das Risikomodell laufend aus Rückmeldungen der Ermittler (Mini-Batch-SGD)
+    
+    Bestätigte und zurückgewiesene Fälle werden gesammelt und je batch_size Stück in einem
+    SGD-Schritt übernommen, danach wird das Modell als Checkpoint gespeichert. Ein vollständiges
+    Training über alle bisherigen Labels ist nicht nötig. Hat ein anderer Prozess (z.B. ein
+    weiterer Webserver-Worker) inzwischen einen neueren Checkpoint geschrieben, wird dieser vor
+    dem Schritt geladen, damit keine Aktualisierung verloren geht.
+    """
+    
+    def __init__(self, model, checkpoint_path=None, batch_size=None, learning_rate=None, sync_interval=None):
+        """
+        Initialisiert den OnlineRiskTrainer
+        
+        Args:
+            model: Das zu aktualisierende LogisticRiskModel
+            checkpoint_path: Optional, Pfad des Checkpoints (Standard: RISK_MODEL_FILE)
+            batch_size: Optional, Anzahl der Rückmeldungen pro SGD-Schritt (Standard: ONLINE_BATCH_SIZE)
+            learning_rate: Optional, Lernrate (Standard: ONLINE_LEARNING_RATE)
+            sync_interval: Optional, Abstand in Sekunden zwischen zwei Prüfungen auf neuere Checkpoints
+        """
+        self.model = model
+        self.checkpoint_path = checkpoint_path or RISK_MODEL_FILE
+        self.batch_size = batch_size or ONLINE_BATCH_SIZE
+        self.learning_rate = ONLINE_LEARNING_RATE if learning_rate is None else learning_rate
+        self.sync_interval = ONLINE_SYNC_INTERVAL if sync_interval is None else sync_interval
+        
+        self._pending = []
+        self._lock = threading.RLock()
+        self._checkpoint_mtime = self._get_checkpoint_mtime()
+        self._last_sync = time.monotonic()
+    
+        # Rückmeldungen eines unvollständigen Mini-Batches gehen beim Beenden des Prozesses nicht verloren;
+        # die schwache Referenz hält den Trainer (und sein Modell) nicht bis zum Prozessende am Leben
+        _active_trainers.add(self)
+    
+    @property
+    def pending_count(self):
+        """Anzahl der gesammelten, noch nicht übernommenen Rückmeldungen"""
+        return len(self._pending)
+    
+    def _get_checkpoint_mtime(self):
+        """Änderungszeit des Checkpoints oder None, wenn er nicht existiert"""
+        try:
+            return os.path.getmtime(self.checkpoint_path)
+        except OSError:
+            return None
+    
+    def sync(self, force=False):
+        """
+        Lädt einen neueren Checkpoint, den ein anderer Prozess geschrieben hat
+        
+        Args:
+            force: Optional, ob unabhängig von sync_interval geprüft wird
+            
+        Returns:
+            True, wenn ein neuerer Checkpoint übernommen wurde
+        """
+        now = time.monotonic()
+        if not force and now - self._last_sync < self.sync_interval:
+            return False
+        
+        with self._lock:
+            self._last_sync = now
+            mtime = self._get_checkpoint_mtime()
+            if mtime is None or mtime == self._checkpoint_mtime:
+                return False
+            
+            try:
+                self.model.assign(LogisticRiskModel.load(self.checkpoint_path))
+            except Exception as e:
+                logger.error(f"Checkpoint {self.checkpoint_path} konnte nicht übernommen werden: {e}")
+                return False
+            
+            self._checkpoint_mtime = mtime
+            logger.info(f"Neueren Checkpoint {self.model.fingerprint} übernommen ({self.model.metadata.get('online_updates', 0)} Aktualisierungen)")
+            return True
+    
+    def add_feedback(self, text, label, analysis):
+        """
+        Sammelt eine Rückmeldung und aktualisiert das Modell, sobald ein Mini-Batch voll ist
+        
+        Args:
+            text: Kombinierter Profiltext
+            label: 1 (Angebot bestätigt) oder 0 (Verdacht zurückgewiesen)
+            analysis: Regelbasiertes Analyseergebnis des Profils
+            
+        Returns:
+            Log-Loss des Mini-Batches, wenn das Modell aktualisiert wurde, sonst None
+        """
+        with self._lock:
+            self._pending.append((text, int(label), analysis))
+            if len(self._pending) < self.batch_size:
+                return None
+            return self._apply_pending()
+    
+    def flush(self):
+        """
+        Übernimmt alle gesammelten Rückmeldungen, auch wenn der Mini-Batch nicht voll ist
+        
+        Returns:
+            Log-Loss des Mini-Batches oder None, wenn keine Rückmeldungen vorlagen
+        """
+        with self._lock:
+            return self._apply_pending() if self._pending else None
+    
+    def _apply_pending(self):
+        """Führt einen SGD-Schritt mit den gesammelten Rückmeldungen aus und speichert einen Checkpoint"""
+        self.sync(force=True)
+        
+        batch, self._pending = self._pending, []
+        texts = [text for text, _, _ in batch]
+        labels = [label for _, label, _ in batch]
+        analyses = [analysis for _, _, analysis in batch]
+        
+        loss = self.model.partial_fit(texts, labels, analyses, learning_rate=self.learning_rate)
+        self.checkpoint()
+        
+        logger.info(f"Risikomodell mit {len(batch)} Rückmeldungen aktualisiert (Log-Loss vorher {loss:.4f}, Modell {self.model.fingerprint})")
+        return loss
+    
+    def checkpoint(self):
+        """
+        Speichert das aktuelle Modell als Checkpoint
+        
+        Returns:
+            Pfad des Checkpoints oder None bei einem Fehler
+        """
+        with self._lock:
+            try:
+                self.model.save(self.checkpoint_path)
+            except Exception as e:
+                logger.error(f"Checkpoint {self.checkpoint_path} konnte nicht gespeichert werden: {e}")
+                return None
+            
+            self._checkpoint_mtime = self._get_checkpoint_mtime()
+            return self.checkpoint_path
+
+
+def _sigmoid(logits):
+    """Logistische Funktion ohne Überlauf für große negative Logits"""
+    return 1.0 / (1.0 + np.exp(-np.clip(logits, -35.0, 35.0)))
+
+
+def load_risk_model(filepath=None):
+    """
+    Lädt das Risikomodell, falls eine Modelldatei vorhanden ist
+    
+    Args:
+        filepath: Optional, Pfad der Datei (Standard: RISK_MODEL_FILE)
+        
+    Returns:
+        LogisticRiskModel-Objekt oder None
+    """
+    filepath = filepath or RISK_MODEL_FILE
+    if not os.path.exists(filepath):
+        return None
+    
+    try:
+        model = LogisticRiskModel.load(filepath)
+        logger.info(f"Risikomodell {model.fingerprint} aus {filepath} geladen ({model.metadata.get('samples', 0)} Trainingsprofile)")
+        return model
+    except Exception as e:
+        logger.error(f"Risikomodell {filepath} konnte nicht geladen werden: {e}")
+        return None
+
+
+def train_from_database(db_manager, detector, n_bits=HASH_BITS, validation_split=0.2, seed=42, **fit_args):
+    """
+    Trainiert ein Risikomodell aus Profilen mit bekanntem Melde- bzw. Meldungsstatus
+    
+    Args:
+        db_manager: Ein DatabaseManager-Objekt
+        detector: HyaluronPenDetector für Profiltext und Analyseergebnis der Trainingsprofile
+        n_bits: Optional, Anzahl der Hash-Bits
+        validation_split: Optional, Anteil der Profile, die nur zur Bewertung verwendet werden
+        seed: Optional, Seed für die Aufteilung in Trainings- und Validierungsdaten
+        **fit_args: Weitere Argumente für LogisticRiskModel.fit
+        
+    Returns:
+        Tupel (LogisticRiskModel, Dictionary mit Kennzahlen auf den Validierungsdaten)
+    """
+    samples = []
+    for profile_data in db_manager.iter_labeled_profiles():
+        label = label_for(profile_data["is_reported"], profile_data["report_statuses"])
+        if label is not None:
+            samples.append((profile_data, label))
+    
+    logger.info(f"{len(samples)} gelabelte Profile geladen ({sum(label for _, label in samples)} bestätigte Angebote)")
+    random.Random(seed).shuffle(samples)
+    
+    texts = [detector.combine_profile_text(profile_data) for profile_data, _ in samples]
+    analyses = [detector.analyze_profile(profile_data) for profile_data, _ in samples]
+    labels = [label for _, label in samples]
+    
+    # Bei sehr wenigen Profilen wird auf den Trainingsdaten bewertet
+    split = int(len(samples) * (1 - validation_split)) if len(samples) >= 10 else len(samples)
+    model = LogisticRiskModel(n_bits).fit(texts[:split], labels[:split], analyses[:split], **fit_args)
+    
+    holdout = slice(split, None) if split < len(samples) else slice(None)
+    evaluation = model.evaluate(texts[holdout], labels[holdout], analyses[holdout])
+    model.metadata["validation"] = evaluation
+    return model, evaluation
+
+
+def main():
+    """Hauptfunktion für die Kommandozeilenausführung"""
+    parser = argparse.ArgumentParser(description="IRI® Legal Agent - Training des Risikomodells")
+    
+    parser.add_argument("--db-url", help="Datenbank-URL (Standard: DATABASE_URL)")
+    parser.add_argument("--output", default=RISK_MODEL_FILE, help="Zielpfad des Modells")
+    parser.add_argument("--bits", type=int, default=HASH_BITS, help="Anzahl der Hash-Bits")
+    parser.add_argument("--epochs", type=int, default=200, help="Anzahl der Trainingsepochen")
+    parser.add_argument("--learning-rate", type=float, default=0.5, help="Lernrate (AdaGrad)")
+    parser.add_argument("--l2", type=float, default=1e-4, help="L2-Regularisierung")
+    parser.add_argument("--validation-split", type=float, default=0.2, help="Anteil der Validierungsdaten")
+    
+    args = parser.parse_args()
+    
+    from database_manager import DatabaseManager
+    from detection_algorithms import HyaluronPenDetector
+    
+    model, evaluation = train_from_database(
+        DatabaseManager(args.db_url),
+        HyaluronPenDetector(),
+        n_bits=args.bits,
+        validation_split=args.validation_split,
+        epochs=args.epochs,
+        learning_rate=args.learning_rate,
+        l2=args.l2
+    )
+    
+    print(json.dumps(evaluation, indent=2))
+    print(f"Modell gespeichert: {os.path.abspath(model.save(args.output))}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -11,6 +11,8 @@ from datetime import datetime
 from urllib.parse import urlparse, quote_plus
 from dotenv import load_dotenv
 
+from image_hashing import hash_image_file, get_screenshot_index
+
 # Konfiguriere Logging
 logging.basicConfig(
     level=logging.INFO,
@@ -87,22 +89,12 @@ class ScreenshotService:
                 logger.info(f"Screenshot erstellt: {screenshot_path}")
                 
                 # Speichere den Screenshot in der Datenbank
-                if self.db_manager:
-                    screenshot_data = {
-                        "profile_id": profile_id,
-                        "post_id": post_id,
-                        "file_path": screenshot_path,
-                        "url_captured": url,
-                        "is_evidence": True,
-                        "metadata": json.dumps({
-                            "capture_date": datetime.now().isoformat(),
-                            "full_page": full_page,
-                            "width": width,
-                            "height": height
-                        })
-                    }
-                    
-                    self.db_manager.add_screenshot(screenshot_data)
+                self._store_screenshot(screenshot_path, url, profile_id, post_id, {
+                    "capture_date": datetime.now().isoformat(),
+                    "full_page": full_page,
+                    "width": width,
+                    "height": height
+                })
                 
                 return screenshot_path
             
@@ -112,6 +104,64 @@ class ScreenshotService:
             logger.error(f"Fehler beim Erstellen des Screenshots von {url}: {e}")
             return None
     
+    def _store_screenshot(self, filepath, url, profile_id, post_id, metadata):
+        """
+        Berechnet den Wahrnehmungs-Hash eines Screenshots, vergleicht ihn mit früheren Aufnahmen und speichert ihn
+        
+        Args:
+            filepath: Pfad zum Screenshot
+            url: Die aufgenommene URL
+            profile_id: Optional, ID des zugehörigen Profils
+            post_id: Optional, ID des zugehörigen Posts
+            metadata: Dictionary mit Metadaten (wird um die Vergleichsergebnisse ergänzt)
+            
+        Returns:
+            Dictionary mit den Metadaten des Screenshots
+        """
+        perceptual_hash = hash_image_file(filepath)
+        hash_index = get_screenshot_index(self.db_manager) if perceptual_hash else None
+        
+        if perceptual_hash:
+            # Gleiches Bild bei anderen Profilen (z.B. wiederverwendete Vorher-Nachher-Bilder)
+            similar = [
+                info for _, info in hash_index.find_similar(perceptual_hash)
+                if info.get("url_captured") != url
+            ]
+            
+            metadata.update({
+                "perceptual_hash": perceptual_hash,
+                "unchanged_since_last_capture": hash_index.is_unchanged(url, perceptual_hash),
+                "similar_screenshots": [info.get("id") or info.get("file_path") for info in similar[:20]]
+            })
+            
+            if metadata["unchanged_since_last_capture"]:
+                logger.info(f"Screenshot von {url} ist seit der letzten Aufnahme unverändert")
+            if similar:
+                logger.info(f"Screenshot von {url} gleicht {len(similar)} Screenshots anderer URLs")
+        
+        screenshot = None
+        if self.db_manager:
+            screenshot = self.db_manager.add_screenshot({
+                "profile_id": profile_id,
+                "post_id": post_id,
+                "file_path": filepath,
+                "url_captured": url,
+                "is_evidence": True,
+                "metadata": json.dumps(metadata),
+                "perceptual_hash": perceptual_hash
+            })
+        
+        if perceptual_hash:
+            hash_index.add(perceptual_hash, {
+                "id": screenshot.id if screenshot else None,
+                "profile_id": profile_id,
+                "post_id": post_id,
+                "url_captured": url,
+                "file_path": filepath
+            })
+        
+        return metadata
+    
     def _capture_with_api(self, url, filepath, full_page=True, width=1280, height=1024, delay=2):
         """
         Erstellt einen Screenshot mit der Screenshot-API
@@ -412,22 +462,12 @@ class AdvancedScreenshotService(ScreenshotService):
                 f.write(f"Simulierter Selenium-Screenshot von {url} erstellt am {datetime.now().isoformat()}")
             
             # Speichere den Screenshot in der Datenbank
-            if self.db_manager:
-                screenshot_data = {
-                    "profile_id": profile_id,
-                    "post_id": post_id,
-                    "file_path": filepath,
-                    "url_captured": url,
-                    "is_evidence": True,
-                    "metadata": json.dumps({
-                        "capture_date": datetime.now().isoformat(),
-                        "method": "selenium",
-                        "scroll": scroll,
-                        "wait_time": wait_time
-                    })
-                }
-                
-                self.db_manager.add_screenshot(screenshot_data)
+            self._store_screenshot(filepath, url, profile_id, post_id, {
+                "capture_date": datetime.now().isoformat(),
+                "method": "selenium",
+                "scroll": scroll,
+                "wait_time": wait_time
+            })
             
             return filepath
             
@@ -92,6 +92,878 @@ def test_detection_algorithms():
         logger.error(f"Fehler beim Testen der Erkennungsalgorithmen: {e}")
         return False
 
+def test_text_scanner():
+    """Testet den Scanner für Preise, Telefonnummern und E-Mail-Adressen"""
+    try:
+        from detection_algorithms import HyaluronPenDetector, TextScanner
+        
+        logger.info("Teste Scanner für Preise und Kontaktdaten...")
+        
+        text = ("Hyaluron Pen ab 79€, Nachbehandlung 79,00 € und Paket für 1.299,90 EUR oder € 49. "
+                "Tel 0171 1234567 oder 0171 1234567, info@studio.de")
+        
+        # Preise in Cent, "ab 79€" und "79,00 €" zählen nur einmal
+        result = TextScanner().scan(text)
+        if result["price_cents"] != [7900, 129990, 4900]:
+            logger.error(f"Preise falsch normalisiert: {result['price_cents']}")
+            return False
+        
+        if result["phones"] != ["0171 1234567"] or result["emails"] != ["info@studio.de"]:
+            logger.error(f"Kontaktdaten falsch extrahiert: {result['phones']}, {result['emails']}")
+            return False
+        
+        if HyaluronPenDetector().scan_text(text)["prices"] != [79.0, 1299.9, 49.0]:
+            logger.error("Preise in Euro weichen von den Cent-Beträgen ab")
+            return False
+        
+        if TextScanner().scan("") != {"price_cents": [], "phones": [], "emails": []}:
+            logger.error("Leerer Text liefert Treffer")
+            return False
+        
+        logger.info("Scanner für Preise und Kontaktdaten erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen des Scanners für Preise und Kontaktdaten: {e}")
+        return False
+
+def test_analysis_context():
+    """Testet den gemeinsamen Analysezustand (eine Tokenisierung pro Text)"""
+    try:
+        import unicodedata
+        import detection_algorithms
+        from detection_algorithms import AnalysisContext, HyaluronPenDetector
+        
+        logger.info("Teste gemeinsamen Analysezustand...")
+        
+        detector = HyaluronPenDetector()
+        text = "Hyaluron Pen in München ab 79€, jetzt Termin buchen! Tel 0171 1234567"
+        
+        # NFD und NFC ergeben denselben Kontext
+        context = detector.build_context(unicodedata.normalize("NFD", text))
+        if context.text != text or "münchen" not in context.tokens_lower:
+            logger.error(f"Text wurde nicht normalisiert: {context.text!r}")
+            return False
+        
+        if detector.build_context(context) is not context or "in" in context.content_tokens:
+            logger.error("Kontext wird neu erstellt oder enthält Stopwörter")
+            return False
+        
+        # Extraktoren liefern mit Kontext dieselben Ergebnisse wie mit dem Text
+        if (detector.scan_text(context) != detector.scan_text(text)
+                or detector.extract_locations(context) != detector.extract_locations(text)
+                or detector.calculate_commercial_score(context) != detector.calculate_commercial_score(text)):
+            logger.error("Ergebnisse mit gemeinsamem Kontext weichen ab")
+            return False
+        
+        # analyze_profile tokenisiert den kombinierten Text genau einmal
+        calls = []
+        word_tokenize = detection_algorithms.word_tokenize
+        
+        def counting_tokenize(value, *args, **kwargs):
+            calls.append(value)
+            return word_tokenize(value, *args, **kwargs)
+        
+        detection_algorithms.word_tokenize = counting_tokenize
+        try:
+            detector.analyze_profile({"profile_name": "studio", "description": text})
+        finally:
+            detection_algorithms.word_tokenize = word_tokenize
+        
+        if len(calls) != 1:
+            logger.error(f"Profiltext wurde {len(calls)}-mal tokenisiert")
+            return False
+        
+        if AnalysisContext("") or AnalysisContext(None).tokens != []:
+            logger.error("Leerer Kontext ist nicht leer")
+            return False
+        
+        logger.info("Gemeinsamer Analysezustand erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen des gemeinsamen Analysezustands: {e}")
+        return False
+
+def test_batch_analysis():
+    """Testet die Batch-Analyse auf mehreren Prozessen"""
+    try:
+        import detection_algorithms
+        from detection_algorithms import DetectionManager
+        
+        logger.info("Teste Batch-Analyse...")
+        
+        manager = DetectionManager(use_cache=False)
+        profiles = [
+            {"profile_name": f"studio_{index}", "description": f"Hyaluron Pen ab {10 + index}€" if index % 3 else "Kosmetikstudio"}
+            for index in range(10)
+        ]
+        
+        serial = manager.analyze_profiles_batch(profiles, workers=1)
+        
+        # Schwellenwert herabsetzen, damit die zehn Profile auf mehrere Prozesse verteilt werden
+        threshold = detection_algorithms.PARALLEL_THRESHOLD
+        detection_algorithms.PARALLEL_THRESHOLD = 4
+        try:
+            parallel = manager.analyze_profiles_batch(profiles, workers=2, chunk_size=3)
+        finally:
+            detection_algorithms.PARALLEL_THRESHOLD = threshold
+        
+        # Ergebnisse kommen in der Reihenfolge der Eingabe zurück
+        expected = [[] if index % 3 == 0 else [10.0 + index] for index in range(10)]
+        if [analysis.prices for analysis in parallel] != expected:
+            logger.error(f"Parallele Ergebnisse in falscher Reihenfolge: {[analysis.prices for analysis in parallel]}")
+            return False
+        
+        if [analysis.risk_score for analysis in parallel] != [analysis.risk_score for analysis in serial]:
+            logger.error("Parallele und serielle Analyse liefern unterschiedliche Risiko-Scores")
+            return False
+        
+        logger.info("Batch-Analyse erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen der Batch-Analyse: {e}")
+        return False
+
+def test_analysis_cache():
+    """Testet den zweistufigen Cache für Analyseergebnisse"""
+    try:
+        import tempfile
+        from database_manager import DatabaseManager
+        from detection_algorithms import DetectionManager
+        from analysis_cache import make_cache_key
+        
+        logger.info("Teste Analyse-Cache...")
+        
+        analyzed = []
+        
+        def counting_manager(db_manager):
+            manager = DetectionManager(db_manager, bulk_writes=False)
+            detector = manager.hyaluron_detector
+            analyze_profile = detector.analyze_profile
+            
+            def counting_analyze(profile_data, analysis_date=None):
+                analyzed.append(profile_data.get("profile_name"))
+                return analyze_profile(profile_data, analysis_date)
+            
+            detector.analyze_profile = counting_analyze
+            return manager
+        
+        offer = {"profile_name": "studio_a", "description": "Hyaluron Pen ab 79€, Termine per WhatsApp"}
+        copy = {"profile_name": "studio_b", "description": "Hyaluron Pen ab 79€, Termine per WhatsApp"}
+        other = {"profile_name": "studio_c", "description": "Kosmetikstudio mit Wimpernverlängerung"}
+        profiles = [offer, other, copy]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_manager = DatabaseManager(f"sqlite:///{temp_dir}/analysis_cache.db")
+            manager = counting_manager(db_manager)
+            
+            # Identische Texte werden innerhalb eines Batches nur einmal analysiert
+            first = manager.analyze_profiles_batch(profiles)
+            if analyzed != ["studio_a", "studio_c"] or first[0].risk_score != first[2].risk_score:
+                logger.error(f"Unerwartete Analysen im ersten Batch: {analyzed}")
+                return False
+            
+            # Unveränderte Texte kommen aus dem Arbeitsspeicher
+            manager.analyze_profiles_batch(profiles)
+            if len(analyzed) != 2 or manager.analysis_cache.get_statistics()["memory_hits"] != 2:
+                logger.error(f"Arbeitsspeicher-Cache nicht verwendet: {manager.analysis_cache.get_statistics()}")
+                return False
+            
+            # Ein neuer Prozess findet die Ergebnisse in der Datenbank
+            restarted = counting_manager(db_manager)
+            cached = restarted.analyze_profiles_batch(profiles)
+            if len(analyzed) != 2 or restarted.analysis_cache.get_statistics()["db_hits"] != 2:
+                logger.error(f"Datenbank-Cache nicht verwendet: {restarted.analysis_cache.get_statistics()}")
+                return False
+            
+            if [analysis.risk_score for analysis in cached] != [analysis.risk_score for analysis in first]:
+                logger.error("Zwischengespeicherte Ergebnisse weichen von der Analyse ab")
+                return False
+            
+            # Ein neuer Regelsatz ergibt eine neue Detector-Version und leert den Arbeitsspeicher
+            detector = restarted.hyaluron_detector
+            old_version = detector.version
+            old_keys = [make_cache_key("profile", old_version, detector.combine_profile_text(profile_data)) for profile_data in profiles]
+            restarted.rule_provider.refresh_interval = 0
+            restarted.rule_provider.publish({"keywords": ["hyaluron pen", "lippenfiller"]}, "Test")
+            
+            restarted.analyze_profiles_batch(profiles)
+            if detector.version == old_version or analyzed[2:] != ["studio_a", "studio_c"]:
+                logger.error(f"Neue Detector-Version verwendet veraltete Ergebnisse: {analyzed}")
+                return False
+            
+            # Einträge der alten Version bleiben für einen Wechsel zurück in der Datenbank, bis sie zu alt sind
+            if len(db_manager.get_cached_analyses(old_keys)) != 2:
+                logger.error("Einträge der alten Detector-Version wurden aus der Datenbank entfernt")
+                return False
+            
+            if restarted.analysis_cache.trim(max_age_days=0) != 4 or db_manager.get_cached_analyses(old_keys):
+                logger.error("Alte Einträge wurden nicht aus der Datenbank entfernt")
+                return False
+            
+            db_manager.engine.dispose()
+        
+        logger.info("Analyse-Cache erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen des Analyse-Caches: {e}")
+        return False
+
+def test_keyword_automaton():
+    """Testet den Aho-Corasick-Automaten für Hyaluron-Keywords"""
+    try:
+        from detection_algorithms import KeywordAutomaton
+        
+        logger.info("Teste Keyword-Automaten...")
+        
+        automaton = KeywordAutomaton(["hyaluron pen", "hyaluronpen", "pen"])
+        matches = automaton.find_all("Hyaluron Pen ab 79€ #hyaluronpen")
+        logger.info(f"Keyword-Treffer: {matches}")
+        
+        if matches.get("hyaluron pen") != [0] or matches.get("hyaluronpen") != [21]:
+            logger.error("Keyword-Automat liefert falsche Positionen")
+            return False
+        
+        if len(matches.get("pen", [])) != 2:
+            logger.error("Keyword-Automat findet überlappende Treffer nicht")
+            return False
+        
+        logger.info("Keyword-Automat erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen des Keyword-Automaten: {e}")
+        return False
+
+def test_fuzzy_keywords():
+    """Testet die Erkennung verschleierter Schlüsselwörter"""
+    try:
+        from detection_algorithms import HyaluronPenDetector
+        
+        logger.info("Teste verschleierte Schlüsselwörter...")
+        
+        detector = HyaluronPenDetector()
+        
+        obfuscated = ["hyalur0n pen", "hy4luron-p3n", "h.y.a.l.u.r.o.n p.e.n", "hya\u200bluron pen", "h\u0443aluron pen", "Lippen aufspr1tzen"]
+        for text in obfuscated:
+            hits = detector.find_hyaluron_keywords(text, include_obfuscated=True)
+            if not hits:
+                logger.error(f"Verschleiertes Schlüsselwort nicht erkannt: {text!r}")
+                return False
+        
+        # Exakte Treffer werden nicht doppelt gezählt, Alltagswörter nicht erkannt
+        if detector.find_hyaluron_keywords("Hyaluron Pen ab 79€", include_obfuscated=True) != {"hyaluron pen": [0]}:
+            logger.error("Exakter Treffer wird doppelt gezählt")
+            return False
+        
+        # Kurze Wortteile ("pen", "stift") dürfen nicht durch andere Produktnamen ersetzt werden
+        products = ["hyaluron gel", "Hyaluron Set", "hyaluron pad", "Hyaluron Peel", "Hyaluronsäure Gel", "Hyaluron Stick"]
+        for text in ["Lippenstift und Lippenpflege im Angebot", "Hyaluronsäure Serum", "Ruf an: 0171 1234567"] + products:
+            if detector.find_obfuscated_keywords(text):
+                logger.error(f"Falscher Treffer in {text!r}: {detector.find_obfuscated_keywords(text)}")
+                return False
+        
+        analysis = detector.analyze_profile({"description": "Hyaluron Gel für trockene Haut, Termin buchen, Preis 29€"})
+        if analysis.contains_hyaluron_pen or analysis.risk_score >= detector.suspicious_threshold:
+            logger.error(f"Pflegeprodukt als Hyaluron Pen erkannt (Risiko-Score: {analysis.risk_score})")
+            return False
+        
+        logger.info("Verschleierte Schlüsselwörter erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen verschleierter Schlüsselwörter: {e}")
+        return False
+
+def test_hashtag_segmentation():
+    """Testet die Zerlegung zusammengeschriebener Hashtags"""
+    try:
+        from detection_algorithms import HyaluronPenDetector
+        
+        logger.info("Teste Hashtag-Zerlegung...")
+        
+        detector = HyaluronPenDetector()
+        segmenter = detector.rules.hashtag_segmenter
+        
+        expected = {
+            "lippenaufspritzungohnenadel": ("lippen", "aufspritzung", "ohne", "nadel"),
+            "hyaluronpenschulungberlin": ("hyaluronpen", "schulung", "berlin"),
+            "lippenaufspritzen": ("lippenaufspritzen",)
+        }
+        for hashtag, segments in expected.items():
+            if segmenter.segment(hashtag) != segments:
+                logger.error(f"Hashtag falsch zerlegt: {hashtag} -> {segmenter.segment(hashtag)}")
+                return False
+        
+        text = "Kurs #HyaluronPenSchulungBerlin jetzt buchen"
+        context = detector.build_context(text)
+        logger.info(f"Zerlegter Text: {context.segmented_text}")
+        
+        if context.segmented_text != "Kurs #HyaluronPen Schulung Berlin jetzt buchen":
+            logger.error("Hashtag im Text wurde nicht zerlegt")
+            return False
+        
+        # Positionen beziehen sich weiterhin auf den Originaltext
+        if detector.find_hyaluron_keywords(context) != {"hyaluronpen": [6]} or "Berlin" not in detector.extract_locations(context):
+            logger.error("Keywords oder Orte im zerlegten Hashtag nicht gefunden")
+            return False
+        
+        if not detector.analyze_post({"post_text": "Neu im Studio #lippenaufspritzungohnenadel"}).contains_hyaluron_pen:
+            logger.error("Verschleiertes Keyword im zerlegten Hashtag nicht erkannt")
+            return False
+        
+        logger.info("Hashtag-Zerlegung erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen der Hashtag-Zerlegung: {e}")
+        return False
+
+def test_language_identification():
+    """Testet die Spracherkennung und die sprachspezifischen Keyword-Automaten"""
+    try:
+        from detection_algorithms import HyaluronPenDetector
+        
+        logger.info("Teste Spracherkennung...")
+        
+        detector = HyaluronPenDetector()
+        
+        samples = {
+            "de": "Wir bieten ab sofort Lippenbehandlungen ohne Nadel in unserem Studio an, jetzt Termin vereinbaren",
+            "en": "We now offer lip treatments without needles in our studio, book your appointment today",
+            "tr": "Stüdyomuzda artık iğnesiz dudak dolgusu yapıyoruz, hemen randevu alın",
+            "ru": "Теперь мы предлагаем увеличение губ без иглы в нашей студии, записывайтесь сейчас",
+            "ar": "نقدم الآن فيلر الشفاه بدون إبر في مركزنا، احجزي موعدك اليوم"
+        }
+        for language, text in samples.items():
+            detected = detector.detect_language(text)
+            if detected != language:
+                logger.error(f"Sprache falsch erkannt: {language} -> {detected}")
+                return False
+        
+        # Kurze Texte bleiben Deutsch
+        if detector.detect_language("Lips 💋") != "de" or detector.detect_language("") != "de":
+            logger.error("Kurzer Text wurde nicht als Deutsch behandelt")
+            return False
+        
+        # Sprachspezifische Keywords werden nur in Texten der jeweiligen Sprache gesucht
+        if not detector.analyze_post({"post_text": samples["tr"]}).contains_hyaluron_pen:
+            logger.error("Türkisches Keyword nicht erkannt")
+            return False
+        if detector.analyze_post({"post_text": "Neu bei uns im Studio: dudak dolgusu für alle Kundinnen"}).contains_hyaluron_pen:
+            logger.error("Türkisches Keyword in deutschem Text erkannt")
+            return False
+        
+        logger.info("Spracherkennung erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen der Spracherkennung: {e}")
+        return False
+
+def test_gazetteer():
+    """Testet das Ortsverzeichnis mit mehrteiligen Namen, Postleitzahlen und mehrdeutigen Ortsnamen"""
+    try:
+        from gazetteer import Gazetteer, DEFAULT_MUNICIPALITIES, NAME_TOKEN_PATTERN
+        
+        logger.info("Teste Ortsverzeichnis...")
+        
+        # Mehrdeutige Namen werden aus gebräuchlichen Wörtern und der Namenslänge abgeleitet
+        municipalities = DEFAULT_MUNICIPALITIES + ["Ohne", "Hof", "Berg", "Stein", "Wangen", "Tübingen"]
+        common_words = {"ohne", "und", "wangen", "stein", "berlin"}
+        gazetteer = Gazetteer(municipalities, {"45127": "Essen", "06108": "Halle (Saale)"}, common_words)
+        
+        def locations(text):
+            return gazetteer.match_tokens([token.lower() for token in NAME_TOKEN_PATTERN.findall(text)])
+        
+        expected = {
+            "Studio in Frankfurt am Main und Mülheim an der Ruhr": ["Frankfurt am Main", "Mülheim an der Ruhr"],
+            "Praxis in Frankfurt (Oder)": ["Frankfurt (Oder)"],
+            "Hyaluron Pen, 06108 Halle": ["Halle (Saale)", "Halle"],
+            # Kommas und Konjunktionen setzen keinen mehrteiligen Namen fort
+            "Termine in Frankfurt oder München": ["Frankfurt", "München"],
+            "Studio in Frankfurt, oder doch in Berlin?": ["Frankfurt", "Berlin"],
+            # Mehrdeutige Namen nur nach Präposition oder neben einer Postleitzahl
+            "Essen und Trinken": [],
+            "Termine in Essen": ["Essen"],
+            "45127 Essen": ["Essen", "Essen"],
+            "Hyaluron Pen ohne Nadel für Wangen und Lippen, Hof und Stein": [],
+            "Praxis in Hof, 72070 Tübingen": ["Hof", "Tübingen"],
+            # Großstädte bleiben eindeutig, auch wenn sie in der Wortfrequenzliste stehen
+            "Hyaluron Pen Berlin": ["Berlin"]
+        }
+        for text, names in expected.items():
+            if locations(text) != names:
+                logger.error(f"Orte in {text!r}: {locations(text)} statt {names}")
+                return False
+        
+        if gazetteer.lookup("Essen") != "Essen" or gazetteer.lookup("45127") != "Essen":
+            logger.error("Einzelner Ortsname oder Postleitzahl wird nicht gefunden")
+            return False
+        
+        logger.info("Ortsverzeichnis erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen des Ortsverzeichnisses: {e}")
+        return False
+
+def test_detection_rules():
+    """Testet versionierte Erkennungsregeln und deren Austausch ohne Neustart"""
+    try:
+        import tempfile
+        from database_manager import DatabaseManager
+        from detection_algorithms import DetectionManager
+        from detection_rules import DEFAULT_RULES_VERSION, validate_rules
+        
+        logger.info("Teste Erkennungsregeln...")
+        
+        try:
+            validate_rules({"price_patterns": ["(\\d+"]})
+            logger.error("Ungültiges Preismuster wurde nicht abgelehnt")
+            return False
+        except ValueError:
+            pass
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_manager = DatabaseManager(f"sqlite:///{temp_dir}/rules.db")
+            publisher = DetectionManager(db_manager, use_cache=False)
+            worker = DetectionManager(db_manager, use_cache=False)
+            worker.rule_provider.refresh_interval = 0
+            
+            profile = {"profile_name": "lips", "description": "Lippenfiller Termin jetzt buchen"}
+            rules = worker.hyaluron_detector.rules
+            if rules.version != DEFAULT_RULES_VERSION or worker.analyze_profile(profile).contains_hyaluron_pen:
+                logger.error("Ohne gespeicherten Regelsatz gelten nicht die Standardregeln")
+                return False
+            
+            publisher.rule_provider.publish({"keywords": ["hyaluron pen", "lippenfiller"], "suspicious_threshold": 40}, "Test")
+            analysis = worker.analyze_profile(profile)
+            logger.info(f"Regelsatz: {worker.hyaluron_detector.rules}, Analyse: {analysis}")
+            
+            if worker.hyaluron_detector.rules.version != 1 or not analysis.contains_hyaluron_pen or not worker.is_suspicious(analysis):
+                logger.error("Neuer Regelsatz wurde nicht übernommen")
+                return False
+            
+            if worker.hyaluron_detector.rules is not worker.hyaluron_detector.rules:
+                logger.error("Unveränderter Regelsatz wird erneut kompiliert")
+                return False
+            
+            db_manager.set_rule_set_active(1, False)
+            if worker.hyaluron_detector.rules.version != DEFAULT_RULES_VERSION:
+                logger.error("Deaktivierter Regelsatz ist weiterhin aktiv")
+                return False
+            
+            db_manager.engine.dispose()
+        
+        logger.info("Erkennungsregeln erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen der Erkennungsregeln: {e}")
+        return False
+
+def test_analysis_result():
+    """Testet die kompakten Analyseergebnisse und ihre Dictionary-Darstellung"""
+    try:
+        import pickle
+        from analysis_result import AnalysisResult
+        from detection_algorithms import HyaluronPenDetector
+        
+        logger.info("Teste Analyseergebnisse...")
+        
+        detector = HyaluronPenDetector()
+        result = detector.analyze_profile({
+            "description": "Hyaluron Pen ab 79€, Lippen aufspritzen ohne Nadel für 149,90 Euro. Tel 0171 1234567"
+        }, analysis_date="2024-01-01T00:00:00")
+        
+        if result.prices != [79.0, 149.9] or result["prices"] != result.to_dict()["prices"]:
+            logger.error(f"Preise werden falsch gespeichert: {result.prices}")
+            return False
+        
+        restored = AnalysisResult.from_dict(result.to_dict())
+        if restored != result or pickle.loads(pickle.dumps(result)) != result:
+            logger.error("Analyseergebnis übersteht die Umwandlung nicht unverändert")
+            return False
+        
+        copy = result.with_date("2024-02-01T00:00:00")
+        if copy.analysis_date == result.analysis_date or copy.get("risk_score") != result.risk_score:
+            logger.error("Kopie mit neuem Analysedatum ist fehlerhaft")
+            return False
+        
+        logger.info("Analyseergebnisse erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen der Analyseergebnisse: {e}")
+        return False
+
+def test_streaming():
+    """Testet die fortlaufende Analyse von Scraping-Ergebnissen"""
+    try:
+        from detection_algorithms import DetectionManager
+        
+        logger.info("Teste Analyse im Streaming-Modus...")
+        
+        manager = DetectionManager(use_cache=False)
+        flushes = []
+        manager.flush_pending_writes = lambda: flushes.append(True)
+        
+        offer = "Hyaluron Pen ab 79€, Lippen aufspritzen ohne Nadel. Termine per WhatsApp 0171 1234567 #hyaluronpen"
+        pulled = []
+        
+        def source():
+            for index in range(5):
+                pulled.append(index)
+                yield "Instagram", {"profile_name": f"studio_{index}", "description": offer if index % 2 else "Kosmetikstudio"}
+        
+        # Ohne volle Abschnitte wird jedes Profil sofort analysiert
+        stream = manager.analyze_scraping_results_stream(source())
+        first = next(stream)
+        if first["profile_name"] != "studio_1" or pulled != [0, 1]:
+            logger.error(f"Verdächtiges Profil wurde erst nach {len(pulled)} Profilen geliefert")
+            return False
+        
+        # Bricht der Aufrufer ab, werden gepufferte Schreibvorgänge trotzdem gespeichert
+        stream.close()
+        if len(flushes) != 1:
+            logger.error("Gepufferte Schreibvorgänge wurden beim Abbruch nicht gespeichert")
+            return False
+        
+        # Ein unvollständiger Abschnitt wird nach max_wait analysiert
+        pulled.clear()
+        stream = manager.analyze_scraping_results_stream(source(), chunk_size=10, max_wait=0)
+        next(stream)
+        if pulled != [0, 1]:
+            logger.error("Unvollständiger Abschnitt wurde trotz abgelaufener Wartezeit zurückgehalten")
+            return False
+        
+        suspicious = [first["profile_name"]] + [profile_data["profile_name"] for profile_data in stream]
+        if suspicious != ["studio_1", "studio_3"] or len(flushes) != 2:
+            logger.error(f"Unerwartete Ergebnisse im Streaming-Modus: {suspicious}")
+            return False
+        
+        logger.info("Analyse im Streaming-Modus erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen der Analyse im Streaming-Modus: {e}")
+        return False
+
+def test_risk_model():
+    """Testet das gelernte Risikomodell über gehashte Merkmale und seine Aktualisierung aus Rückmeldungen"""
+    try:
+        import gc
+        import weakref
+        import tempfile
+        from risk_model import LogisticRiskModel, OnlineRiskTrainer, label_for
+        from detection_algorithms import DetectionManager, HyaluronPenDetector
+        
+        logger.info("Teste Risikomodell...")
+        
+        if label_for(True, ["abgelehnt"]) != 0 or label_for(False, ["pending"]) != 1 or label_for(False, []) is not None:
+            logger.error("Trainingslabels werden falsch bestimmt")
+            return False
+        
+        # Die jüngste Entscheidung zählt, egal ob Zurückweisung oder Bestätigung
+        if label_for(True, ["dismissed", "confirmed"]) != 1 or label_for(True, ["confirmed", "dismissed"]) != 0:
+            logger.error("Trainingslabel folgt nicht der jüngsten Entscheidung")
+            return False
+        
+        detector = HyaluronPenDetector()
+        offers = [
+            "Hyaluron Pen Behandlung nur 79€ #hyaluronpen #lippenaufspritzen Termine per DM",
+            "Lippen aufspritzen ohne Nadel, 99 Euro, Berlin #hyaluronpen",
+            "Hyaluron Pen Schulung mit Zertifikat #hyaluronpenschulung 149€"
+        ]
+        others = [
+            "Maniküre und Pediküre im Studio #nails #nageldesign",
+            "Neue Wimpernverlängerung, jetzt Termin buchen #wimpern",
+            "Urlaub am Meer #sommer #strand"
+        ]
+        texts = offers + others
+        analyses = [detector.analyze_profile({"description": text}) for text in texts]
+        labels = [1] * len(offers) + [0] * len(others)
+        
+        model = LogisticRiskModel(n_bits=16).fit(texts, labels, analyses)
+        scores = model.risk_scores(texts, analyses)
+        logger.info(f"Risiko-Scores: {[round(score, 1) for score in scores]}")
+        
+        if min(scores[:len(offers)]) <= max(scores[len(offers):]) or model.evaluate(texts, labels, analyses)["accuracy"] != 1.0:
+            logger.error("Risikomodell trennt Angebote nicht von anderen Profilen")
+            return False
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_path = model.save(f"{temp_dir}/risk_model.npz")
+            loaded = LogisticRiskModel.load(checkpoint_path)
+            
+            if loaded.fingerprint != model.fingerprint or loaded.risk_scores(texts, analyses) != scores:
+                logger.error("Gespeichertes Risikomodell weicht vom trainierten ab")
+                return False
+            
+            manager = DetectionManager(use_cache=False, risk_model=loaded)
+            manager.risk_trainer = OnlineRiskTrainer(loaded, checkpoint_path=checkpoint_path, batch_size=2)
+            analysis = manager.analyze_profiles_batch([{"description": offers[0]}])[0]
+            if abs(analysis.risk_score - scores[0]) > 1e-6:
+                logger.error("DetectionManager verwendet den Score des Risikomodells nicht")
+                return False
+            
+            # Zurückgewiesene Fälle senken den Score ähnlicher Profile nach einem Mini-Batch
+            dismissed = {"description": "Hyaluron Pen Beratung beim Hautarzt #hautarzt", "report_statuses": ["dismissed"]}
+            before = manager.analyze_profile(dismissed).risk_score
+            other = OnlineRiskTrainer(model, checkpoint_path=checkpoint_path)
+            manager.record_feedback(dismissed)
+            if manager.risk_trainer.pending_count != 1 or loaded.fingerprint != model.fingerprint:
+                logger.error("Rückmeldung wurde vor einem vollen Mini-Batch übernommen")
+                return False
+            
+            manager.record_feedback(dismissed)
+            after = manager.analyze_profile(dismissed).risk_score
+            logger.info(f"Risiko-Score vor/nach Rückmeldung: {before:.1f}/{after:.1f}")
+            if after >= before or loaded.metadata.get("online_updates") != 1:
+                logger.error("Rückmeldungen haben das Risikomodell nicht aktualisiert")
+                return False
+            
+            if not other.sync(force=True) or model.fingerprint != loaded.fingerprint:
+                logger.error("Checkpoint der Aktualisierung wird von anderen Prozessen nicht übernommen")
+                return False
+            
+            # Nicht mehr verwendete Trainer werden nicht bis zum Prozessende festgehalten
+            probe = weakref.ref(OnlineRiskTrainer(model, checkpoint_path=checkpoint_path))
+            gc.collect()
+            if probe() is not None:
+                logger.error("OnlineRiskTrainer wird bis zum Prozessende festgehalten")
+                return False
+        
+        logger.info("Risikomodell erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen des Risikomodells: {e}")
+        return False
+
+def test_bulk_writer():
+    """Testet das gepufferte Speichern von Profilen und Posts"""
+    try:
+        from bulk_writer import BulkProfileWriter
+        from database_manager import DatabaseManager
+        from database_schema import Profile, Post
+        
+        logger.info("Teste Bulk-Writer...")
+        
+        db_manager = DatabaseManager("sqlite:///test_iri_legal_agent.db")
+        
+        profile_data = {
+            "profile_name": "bulk_test_studio",
+            "profile_link": "https://instagram.com/bulk_test_studio",
+            "description": "Hyaluron Pen Behandlungen",
+            "risk_score": 80.0
+        }
+        post_data = {"post_link": "https://instagram.com/p/bulk_test", "post_text": "Hyaluron Pen ab 79€"}
+        
+        # Dasselbe Profil zweimal puffern: es darf nur einmal gespeichert werden
+        with BulkProfileWriter(db_manager, batch_size=10, flush_interval=0) as writer:
+            writer.add("Instagram", profile_data, [post_data])
+            writer.add("Instagram", dict(profile_data, risk_score=90.0), [post_data])
+        
+        session = db_manager.get_session()
+        try:
+            profiles = session.query(Profile).filter_by(profile_name="bulk_test_studio").all()
+            posts = session.query(Post).filter_by(post_link="https://instagram.com/p/bulk_test").all()
+            
+            if len(profiles) != 1 or len(posts) != 1:
+                logger.error(f"Bulk-Writer hat {len(profiles)} Profile und {len(posts)} Posts gespeichert")
+                return False
+            
+            if profiles[0].risk_score != 90.0:
+                logger.error("Bulk-Writer hat den neuesten Risiko-Score nicht übernommen")
+                return False
+        finally:
+            session.close()
+        
+        # Ein fehlerhaftes Profil (ohne Pflichtfeld profile_link) kostet nur sich selbst, nicht den Batch
+        with BulkProfileWriter(db_manager, batch_size=10, flush_interval=0) as writer:
+            writer.add("Instagram", {"profile_name": "bulk_test_valid_a", "profile_link": "https://instagram.com/bulk_test_valid_a"})
+            writer.add("Instagram", {"profile_name": "bulk_test_invalid"})
+            writer.add("Instagram", {"profile_name": "bulk_test_valid_b", "profile_link": "https://instagram.com/bulk_test_valid_b"})
+        
+        statistics = writer.get_statistics()
+        session = db_manager.get_session()
+        try:
+            saved = {name for name, in session.query(Profile.profile_name).filter(Profile.profile_name.like("bulk_test_%"))}
+        finally:
+            session.close()
+        
+        if not {"bulk_test_valid_a", "bulk_test_valid_b"} <= saved or "bulk_test_invalid" in saved or statistics["failed_profiles"] != 1:
+            logger.error(f"Fehlgeschlagener Batch hat gültige Profile verworfen: {saved}, {statistics}")
+            return False
+        
+        logger.info("Bulk-Writer erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen des Bulk-Writers: {e}")
+        return False
+
+def test_near_duplicates():
+    """Testet den MinHash/LSH-Index für kopierte Anzeigentexte"""
+    try:
+        from near_duplicates import NearDuplicateIndex
+        
+        logger.info("Teste Duplikat-Index...")
+        
+        index = NearDuplicateIndex(threshold=0.9)
+        ad_text = "Hyaluron Pen ab 79€, jetzt Termin buchen! Volle Lippen ohne Nadel im Studio Berlin Mitte."
+        
+        index.add("post:1", ad_text)
+        index.add("post:2", "Öffnungszeiten: Montag bis Freitag 9:00 - 18:00 Uhr, Samstag nach Vereinbarung.")
+        matches = index.add("post:3", ad_text.upper() + "  ")
+        logger.info(f"Gefundene Kopien: {matches}")
+        
+        if [key for key, _ in matches] != ["post:1"]:
+            logger.error("Duplikat-Index erkennt die Kopie nicht")
+            return False
+        
+        if index.get_clusters() != [["post:1", "post:3"]]:
+            logger.error(f"Duplikat-Index bildet falsche Cluster: {index.get_clusters()}")
+            return False
+        
+        logger.info("Duplikat-Index erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen des Duplikat-Index: {e}")
+        return False
+
+def test_image_hashing():
+    """Testet den Wahrnehmungs-Hash und den Hamming-Index für Screenshots"""
+    try:
+        from PIL import Image, ImageDraw
+        from image_hashing import dhash, hamming_distance, ScreenshotHashIndex
+        
+        logger.info("Teste Screenshot-Hashes...")
+        
+        image = Image.new("RGB", (400, 300), "white")
+        draw = ImageDraw.Draw(image)
+        draw.ellipse((50, 50, 250, 200), fill="red")
+        draw.rectangle((280, 100, 380, 280), fill="blue")
+        
+        original_hash = dhash(image)
+        resized_hash = dhash(image.resize((200, 150)))
+        other_hash = dhash(Image.new("RGB", (400, 300), "black"))
+        
+        if hamming_distance(original_hash, resized_hash) > 6:
+            logger.error("Verkleinertes Bild hat einen zu stark abweichenden Hash")
+            return False
+        
+        index = ScreenshotHashIndex(max_distance=6)
+        index.add(format(original_hash, "016x"), {"id": 1, "url_captured": "https://example.com/a"})
+        index.add(format(other_hash, "016x"), {"id": 2, "url_captured": "https://example.com/b"})
+        
+        similar = [info["id"] for _, info in index.find_similar(format(resized_hash, "016x"))]
+        if similar != [1]:
+            logger.error(f"Hamming-Index findet falsche Screenshots: {similar}")
+            return False
+        
+        if not index.is_unchanged("https://example.com/a", format(resized_hash, "016x")):
+            logger.error("Unveränderte Aufnahme wird nicht erkannt")
+            return False
+        
+        logger.info("Screenshot-Hashes erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen der Screenshot-Hashes: {e}")
+        return False
+
+def test_operator_resolution():
+    """Testet die plattformübergreifende Zuordnung von Profilen zu Betreibern"""
+    try:
+        from operator_resolution import OperatorIndex, collect_identifiers, normalize_phone
+        
+        logger.info("Teste Betreiberzuordnung...")
+        
+        if normalize_phone("+49 (0)171-1234567") != normalize_phone("0171 1234567") != "+491711234567":
+            logger.error("Telefonnummern werden nicht einheitlich normalisiert")
+            return False
+        
+        profiles = [
+            ("Instagram", {"profile_name": "lips_by_anna", "analysis": {"phones": ["0171 1234567"], "emails": []}}),
+            ("TikTok", {"profile_name": "annalips", "description": "Termine: www.anna-beauty.de", "analysis": {"phones": ["+49 171 1234567"]}}),
+            ("Website", {"profile_name": "Anna Beauty", "profile_link": "https://anna-beauty.de/hyaluron", "analysis": {}}),
+            ("Facebook", {"profile_name": "Studio Berlin", "email": "info@studio-berlin.de", "analysis": {}})
+        ]
+        
+        index = OperatorIndex()
+        roots = [index.add(f"profile:{platform}:{data['profile_name']}", collect_identifiers(platform, data)) for platform, data in profiles]
+        logger.info(f"Betreiber: {index.get_clusters(min_size=1)}")
+        
+        if len(set(roots[:3])) != 1 or index.operator_of("profile:Website:Anna Beauty") != index.operator_of("profile:Instagram:lips_by_anna"):
+            logger.error("Profile mit gemeinsamer Telefonnummer oder Domain werden nicht zusammengefasst")
+            return False
+        
+        if index.members_of("profile:Facebook:Studio Berlin") != ["profile:Facebook:Studio Berlin"]:
+            logger.error("Unabhängiges Profil wurde einem fremden Betreiber zugeordnet")
+            return False
+        
+        # Verschiedene Freemail-Adressen in Texten verbinden keine Profile
+        freemail = [
+            ("Instagram", {"profile_name": "anna_lips", "description": "Mail: anna@gmail.com", "analysis": {}}),
+            ("Instagram", {"profile_name": "bert_beauty", "post_text": "Mail: bert@gmail.com oder gmail.com", "analysis": {}})
+        ]
+        for platform, data in freemail:
+            if any(kind == "domain" for kind, value in collect_identifiers(platform, data)):
+                logger.error(f"Freemail-Domain als Betreiber-Domain erkannt: {collect_identifiers(platform, data)}")
+                return False
+            index.add(f"profile:{platform}:{data['profile_name']}", collect_identifiers(platform, data))
+        if index.operator_of("profile:Instagram:anna_lips") == index.operator_of("profile:Instagram:bert_beauty"):
+            logger.error("Profile mit verschiedenen Gmail-Adressen wurden zusammengefasst")
+            return False
+        
+        logger.info("Betreiberzuordnung erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen der Betreiberzuordnung: {e}")
+        return False
+
+def test_pipeline_metrics():
+    """Testet die Laufzeitmessung und das cProfile-Sampling der Erkennungs-Pipeline"""
+    try:
+        import tempfile
+        from pipeline_metrics import get_registry, instrumented
+        
+        logger.info("Teste Laufzeitmessung...")
+        
+        class Stage:
+            @instrumented("test.stage", profile=True)
+            def run(self, text):
+                return text.upper()
+        
+        registry = get_registry()
+        was_enabled, profile_every, profile_dir = registry.enabled, registry.profile_every, registry.profile_dir
+        
+        try:
+            registry.disable()
+            Stage().run("ohne Messung")
+            if "test.stage" in registry.snapshot()["stages"]:
+                logger.error("Deaktivierte Messung zeichnet Aufrufe auf")
+                return False
+            
+            with tempfile.TemporaryDirectory() as temp_dir:
+                registry.enable(profile_every=2, profile_dir=temp_dir)
+                for _ in range(4):
+                    Stage().run("Hyaluron Pen äöü")
+                
+                stage = registry.snapshot()["stages"]["test.stage"]
+                logger.info(f"Messwerte: {stage}")
+                
+                if stage["calls"] != 4 or stage["bytes"] != 4 * len("Hyaluron Pen äöü".encode("utf-8")):
+                    logger.error("Aufrufe oder Bytes wurden falsch gezählt")
+                    return False
+                
+                profile_files = [name for name in os.listdir(temp_dir) if name.startswith("test.stage")]
+                if len(profile_files) != 2:
+                    logger.error(f"Falsche Anzahl von cProfile-Ausgaben: {profile_files}")
+                    return False
+        finally:
+            registry.reset()
+            registry.profile_every, registry.profile_dir = profile_every, profile_dir
+            if not was_enabled:
+                registry.disable()
+        
+        logger.info("Laufzeitmessung erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen der Laufzeitmessung: {e}")
+        return False
+
 def test_screenshot_service():
     """Testet den Screenshot-Dienst"""
     try:
@@ -172,6 +1044,440 @@ def test_platform_scraper():
         logger.error(f"Fehler beim Testen des Plattform-Scrapers: {e}")
         return False
 
+def test_async_scraper():
+    """Testet die asynchrone Scraping-Engine gegen einen lokalen HTTP-Server"""
+    try:
+        try:
+            from async_scraper import AsyncSearchEngine
+        except ImportError:
+            logger.warning("aiohttp nicht installiert, asynchrone Scraping-Engine wird nicht getestet")
+            return True
+        
+        import threading
+        from urllib.parse import quote_plus
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        from platform_scraper import MultiPlatformScraper
+        from politeness import PolitenessScheduler
+        from adaptive_concurrency import AIMDController
+        
+        logger.info("Teste asynchrone Scraping-Engine...")
+        
+        requests_seen = {"total": 0, "active": 0, "max_active": 0}
+        flaky_user_agents = []
+        lock = threading.Lock()
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                # Erste Anfrage an /flaky schlägt fehl, damit ein Wiederholungsversuch folgt
+                if self.path == "/flaky":
+                    flaky_user_agents.append(self.headers.get("User-Agent"))
+                    self.send_response(500 if len(flaky_user_agents) == 1 else 200)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                
+                with lock:
+                    requests_seen["total"] += 1
+                    requests_seen["active"] += 1
+                    requests_seen["max_active"] = max(requests_seen["max_active"], requests_seen["active"])
+                time.sleep(0.05)
+                with lock:
+                    requests_seen["active"] -= 1
+                
+                body = "<html><title>Beauty Studio</title><p>Hyaluron Pen ab 79€</p></html>".encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        
+        try:
+            # Alle Seiten werden vom lokalen Server geladen
+            platform_scraper = MultiPlatformScraper()
+            platform_scraper.instagram_scraper.hashtag_url = lambda hashtag: f"{base_url}/tags/{hashtag.lstrip('#')}"
+            platform_scraper.instagram_scraper.profile_url = lambda profile_name: f"{base_url}/{profile_name.lstrip('@')}"
+            platform_scraper.google_scraper.keyword_url = lambda keyword: f"{base_url}/search?q={quote_plus(keyword)}"
+            platform_scraper.instagram_scraper.http_cache = None
+            platform_scraper.google_scraper.http_cache = None
+            
+            platforms = ["Instagram", "Google"]
+            planned = sum(len(searches) for platform, searches in platform_scraper.plan_search(platforms=platforms))
+            
+            # Der lokale Server wird ohne Ratenbegrenzung angefragt, damit nur das Limit pro Host greift
+            scheduler = PolitenessScheduler({"Instagram": (1000.0, 10), "Google": (1000.0, 10)})
+            engine = AsyncSearchEngine(platform_scraper, max_concurrency=8, max_per_host=2, scheduler=scheduler,
+                                       controller=AIMDController())
+            start_time = time.time()
+            results = engine.run_search(platforms=platforms)
+            logger.info(f"{requests_seen['total']} Seiten in {time.time() - start_time:.2f}s geladen")
+            
+            if list(results) != platforms or not results["Instagram"] or not results["Google"]:
+                logger.error(f"Unerwartete Ergebnisse: { {platform: len(found) for platform, found in results.items()} }")
+                return False
+            
+            if requests_seen["total"] != planned:
+                logger.error(f"{requests_seen['total']} Anfragen statt {planned}")
+                return False
+            
+            # Alle Anfragen gehen an denselben Host und müssen sich das Limit pro Host teilen
+            if requests_seen["max_active"] != 2:
+                logger.error(f"{requests_seen['max_active']} gleichzeitige Anfragen an einen Host statt 2")
+                return False
+            
+            streamed = list(engine.iter_search(platforms=["Google"]))
+            if not streamed or any(platform != "Google" for platform, profile_data in streamed):
+                logger.error("Keine Ergebnisse aus der asynchronen Suche mit Streaming")
+                return False
+            
+            # Wiederholungsversuche senden den gewechselten User-Agent
+            import asyncio
+            import aiohttp
+            from async_scraper import HostLimiter
+            google_scraper = platform_scraper.google_scraper
+            google_scraper.session.headers["User-Agent"] = "Erster Agent"
+            google_scraper.user_agents = ["Zweiter Agent"]
+            engine.retry_delay = 0
+            
+            async def fetch_flaky():
+                async with aiohttp.ClientSession() as session:
+                    limiter = HostLimiter(2, 2, scheduler, engine.controller)
+                    return await engine._fetch(session, limiter, google_scraper, f"{base_url}/flaky")
+            
+            page = asyncio.run(fetch_flaky())
+            if page is None or flaky_user_agents != ["Erster Agent", "Zweiter Agent"]:
+                logger.error(f"User-Agent wurde beim Wiederholungsversuch nicht gewechselt: {flaky_user_agents}")
+                return False
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        logger.info("Asynchrone Scraping-Engine erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen der asynchronen Scraping-Engine: {e}")
+        return False
+
+def test_politeness_scheduler():
+    """Testet die Anfrageraten pro Host"""
+    try:
+        import requests
+        from politeness import PolitenessScheduler, TokenBucket, parse_rate_limits
+        from platform_scraper import WebsiteScraper
+        
+        logger.info("Teste Anfrageraten pro Host...")
+        
+        # Burst ohne Wartezeit, danach Abstand 1/Rate
+        bucket = TokenBucket(rate=10.0, burst=2)
+        delays = [bucket.reserve() for _ in range(4)]
+        if delays[:2] != [0.0, 0.0] or not (0.09 <= delays[2] <= 0.11 and 0.19 <= delays[3] <= 0.21):
+            logger.error(f"Unerwartete Wartezeiten: {delays}")
+            return False
+        
+        if parse_rate_limits("Instagram=0.2, Website=2:4") != {"Instagram": (0.2, 1), "Website": (2.0, 4)}:
+            logger.error("Raten aus SCRAPER_RATE_LIMITS falsch gelesen")
+            return False
+        
+        scheduler = PolitenessScheduler({"Website": (20.0, 1)})
+        if scheduler.rate_for("Instagram")[0] >= scheduler.rate_for("Website")[0]:
+            logger.error("Instagram ist nicht strenger begrenzt als Studio-Websites")
+            return False
+        if scheduler.bucket("https://www.instagram.com/a/") is not scheduler.bucket("https://instagram.com/b/"):
+            logger.error("www.instagram.com und instagram.com verwenden verschiedene Buckets")
+            return False
+        
+        # Anfragen an verschiedene Hosts gehen ohne Wartezeit hintereinander raus
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"<html>Hyaluron Pen</html>"
+        
+        scraper = WebsiteScraper()
+        scraper.scheduler = scheduler
+        scraper.http_cache = None
+        scraper.session.request = lambda **kwargs: response
+        
+        start_time = time.time()
+        for domain in ["studio-a.de", "studio-b.de", "studio-c.de"]:
+            scraper.make_request(f"https://{domain}/")
+        different_hosts = time.time() - start_time
+        
+        start_time = time.time()
+        for _ in range(3):
+            scraper.make_request("https://studio-d.de/")
+        same_host = time.time() - start_time
+        
+        logger.info(f"3 Hosts: {different_hosts:.3f}s, 1 Host: {same_host:.3f}s")
+        if different_hosts > 0.05 or same_host < 0.09:
+            logger.error("Anfragen an verschiedene Hosts warten oder ein Host überschreitet seine Rate")
+            return False
+        
+        logger.info("Anfrageraten pro Host erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen der Anfrageraten pro Host: {e}")
+        return False
+
+def test_adaptive_concurrency():
+    """Testet die adaptive Parallelität pro Host (AIMD) und Retry-After"""
+    try:
+        import requests
+        from adaptive_concurrency import AIMDController, is_congested, parse_retry_after
+        from politeness import PolitenessScheduler
+        from platform_scraper import WebsiteScraper
+        
+        logger.info("Teste adaptive Parallelität pro Host...")
+        
+        url = "https://studio-aimd.de/"
+        controller = AIMDController(maximum=8, backoff=0.2)
+        
+        # Additive Erhöhung bei gesunden Antworten
+        for _ in range(10):
+            controller.record_success(url)
+        window = controller.limit(url)
+        if window < 3:
+            logger.error(f"Fenster nach 10 Erfolgen nur {window}")
+            return False
+        
+        # Multiplikative Verkleinerung bei Drosselung, nur einmal pro Sperrzeit
+        delay = controller.record_congestion(url, "2")
+        controller.record_congestion(url)
+        if controller.limit(url) != window // 2 or not 1.9 <= delay <= 2.0 or controller.blocked_for(url) < 1.9:
+            logger.error(f"Unerwarteter Zustand nach Drosselung: {controller.get_statistics()}")
+            return False
+        
+        if parse_retry_after("120") != 120 or parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") != 0 or parse_retry_after("bald") is not None:
+            logger.error("Retry-After falsch gelesen")
+            return False
+        if not is_congested(429, "") or not is_congested(403, "Bitte Captcha lösen") or is_congested(403, "Hyaluron Pen"):
+            logger.error("Drosselungserkennung fehlerhaft")
+            return False
+        
+        # Eine gewöhnliche Seite mit Robots-Meta-Tag ist keine Bot-Prüfseite
+        robots_page = '<html><head><meta name="robots" content="index,follow"></head><body>Hyaluron Pen</body></html>'
+        if is_congested(200, robots_page) or is_congested(403, robots_page) or not is_congested(403, "Are you a robot?"):
+            logger.error("Robots-Meta-Tag als Bot-Prüfseite erkannt")
+            return False
+        
+        # reCAPTCHA im Kontaktformular einer erreichbaren Seite ist keine Drosselung
+        contact_page = '<form><div class="g-recaptcha"></div></form><script src="https://www.google.com/recaptcha/api.js"></script>'
+        if is_congested(200, contact_page) or not is_congested(403, contact_page):
+            logger.error("Seite mit reCAPTCHA-Kontaktformular als Drosselung erkannt")
+            return False
+        
+        # make_request wartet nach 429 die Retry-After-Zeit ab und versucht es dann erneut
+        throttled = requests.Response()
+        throttled.status_code = 429
+        throttled.headers["Retry-After"] = "1"
+        throttled._content = b""
+        
+        ok = requests.Response()
+        ok.status_code = 200
+        ok._content = b"<html>Hyaluron Pen</html>"
+        
+        responses = [throttled, ok]
+        scraper = WebsiteScraper()
+        scraper.scheduler = PolitenessScheduler({"Website": (1000.0, 10)})
+        scraper.concurrency = AIMDController()
+        scraper.http_cache = None
+        scraper.session.request = lambda **kwargs: responses.pop(0)
+        
+        start_time = time.time()
+        response = scraper.make_request("https://studio-retry.de/")
+        duration = time.time() - start_time
+        
+        if response is not ok or not 0.9 <= duration < 2.0:
+            logger.error(f"Retry-After nicht eingehalten ({duration:.2f}s)")
+            return False
+        
+        statistics = scraper.concurrency.get_statistics()["studio-retry.de"]
+        if statistics["congestions"] != 1 or statistics["successes"] != 1:
+            logger.error(f"Unerwartete Statistik: {statistics}")
+            return False
+        
+        logger.info("Adaptive Parallelität pro Host erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen der adaptiven Parallelität: {e}")
+        return False
+
+def test_http_cache():
+    """Testet den HTTP-Cache mit bedingten Anfragen"""
+    try:
+        import os
+        import tempfile
+        import requests
+        from http_cache import HttpCache, parse_ttls
+        from politeness import PolitenessScheduler
+        from platform_scraper import WebsiteScraper
+        
+        logger.info("Teste HTTP-Cache...")
+        
+        if parse_ttls("Instagram=3600, Website=0") != {"Instagram": 3600.0, "Website": 0.0}:
+            logger.error("TTLs aus HTTP_CACHE_TTLS falsch gelesen")
+            return False
+        
+        with tempfile.TemporaryDirectory() as directory:
+            cache = HttpCache(directory=directory)
+            
+            # Server mit ETag: 200 beim ersten Abruf, 304, wenn die Anfrage den ETag mitschickt
+            sent_headers = []
+            def request(**kwargs):
+                sent_headers.append(kwargs.get("headers") or {})
+                response = requests.Response()
+                response.url = kwargs["url"]
+                if sent_headers[-1].get("If-None-Match") == '"v1"':
+                    response.status_code = 304
+                    response._content = b""
+                else:
+                    response.status_code = 200
+                    response.headers["ETag"] = '"v1"'
+                    response.headers["Content-Type"] = "text/html; charset=utf-8"
+                    response._content = "<html>Hyaluron Pen für Lippen</html>".encode("utf-8")
+                return response
+            
+            scraper = WebsiteScraper()
+            scraper.scheduler = PolitenessScheduler({"Website": (1000.0, 10)})
+            scraper.http_cache = cache
+            scraper.session.request = request
+            
+            first = scraper.make_request("https://studio-cache.de/")
+            second = scraper.make_request("https://studio-cache.de/")
+            if len(sent_headers) != 1 or second.text != first.text or not getattr(second, "from_cache", False):
+                logger.error(f"Seite innerhalb der TTL erneut geladen ({len(sent_headers)} Anfragen)")
+                return False
+            
+            # Nach Ablauf der TTL wird bedingt angefragt und 304 aus der lokalen Kopie bedient
+            cache.platform_ttls["Website"] = 0
+            revalidated = scraper.make_request("https://studio-cache.de/")
+            if len(sent_headers) != 2 or sent_headers[-1].get("If-None-Match") != '"v1"':
+                logger.error(f"Keine bedingte Anfrage nach Ablauf der TTL: {sent_headers}")
+                return False
+            if revalidated.status_code != 200 or revalidated.text != first.text or cache.revalidations != 1:
+                logger.error("304 nicht aus der lokalen Kopie bedient")
+                return False
+            
+            # Gleiche Inhalte unter verschiedenen URLs werden nur einmal gespeichert
+            cache.store("https://studio-cache.de/kopie", {}, first.content)
+            if cache.get_statistics()["entries"] != 2 or len(os.listdir(os.path.join(directory, "objects"))) != 1:
+                logger.error(f"Inhalt nicht inhaltsadressiert gespeichert: {cache.get_statistics()}")
+                return False
+            
+            # Größenbegrenzung: die am längsten nicht verwendeten Einträge werden verdrängt
+            small_cache = HttpCache(directory=os.path.join(directory, "small"), max_bytes=20000)
+            for number in range(4):
+                small_cache.store(f"https://studio-{number}.de/", {}, os.urandom(4000))
+            small_cache.read_body(small_cache.lookup("https://studio-0.de/"))
+            small_cache.store("https://studio-4.de/", {}, os.urandom(4000))
+            statistics = small_cache.get_statistics()
+            if statistics["bytes"] > 20000 or small_cache.lookup("https://studio-0.de/") is None or small_cache.lookup("https://studio-1.de/") is not None:
+                logger.error(f"Unerwartete Verdrängung: {statistics}")
+                return False
+        
+        logger.info("HTTP-Cache erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen des HTTP-Caches: {e}")
+        return False
+
+def test_proxy_pool():
+    """Testet den Proxy-Pool mit Circuit-Breakern"""
+    try:
+        import requests
+        from collections import Counter
+        from proxy_pool import ProxyPool, CLOSED, OPEN
+        from politeness import PolitenessScheduler
+        from platform_scraper import WebsiteScraper
+        
+        logger.info("Teste Proxy-Pool...")
+        
+        proxies = ["http://p1:8080", "http://p2:8080", "http://p3:8080"]
+        pool = ProxyPool(proxies, failure_threshold=2, open_timeout=0.2)
+        
+        # Nach zwei Verbindungsfehlern in Folge wird p1 gesperrt
+        pool.record_failure("http://p1:8080", "https://studio.de/")
+        pool.record_failure("http://p1:8080", "https://studio.de/")
+        if pool.get_statistics()["p1:8080"]["state"] != OPEN:
+            logger.error(f"Proxy nach Fehlern nicht gesperrt: {pool.get_statistics()}")
+            return False
+        
+        # Sperren durch Instagram betreffen p2 nur für Instagram
+        pool.record_response("http://p2:8080", "https://www.instagram.com/a/", 429, congested=True)
+        pool.record_response("http://p2:8080", "https://www.instagram.com/b/", 403)
+        instagram = Counter(pool.acquire("https://www.instagram.com/c/") for _ in range(50))
+        if set(instagram) != {"http://p3:8080"}:
+            logger.error(f"Gesperrte Proxies für Instagram verwendet: {instagram}")
+            return False
+        
+        # Schnelle, zuverlässige Proxies werden bevorzugt
+        for _ in range(5):
+            pool.record_success("http://p2:8080", "https://studio.de/", latency=0.1)
+            pool.record_success("http://p3:8080", "https://studio.de/", latency=3.0)
+        studio = Counter(pool.acquire("https://studio.de/") for _ in range(50))
+        if studio["http://p1:8080"] or studio["http://p2:8080"] <= studio["http://p3:8080"]:
+            logger.error(f"Unerwartete Verteilung: {studio}")
+            return False
+        
+        # Nach der Sperrzeit bekommt p1 genau eine Probeanfrage; scheitert sie, verdoppelt sich die Sperrzeit
+        time.sleep(0.25)
+        probes = [pool.acquire("https://studio.de/") for _ in range(3)]
+        if probes[0] != "http://p1:8080" or "http://p1:8080" in probes[1:]:
+            logger.error(f"Keine einzelne Probeanfrage: {probes}")
+            return False
+        pool.record_failure("http://p1:8080", "https://studio.de/")
+        time.sleep(0.25)
+        if pool.acquire("https://studio.de/") == "http://p1:8080":
+            logger.error("Sperrzeit nach fehlgeschlagener Probe nicht verlängert")
+            return False
+        time.sleep(0.3)
+        if pool.acquire("https://studio.de/") != "http://p1:8080":
+            logger.error("Keine zweite Probeanfrage nach verlängerter Sperrzeit")
+            return False
+        pool.record_success("http://p1:8080", "https://studio.de/", latency=0.2)
+        if pool.get_statistics()["p1:8080"]["state"] != CLOSED:
+            logger.error("Proxy nach erfolgreicher Probe nicht freigegeben")
+            return False
+        
+        # make_request weicht einem toten Proxy ohne Wartezeit aus
+        ok = requests.Response()
+        ok.status_code = 200
+        ok._content = b"<html>Hyaluron Pen</html>"
+        
+        used = []
+        def request(**kwargs):
+            used.append(kwargs["proxies"]["http"])
+            if used[-1] == "http://dead:8080":
+                raise requests.exceptions.ProxyError("Verbindung zum Proxy fehlgeschlagen")
+            return ok
+        
+        scraper = WebsiteScraper()
+        scraper.scheduler = PolitenessScheduler({"Website": (1000.0, 10)})
+        scraper.http_cache = None
+        scraper.proxy_pool = ProxyPool(["http://dead:8080", "http://alive:8080"], failure_threshold=1)
+        scraper.session.request = request
+        
+        start_time = time.time()
+        responses = [scraper.make_request(f"https://studio-{number}.de/") for number in range(5)]
+        duration = time.time() - start_time
+        if any(response is not ok for response in responses) or used.count("http://dead:8080") > 1 or duration > 1.0:
+            logger.error(f"Toter Proxy nicht gemieden: {used} ({duration:.2f}s)")
+            return False
+        
+        if WebsiteScraper().proxy_pool is not WebsiteScraper().proxy_pool:
+            logger.error("Scraper verwenden verschiedene Proxy-Pools")
+            return False
+        
+        logger.info("Proxy-Pool erfolgreich getestet")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Testen des Proxy-Pools: {e}")
+        return False
+
 def test_integrated_scraper():
     """Testet den integrierten Scraper"""
     try:
@@ -291,8 +1597,31 @@ def run_all_tests():
     tests = [
         ("Datenbankverbindung", test_database_connection),
         ("Erkennungsalgorithmen", test_detection_algorithms),
+        ("Preis- und Kontaktscanner", test_text_scanner),
+        ("Gemeinsamer Analysezustand", test_analysis_context),
+        ("Batch-Analyse", test_batch_analysis),
+        ("Analyse-Cache", test_analysis_cache),
+        ("Keyword-Automat", test_keyword_automaton),
+        ("Verschleierte Schlüsselwörter", test_fuzzy_keywords),
+        ("Erkennungsregeln", test_detection_rules),
+        ("Hashtag-Zerlegung", test_hashtag_segmentation),
+        ("Spracherkennung", test_language_identification),
+        ("Ortsverzeichnis", test_gazetteer),
+        ("Analyseergebnisse", test_analysis_result),
+        ("Streaming-Analyse", test_streaming),
+        ("Risikomodell", test_risk_model),
+        ("Bulk-Writer", test_bulk_writer),
+        ("Duplikat-Index", test_near_duplicates),
+        ("Screenshot-Hashes", test_image_hashing),
+        ("Betreiberzuordnung", test_operator_resolution),
+        ("Laufzeitmessung", test_pipeline_metrics),
         ("Screenshot-Dienst", test_screenshot_service),
         ("Plattform-Scraper", test_platform_scraper),
+        ("Asynchrone Scraping-Engine", test_async_scraper),
+        ("Anfrageraten pro Host", test_politeness_scheduler),
+        ("Adaptive Parallelität", test_adaptive_concurrency),
+        ("HTTP-Cache", test_http_cache),
+        ("Proxy-Pool", test_proxy_pool),
         ("Integrierter Scraper", test_integrated_scraper),
         ("Flask-App", test_flask_app)
     ]
@@ -337,7 +1666,7 @@ def run_all_tests():
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Test-Skript für den verbesserten Scraper")
     
-    parser.add_argument("--test", choices=["all", "db", "detection", "screenshot", "platform", "integrated", "flask"],
+    parser.add_argument("--test", choices=["all", "db", "detection", "scanner", "context", "batch", "analysiscache", "keywords", "fuzzy", "rules", "hashtags", "language", "gazetteer", "results", "streaming", "riskmodel", "bulk", "duplicates", "imagehash", "operators", "metrics", "screenshot", "platform", "async", "politeness", "aimd", "httpcache", "proxies", "integrated", "flask"],
                         default="all", help="Auszuführender Test")
     
     args = parser.parse_args()
@@ -348,10 +1677,56 @@ if __name__ == "__main__":
         test_database_connection()
     elif args.test == "detection":
         test_detection_algorithms()
+    elif args.test == "scanner":
+        test_text_scanner()
+    elif args.test == "context":
+        test_analysis_context()
+    elif args.test == "batch":
+        test_batch_analysis()
+    elif args.test == "analysiscache":
+        test_analysis_cache()
+    elif args.test == "keywords":
+        test_keyword_automaton()
+    elif args.test == "fuzzy":
+        test_fuzzy_keywords()
+    elif args.test == "rules":
+        test_detection_rules()
+    elif args.test == "hashtags":
+        test_hashtag_segmentation()
+    elif args.test == "language":
+        test_language_identification()
+    elif args.test == "gazetteer":
+        test_gazetteer()
+    elif args.test == "results":
+        test_analysis_result()
+    elif args.test == "streaming":
+        test_streaming()
+    elif args.test == "riskmodel":
+        test_risk_model()
+    elif args.test == "bulk":
+        test_bulk_writer()
+    elif args.test == "duplicates":
+        test_near_duplicates()
+    elif args.test == "imagehash":
+        test_image_hashing()
+    elif args.test == "operators":
+        test_operator_resolution()
+    elif args.test == "metrics":
+        test_pipeline_metrics()
     elif args.test == "screenshot":
         test_screenshot_service()
     elif args.test == "platform":
         test_platform_scraper()
+    elif args.test == "async":
+        test_async_scraper()
+    elif args.test == "politeness":
+        test_politeness_scheduler()
+    elif args.test == "aimd":
+        test_adaptive_concurrency()
+    elif args.test == "httpcache":
+        test_http_cache()
+    elif args.test == "proxies":
+        test_proxy_pool()
     elif args.test == "integrated":
         test_integrated_scraper()
     elif args.test == "flask":